@@ -40,6 +40,7 @@ from extensions import login_manager, csrf
 
 # Import database functions
 from database import close_db, init_db, get_db
+from database.connection import close_pool
 
 
 def create_app(config_name=None):
@@ -94,6 +95,12 @@ def create_app(config_name=None):
     # Expire old waitlist entries on startup
     expire_waitlist_entries(app)
 
+    # Trim map revision history for past dates
+    prune_map_changes(app)
+
+    # Don't carry the startup tasks' pooled connection into forked workers
+    close_pool()
+
     return app
 
 
@@ -275,6 +282,36 @@ def register_cli_commands(app):
             app.logger.info('All migrations completed successfully')
             click.echo('Migrations complete!')
 
+    @app.cli.command('recompute-customer-stats')
+    def recompute_customer_stats_command():
+        """Rebuild every customer's statistics from their reservations."""
+        from models.reservation_state import recompute_all_customer_statistics
+
+        with app.app_context():
+            updated = recompute_all_customer_statistics()
+        app.logger.info(f'Customer statistics recomputed via CLI ({updated} changed)')
+        click.echo(f'Customer statistics recomputed: {updated} customer(s) changed')
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index_command():
+        """Rebuild the customer/guest search indexes from scratch."""
+        from models.search_index import rebuild_search_index
+
+        with app.app_context():
+            indexed = rebuild_search_index()
+        app.logger.info(f'Search index rebuilt via CLI ({indexed} rows)')
+        click.echo(f'Search index rebuilt: {indexed} row(s) indexed')
+
+    @app.cli.command('rebuild-daily-rollup')
+    def rebuild_daily_rollup_command():
+        """Rebuild (backfill) the daily insights rollup for every past day."""
+        from models.insights.rollup import rebuild_daily_rollup
+
+        with app.app_context():
+            days = rebuild_daily_rollup()
+        app.logger.info(f'Daily rollup rebuilt via CLI ({days} days)')
+        click.echo(f'Daily rollup rebuilt: {days} day(s) recomputed')
+
     @app.cli.command('create-user')
     @click.argument('username')
     @click.argument('email')
@@ -451,6 +488,22 @@ def expire_waitlist_entries(app):
         app.logger.warning(f'Could not expire waitlist entries: {e}')
 
 
+def prune_map_changes(app):
+    """
+    Prune map change rows for past dates on startup.
+    Keeps the revision log used by map polling small.
+    """
+    try:
+        with app.app_context():
+            from models.map_revision import prune_map_changes as _prune
+            count = _prune()
+            if count > 0:
+                app.logger.info(f'Pruned {count} old map change rows')
+    except Exception as e:
+        # Don't crash the app if the table is not migrated yet
+        app.logger.warning(f'Could not prune map changes: {e}')
+
+
 # Create application instance for development server
 if __name__ == '__main__':
     app = create_app()
@@ -461,7 +461,8 @@ def hotel_guests_import():
                     updated_count=result['updated'],
                     errors=result.get('errors', []),
                     room_changes=result.get('room_changes', []),
-                    imported_by=current_user.id if current_user.is_authenticated else None
+                    imported_by=current_user.id if current_user.is_authenticated else None,
+                    timings=result.get('timings')
                 )
             except Exception as log_err:
                 current_app.logger.warning(f'Failed to save import log: {log_err}')
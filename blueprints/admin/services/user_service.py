@@ -11,6 +11,8 @@ from datetime import datetime
 from typing import Dict, List, Any, Tuple
 import re
 import os
+import json
+import time
 import openpyxl
 
 
@@ -157,9 +159,9 @@ def detect_header_row(sheet) -> Tuple[int, Dict[str, int]]:
     Returns:
         Tuple of (header_row_number, column_mapping_dict)
     """
-    # Try first 10 rows to find headers
-    for row_num in range(1, 11):
-        row_values = [cell.value for cell in sheet[row_num]]
+    # Try first 10 rows to find headers (iter_rows also works on read-only sheets)
+    for row_num, row_values in enumerate(
+            sheet.iter_rows(min_row=1, max_row=10, values_only=True), start=1):
 
         # Count how many known headers we find
         column_map = {}
@@ -205,78 +207,176 @@ def parse_date(value) -> str:
     return None
 
 
-def import_hotel_guests_from_excel(
-    file_path: str,
-    source_name: str = None
-) -> Dict[str, Any]:
+def _parse_guest_row(row_num: int, row_values: tuple, column_map: Dict[str, int],
+                     result: Dict[str, Any]):
     """
-    Import hotel guests from an Excel file.
+    Parse one sheet row into a guest record for bulk_upsert_hotel_guests().
 
-    Args:
-        file_path: Path to the Excel file
-        source_name: Optional source file name for tracking
+    Non-guest rows (repeated headers, room-preference lines, footers) are
+    uncounted from result['total']; invalid guest rows add an error.
 
     Returns:
-        Dict with 'created', 'updated', 'errors', 'total' counts
+        Record dict, or None when the row is skipped
     """
-    from models.hotel_guest import (upsert_hotel_guest, propagate_room_change,
-                                     sync_customer_room_by_booking, reconcile_absent_guests,
-                                     backfill_missing_anchors, refresh_room_segments,
-                                     refresh_guest_identity)
+    # Extract values using column map
+    def get_value(field: str):
+        if field in column_map:
+            idx = column_map[field]
+            if idx < len(row_values):
+                return row_values[idx]
+        return None
+
+    # Build guest name
+    first_name = get_value('first_name') or ''
+    last_name = get_value('last_name') or ''
+    guest_name = f"{first_name} {last_name}".strip()
+    room_value = get_value('room_number')
+    reserva_value = get_value('reservation_code')
+
+    # Skip non-guest rows that some PMS exports interleave (repeated column
+    # headers on each page) — don't count them as errors.
+    if (str(first_name).strip().lower() in ('nombre', 'name', 'guest')
+            or str(last_name).strip().lower() in ('apellidos', 'surname')):
+        result['total'] -= 1
+        return None
+
+    # Room-preference line: no guest name, the "Reserva" column carries
+    # "Preferencias: ..." text. These are HOTEL ROOM preferences, not relevant
+    # to the beach club — skip them silently (not a guest, not an error).
+    if (not guest_name and reserva_value
+            and str(reserva_value).strip().lower().startswith('preferencia')):
+        result['total'] -= 1
+        return None
+
+    if not guest_name:
+        # A row with no name but a room/reservation is a REAL guest the PMS
+        # exported without a name — surface what it was so it's diagnosable.
+        # A row with no name and no room/reservation is a blank/total/footer
+        # row — skip it silently (don't inflate the error count).
+        ctx = []
+        if room_value:
+            ctx.append(f"hab={str(room_value).strip()}")
+        if reserva_value:
+            ctx.append(f"reserva={str(reserva_value).strip()}")
+        if not ctx:
+            result['total'] -= 1
+            return None
+        result['errors'].append(f"Fila {row_num}: Nombre vacío ({', '.join(ctx)})")
+        return None
 
-    result = {
+    # Get room number
+    if not room_value:
+        result['errors'].append(f"Fila {row_num}: Habitación vacía (nombre={guest_name})")
+        return None
+    room_number = str(room_value).strip()
+
+    # Parse dates
+    arrival_date = parse_date(get_value('arrival_date'))
+    departure_date = parse_date(get_value('departure_date'))
+
+    if not arrival_date:
+        result['errors'].append(f"Fila {row_num}: Fecha llegada inválida")
+        return None
+
+    if not departure_date:
+        result['errors'].append(f"Fila {row_num}: Fecha salida inválida")
+        return None
+
+    # Determine VIP code based on repeat guest
+    repeat_count = get_value('repeat_guest')
+    vip_code = None
+    if repeat_count and str(repeat_count).isdigit() and int(repeat_count) >= 3:
+        vip_code = 'REPEAT'
+
+    return {
+        'row_num': row_num,
+        'room_number': room_number,
+        'guest_name': guest_name,
+        'arrival_date': arrival_date,
+        'departure_date': departure_date,
+        'booking_reference': reserva_value,  # "Reserva" column from PMS
+        'guest_type': get_value('guest_type'),
+        'nationality': get_value('nationality'),
+        'vip_code': vip_code
+    }
+
+
+# Fallback column mapping for the GuestInHouseRpt format (no header detected)
+DEFAULT_GUEST_COLUMNS = {
+    'first_name': 0,      # Nombre
+    'last_name': 1,       # Apellidos
+    'reservation_code': 2, # Reserva
+    'board_type': 3,      # Pensión
+    'guest_type': 4,      # Tipo
+    'room_number': 5,     # Háb.
+    'arrival_date': 6,    # Llegada
+    'departure_date': 7,  # Salida
+    'birthday': 8,        # Cumpl.
+    'anniversary': 9,     # Aniv.
+    'gender': 10,         # Sexo
+    'document_id': 11,    # Documento
+    'nationality': 12,    # País
+    'language': 13,       # Idioma
+    'registration_signed': 14,  # Rég Fdo.
+    'repeat_guest': 15,   # Repetidor
+}
+
+
+def _new_import_result() -> Dict[str, Any]:
+    """Empty import result (shared by the full and incremental imports)."""
+    return {
         'created': 0,
         'updated': 0,
         'errors': [],
         'total': 0,
         'room_changes': [],
-        'checked_out': 0
+        'checked_out': 0,
+        'timings': {}
     }
-    seen_ids = set()  # hotel_guest ids seen in this import (for stale reconciliation)
 
-    # Keep a copy of the most recently imported file for audit / debugging
-    # (the upload/temp file is otherwise deleted right after import).
-    try:
-        import shutil
-        from flask import current_app as _ca
-        _keep = os.path.join(_ca.instance_path, 'last_guest_import.xlsx')
-        os.makedirs(_ca.instance_path, exist_ok=True)
-        shutil.copyfile(file_path, _keep)
-    except Exception:
-        pass  # never let audit-copy failure block an import
 
+class _PhaseTimer:
+    """Records the duration of consecutive import phases into result['timings'] (ms)."""
+
+    def __init__(self, result: Dict[str, Any]):
+        self.timings = result['timings']
+        self.start = self.last = time.perf_counter()
+
+    def lap(self, phase: str) -> None:
+        now = time.perf_counter()
+        self.timings[phase] = round((now - self.last) * 1000, 1)
+        self.last = now
+
+    def finish(self) -> None:
+        self.timings['total'] = round((time.perf_counter() - self.start) * 1000, 1)
+
+
+def read_hotel_guest_records(file_path: str, result: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Stream a PMS guest report (read-only, values only) into guest records.
+
+    Counts rows into result['total'] and appends row errors to result['errors'].
+
+    Args:
+        file_path: Path to the Excel file
+        result: Import result being filled
+
+    Returns:
+        List of record dicts (see _parse_guest_row)
+    """
+    wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
     try:
-        wb = openpyxl.load_workbook(file_path, data_only=True)
         sheet = wb.active
 
         # Detect header row and column mapping
         header_row, column_map = detect_header_row(sheet)
-
         if not column_map:
-            # Fallback to manual column mapping for GuestInHouseRpt format
-            column_map = {
-                'first_name': 0,      # Nombre
-                'last_name': 1,       # Apellidos
-                'reservation_code': 2, # Reserva
-                'board_type': 3,      # Pensión
-                'guest_type': 4,      # Tipo
-                'room_number': 5,     # Háb.
-                'arrival_date': 6,    # Llegada
-                'departure_date': 7,  # Salida
-                'birthday': 8,        # Cumpl.
-                'anniversary': 9,     # Aniv.
-                'gender': 10,         # Sexo
-                'document_id': 11,    # Documento
-                'nationality': 12,    # País
-                'language': 13,       # Idioma
-                'registration_signed': 14,  # Rég Fdo.
-                'repeat_guest': 15,   # Repetidor
-            }
-
-        # Process data rows
-        for row_num in range(header_row + 1, sheet.max_row + 1):
-            row_values = [cell.value for cell in sheet[row_num]]
+            column_map = DEFAULT_GUEST_COLUMNS
 
+        records = []
+        for row_num, row_values in enumerate(
+                sheet.iter_rows(min_row=header_row + 1, values_only=True),
+                start=header_row + 1):
             # Skip empty rows
             if not any(row_values):
                 continue
@@ -284,236 +384,540 @@ def import_hotel_guests_from_excel(
             result['total'] += 1
 
             try:
-                # Extract values using column map
-                def get_value(field: str):
-                    if field in column_map:
-                        idx = column_map[field]
-                        if idx < len(row_values):
-                            return row_values[idx]
-                    return None
-
-                # Build guest name
-                first_name = get_value('first_name') or ''
-                last_name = get_value('last_name') or ''
-                guest_name = f"{first_name} {last_name}".strip()
-                room_value = get_value('room_number')
-                reserva_value = get_value('reservation_code')
-
-                # Skip non-guest rows that some PMS exports interleave (repeated column
-                # headers on each page) — don't count them as errors.
-                if (str(first_name).strip().lower() in ('nombre', 'name', 'guest')
-                        or str(last_name).strip().lower() in ('apellidos', 'surname')):
-                    result['total'] -= 1
-                    continue
-
-                # Room-preference line: no guest name, the "Reserva" column carries
-                # "Preferencias: ..." text. These are HOTEL ROOM preferences, not relevant
-                # to the beach club — skip them silently (not a guest, not an error).
-                if (not guest_name and reserva_value
-                        and str(reserva_value).strip().lower().startswith('preferencia')):
-                    result['total'] -= 1
-                    continue
-
-                if not guest_name:
-                    # A row with no name but a room/reservation is a REAL guest the PMS
-                    # exported without a name — surface what it was so it's diagnosable.
-                    # A row with no name and no room/reservation is a blank/total/footer
-                    # row — skip it silently (don't inflate the error count).
-                    ctx = []
-                    if room_value:
-                        ctx.append(f"hab={str(room_value).strip()}")
-                    if reserva_value:
-                        ctx.append(f"reserva={str(reserva_value).strip()}")
-                    if not ctx:
-                        result['total'] -= 1
-                        continue
-                    result['errors'].append(f"Fila {row_num}: Nombre vacío ({', '.join(ctx)})")
-                    continue
-
-                # Get room number
-                if not room_value:
-                    result['errors'].append(f"Fila {row_num}: Habitación vacía (nombre={guest_name})")
-                    continue
-                room_number = str(room_value).strip()
-
-                # Parse dates
-                arrival_date = parse_date(get_value('arrival_date'))
-                departure_date = parse_date(get_value('departure_date'))
-
-                if not arrival_date:
-                    result['errors'].append(f"Fila {row_num}: Fecha llegada inválida")
-                    continue
-
-                if not departure_date:
-                    result['errors'].append(f"Fila {row_num}: Fecha salida inválida")
-                    continue
-
-                # Get optional fields
-                nationality = get_value('nationality')
-                guest_type = get_value('guest_type')
-                repeat_count = get_value('repeat_guest')
-                booking_reference = get_value('reservation_code')  # "Reserva" column from PMS
-
-                # Determine VIP code based on repeat guest
-                vip_code = None
-                if repeat_count and str(repeat_count).isdigit() and int(repeat_count) >= 3:
-                    vip_code = 'REPEAT'
-
-                # Upsert the guest
-                upsert_result = upsert_hotel_guest(
-                    room_number=room_number,
-                    guest_name=guest_name,
-                    arrival_date=arrival_date,
-                    departure_date=departure_date,
-                    booking_reference=booking_reference,
-                    guest_type=guest_type,
-                    nationality=nationality,
-                    vip_code=vip_code,
-                    source_file=source_name
-                )
-
-                if upsert_result['action'] == 'created':
-                    result['created'] += 1
-                else:
-                    result['updated'] += 1
-                if upsert_result.get('id'):
-                    seen_ids.add(upsert_result['id'])
-
-                # Keep linked beach_customers' room in sync with the guest list.
-                # Primary path: match on the stable booking_reference (robust to room
-                # changes, room-first-assignment, and name spelling differences).
-                if booking_reference:
-                    sync_res = sync_customer_room_by_booking(booking_reference, room_number)
-                    for ch in sync_res['changes']:
-                        result['room_changes'].append({
-                            'guest_name': guest_name,
-                            'old_room': ch['old_room'],
-                            'new_room': ch['new_room'],
-                            'customer_updated': True,
-                            'reservations_updated': None
-                        })
-                # Fallback for guests with no booking reference: legacy room+name match.
-                elif upsert_result.get('room_changed'):
-                    propagate_result = propagate_room_change(
-                        guest_name=guest_name,
-                        old_room=upsert_result['old_room'],
-                        new_room=upsert_result['new_room']
-                    )
-
-                    result['room_changes'].append({
-                        'guest_name': guest_name,
-                        'old_room': upsert_result['old_room'],
-                        'new_room': upsert_result['new_room'],
-                        'customer_updated': propagate_result['customer_updated'],
-                        'reservations_updated': propagate_result['reservations_updated']
-                    })
-
+                record = _parse_guest_row(row_num, row_values, column_map, result)
+                if record is not None:
+                    records.append(record)
             except Exception as e:
                 current_app.logger.error(f'Error importing row {row_num}: {e}', exc_info=True)
                 result['errors'].append(f"Fila {row_num}: error al procesar datos")
 
+        return records
+    finally:
         wb.close()
 
-        # Stale reconciliation: guests no longer in the report are checked out.
-        # Guarded so a partial/truncated upload can't mass-check-out everyone.
-        try:
-            recon = reconcile_absent_guests(seen_ids, result['created'] + result['updated'])
-            result['checked_out'] = recon.get('checked_out', 0)
-            if recon.get('skipped'):
-                current_app.logger.info(f"Guest reconciliation skipped: {recon.get('reason')}")
-        except Exception as e:
-            current_app.logger.error(f'Guest reconciliation failed: {e}', exc_info=True)
 
-        # Anchor reservations: now that the guest list is fresh, fill booking_reference on
-        # current/future interno reservations that can be resolved (self-heals pre-arrival
-        # bookings once their guest appears). Never overwrites an existing anchor.
-        try:
-            anchor = backfill_missing_anchors()
-            result['anchored'] = anchor.get('updated', 0)
-            result['anchor_pending'] = anchor.get('no_pms_record', 0) + anchor.get('ambiguous', 0)
-            current_app.logger.info(
-                f"Anchor backfill: {result['anchored']} anchored, "
-                f"{result['anchor_pending']} still pending"
-            )
-        except Exception as e:
-            current_app.logger.error(f'Anchor backfill failed: {e}', exc_info=True)
+def _write_guest_records(
+    records: List[Dict[str, Any]],
+    result: Dict[str, Any],
+    seen_ids: set,
+    timer: _PhaseTimer
+) -> List[Dict[str, Any]]:
+    """
+    Write parsed guest records: guests and booking-anchored customer rooms in a
+    single transaction, then the legacy room+name fallback.
+
+    Fills created/updated counts, seen_ids and room_changes.
+
+    Returns:
+        Per-record upsert results (aligned with records), or None if the
+        transaction failed (an error is added to the result)
+    """
+    from database import get_db
+    from models.hotel_guest import (bulk_upsert_hotel_guests, propagate_room_change,
+                                     sync_customer_rooms_by_booking)
+
+    conn = get_db()
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        upserts = bulk_upsert_hotel_guests(records, conn)
+        timer.lap('guests')
+
+        sync_res = sync_customer_rooms_by_booking(
+            [(r['booking_reference'], r['room_number']) for r in records],
+            conn
+        )
+        conn.commit()
+        timer.lap('room_sync')
+    except Exception as e:
+        conn.rollback()
+        current_app.logger.error(f'Error saving imported guests: {e}', exc_info=True)
+        result['errors'].append("Error al guardar huéspedes")
+        return None
 
-        # Room-change follow-up: this PMS re-books on room changes (base-N segments),
-        # so re-anchor reservations to the segment covering their date and point each
-        # customer's room at the segment covering today. Surfaces the room changes the
-        # per-row sync can't see (new segment = new reference).
+    names_by_ref = {}
+    fallback_changes = []
+    for record, upsert_result in zip(records, upserts):
+        if upsert_result['action'] == 'error':
+            current_app.logger.warning(
+                f"Row {record['row_num']} not imported: {upsert_result['error']}"
+            )
+            result['errors'].append(f"Fila {record['row_num']}: error al procesar datos")
+            continue
+
+        if upsert_result['action'] == 'created':
+            result['created'] += 1
+        else:
+            result['updated'] += 1
+        seen_ids.add(upsert_result['id'])
+
+        if record['booking_reference']:
+            names_by_ref.setdefault(record['booking_reference'], record['guest_name'])
+        elif upsert_result.get('room_changed'):
+            fallback_changes.append((record['guest_name'], upsert_result))
+
+    # Keep linked beach_customers' room in sync with the guest list.
+    # Primary path: match on the stable booking_reference (robust to room
+    # changes, room-first-assignment, and name spelling differences).
+    for ch in sync_res['changes']:
+        result['room_changes'].append({
+            'guest_name': names_by_ref.get(ch['booking_reference'], ''),
+            'old_room': ch['old_room'],
+            'new_room': ch['new_room'],
+            'customer_updated': True,
+            'reservations_updated': None
+        })
+
+    # Fallback for guests with no booking reference: legacy room+name match.
+    for guest_name, upsert_result in fallback_changes:
         try:
-            seg = refresh_room_segments()
-            result['reanchored'] = seg.get('reanchored', 0)
-            result['segment_room_updates'] = seg.get('rooms_updated', 0)
-            for ch in seg.get('changes', []):
-                if 'new_room' in ch:
-                    result['room_changes'].append({
-                        'guest_name': f"cliente #{ch['customer_id']}",
-                        'old_room': ch.get('old_room'),
-                        'new_room': ch.get('new_room'),
-                        'customer_updated': True,
-                        'reservations_updated': None
-                    })
-            current_app.logger.info(
-                f"Segment refresh: {result['reanchored']} re-anchored, "
-                f"{result['segment_room_updates']} room(s) updated"
+            propagate_result = propagate_room_change(
+                guest_name=guest_name,
+                old_room=upsert_result['old_room'],
+                new_room=upsert_result['new_room']
             )
         except Exception as e:
-            current_app.logger.error(f'Segment refresh failed: {e}', exc_info=True)
+            current_app.logger.error(f'Room change propagation failed: {e}', exc_info=True)
+            continue
+
+        result['room_changes'].append({
+            'guest_name': guest_name,
+            'old_room': upsert_result['old_room'],
+            'new_room': upsert_result['new_room'],
+            'customer_updated': propagate_result['customer_updated'],
+            'reservations_updated': propagate_result['reservations_updated']
+        })
+    timer.lap('room_fallback')
+
+    return upserts
+
+
+def _run_post_import_passes(
+    result: Dict[str, Any],
+    seen_ids: set,
+    processed_count: int,
+    timer: _PhaseTimer,
+    booking_refs: set = None,
+    absent_ids: set = None
+) -> None:
+    """
+    Follow-up passes after guest writes: stale reconciliation, anchor backfill,
+    segment and identity refresh, search index and stay marker refresh,
+    out-of-stay audit.
 
-        # Identity refresh: holder-stub rows (e.g. 'DL GOUGH') get replaced by the real
-        # occupants in later PMS reports — keep the main-guest flag on an active
-        # occupant and rename customers stuck with the extinct holder name.
-        try:
-            ident = refresh_guest_identity()
-            result['mains_promoted'] = ident.get('mains_promoted', 0)
-            result['customers_renamed'] = ident.get('customers_renamed', 0)
+    Args:
+        result: Import result being filled
+        seen_ids: hotel_guest ids present in the report
+        processed_count: Guest rows in the report (reconciliation safety guard)
+        timer: Phase timer
+        booking_refs: Limit segment/identity refresh to these booking
+                      references (incremental sync); None = everything
+        absent_ids: Only these guests may be checked out (incremental sync);
+                    None = every in-house guest not in seen_ids
+    """
+    from models.hotel_guest import (reconcile_absent_guests, backfill_missing_anchors,
+                                     refresh_room_segments, refresh_guest_identity)
+
+    # Stale reconciliation: guests no longer in the report are checked out.
+    # Guarded so a partial/truncated upload can't mass-check-out everyone.
+    try:
+        recon = reconcile_absent_guests(seen_ids, processed_count, candidate_ids=absent_ids)
+        result['checked_out'] = recon.get('checked_out', 0)
+        if recon.get('skipped'):
+            current_app.logger.info(f"Guest reconciliation skipped: {recon.get('reason')}")
+    except Exception as e:
+        current_app.logger.error(f'Guest reconciliation failed: {e}', exc_info=True)
+    timer.lap('reconcile')
+
+    # Anchor reservations: now that the guest list is fresh, fill booking_reference on
+    # current/future interno reservations that can be resolved (self-heals pre-arrival
+    # bookings once their guest appears). Never overwrites an existing anchor.
+    try:
+        anchor = backfill_missing_anchors()
+        result['anchored'] = anchor.get('updated', 0)
+        result['anchor_pending'] = anchor.get('no_pms_record', 0) + anchor.get('ambiguous', 0)
+        current_app.logger.info(
+            f"Anchor backfill: {result['anchored']} anchored, "
+            f"{result['anchor_pending']} still pending"
+        )
+    except Exception as e:
+        current_app.logger.error(f'Anchor backfill failed: {e}', exc_info=True)
+    timer.lap('anchors')
+
+    # Room-change follow-up: this PMS re-books on room changes (base-N segments),
+    # so re-anchor reservations to the segment covering their date and point each
+    # customer's room at the segment covering today. Surfaces the room changes the
+    # per-row sync can't see (new segment = new reference).
+    try:
+        seg = refresh_room_segments(booking_refs=booking_refs)
+        result['reanchored'] = seg.get('reanchored', 0)
+        result['segment_room_updates'] = seg.get('rooms_updated', 0)
+        for ch in seg.get('changes', []):
+            if 'new_room' in ch:
+                result['room_changes'].append({
+                    'guest_name': f"cliente #{ch['customer_id']}",
+                    'old_room': ch.get('old_room'),
+                    'new_room': ch.get('new_room'),
+                    'customer_updated': True,
+                    'reservations_updated': None
+                })
+        current_app.logger.info(
+            f"Segment refresh: {result['reanchored']} re-anchored, "
+            f"{result['segment_room_updates']} room(s) updated"
+        )
+    except Exception as e:
+        current_app.logger.error(f'Segment refresh failed: {e}', exc_info=True)
+    timer.lap('segments')
+
+    # Identity refresh: holder-stub rows (e.g. 'DL GOUGH') get replaced by the real
+    # occupants in later PMS reports — keep the main-guest flag on an active
+    # occupant and rename customers stuck with the extinct holder name.
+    try:
+        ident = refresh_guest_identity(booking_refs=booking_refs)
+        result['mains_promoted'] = ident.get('mains_promoted', 0)
+        result['customers_renamed'] = ident.get('customers_renamed', 0)
+        current_app.logger.info(
+            f"Identity refresh: {result['mains_promoted']} main(s) promoted, "
+            f"{result['customers_renamed']} customer(s) renamed"
+        )
+    except Exception as e:
+        current_app.logger.error(f'Identity refresh failed: {e}', exc_info=True)
+    timer.lap('identity')
+
+    # Search index: fold the new/changed guests into the unified search index
+    # now rather than on the first search after the import.
+    try:
+        from models.search_index import refresh_search_index
+        refresh_search_index()
+    except Exception as e:
+        current_app.logger.error(f'Search index refresh failed: {e}', exc_info=True)
+    timer.lap('search_index')
+
+    # Stay markers: rebuild the check-in/check-out days touched by the import
+    # so map polls read precomputed flags.
+    try:
+        from models.stay_markers import refresh_stay_markers
+        refresh_stay_markers()
+    except Exception as e:
+        current_app.logger.error(f'Stay marker refresh failed: {e}', exc_info=True)
+    timer.lap('stay_markers')
+
+    # Out-of-stay audit: current/future reservations whose hotel booking no
+    # longer covers the reservation date (e.g. sunbeds booked past the
+    # guest's checkout under a stale customer). Surface them here so staff
+    # reviews them proactively instead of finding the wrong guest on the map.
+    try:
+        from models.stay_validation import find_out_of_stay_reservations
+        out_of_stay = find_out_of_stay_reservations()
+        # High confidence (shown in the import UI): guest already departed
+        # per PMS but still holds current/future sunbeds. 'beyond_departure'
+        # entries often self-heal (pending room-change segment / extension),
+        # so they only go to the log.
+        departed = [r for r in out_of_stay if r['severity'] == 'departed']
+        beyond = [r for r in out_of_stay if r['severity'] != 'departed']
+        result['out_of_stay'] = departed
+        result['out_of_stay_beyond'] = len(beyond)
+        if departed:
+            detail = '; '.join(
+                f"#{r['ticket_number'] or r['reservation_id']} "
+                f"{r['customer_name']} (hab {r['room_number']}) "
+                f"el {r['reservation_date']} — salida hotel {r['stay_departure']}"
+                for r in departed[:10]
+            )
+            current_app.logger.warning(
+                f"Out-of-stay reservations (guest departed): {len(departed)} "
+                f"[{detail}]"
+            )
+        if beyond:
             current_app.logger.info(
-                f"Identity refresh: {result['mains_promoted']} main(s) promoted, "
-                f"{result['customers_renamed']} customer(s) renamed"
+                f"Reservations beyond current PMS departure (may self-heal "
+                f"on next segment): {len(beyond)}"
             )
-        except Exception as e:
-            current_app.logger.error(f'Identity refresh failed: {e}', exc_info=True)
+    except Exception as e:
+        current_app.logger.error(f'Out-of-stay audit failed: {e}', exc_info=True)
+    timer.lap('out_of_stay')
 
-        # Out-of-stay audit: current/future reservations whose hotel booking no
-        # longer covers the reservation date (e.g. sunbeds booked past the
-        # guest's checkout under a stale customer). Surface them here so staff
-        # reviews them proactively instead of finding the wrong guest on the map.
-        try:
-            from models.stay_validation import find_out_of_stay_reservations
-            out_of_stay = find_out_of_stay_reservations()
-            # High confidence (shown in the import UI): guest already departed
-            # per PMS but still holds current/future sunbeds. 'beyond_departure'
-            # entries often self-heal (pending room-change segment / extension),
-            # so they only go to the log.
-            departed = [r for r in out_of_stay if r['severity'] == 'departed']
-            beyond = [r for r in out_of_stay if r['severity'] != 'departed']
-            result['out_of_stay'] = departed
-            result['out_of_stay_beyond'] = len(beyond)
-            if departed:
-                detail = '; '.join(
-                    f"#{r['ticket_number'] or r['reservation_id']} "
-                    f"{r['customer_name']} (hab {r['room_number']}) "
-                    f"el {r['reservation_date']} — salida hotel {r['stay_departure']}"
-                    for r in departed[:10]
-                )
-                current_app.logger.warning(
-                    f"Out-of-stay reservations (guest departed): {len(departed)} "
-                    f"[{detail}]"
-                )
-            if beyond:
-                current_app.logger.info(
-                    f"Reservations beyond current PMS departure (may self-heal "
-                    f"on next segment): {len(beyond)}"
-                )
-        except Exception as e:
-            current_app.logger.error(f'Out-of-stay audit failed: {e}', exc_info=True)
+
+def import_hotel_guests_from_excel(
+    file_path: str,
+    source_name: str = None
+) -> Dict[str, Any]:
+    """
+    Import hotel guests from an Excel file.
+
+    Bulk pipeline: the sheet is streamed read-only, existing guests are
+    prefetched once and matched in memory, and all guest/customer-room writes
+    happen in a single transaction. Durations per phase are reported in
+    result['timings'] (ms) for the import log.
+
+    Args:
+        file_path: Path to the Excel file
+        source_name: Optional source file name for tracking
+
+    Returns:
+        Dict with 'created', 'updated', 'errors', 'total' counts
+    """
+    result = _new_import_result()
+    seen_ids = set()  # hotel_guest ids seen in this import (for stale reconciliation)
+    timer = _PhaseTimer(result)
+
+    # Keep a copy of the most recently imported file for audit / debugging
+    # (the upload/temp file is otherwise deleted right after import).
+    try:
+        import shutil
+        from flask import current_app as _ca
+        _keep = os.path.join(_ca.instance_path, 'last_guest_import.xlsx')
+        os.makedirs(_ca.instance_path, exist_ok=True)
+        shutil.copyfile(file_path, _keep)
+    except Exception:
+        pass  # never let audit-copy failure block an import
+
+    try:
+        records = read_hotel_guest_records(file_path, result)
+        for record in records:
+            record['source_file'] = source_name
+        timer.lap('read')
+
+        if _write_guest_records(records, result, seen_ids, timer) is not None:
+            _run_post_import_passes(result, seen_ids, result['created'] + result['updated'], timer)
 
     except Exception as e:
         current_app.logger.error(f'Error opening import file: {e}', exc_info=True)
         result['errors'].append("Error al abrir archivo")
 
+    timer.finish()
+    return result
+
+
+# ==================== Incremental (diff-based) Guest Sync ====================
+
+# Record fields that define a guest row's content in the sync snapshot
+_SNAPSHOT_FIELDS = ('room_number', 'guest_name', 'arrival_date', 'departure_date',
+                    'booking_reference', 'guest_type', 'nationality', 'vip_code')
+
+
+def guest_record_key(record: Dict[str, Any]) -> str:
+    """
+    Stable identity of a report row across PMS exports.
+
+    Same rules as the upsert matching: booking reference + normalized name,
+    or room + arrival + name for rows without a booking reference.
+    """
+    from models.hotel_guest import normalize_guest_name
+
+    ref = record.get('booking_reference')
+    if ref:
+        return f"ref|{ref}|{normalize_guest_name(record['guest_name'])}"
+    return f"room|{record['room_number']}|{record['arrival_date']}|{record['guest_name']}"
+
+
+def _record_fingerprint(record: Dict[str, Any]) -> list:
+    """JSON-friendly content of a record, compared between snapshots."""
+    return [None if record.get(f) is None else str(record[f]) for f in _SNAPSHOT_FIELDS]
+
+
+def load_guest_snapshot(snapshot_path: str) -> Dict[str, Any]:
+    """
+    Load the previous sync snapshot ({'rows': {key: {'data', 'guest_id'}}}).
+
+    Returns None when there is no (readable) snapshot: the next sync is full.
+    """
+    try:
+        with open(snapshot_path, encoding='utf-8') as fh:
+            snapshot = json.load(fh)
+        if isinstance(snapshot, dict) and isinstance(snapshot.get('rows'), dict):
+            return snapshot
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def save_guest_snapshot(snapshot_path: str, rows: Dict[str, Any], sync_date: str = None) -> None:
+    """
+    Atomically write the sync snapshot.
+
+    sync_date (YYYY-MM-DD, club timezone) is the day the snapshot was applied;
+    the next sync uses it to find segment boundaries crossed in between.
+    """
+    directory = os.path.dirname(snapshot_path) or '.'
+    os.makedirs(directory, exist_ok=True)
+    tmp_path = f'{snapshot_path}.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as fh:
+        json.dump({'saved_at': datetime.now().isoformat(timespec='seconds'),
+                   'sync_date': sync_date, 'rows': rows},
+                  fh, ensure_ascii=False)
+    os.replace(tmp_path, snapshot_path)
+
+
+def diff_guest_records(records: List[Dict[str, Any]], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Row-level diff of a parsed report against the previous snapshot.
+
+    Args:
+        records: Parsed records of the new report
+        snapshot: Previous snapshot (None = everything is new)
+
+    Returns:
+        dict: {
+            'current': {key: record},   # last record per key
+            'added': [key], 'changed': [key], 'removed': [key],
+            'unchanged': int
+        }
+    """
+    previous = (snapshot or {}).get('rows', {})
+    current = {}
+    for record in records:
+        current[guest_record_key(record)] = record
+
+    added, changed = [], []
+    unchanged = 0
+    for key, record in current.items():
+        old = previous.get(key)
+        if old is None:
+            added.append(key)
+        elif old.get('data') != _record_fingerprint(record) or not old.get('guest_id'):
+            changed.append(key)
+        else:
+            unchanged += 1
+
+    removed = [key for key in previous if key not in current]
+    return {
+        'current': current,
+        'added': added,
+        'changed': changed,
+        'removed': removed,
+        'unchanged': unchanged
+    }
+
+
+def sync_hotel_guests_incremental(
+    file_path: str,
+    snapshot_path: str,
+    source_name: str = None,
+    dry_run: bool = False,
+    full: bool = False
+) -> Dict[str, Any]:
+    """
+    Apply only what changed in a PMS report since the previous sync.
+
+    The report is diffed row by row against the snapshot of the last sync
+    (kept in instance/). Only added and changed guests are written, only
+    removed guests are candidates for check-out, and the segment/identity
+    passes are limited to the affected booking references plus the bookings
+    with a segment arrival or departure since the last sync date (those move
+    to their next segment even when their rows did not change). Without a
+    snapshot (or with full=True) every row is applied and the reconciliation
+    covers all in-house guests, like import_hotel_guests_from_excel().
+
+    Args:
+        file_path: Path to the Excel file
+        snapshot_path: Snapshot JSON path
+        source_name: Optional source file name for tracking
+        dry_run: Compute and report the change set without writing anything
+        full: Ignore the snapshot and apply every row
+
+    Returns:
+        Import result dict plus 'mode' ('incremental' | 'full'), 'dry_run' and
+        'changes': {'added', 'changed', 'removed', 'unchanged', 'booking_refs'}
+        counts and 'sample' keys
+    """
+    result = _new_import_result()
+    timer = _PhaseTimer(result)
+    result['dry_run'] = dry_run
+
+    try:
+        records = read_hotel_guest_records(file_path, result)
+    except Exception as e:
+        current_app.logger.error(f'Error opening import file: {e}', exc_info=True)
+        result['errors'].append("Error al abrir archivo")
+        timer.finish()
+        return result
+    for record in records:
+        record['source_file'] = source_name
+    timer.lap('read')
+
+    snapshot = None if full else load_guest_snapshot(snapshot_path)
+    incremental = snapshot is not None
+    diff = diff_guest_records(records, snapshot)
+    previous = snapshot['rows'] if incremental else {}
+    timer.lap('diff')
+
+    to_apply = diff['added'] + diff['changed']
+    booking_refs = set()
+    for key in to_apply:
+        if diff['current'][key]['booking_reference']:
+            booking_refs.add(str(diff['current'][key]['booking_reference']))
+    for key in diff['removed']:
+        ref = previous[key]['data'][_SNAPSHOT_FIELDS.index('booking_reference')]
+        if ref:
+            booking_refs.add(ref)
+
+    result['mode'] = 'incremental' if incremental else 'full'
+    result['changes'] = {
+        'added': len(diff['added']),
+        'changed': len(diff['changed']),
+        'removed': len(diff['removed']),
+        'unchanged': diff['unchanged'],
+        'booking_refs': len(booking_refs),
+        'sample': {
+            'added': diff['added'][:10],
+            'changed': diff['changed'][:10],
+            'removed': diff['removed'][:10]
+        }
+    }
+
+    if dry_run:
+        timer.finish()
+        return result
+
+    from models.hotel_guest import get_bookings_with_boundaries
+    from utils.datetime_helpers import get_today
+
+    today = get_today().isoformat()
+    seen_ids = set()
+    apply_records = [diff['current'][key] for key in to_apply]
+    upserts = _write_guest_records(apply_records, result, seen_ids, timer)
+    if upserts is None:
+        timer.finish()
+        return result
+
+    if incremental:
+        # Unchanged rows are still in the report: never check them out
+        seen_ids.update(
+            previous[key]['guest_id'] for key in diff['current']
+            if key in previous and previous[key].get('guest_id')
+        )
+        absent_ids = {previous[key]['guest_id'] for key in diff['removed']
+                      if previous[key].get('guest_id')}
+        # The segment/identity passes resolve against today: bookings crossing a
+        # segment boundary since the last sync need them even if unchanged.
+        # Snapshots without a sync date get one full pass.
+        last_sync = snapshot.get('sync_date')
+        pass_refs = None
+        if last_sync:
+            pass_refs = set(booking_refs)
+            if last_sync != today:
+                pass_refs.update(get_bookings_with_boundaries(last_sync, today))
+        _run_post_import_passes(result, seen_ids, len(diff['current']), timer,
+                                booking_refs=pass_refs, absent_ids=absent_ids)
+    else:
+        _run_post_import_passes(result, seen_ids, result['created'] + result['updated'], timer)
+
+    # New snapshot: unchanged rows keep their entry, applied rows get their id
+    rows = {key: previous[key] for key in diff['current']
+            if key in previous and key not in to_apply}
+    for key, upsert_result in zip(to_apply, upserts):
+        if upsert_result['action'] != 'error':
+            rows[key] = {
+                'data': _record_fingerprint(diff['current'][key]),
+                'guest_id': upsert_result['id']
+            }
+    try:
+        save_guest_snapshot(snapshot_path, rows, sync_date=today)
+    except OSError as e:
+        current_app.logger.error(f'Could not save guest sync snapshot: {e}', exc_info=True)
+    timer.lap('snapshot')
+
+    timer.finish()
     return result
 
 
@@ -528,7 +932,7 @@ def validate_excel_file(file_path: str) -> Tuple[bool, str, Dict[str, Any]]:
         Tuple of (is_valid, error_message, preview_data)
     """
     try:
-        wb = openpyxl.load_workbook(file_path, data_only=True)
+        wb = openpyxl.load_workbook(file_path, read_only=True, data_only=True)
         sheet = wb.active
 
         # Detect header row
@@ -536,29 +940,34 @@ def validate_excel_file(file_path: str) -> Tuple[bool, str, Dict[str, Any]]:
 
         # Check required columns
         if 'room_number' not in column_map:
+            wb.close()
             return False, 'No se encontró columna de habitación', {}
 
         if 'arrival_date' not in column_map and 'departure_date' not in column_map:
+            wb.close()
             return False, 'No se encontraron columnas de fecha', {}
 
-        # Get row count (excluding header and empty rows)
-        data_rows = 0
-        for row_num in range(header_row + 1, min(sheet.max_row + 1, 1000)):
-            row_values = [cell.value for cell in sheet[row_num]]
-            if any(row_values):
-                data_rows += 1
+        def cell(row_values, field, default_idx):
+            idx = column_map.get(field, default_idx)
+            return row_values[idx] if idx < len(row_values) else None
 
-        # Get preview (first 5 rows)
+        # Count data rows (excluding header and empty rows) and build the
+        # preview (first 5 rows) in one streamed pass
+        data_rows = 0
         preview_rows = []
-        for row_num in range(header_row + 1, min(header_row + 6, sheet.max_row + 1)):
-            row_values = [cell.value for cell in sheet[row_num]]
-            if any(row_values):
+        for row_num, row_values in enumerate(
+                sheet.iter_rows(min_row=header_row + 1, max_row=999, values_only=True),
+                start=header_row + 1):
+            if not any(row_values):
+                continue
+            data_rows += 1
+            if row_num < header_row + 6:
                 preview_rows.append({
                     'row': row_num,
-                    'room': str(row_values[column_map.get('room_number', 5)] or ''),
-                    'name': f"{row_values[column_map.get('first_name', 0)] or ''} {row_values[column_map.get('last_name', 1)] or ''}".strip(),
-                    'arrival': parse_date(row_values[column_map.get('arrival_date', 6)]),
-                    'departure': parse_date(row_values[column_map.get('departure_date', 7)]),
+                    'room': str(cell(row_values, 'room_number', 5) or ''),
+                    'name': f"{cell(row_values, 'first_name', 0) or ''} {cell(row_values, 'last_name', 1) or ''}".strip(),
+                    'arrival': parse_date(cell(row_values, 'arrival_date', 6)),
+                    'departure': parse_date(cell(row_values, 'departure_date', 7)),
                 })
 
         wb.close()
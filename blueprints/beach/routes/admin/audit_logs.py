@@ -22,8 +22,8 @@ def register_routes(bp):
         Renders HTML template with search filters and paginated results.
         """
         from models.audit_log import (
-            get_audit_logs,
-            count_audit_logs,
+            get_audit_log_page,
+            count_audit_logs_cached,
             get_distinct_actions,
             get_distinct_entity_types
         )
@@ -35,23 +35,24 @@ def register_routes(bp):
         entity_type = request.args.get('entity_type', '').strip() or None
         start_date = request.args.get('start_date', '').strip() or None
         end_date = request.args.get('end_date', '').strip() or None
-
-        # Pagination
-        page = request.args.get('page', 1, type=int)
+        filters = {
+            'user_id': user_id,
+            'action': action,
+            'entity_type': entity_type,
+            'start_date': start_date,
+            'end_date': end_date
+        }
+
+        # Pagination (keyset cursors; page is the displayed page number)
+        page = max(request.args.get('page', 1, type=int), 1)
         per_page = request.args.get('per_page', 50, type=int)
         per_page = min(per_page, 100)  # Cap at 100
-        offset = (page - 1) * per_page
+        after = request.args.get('after') or None
+        before = request.args.get('before') or None
 
         # Get filtered logs
-        logs = get_audit_logs(
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            start_date=start_date,
-            end_date=end_date,
-            limit=per_page,
-            offset=offset
-        )
+        result = get_audit_log_page(filters, per_page, after=after, before=before, page=page)
+        logs = result['items']
 
         # Parse changes JSON for display
         for log in logs:
@@ -61,16 +62,11 @@ def register_routes(bp):
                 except (json.JSONDecodeError, TypeError):
                     log['changes_parsed'] = None
 
-        # Get total count for pagination
-        total = count_audit_logs(
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            start_date=start_date,
-            end_date=end_date
-        )
+        # Total for the header (cached for a short while: exact counts of a
+        # large table on every page turn are too slow)
+        total = count_audit_logs_cached(**filters)
 
-        total_pages = (total + per_page - 1) // per_page if total > 0 else 1
+        total_pages = max((total + per_page - 1) // per_page, page)
 
         # Get filter options
         users = get_all_users(active_only=False)
@@ -84,16 +80,12 @@ def register_routes(bp):
             page=page,
             per_page=per_page,
             total_pages=total_pages,
+            next_cursor=result['next_cursor'],
+            prev_cursor=result['prev_cursor'],
             users=users,
             actions=actions,
             entity_types=entity_types,
-            filters={
-                'user_id': user_id,
-                'action': action,
-                'entity_type': entity_type,
-                'start_date': start_date,
-                'end_date': end_date
-            }
+            filters=filters
         )
 
     @bp.route('/audit-logs/api')
@@ -111,39 +103,36 @@ def register_routes(bp):
             entity_id (int): Filter by specific entity ID
             start_date (str): Filter from date (YYYY-MM-DD)
             end_date (str): Filter until date (YYYY-MM-DD)
-            page (int): Page number (default 1)
+            page (int): Page number (default 1; offset paging without a cursor)
             per_page (int): Results per page (default 50, max 100)
+            after (str): Keyset cursor - page after this row (pagination.next_cursor)
+            before (str): Keyset cursor - page before this row (pagination.prev_cursor)
 
         Returns:
             JSON response with logs, pagination info, and metadata
         """
-        from models.audit_log import get_audit_logs, count_audit_logs
+        from models.audit_log import get_audit_log_page, count_audit_logs_cached
 
         # Get filter parameters
-        user_id = request.args.get('user_id', type=int)
-        action = request.args.get('action', '').strip() or None
-        entity_type = request.args.get('entity_type', '').strip() or None
-        entity_id = request.args.get('entity_id', type=int)
-        start_date = request.args.get('start_date', '').strip() or None
-        end_date = request.args.get('end_date', '').strip() or None
+        filters = {
+            'user_id': request.args.get('user_id', type=int),
+            'action': request.args.get('action', '').strip() or None,
+            'entity_type': request.args.get('entity_type', '').strip() or None,
+            'entity_id': request.args.get('entity_id', type=int),
+            'start_date': request.args.get('start_date', '').strip() or None,
+            'end_date': request.args.get('end_date', '').strip() or None
+        }
 
         # Pagination
-        page = request.args.get('page', 1, type=int)
+        page = max(request.args.get('page', 1, type=int), 1)
         per_page = request.args.get('per_page', 50, type=int)
         per_page = min(per_page, 100)  # Cap at 100
-        offset = (page - 1) * per_page
+        after = request.args.get('after') or None
+        before = request.args.get('before') or None
 
         # Get filtered logs
-        logs = get_audit_logs(
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            start_date=start_date,
-            end_date=end_date,
-            limit=per_page,
-            offset=offset
-        )
+        result = get_audit_log_page(filters, per_page, after=after, before=before, page=page)
+        logs = result['items']
 
         # Parse changes JSON for each log
         for log in logs:
@@ -153,17 +142,10 @@ def register_routes(bp):
                 except (json.JSONDecodeError, TypeError):
                     pass
 
-        # Get total count for pagination
-        total = count_audit_logs(
-            user_id=user_id,
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            start_date=start_date,
-            end_date=end_date
-        )
+        # Total for pagination (cached for a short while)
+        total = count_audit_logs_cached(**filters)
 
-        total_pages = (total + per_page - 1) // per_page if total > 0 else 1
+        total_pages = max((total + per_page - 1) // per_page, page)
 
         return jsonify({
             'success': True,
@@ -173,8 +155,10 @@ def register_routes(bp):
                 'per_page': per_page,
                 'total': total,
                 'total_pages': total_pages,
-                'has_next': page < total_pages,
-                'has_prev': page > 1
+                'has_next': result['next_cursor'] is not None,
+                'has_prev': result['prev_cursor'] is not None,
+                'next_cursor': result['next_cursor'],
+                'prev_cursor': result['prev_cursor']
             }
         })
 
@@ -293,14 +277,14 @@ def register_routes(bp):
         Returns:
             JSON response with retention stats and summary data
         """
-        from models.audit_log import get_retention_stats, count_audit_logs
+        from models.audit_log import get_retention_stats, count_audit_logs_cached
 
         stats = get_retention_stats()
 
         # Get counts by action type
         action_counts = {}
         for action in ['CREATE', 'UPDATE', 'DELETE', 'VIEW']:
-            action_counts[action] = count_audit_logs(action=action)
+            action_counts[action] = count_audit_logs_cached(action=action)
 
         return jsonify({
             'success': True,
@@ -5,7 +5,7 @@ Customer and hotel guest API routes.
 from flask import current_app, request
 from flask_login import login_required
 from utils.decorators import permission_required
-from utils.audit import log_create, log_update
+from utils.audit import log_create, log_update, audit_snapshot
 from utils.api_response import api_success, api_error
 from models.customer import (
     find_duplicates, get_customer_by_id, get_customer_preferences,
@@ -569,7 +569,7 @@ def register_routes(bp):
             return api_error('Cliente no encontrado', 404)
 
         # Capture before-state for audit
-        before_state = dict(customer)
+        before_state = audit_snapshot('customer', customer)
 
         # Filter to allowed scalar fields
         allowed_fields = [
@@ -623,7 +623,7 @@ def register_routes(bp):
             updated_prefs = get_customer_preferences(customer_id)
             updated_tags = get_customer_tags(customer_id)
 
-            after_state = dict(updated_customer) if updated_customer else {}
+            after_state = audit_snapshot('customer', updated_customer)
             log_update('customer', customer_id, before=before_state, after=after_state)
 
             return api_success(
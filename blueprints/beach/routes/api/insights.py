@@ -10,10 +10,8 @@ from flask_login import login_required
 from utils.decorators import permission_required
 from utils.api_response import api_success, api_error
 from models.insights import (
-    get_occupancy_today,
     get_occupancy_by_zone,
-    get_pending_checkins_count,
-    get_occupancy_comparison,
+    get_today_snapshot,
     get_occupancy_range,
     get_occupancy_stats,
     get_revenue_stats,
@@ -61,17 +59,7 @@ def register_routes(bp):
         }
         """
         try:
-            occupancy = get_occupancy_today()
-            comparison = get_occupancy_comparison()
-            pending = get_pending_checkins_count()
-            zones = get_occupancy_by_zone()
-
-            return api_success(
-                occupancy=occupancy,
-                comparison=comparison,
-                pending_checkins=pending,
-                zones=zones
-            )
+            return api_success(**get_today_snapshot())
 
         except Exception as e:
             current_app.logger.error(f'Error: {e}', exc_info=True)
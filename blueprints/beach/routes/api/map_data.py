@@ -3,7 +3,7 @@ Map data API routes.
 Endpoints for retrieving map data and availability information.
 """
 
-from flask import current_app, request, jsonify  # jsonify kept for health_check
+from flask import current_app, request, jsonify, make_response  # jsonify kept for health_check
 from flask_login import login_required
 from utils.datetime_helpers import get_today
 
@@ -15,7 +15,121 @@ from models.furniture_type import get_all_furniture_types
 from models.state import get_all_states
 from models.reservation import get_furniture_availability_map
 from models.config import get_map_config
-from models.furniture_block import get_blocks_for_date, BLOCK_TYPES
+from models.furniture_block import BLOCK_TYPES
+from models.map_revision import get_map_revision, get_map_changes_since, build_map_etag
+
+
+def _format_blocks(furniture_availability: dict) -> dict:
+    """
+    Build the {furniture_id: block_info} lookup sent to the map from the
+    blocks the availability engine attached to each furniture's cell.
+    """
+    blocks_map = {}
+    for furniture_id, info in furniture_availability.items():
+        block = info.get('block')
+        if not block:
+            continue
+        blocks_map[furniture_id] = {
+            'id': block['id'],
+            'block_type': block['block_type'],
+            'reason': block.get('reason', ''),
+            'start_date': block.get('start_date', ''),
+            'end_date': block.get('end_date', ''),
+            'color': BLOCK_TYPES.get(block['block_type'], {}).get('color', '#9CA3AF'),
+            'name': BLOCK_TYPES.get(block['block_type'], {}).get('name', 'Bloqueado')
+        }
+    return blocks_map
+
+
+def _availability_for_date(availability: dict, date_str: str) -> dict:
+    """Flatten {furniture_id: {date: info}} to {furniture_id: info} for one date."""
+    furniture_availability = {}
+    if availability and 'availability' in availability:
+        for fid, dates_data in availability['availability'].items():
+            if date_str in dates_data:
+                furniture_availability[int(fid)] = dates_data[date_str]
+    return furniture_availability
+
+
+def _full_map_payload(date_str: str) -> dict:
+    """Build the complete map payload for a date."""
+    # Get all static data
+    zones = get_all_zones(active_only=True)
+    # Pass date to filter temporary furniture by their date range
+    furniture = get_all_furniture(active_only=True, for_date=date_str)
+    furniture_types = get_all_furniture_types(active_only=True)
+    states = get_all_states(active_only=True, include_usage=False)
+
+    # Build lookup dicts
+    furniture_types_map = {ft['type_code']: ft for ft in furniture_types}
+    state_colors = {s['name']: s['color'] for s in states}
+
+    # Get availability (reservations and blocks) for the date
+    availability = get_furniture_availability_map(date_str, date_str)
+    furniture_availability = _availability_for_date(availability, date_str)
+    blocks_map = _format_blocks(furniture_availability)
+
+    # Get map configuration from database
+    map_config = get_map_config()
+    zone_padding = map_config['zone_padding']
+    zone_height = map_config['zone_height']
+    map_width = map_config['default_width']
+    min_height = map_config['min_height']
+
+    # Calculate zone bounds for rendering (vertical stacking)
+    zone_bounds = {}
+    for idx, zone in enumerate(zones):
+        zone_bounds[zone['id']] = {
+            'x': zone_padding,
+            'y': zone_padding + idx * (zone_height + zone_padding),
+            'width': map_width - 2 * zone_padding,
+            'height': zone_height
+        }
+
+    # Calculate total map height based on zones
+    total_height = zone_padding + len(zones) * (zone_height + zone_padding)
+
+    return {
+        'zones': zones,
+        'zone_bounds': zone_bounds,
+        'furniture': furniture,
+        'furniture_types': furniture_types_map,
+        'states': states,
+        'state_colors': state_colors,
+        'availability': furniture_availability,
+        'blocks': blocks_map,
+        'block_types': BLOCK_TYPES,
+        'summary': availability.get('summary', {}).get(date_str, {}),
+        'map_dimensions': {
+            'width': map_width,
+            'height': max(min_height, total_height)
+        },
+        'map_config': map_config
+    }
+
+
+def _delta_map_payload(date_str: str, changed_ids: set) -> dict:
+    """
+    Build the incremental payload for the furniture that changed on a date.
+
+    Furniture listed in removed_furniture no longer appears on the map for
+    the date (deactivated, deleted, or a temporary piece out of its range).
+    Changed furniture absent from 'availability'/'blocks' is free/unblocked.
+    """
+    ids = sorted(changed_ids)
+    furniture = get_all_furniture(active_only=True, for_date=date_str, furniture_ids=ids)
+    present_ids = {f['id'] for f in furniture}
+
+    availability = get_furniture_availability_map(date_str, date_str, furniture_ids=ids)
+    furniture_availability = _availability_for_date(availability, date_str)
+
+    return {
+        'furniture': furniture,
+        'removed_furniture': [fid for fid in ids if fid not in present_ids],
+        'changed_furniture': ids,
+        'availability': furniture_availability,
+        'blocks': _format_blocks(furniture_availability),
+    }
 
 
 def register_routes(bp):
@@ -28,87 +142,56 @@ def register_routes(bp):
         """
         Get all data needed to render the interactive map.
 
+        Responses carry a weak ETag derived from the per-date map revision, so
+        an unchanged poll with If-None-Match returns 304 without touching the
+        map tables.
+
         Query params:
             date: Date string YYYY-MM-DD (default: today)
+            since: Map revision the client already has (optional). Returns
+                   only the furniture that changed after it ('delta': true),
+                   or the full payload when the change cannot be expressed
+                   per furniture piece.
 
         Returns:
             JSON with zones, furniture, furniture_types, states, availability
         """
         date_str = request.args.get('date', get_today().strftime('%Y-%m-%d'))
-
-        # Get all static data
-        zones = get_all_zones(active_only=True)
-        # Pass date to filter temporary furniture by their date range
-        furniture = get_all_furniture(active_only=True, for_date=date_str)
-        furniture_types = get_all_furniture_types(active_only=True)
-        states = get_all_states(active_only=True)
-
-        # Build lookup dicts
-        furniture_types_map = {ft['type_code']: ft for ft in furniture_types}
-        state_colors = {s['name']: s['color'] for s in states}
-
-        # Get availability for the date
-        availability = get_furniture_availability_map(date_str, date_str)
-
-        # Build furniture availability lookup for the specific date
-        furniture_availability = {}
-        if availability and 'availability' in availability:
-            for fid, dates_data in availability['availability'].items():
-                if date_str in dates_data:
-                    furniture_availability[int(fid)] = dates_data[date_str]
-
-        # Get blocks for the date
-        blocks_list = get_blocks_for_date(date_str)
-        blocks_map = {}
-        for block in blocks_list:
-            blocks_map[block['furniture_id']] = {
-                'id': block['id'],
-                'block_type': block['block_type'],
-                'reason': block.get('reason', ''),
-                'start_date': block.get('start_date', ''),
-                'end_date': block.get('end_date', ''),
-                'color': BLOCK_TYPES.get(block['block_type'], {}).get('color', '#9CA3AF'),
-                'name': BLOCK_TYPES.get(block['block_type'], {}).get('name', 'Bloqueado')
-            }
-
-        # Get map configuration from database
-        map_config = get_map_config()
-        zone_padding = map_config['zone_padding']
-        zone_height = map_config['zone_height']
-        map_width = map_config['default_width']
-        min_height = map_config['min_height']
-
-        # Calculate zone bounds for rendering (vertical stacking)
-        zone_bounds = {}
-        for idx, zone in enumerate(zones):
-            zone_bounds[zone['id']] = {
-                'x': zone_padding,
-                'y': zone_padding + idx * (zone_height + zone_padding),
-                'width': map_width - 2 * zone_padding,
-                'height': zone_height
-            }
-
-        # Calculate total map height based on zones
-        total_height = zone_padding + len(zones) * (zone_height + zone_padding)
-
-        return api_success(
+        since = request.args.get('since', type=int)
+
+        # Read the revision before any data: a write landing mid-request is
+        # then re-sent on the next poll instead of being lost.
+        revision = get_map_revision(date_str)
+
+        if since is not None and since <= revision:
+            changed_ids, full_reload = get_map_changes_since(date_str, since)
+            if not full_reload:
+                response, status = api_success(
+                    date=date_str,
+                    delta=True,
+                    since=since,
+                    map_revision=revision,
+                    **_delta_map_payload(date_str, changed_ids)
+                )
+                response.headers['Cache-Control'] = 'no-cache'
+                return response, status
+
+        etag = build_map_etag(date_str, revision)
+        if since is None and request.if_none_match.contains_weak(etag):
+            response = make_response('', 304)
+            response.set_etag(etag, weak=True)
+            response.headers['Cache-Control'] = 'no-cache'
+            return response
+
+        response, status = api_success(
             date=date_str,
-            zones=zones,
-            zone_bounds=zone_bounds,
-            furniture=furniture,
-            furniture_types=furniture_types_map,
-            states=states,
-            state_colors=state_colors,
-            availability=furniture_availability,
-            blocks=blocks_map,
-            block_types=BLOCK_TYPES,
-            summary=availability.get('summary', {}).get(date_str, {}),
-            map_dimensions={
-                'width': map_width,
-                'height': max(min_height, total_height)
-            },
-            map_config=map_config
+            delta=False,
+            map_revision=revision,
+            **_full_map_payload(date_str)
         )
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response, status
 
     @bp.route('/map/availability')
     @login_required
@@ -121,6 +204,8 @@ def register_routes(bp):
             date_from: Start date YYYY-MM-DD
             date_to: End date YYYY-MM-DD (default: same as date_from)
             zone_id: Filter by zone (optional)
+            format: 'compact' for the columnar layout (reservation side
+                    table + furniture x date int matrix), default nested
 
         Returns:
             JSON availability matrix
@@ -128,11 +213,13 @@ def register_routes(bp):
         date_from = request.args.get('date_from', get_today().strftime('%Y-%m-%d'))
         date_to = request.args.get('date_to', date_from)
         zone_id = request.args.get('zone_id', type=int)
+        compact = request.args.get('format') == 'compact'
 
         try:
             availability = get_furniture_availability_map(
                 date_from, date_to,
-                zone_id=zone_id
+                zone_id=zone_id,
+                compact=compact
             )
 
             return api_success(
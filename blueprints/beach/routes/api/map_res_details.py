@@ -225,6 +225,8 @@ def register_routes(bp):
             unavailable = availability.get('unavailable', [])
             if unavailable:
                 blocker = unavailable[0]
+                if blocker.get('status') == 'blocked':
+                    return api_error('Mobiliario de destino bloqueado', 409, conflict=blocker)
                 return api_error(
                     f'Mobiliario ocupado por {blocker.get("customer_name", "otra reserva")}',
                     409,
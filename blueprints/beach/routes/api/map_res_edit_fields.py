@@ -14,7 +14,7 @@ from models.customer import get_customer_by_id, create_customer_from_hotel_guest
 from database import get_db
 from models.characteristic_assignments import set_reservation_characteristics_by_codes
 from models.tag import set_reservation_tags, sync_reservation_tags_to_customer
-from utils.audit import log_update
+from utils.audit import log_update, audit_snapshot, get_audit_snapshot
 
 
 def register_routes(bp: Blueprint) -> None:
@@ -48,7 +48,7 @@ def register_routes(bp: Blueprint) -> None:
             return api_error('Reserva no encontrada', 404)
 
         # Capture before-state for audit log
-        before_state = dict(reservation) if reservation else {}
+        before_state = audit_snapshot('reservation', reservation)
 
         # Allowed fields for partial update
         # Note: For date changes, use the dedicated /change-dates endpoint
@@ -218,8 +218,7 @@ def register_routes(bp: Blueprint) -> None:
                 conn.commit()
 
             # Audit log
-            after_reservation = get_beach_reservation_by_id(reservation_id)
-            after_state = dict(after_reservation) if after_reservation else {}
+            after_state = get_audit_snapshot('reservation', reservation_id) or {}
             log_update('reservation', reservation_id, before=before_state, after=after_state)
 
             return api_success(
@@ -8,7 +8,9 @@ from datetime import datetime
 from utils.api_response import api_success, api_error
 from blueprints.beach.services.pricing_service import (
     get_eligible_packages,
-    calculate_reservation_pricing
+    calculate_reservation_pricing,
+    calculate_pricing_batch,
+    MAX_BATCH_QUOTES
 )
 from models.pricing import get_all_minimum_consumption_policies
 
@@ -145,6 +147,88 @@ def register_routes(bp):
             current_app.logger.error(f'Error: {e}', exc_info=True)
             return api_error("Error interno del servidor", 500)
 
+    @bp.route('/pricing/calculate-batch', methods=['POST'])
+    @login_required
+    def calculate_pricing_batch_route():
+        """
+        Calculate pricing for many furniture sets x dates x party sizes at once.
+
+        Request JSON:
+        {
+            "customer_id": 123,
+            "furniture_sets": [[1, 2], [3]],
+            "dates": ["2025-12-26", "2025-12-27"],
+            "party_sizes": [2, 4],
+            "package_id": 5,  // optional, applied to every quote
+            "customer_source": "customer" | "hotel_guest",  // optional
+            "minimum_consumption_policy_id": 2  // optional
+        }
+
+        Response JSON:
+        {
+            "success": true,
+            "quotes": [
+                {
+                    "furniture_ids": [1, 2],
+                    "reservation_date": "2025-12-26",
+                    "num_people": 2,
+                    "pricing": {...}  // as /pricing/calculate
+                },
+                ...
+            ]
+        }
+        """
+        try:
+            data = request.get_json() or {}
+
+            # Validate required fields
+            required_fields = ["customer_id", "furniture_sets", "dates", "party_sizes"]
+            for field in required_fields:
+                if field not in data:
+                    return api_error(f"Campo requerido: {field}")
+
+            furniture_sets = data["furniture_sets"]
+            if not isinstance(furniture_sets, list) or not all(
+                isinstance(furniture_ids, list) for furniture_ids in furniture_sets
+            ):
+                return api_error("furniture_sets debe ser una lista de listas de mobiliario")
+
+            party_sizes = data["party_sizes"]
+            if not isinstance(party_sizes, list) or not all(
+                isinstance(size, int) and size > 0 for size in party_sizes
+            ):
+                return api_error("party_sizes debe ser una lista de enteros positivos")
+
+            # Parse dates
+            if not isinstance(data["dates"], list):
+                return api_error("dates debe ser una lista de fechas")
+            try:
+                dates = [datetime.strptime(d, "%Y-%m-%d").date() for d in data["dates"]]
+            except (TypeError, ValueError):
+                return api_error("Formato de fecha inválido. Use YYYY-MM-DD")
+
+            if len(furniture_sets) * len(dates) * len(party_sizes) > MAX_BATCH_QUOTES:
+                return api_error(f"Máximo {MAX_BATCH_QUOTES} combinaciones por petición")
+
+            quotes = calculate_pricing_batch(
+                customer_id=data["customer_id"],
+                furniture_sets=furniture_sets,
+                reservation_dates=dates,
+                party_sizes=party_sizes,
+                package_id=data.get("package_id"),
+                customer_source=data.get("customer_source", "customer"),
+                minimum_consumption_policy_id=data.get("minimum_consumption_policy_id")
+            )
+
+            return api_success(quotes=quotes)
+
+        except ValueError as e:
+            current_app.logger.error(f'Error: {e}', exc_info=True)
+            return api_error("Error interno del servidor")
+        except Exception as e:
+            current_app.logger.error(f'Error: {e}', exc_info=True)
+            return api_error("Error interno del servidor", 500)
+
     @bp.route('/pricing/minimum-consumption-policies', methods=['GET'])
     @login_required
     def list_minimum_consumption_policies() -> Response:
@@ -5,7 +5,7 @@ Reservation API routes including availability, multi-day, and suggestions.
 from flask import current_app, request, jsonify
 from flask_login import login_required, current_user
 from utils.decorators import permission_required
-from utils.audit import log_create, log_update, log_delete
+from utils.audit import log_create, log_update, log_delete, audit_snapshot, get_audit_snapshot
 from utils.api_response import api_success, api_error
 from models.characteristic_assignments import get_reservation_characteristics, set_reservation_characteristics_by_codes
 from models.reservation import (
@@ -103,17 +103,7 @@ def register_routes(bp):
 
         try:
             # Capture before state for audit log
-            before_state = {
-                'id': reservation['id'],
-                'customer_id': reservation.get('customer_id'),
-                'num_people': reservation.get('num_people'),
-                'current_states': reservation.get('current_states'),
-                'notes': reservation.get('notes'),
-                'paid': reservation.get('paid'),
-                'final_price': reservation.get('final_price'),
-                'payment_method': reservation.get('payment_method'),
-                'payment_ticket_number': reservation.get('payment_ticket_number')
-            }
+            before_state = audit_snapshot('reservation', reservation)
 
             # Handle state change separately
             if 'state_id' in data:
@@ -159,18 +149,7 @@ def register_routes(bp):
                 update_beach_reservation(reservation_id, **updates)
 
             # Log audit entry for the update
-            updated_reservation = get_reservation_with_details(reservation_id)
-            after_state = {
-                'id': updated_reservation['id'],
-                'customer_id': updated_reservation.get('customer_id'),
-                'num_people': updated_reservation.get('num_people'),
-                'current_states': updated_reservation.get('current_states'),
-                'notes': updated_reservation.get('notes'),
-                'paid': updated_reservation.get('paid'),
-                'final_price': updated_reservation.get('final_price'),
-                'payment_method': updated_reservation.get('payment_method'),
-                'payment_ticket_number': updated_reservation.get('payment_ticket_number')
-            }
+            after_state = get_audit_snapshot('reservation', reservation_id)
             log_update('reservation', reservation_id, before=before_state, after=after_state)
 
             return api_success()
@@ -244,11 +223,8 @@ def register_routes(bp):
 
             # Log audit entry for state change
             if result_action:
-                updated_reservation = get_reservation_with_details(reservation_id)
-                after_state = {
-                    'id': updated_reservation['id'],
-                    'current_states': updated_reservation.get('current_states')
-                }
+                snapshot = get_audit_snapshot('reservation', reservation_id) or {}
+                after_state = {'id': reservation_id, 'current_states': snapshot.get('current_states')}
                 log_update('reservation', reservation_id, before=before_state, after=after_state)
 
             return api_success(action=result_action, state=state_name)
@@ -398,11 +374,16 @@ def register_routes(bp):
     @login_required
     @permission_required('beach.reservations.view')
     def availability_map():
-        """Get availability map for date range (calendar/grid view)."""
+        """Get availability map for date range (calendar/grid view).
+
+        format=compact returns the columnar layout (see
+        get_furniture_availability_map).
+        """
         date_from = request.args.get('date_from')
         date_to = request.args.get('date_to')
         zone_id = request.args.get('zone_id', type=int)
         furniture_type = request.args.get('type')
+        compact = request.args.get('format') == 'compact'
 
         if not date_from or not date_to:
             return api_error('date_from y date_to requeridos', 400)
@@ -411,7 +392,8 @@ def register_routes(bp):
             date_from=date_from,
             date_to=date_to,
             zone_id=zone_id,
-            furniture_type=furniture_type
+            furniture_type=furniture_type,
+            compact=compact
         )
 
         return api_success(**result)
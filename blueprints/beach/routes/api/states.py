@@ -40,7 +40,7 @@ def register_routes(bp):
         }
         """
         try:
-            states = get_all_states(active_only=True)
+            states = get_all_states(active_only=True, include_usage=False)
 
             # Return only fields needed by the panel
             filtered_states = []
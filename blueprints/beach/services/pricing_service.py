@@ -6,26 +6,30 @@ Handles:
 - Package price calculations
 - Minimum consumption matching and calculations
 - Complete reservation pricing orchestration
+- Batch quotes over furniture sets x dates x party sizes
 """
 
 from typing import Optional, Dict, List, Any
 from datetime import date as Date
-from models.package import (
-    get_active_packages_for_date,
-    get_package_by_id
-)
-from models.pricing import (
-    get_applicable_minimum_consumption_policy,
-    get_minimum_consumption_policy_by_id
-)
-from models.furniture import get_furniture_by_id
+from models.pricing import get_pricing_rules, resolve_minimum_consumption_policy
+from models.furniture import get_furniture_by_ids
 from models.customer import get_customer_by_id
 from models.hotel_guest import get_hotel_guest_by_id
 
+# Largest number of quotes calculate_pricing_batch prices in one call
+MAX_BATCH_QUOTES = 500
+
+
+def _lookup_by_id(rows: Dict[int, Any], row_id: Any) -> Any:
+    """Look up a row by ID, accepting numeric strings from JSON payloads."""
+    if isinstance(row_id, str) and row_id.isdigit():
+        row_id = int(row_id)
+    return rows.get(row_id)
+
 
 def get_furniture_details(furniture_ids: List[int]) -> Dict[str, Any]:
     """
-    Get furniture details for pricing calculations.
+    Get furniture details for pricing calculations (one batched query).
 
     Args:
         furniture_ids: List of furniture IDs
@@ -36,11 +40,17 @@ def get_furniture_details(furniture_ids: List[int]) -> Dict[str, Any]:
     if not furniture_ids:
         return {"furniture_types": [], "zone_id": None}
 
+    return _furniture_details_from(get_furniture_by_ids(furniture_ids), furniture_ids)
+
+
+def _furniture_details_from(furniture_by_id: Dict[int, Any],
+                            furniture_ids: List[int]) -> Dict[str, Any]:
+    """Build get_furniture_details' result from already fetched furniture."""
     furniture_types = []
     zone_id = None
 
     for furniture_id in furniture_ids:
-        furniture = get_furniture_by_id(furniture_id)
+        furniture = _lookup_by_id(furniture_by_id, furniture_id)
         if furniture:
             furniture_types.append(furniture["furniture_type"])
             if zone_id is None:
@@ -52,6 +62,55 @@ def get_furniture_details(furniture_ids: List[int]) -> Dict[str, Any]:
     }
 
 
+def _packages_for_date(
+    rules: Dict[str, Any],
+    reservation_date: Date,
+    customer_type: Optional[str],
+    zone_id: Optional[int]
+) -> List[Dict[str, Any]]:
+    """Compiled-table equivalent of get_active_packages_for_date."""
+    day = str(reservation_date)
+    packages = []
+    for package in rules["active_packages"]:
+        if package["valid_from"] and str(package["valid_from"]) > day:
+            continue
+        if package["valid_until"] and str(package["valid_until"]) < day:
+            continue
+        if customer_type and package["customer_type"] not in (customer_type, "both", None):
+            continue
+        if zone_id and package["zone_id"] not in (zone_id, None):
+            continue
+        packages.append(package)
+    return packages
+
+
+def _package_price(package: Dict[str, Any], num_people: int) -> float:
+    """Price of a package row for a party size."""
+    if package["price_type"] == "per_person":
+        return package["base_price"] * num_people
+    else:  # per_package
+        return package["base_price"]
+
+
+def _minimum_consumption_result(policy: Dict[str, Any], num_people: int,
+                                label: str = "Consumo mínimo") -> Dict[str, Any]:
+    """Amount and breakdown of a minimum consumption policy for a party size."""
+    if policy["calculation_type"] == "per_person":
+        amount = policy["minimum_amount"] * num_people
+        breakdown = f"{label}: €{amount:.2f} ({policy['minimum_amount']:.2f}€ × {num_people} personas)"
+    else:  # per_reservation
+        amount = policy["minimum_amount"]
+        breakdown = f"{label}: €{amount:.2f} (fijo por reserva)"
+
+    return {
+        "policy_id": policy["id"],
+        "policy_name": policy["policy_name"],
+        "amount": amount,
+        "breakdown": breakdown,
+        "policy_description": policy.get("policy_description", "")
+    }
+
+
 def get_eligible_packages(
     customer_type: str,
     furniture_ids: List[int],
@@ -87,13 +146,9 @@ def get_eligible_packages(
     logger.info(f"[Pricing] get_eligible_packages - customer_type={customer_type}, furniture_types={furniture_types}, zone_id={zone_id}, num_people={num_people}, date={reservation_date}")
 
     # Get packages matching customer type and date
-    packages = get_active_packages_for_date(
-        date=reservation_date,
-        customer_type=customer_type,
-        zone_id=zone_id
-    )
+    packages = _packages_for_date(get_pricing_rules(), reservation_date, customer_type, zone_id)
 
-    logger.info(f"[Pricing] Found {len(packages)} packages from database")
+    logger.info(f"[Pricing] Found {len(packages)} packages from compiled rules")
     for pkg in packages:
         logger.info(f"[Pricing]   - {pkg['package_name']}: furniture_types={pkg.get('furniture_types_included')}, min={pkg['min_people']}, max={pkg['max_people']}")
 
@@ -117,7 +172,7 @@ def get_eligible_packages(
                 continue
 
         # Calculate price for this package
-        price = calculate_package_price(package["id"], num_people)
+        price = _package_price(package, num_people)
 
         # Add price breakdown
         if package["price_type"] == "per_person":
@@ -148,14 +203,11 @@ def calculate_package_price(package_id: int, num_people: int) -> float:
     Returns:
         Calculated price (float)
     """
-    package = get_package_by_id(package_id)
+    package = _lookup_by_id(get_pricing_rules()["packages"], package_id)
     if not package:
         return 0.0
 
-    if package["price_type"] == "per_person":
-        return package["base_price"] * num_people
-    else:  # per_package
-        return package["base_price"]
+    return _package_price(package, num_people)
 
 
 def get_applicable_minimum_consumption(
@@ -187,35 +239,32 @@ def get_applicable_minimum_consumption(
     if not furniture_ids:
         return None
 
-    furniture_details = get_furniture_details(furniture_ids)
-    furniture_types = furniture_details["furniture_types"]
+    return _match_minimum_consumption(
+        get_pricing_rules(), get_furniture_details(furniture_ids), customer_type, num_people
+    )
+
+
+def _match_minimum_consumption(
+    rules: Dict[str, Any],
+    furniture_details: Dict[str, Any],
+    customer_type: str,
+    num_people: int
+) -> Optional[Dict[str, Any]]:
+    """Resolve the minimum consumption for already fetched furniture details."""
     zone_id = furniture_details["zone_id"]
 
     # Try to find applicable policy for each furniture type
     # Use the first match (highest priority)
-    for furniture_type in furniture_types:
-        policy = get_applicable_minimum_consumption_policy(
+    for furniture_type in furniture_details["furniture_types"]:
+        policy = resolve_minimum_consumption_policy(
+            rules,
             furniture_type=furniture_type,
             customer_type=customer_type,
             zone_id=zone_id
         )
 
         if policy:
-            # Calculate amount based on calculation_type
-            if policy["calculation_type"] == "per_person":
-                amount = policy["minimum_amount"] * num_people
-                breakdown = f"Consumo mínimo: €{amount:.2f} ({policy['minimum_amount']:.2f}€ × {num_people} personas)"
-            else:  # per_reservation
-                amount = policy["minimum_amount"]
-                breakdown = f"Consumo mínimo: €{amount:.2f} (fijo por reserva)"
-
-            return {
-                "policy_id": policy["id"],
-                "policy_name": policy["policy_name"],
-                "amount": amount,
-                "breakdown": breakdown,
-                "policy_description": policy.get("policy_description", "")
-            }
+            return _minimum_consumption_result(policy, num_people)
 
     return None
 
@@ -234,25 +283,12 @@ def get_minimum_consumption_by_policy_id(
     Returns:
         dict with policy details and calculated amount, or None
     """
-    policy = get_minimum_consumption_policy_by_id(policy_id)
-    if not policy or not policy.get('is_active'):
+    # Only active policies are compiled
+    policy = _lookup_by_id(get_pricing_rules()["policies_by_id"], policy_id)
+    if not policy:
         return None
 
-    # Calculate amount based on calculation_type
-    if policy["calculation_type"] == "per_person":
-        amount = policy["minimum_amount"] * num_people
-        breakdown = f"Consumo minimo: €{amount:.2f} ({policy['minimum_amount']:.2f}€ × {num_people} personas)"
-    else:  # per_reservation
-        amount = policy["minimum_amount"]
-        breakdown = f"Consumo minimo: €{amount:.2f} (fijo por reserva)"
-
-    return {
-        "policy_id": policy["id"],
-        "policy_name": policy["policy_name"],
-        "amount": amount,
-        "breakdown": breakdown,
-        "policy_description": policy.get("policy_description", "")
-    }
+    return _minimum_consumption_result(policy, num_people, label="Consumo minimo")
 
 
 def calculate_reservation_pricing(
@@ -295,21 +331,124 @@ def calculate_reservation_pricing(
             'has_minimum_consumption': bool
         }
     """
-    # Get customer details based on source
+    customer_type = _get_customer_type(customer_id, customer_source)
+
+    return _price_reservation(
+        rules=get_pricing_rules(),
+        customer_type=customer_type,
+        furniture_ids=furniture_ids,
+        num_people=num_people,
+        package_id=package_id,
+        minimum_consumption_policy_id=minimum_consumption_policy_id
+    )
+
+
+def calculate_pricing_batch(
+    customer_id: int,
+    furniture_sets: List[List[int]],
+    reservation_dates: List[Date],
+    party_sizes: List[int],
+    package_id: Optional[int] = None,
+    customer_source: str = "customer",
+    minimum_consumption_policy_id: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """
+    Price every furniture set x date x party size combination at once.
+
+    The customer, the furniture of all sets and the pricing rules are looked
+    up once for the whole batch. Prices do not depend on the date, so each
+    (furniture set, party size) is priced once and shared across dates.
+
+    Args:
+        customer_id: Customer ID (from beach_customers or hotel_guests)
+        furniture_sets: Candidate furniture ID lists
+        reservation_dates: Candidate dates
+        party_sizes: Candidate numbers of people
+        package_id: Optional selected package ID (applied to every quote)
+        customer_source: Source of customer ("customer" or "hotel_guest")
+        minimum_consumption_policy_id: Optional manually selected policy ID
+
+    Returns:
+        List of {furniture_ids, reservation_date, num_people, pricing} in
+        furniture set, date, party size order; pricing is as returned by
+        calculate_reservation_pricing
+
+    Raises:
+        ValueError: If the customer is not found or the batch is too large
+    """
+    total = len(furniture_sets) * len(reservation_dates) * len(party_sizes)
+    if total > MAX_BATCH_QUOTES:
+        raise ValueError(f"Batch of {total} quotes exceeds the limit of {MAX_BATCH_QUOTES}")
+
+    customer_type = _get_customer_type(customer_id, customer_source)
+    rules = get_pricing_rules()
+    all_ids = list(dict.fromkeys(fid for furniture_ids in furniture_sets for fid in furniture_ids))
+    furniture_by_id = get_furniture_by_ids(all_ids)
+
+    quotes = []
+    for furniture_ids in furniture_sets:
+        furniture_details = _furniture_details_from(furniture_by_id, furniture_ids)
+        pricing_by_size = {
+            num_people: _price_reservation(
+                rules=rules,
+                customer_type=customer_type,
+                furniture_ids=furniture_ids,
+                num_people=num_people,
+                package_id=package_id,
+                minimum_consumption_policy_id=minimum_consumption_policy_id,
+                furniture_details=furniture_details
+            )
+            for num_people in party_sizes
+        }
+        for reservation_date in reservation_dates:
+            for num_people in party_sizes:
+                quotes.append({
+                    "furniture_ids": furniture_ids,
+                    "reservation_date": reservation_date,
+                    "num_people": num_people,
+                    "pricing": pricing_by_size[num_people]
+                })
+
+    return quotes
+
+
+def _get_customer_type(customer_id: int, customer_source: str) -> str:
+    """
+    Resolve the pricing customer type of a beach customer or hotel guest.
+
+    Raises:
+        ValueError: If the customer is not found
+    """
     if customer_source == "hotel_guest":
         # Look up in hotel_guests table
         customer = get_hotel_guest_by_id(customer_id)
         if not customer:
             raise ValueError(f"Hotel guest {customer_id} not found")
         # Hotel guests are always 'interno'
-        customer_type = "interno"
-    else:
-        # Look up in beach_customers table
-        customer = get_customer_by_id(customer_id)
-        if not customer:
-            raise ValueError(f"Customer {customer_id} not found")
-        customer_type = customer["customer_type"]
+        return "interno"
+
+    # Look up in beach_customers table
+    customer = get_customer_by_id(customer_id)
+    if not customer:
+        raise ValueError(f"Customer {customer_id} not found")
+    return customer["customer_type"]
 
+
+def _price_reservation(
+    rules: Dict[str, Any],
+    customer_type: str,
+    furniture_ids: List[int],
+    num_people: int,
+    package_id: Optional[int] = None,
+    minimum_consumption_policy_id: Optional[int] = None,
+    furniture_details: Optional[Dict[str, Any]] = None
+) -> Dict[str, Any]:
+    """
+    Price one reservation against compiled rules (see
+    calculate_reservation_pricing for the business rules and result).
+    Furniture is only fetched when minimum consumption is auto-detected
+    and no furniture_details are given.
+    """
     result = {
         "package": None,
         "package_price": 0.0,
@@ -323,9 +462,10 @@ def calculate_reservation_pricing(
 
     # If package selected, use package pricing (MUTUALLY EXCLUSIVE with minimum consumption)
     if package_id:
-        package = get_package_by_id(package_id)
+        package = _lookup_by_id(rules["packages"], package_id)
         if package:
-            price = calculate_package_price(package_id, num_people)
+            package = dict(package)
+            price = _package_price(package, num_people)
 
             if package["price_type"] == "per_person":
                 breakdown = f"Paquete {package['package_name']}: €{price:.2f} ({package['base_price']:.2f}€ × {num_people} personas)"
@@ -345,15 +485,17 @@ def calculate_reservation_pricing(
     # No package selected, check for minimum consumption
     # Use manual policy selection if provided, otherwise auto-detect
     if minimum_consumption_policy_id:
-        min_consumption = get_minimum_consumption_by_policy_id(
-            policy_id=minimum_consumption_policy_id,
-            num_people=num_people
+        # Only active policies are compiled
+        policy = _lookup_by_id(rules["policies_by_id"], minimum_consumption_policy_id)
+        min_consumption = (
+            _minimum_consumption_result(policy, num_people, label="Consumo minimo")
+            if policy else None
         )
     else:
-        min_consumption = get_applicable_minimum_consumption(
-            furniture_ids=furniture_ids,
-            customer_type=customer_type,
-            num_people=num_people
+        if furniture_details is None:
+            furniture_details = get_furniture_details(furniture_ids)
+        min_consumption = _match_minimum_consumption(
+            rules, furniture_details, customer_type, num_people
         )
 
     if min_consumption:
@@ -16,6 +16,23 @@ class Config:
     # Database configuration
     DATABASE_PATH = os.environ.get('DATABASE_PATH') or 'instance/beach_club.db'
 
+    # SQLite connections are pooled per worker thread and configured once
+    # when opened (see database/connection.py).
+    DB_POOL_ENABLED = os.environ.get('DB_POOL_ENABLED', 'true').lower() == 'true'
+    SQLITE_CACHED_STATEMENTS = int(os.environ.get('SQLITE_CACHED_STATEMENTS', 256))
+    SQLITE_PRAGMAS = {
+        'foreign_keys': 'ON',
+        'journal_mode': 'WAL',
+        # NORMAL is durable against corruption in WAL mode; only the last
+        # commits may roll back on power loss
+        'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+        'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT_MS', 5000)),
+        # Negative cache_size is in KiB (16 MB page cache per connection)
+        'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -16000)),
+        'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+        'temp_store': os.environ.get('SQLITE_TEMP_STORE', 'MEMORY'),
+    }
+
     # SQLAlchemy disabled (using raw SQLite)
     SQLALCHEMY_DATABASE_URI = None
     SQLALCHEMY_TRACK_MODIFICATIONS = False
@@ -50,6 +67,12 @@ class Config:
     MAX_CONTENT_LENGTH = int(os.environ.get('MAX_CONTENT_LENGTH', 16 * 1024 * 1024))  # 16MB
     ALLOWED_EXTENSIONS = {'xlsx', 'xls', 'pdf', 'png', 'jpg', 'jpeg'}
 
+    # Audit log entries are queued and written in batches by a background
+    # thread (see utils/audit.py); a full queue falls back to direct writes.
+    AUDIT_ASYNC_ENABLED = os.environ.get('AUDIT_ASYNC_ENABLED', 'true').lower() == 'true'
+    AUDIT_QUEUE_SIZE = int(os.environ.get('AUDIT_QUEUE_SIZE', 1000))
+    AUDIT_BATCH_SIZE = int(os.environ.get('AUDIT_BATCH_SIZE', 100))
+
     # Pagination
     ITEMS_PER_PAGE = 20
 
@@ -107,6 +130,7 @@ class TestConfig(Config):
     RATELIMIT_ENABLED = False  # Disable rate limiting for tests
     DATABASE_PATH = os.environ.get('DATABASE_PATH', ':memory:')
     SECRET_KEY = 'test-secret-key'
+    AUDIT_ASYNC_ENABLED = False  # Write audit entries inline (deterministic tests)
 
 
 # Configuration dictionary
@@ -1,13 +1,184 @@
 """
 Database connection management.
 Handles connection pooling, initialization, and teardown.
+
+Connections are pooled per thread (gunicorn gthread workers serve each
+request on one thread): the first request on a thread opens and configures
+a connection, later requests on that thread reuse it. PRAGMAs are applied
+once, when the connection is opened.
 """
 
 import sqlite3
 import os
+import threading
 from flask import g, current_app
 
 
+# Per-thread pool: {db_path: _PooledConnection}
+_local = threading.local()
+
+# Connections inherited across fork; kept referenced so they are never
+# finalized (closed) from the child process
+_inherited = []
+
+
+class _PooledConnection:
+    """A pooled connection plus what is needed to tell if it is still valid."""
+
+    __slots__ = ('conn', 'pid', 'file_id', 'in_use')
+
+    def __init__(self, conn: sqlite3.Connection, pid: int, file_id: tuple):
+        self.conn = conn
+        self.pid = pid
+        self.file_id = file_id
+        self.in_use = False
+
+
+def _file_id(db_path: str) -> tuple:
+    """Identify the database file, to detect it being replaced (restore/reset)."""
+    if db_path == ':memory:' or db_path.startswith('file:'):
+        return ()
+    try:
+        st = os.stat(db_path)
+    except OSError:
+        return None
+    return (st.st_dev, st.st_ino)
+
+
+def _connect(db_path: str) -> sqlite3.Connection:
+    """
+    Open a new connection and apply the configured PRAGMAs.
+
+    Args:
+        db_path: Database file path
+
+    Returns:
+        sqlite3.Connection: Configured connection
+    """
+    conn = sqlite3.connect(
+        db_path,
+        detect_types=sqlite3.PARSE_DECLTYPES,
+        cached_statements=current_app.config.get('SQLITE_CACHED_STATEMENTS', 256)
+    )
+    conn.row_factory = sqlite3.Row
+
+    pragmas = current_app.config.get('SQLITE_PRAGMAS') or {
+        'foreign_keys': 'ON',
+        'journal_mode': 'WAL',
+    }
+    for name, value in pragmas.items():
+        if value is None or value == '':
+            continue
+        conn.execute(f'PRAGMA {name} = {value}')
+    return conn
+
+
+def _pool() -> dict:
+    """Return this thread's pool dict."""
+    pool = getattr(_local, 'pool', None)
+    if pool is None:
+        pool = _local.pool = {}
+    return pool
+
+
+def _acquire(db_path: str) -> sqlite3.Connection:
+    """
+    Get this thread's pooled connection for db_path, opening one if needed.
+
+    A pooled connection is discarded (and replaced) when the process forked
+    since it was opened or the database file was replaced on disk. A nested
+    app context on the same thread gets its own, unpooled connection so it
+    cannot commit or roll back the outer context's transaction.
+    """
+    pool = _pool()
+    pooled = pool.get(db_path)
+
+    if pooled is not None:
+        if pooled.in_use and pooled.pid == os.getpid():
+            return _connect(db_path)
+        if pooled.pid != os.getpid():
+            # Inherited across fork (gunicorn preload): never touch it here
+            _inherited.append(pool.pop(db_path))
+        elif pooled.file_id != _file_id(db_path):
+            pool.pop(db_path, None)
+            try:
+                pooled.conn.close()
+            except sqlite3.Error:
+                pass
+        else:
+            pooled.in_use = True
+            return pooled.conn
+
+    conn = _connect(db_path)
+    pooled = _PooledConnection(conn, os.getpid(), _file_id(db_path))
+    pooled.in_use = True
+    pool[db_path] = pooled
+    return conn
+
+
+def _release(db_path: str, conn: sqlite3.Connection) -> None:
+    """
+    Return a connection to the pool after a request.
+
+    Any transaction left open is rolled back. Connections whose session
+    state was altered (foreign keys switched off by a migration or script)
+    are closed instead of being reused.
+    """
+    try:
+        if conn.in_transaction:
+            conn.rollback()
+        healthy = conn.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+    except sqlite3.Error:
+        healthy = False
+
+    pooled = _pool().get(db_path)
+    if healthy:
+        pooled.in_use = False
+        return
+
+    _pool().pop(db_path, None)
+    try:
+        conn.close()
+    except sqlite3.Error:
+        pass
+
+
+def close_pool() -> None:
+    """Close every pooled connection owned by the current thread."""
+    pool = _pool()
+    for pooled in pool.values():
+        if pooled.pid == os.getpid():
+            try:
+                pooled.conn.close()
+            except sqlite3.Error:
+                pass
+    pool.clear()
+
+
+def try_begin_immediate(conn: sqlite3.Connection) -> bool:
+    """
+    Start a write transaction only if the write lock is free right now.
+
+    Read paths use it for opportunistic maintenance: instead of waiting up to
+    busy_timeout behind a writer, they skip the work and leave it for later.
+
+    Args:
+        conn: Connection with no open transaction
+
+    Returns:
+        bool: True if the transaction was started, False if the lock was busy
+    """
+    timeout = conn.execute('PRAGMA busy_timeout').fetchone()[0]
+    conn.execute('PRAGMA busy_timeout = 0')
+    try:
+        conn.execute('BEGIN IMMEDIATE')
+        return True
+    except sqlite3.OperationalError:
+        return False
+    finally:
+        conn.execute(f'PRAGMA busy_timeout = {int(timeout)}')
+
+
 def get_db():
     """
     Get thread-safe database connection with row factory.
@@ -17,27 +188,30 @@ def get_db():
     """
     if 'db' not in g:
         db_path = current_app.config.get('DATABASE_PATH', 'instance/beach_club.db')
-        g.db = sqlite3.connect(
-            db_path,
-            detect_types=sqlite3.PARSE_DECLTYPES
-        )
-        g.db.row_factory = sqlite3.Row
-        # Enable foreign key constraints
-        g.db.execute('PRAGMA foreign_keys = ON')
-        # Enable WAL mode for better concurrency
-        g.db.execute('PRAGMA journal_mode = WAL')
+        if current_app.config.get('DB_POOL_ENABLED', True):
+            g.db = _acquire(db_path)
+        else:
+            g.db = _connect(db_path)
+        g.db_path = db_path
     return g.db
 
 
 def close_db(e=None):
     """
-    Close database connection.
+    Release database connection back to the thread pool (or close it).
 
     Args:
         e: Exception if any (from Flask teardown context)
     """
     db = g.pop('db', None)
-    if db is not None:
+    db_path = g.pop('db_path', None)
+    if db is None:
+        return
+
+    pooled = _pool().get(db_path) if db_path else None
+    if pooled is not None and pooled.conn is db:
+        _release(db_path, db)
+    else:
         db.close()
 
 
@@ -48,6 +222,7 @@ def init_db():
     """
     from database.schema import drop_tables, create_tables, create_indexes
     from database.seed import seed_database
+    from utils.cache import invalidate
 
     db = get_db()
 
@@ -64,4 +239,7 @@ def init_db():
     seed_database(db)
 
     db.commit()
+
+    # Recreated tables lose their generation triggers until migrations run
+    invalidate()
     print("Database initialized successfully!")
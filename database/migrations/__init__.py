@@ -14,7 +14,8 @@ from .reservations import (
 )
 from .hotel_guests import (
     migrate_hotel_guests_multi_guest,
-    migrate_hotel_guests_booking_reference
+    migrate_hotel_guests_booking_reference,
+    migrate_hotel_guests_booking_base
 )
 from .customers import (
     migrate_customers_language_phone,
@@ -55,14 +56,23 @@ from .waitlist import (
 from .add_insights_permissions import migrate_add_insights_permissions
 from .temp_furniture_date_range import migrate_temp_furniture_date_range
 from .fix_reports_menu import migrate_fix_reports_menu
-from .import_log import migrate_import_log_table
+from .import_log import migrate_import_log_table, migrate_import_log_timings
 from .booking_reference_link import (
     migrate_customers_booking_reference,
     migrate_reservations_booking_reference
 )
 from .connectivity_log import migrate_connectivity_events_table
 from .connectivity_menu import migrate_connectivity_menu
-from .room_changes_log import migrate_room_changes_table
+from .room_changes_log import migrate_room_changes_table, migrate_room_change_dates
+from .map_revision import migrate_map_revision
+from .cache_generations import migrate_cache_generations
+from .state_members import migrate_reservation_state_members
+from .customer_stats import migrate_customer_stats_triggers
+from .search_index import migrate_search_index
+from .ticket_sequences import migrate_ticket_sequences
+from .audit_log_indexes import migrate_audit_log_indexes
+from .stay_markers import migrate_stay_markers
+from .daily_rollup import migrate_daily_rollup
 
 
 # Ordered list of all migrations
@@ -152,6 +162,38 @@ MIGRATIONS = [
 
     # Phase 21: Room change history (visual info for staff)
     ('room_changes_table', migrate_room_changes_table),
+
+    # Phase 22: Map revision log (conditional / incremental map polling)
+    ('map_revision', migrate_map_revision),
+
+    # Phase 23: Reference-data cache generations (cross-worker invalidation)
+    ('cache_generations', migrate_cache_generations),
+
+    # Phase 24: Bulk guest import timing report
+    ('import_log_timings', migrate_import_log_timings),
+
+    # Phase 25: Normalised state membership + incremental customer statistics
+    ('reservation_state_members', migrate_reservation_state_members),
+    ('customer_stats_triggers', migrate_customer_stats_triggers),
+
+    # Phase 26: Accent-insensitive customer/guest search index
+    ('search_index', migrate_search_index),
+
+    # Phase 27: Per-day ticket sequences (atomic ticket allocation)
+    ('ticket_sequences', migrate_ticket_sequences),
+
+    # Phase 28: Audit log filter indexes (keyset pagination)
+    ('audit_log_indexes', migrate_audit_log_indexes),
+
+    # Phase 29: Sargable availability-map lookups (room-change day, stay markers)
+    ('room_change_dates', migrate_room_change_dates),
+    ('stay_markers', migrate_stay_markers),
+
+    # Phase 30: Daily insights rollup (occupancy / revenue / cancellations)
+    ('daily_rollup', migrate_daily_rollup),
+
+    # Phase 31: Set-based PMS segment passes (stored booking base)
+    ('hotel_guests_booking_base', migrate_hotel_guests_booking_base),
 ]
 
 
@@ -193,6 +235,10 @@ def run_all_migrations() -> dict:
             results.append((name, False, str(e)))
             print(f"ERROR in migration {name}: {e}")
 
+    # Migrations may alter cached reference tables without bumping generations
+    from utils.cache import invalidate
+    invalidate()
+
     print("=" * 60)
     print(f"Migrations complete: {applied} applied, {skipped} skipped, {failed} failed")
     print("=" * 60)
@@ -218,6 +264,7 @@ __all__ = [
     'migrate_status_history_v2',
     'migrate_hotel_guests_multi_guest',
     'migrate_hotel_guests_booking_reference',
+    'migrate_hotel_guests_booking_base',
     'migrate_customers_language_phone',
     'migrate_customers_extended_stats',
     'migrate_add_sentada_state',
@@ -248,6 +295,7 @@ __all__ = [
     'migrate_zone_number_start',
     'migrate_furniture_label',
     'migrate_import_log_table',
+    'migrate_import_log_timings',
     'migrate_customers_booking_reference',
     'migrate_reservations_booking_reference',
 ]
@@ -0,0 +1,55 @@
+"""
+Audit log indexes migration.
+Composite indexes matching the audit log viewer's filters, each ending in
+created_at so filtered, newest-first pages (keyset pagination) are index
+range scans instead of sorts over the whole table.
+"""
+
+from database.connection import get_db
+
+
+AUDIT_LOG_INDEXES = {
+    'idx_audit_log_created': 'audit_log(created_at)',
+    'idx_audit_log_entity': 'audit_log(entity_type, entity_id, created_at)',
+    'idx_audit_log_entity_type': 'audit_log(entity_type, created_at)',
+    'idx_audit_log_user': 'audit_log(user_id, created_at)',
+    'idx_audit_log_action': 'audit_log(action, created_at)',
+}
+
+
+def migrate_audit_log_indexes() -> bool:
+    """
+    Migration: Create the audit_log filter indexes.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='index' AND tbl_name='audit_log'
+    """)
+    existing = {row['name'] for row in cursor.fetchall()}
+    missing = [name for name in AUDIT_LOG_INDEXES if name not in existing]
+
+    if not missing:
+        print("Migration already applied - audit_log indexes exist.")
+        return False
+
+    print("Applying audit_log_indexes migration...")
+
+    try:
+        for name in missing:
+            db.execute(f'CREATE INDEX IF NOT EXISTS {name} ON {AUDIT_LOG_INDEXES[name]}')
+            print(f"  Created index {name}")
+
+        db.commit()
+        print("Migration audit_log_indexes applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
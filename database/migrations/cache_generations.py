@@ -0,0 +1,178 @@
+"""
+Cache generation migration.
+Per-scope generation counters for the process-wide reference-data cache
+(utils/cache.py). Triggers bump a scope whenever its tables change, so every
+gunicorn worker sees writes made by the others on its next lookup.
+"""
+
+from database.connection import get_db
+
+
+# scope -> [(table, trigger event clause)]
+CACHE_SCOPES = {
+    'zones': [
+        ('beach_zones', 'INSERT'),
+        ('beach_zones', 'UPDATE'),
+        ('beach_zones', 'DELETE'),
+        # get_all_zones() reports furniture_count per zone
+        ('beach_furniture', 'INSERT'),
+        ('beach_furniture', 'DELETE'),
+        ('beach_furniture', 'UPDATE OF zone_id'),
+    ],
+    'furniture_types': [
+        ('beach_furniture_types', 'INSERT'),
+        ('beach_furniture_types', 'UPDATE'),
+        ('beach_furniture_types', 'DELETE'),
+        # get_all_furniture_types() reports active furniture_count per type
+        ('beach_furniture', 'INSERT'),
+        ('beach_furniture', 'DELETE'),
+        ('beach_furniture', 'UPDATE OF furniture_type, active'),
+    ],
+    'furniture_layout': [
+        # Row clustering for the suggestion engine (positions, capacity, zone)
+        ('beach_furniture', 'INSERT'),
+        ('beach_furniture', 'DELETE'),
+        ('beach_furniture', 'UPDATE OF number, zone_id, furniture_type, capacity, '
+                            'position_x, position_y, active'),
+    ],
+    'states': [
+        ('beach_reservation_states', 'INSERT'),
+        ('beach_reservation_states', 'UPDATE'),
+        ('beach_reservation_states', 'DELETE'),
+    ],
+    'characteristics': [
+        ('beach_characteristics', 'INSERT'),
+        ('beach_characteristics', 'UPDATE'),
+        ('beach_characteristics', 'DELETE'),
+        ('beach_furniture_characteristics', 'INSERT'),
+        ('beach_furniture_characteristics', 'UPDATE'),
+        ('beach_furniture_characteristics', 'DELETE'),
+    ],
+    'config': [
+        ('beach_config', 'INSERT'),
+        ('beach_config', 'UPDATE'),
+        ('beach_config', 'DELETE'),
+    ],
+    'users': [
+        # Flask-Login user rows (get_user_by_id joins the role name)
+        ('users', 'INSERT'),
+        ('users', 'UPDATE'),
+        ('users', 'DELETE'),
+        ('roles', 'UPDATE OF name, display_name'),
+        ('roles', 'DELETE'),
+    ],
+    'permissions': [
+        # Per-role permission sets and menus
+        ('permissions', 'INSERT'),
+        ('permissions', 'UPDATE'),
+        ('permissions', 'DELETE'),
+        ('role_permissions', 'INSERT'),
+        ('role_permissions', 'UPDATE'),
+        ('role_permissions', 'DELETE'),
+    ],
+    'pricing': [
+        # Compiled package / minimum consumption decision table
+        ('beach_packages', 'INSERT'),
+        ('beach_packages', 'UPDATE'),
+        ('beach_packages', 'DELETE'),
+        ('beach_minimum_consumption_policies', 'INSERT'),
+        ('beach_minimum_consumption_policies', 'UPDATE'),
+        ('beach_minimum_consumption_policies', 'DELETE'),
+    ],
+}
+
+
+def build_generation_triggers(scopes: dict) -> dict:
+    """
+    Build {trigger_name: CREATE TRIGGER body} for the given scopes.
+
+    Args:
+        scopes: {scope: [(table, event clause), ...]}
+
+    Returns:
+        dict of trigger definitions (without the CREATE TRIGGER prefix)
+    """
+    triggers = {}
+    for scope, sources in scopes.items():
+        for table, event in sources:
+            suffix = event.split()[0].lower()[:3]
+            name = f'trg_cache_gen_{scope}_{table}_{suffix}'
+            triggers[name] = f'''
+                AFTER {event} ON {table} BEGIN
+                    INSERT INTO beach_cache_generations (scope, generation)
+                    VALUES ('{scope}', 1)
+                    ON CONFLICT(scope) DO UPDATE SET generation = generation + 1;
+                END'''
+    return triggers
+
+
+def install_generation_triggers(db, scopes: dict) -> int:
+    """
+    Create the generation triggers for the given scopes that are missing.
+
+    Triggers are dropped together with their table when init_db() recreates
+    the schema, so callers re-run this even when the counter table exists.
+
+    Args:
+        db: Database connection
+        scopes: {scope: [(table, event clause), ...]}
+
+    Returns:
+        Number of triggers created
+    """
+    triggers = build_generation_triggers(scopes)
+    existing = {
+        row['name'] for row in db.execute(
+            "SELECT name FROM sqlite_master WHERE type='trigger' AND name LIKE 'trg_cache_gen_%'"
+        ).fetchall()
+    }
+    created = 0
+    for name, body in triggers.items():
+        if name not in existing:
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {body}')
+            created += 1
+    return created
+
+
+def migrate_cache_generations() -> bool:
+    """
+    Migration: Create beach_cache_generations table and its triggers.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name='beach_cache_generations'
+    """)
+    table_exists = cursor.fetchone() is not None
+
+    try:
+        if not table_exists:
+            print("Applying cache_generations migration...")
+            db.execute('''
+                CREATE TABLE beach_cache_generations (
+                    scope TEXT PRIMARY KEY,
+                    generation INTEGER NOT NULL DEFAULT 0
+                )
+            ''')
+            print("  Created beach_cache_generations table")
+
+        created = install_generation_triggers(db, CACHE_SCOPES)
+
+        if table_exists and not created:
+            print("Migration already applied - beach_cache_generations table and triggers exist.")
+            return False
+
+        print(f"  Created {created} cache generation triggers")
+        db.commit()
+        print("Migration cache_generations applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
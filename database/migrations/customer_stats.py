@@ -0,0 +1,127 @@
+"""
+Customer statistics migration.
+Keeps beach_customers statistics (visits, no-shows, cancellations, totals,
+spend, last visit) up to date incrementally: triggers on beach_reservations
+apply the contribution of each inserted, deleted or updated reservation as a
+delta, so state changes never rescan a customer's history.
+
+The rules match the grouped recompute in models/reservation_state.py.
+"""
+
+from database.connection import get_db
+from database.migrations.state_members import csv_has_state
+
+
+# A reservation's contribution to its customer's statistics
+_VISIT = "COALESCE(" + csv_has_state('{row}.current_states', "'Sentada'") + ", 0)"
+_NO_SHOW = "COALESCE(" + csv_has_state('{row}.current_states', "'No-Show'") + ", 0)"
+_CANCELLED = "COALESCE(" + csv_has_state('{row}.current_states', "'Cancelada'") + ", 0)"
+_ACTIVE = "(NOT " + _NO_SHOW + " AND NOT " + _CANCELLED + ")"
+
+
+def _apply(row: str, sign: str) -> str:
+    """Build the UPDATE adding (+) or removing (-) a reservation's contribution."""
+    if sign == '+':
+        # A newer visit moves last_visit forward
+        last_visit = f'''CASE WHEN {_VISIT.format(row=row)}
+                     AND (last_visit IS NULL OR last_visit < {row}.reservation_date)
+                THEN {row}.reservation_date ELSE last_visit END'''
+    else:
+        # Losing the latest visit: look up the previous one (customer index)
+        last_visit = f'''CASE WHEN {_VISIT.format(row=row)} AND last_visit = {row}.reservation_date
+                THEN (SELECT MAX(r.reservation_date) FROM beach_reservations r
+                      WHERE r.customer_id = {row}.customer_id
+                        AND {csv_has_state('r.current_states', "'Sentada'")})
+                ELSE last_visit END'''
+
+    return f'''
+        UPDATE beach_customers
+        SET total_visits = COALESCE(total_visits, 0) {sign} {_VISIT.format(row=row)},
+            no_shows = COALESCE(no_shows, 0) {sign} {_NO_SHOW.format(row=row)},
+            cancellations = COALESCE(cancellations, 0) {sign} {_CANCELLED.format(row=row)},
+            total_reservations = COALESCE(total_reservations, 0) {sign} {_ACTIVE.format(row=row)},
+            total_spent = ROUND(COALESCE(total_spent, 0) {sign}
+                CASE WHEN {_ACTIVE.format(row=row)} THEN COALESCE({row}.final_price, 0) ELSE 0 END, 2),
+            last_visit = {last_visit}
+        WHERE id = {row}.customer_id;
+    '''
+
+
+def _build_triggers() -> dict:
+    """Return {trigger_name: CREATE TRIGGER statement}."""
+    return {
+        'trg_customer_stats_res_ins': f'''
+            AFTER INSERT ON beach_reservations BEGIN
+                {_apply('NEW', '+')}
+            END''',
+        'trg_customer_stats_res_del': f'''
+            AFTER DELETE ON beach_reservations BEGIN
+                {_apply('OLD', '-')}
+            END''',
+        'trg_customer_stats_res_upd': f'''
+            AFTER UPDATE OF current_states, final_price, reservation_date, customer_id
+            ON beach_reservations
+            WHEN OLD.current_states IS NOT NEW.current_states
+              OR OLD.final_price IS NOT NEW.final_price
+              OR OLD.reservation_date IS NOT NEW.reservation_date
+              OR OLD.customer_id IS NOT NEW.customer_id
+            BEGIN
+                {_apply('OLD', '-')}
+                {_apply('NEW', '+')}
+            END''',
+    }
+
+
+def migrate_customer_stats_triggers() -> bool:
+    """
+    Migration: Create the incremental customer statistics triggers.
+
+    Whenever triggers are (re)created, statistics are rebuilt once so the
+    deltas start from exact values. Triggers are dropped with their table when
+    init_db() recreates the schema, so they are checked on every run.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    triggers = _build_triggers()
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='trigger' AND name LIKE 'trg_customer_stats_%'
+    """)
+    existing_triggers = {row['name'] for row in cursor.fetchall()}
+    missing_triggers = [name for name in triggers if name not in existing_triggers]
+
+    if not missing_triggers:
+        print("Migration already applied - customer statistics triggers exist.")
+        return False
+
+    print("Applying customer_stats_triggers migration...")
+
+    try:
+        db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_reservations_customer_date
+            ON beach_reservations(customer_id, reservation_date)
+        ''')
+        print("  Created index on customer_id + reservation_date")
+
+        for name in missing_triggers:
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {triggers[name]}')
+        print(f"  Created {len(missing_triggers)} customer statistics triggers")
+
+        # Baseline for the deltas (same rules, one grouped pass)
+        from models.reservation_state import recompute_all_customer_statistics
+        updated = recompute_all_customer_statistics(conn=db)
+        print(f"  Recomputed statistics for {updated} customers")
+
+        db.commit()
+        print("Migration customer_stats_triggers applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
@@ -0,0 +1,195 @@
+"""
+Daily rollup migration.
+Materialised per-day insights aggregates (beach_daily_rollup) per
+zone x furniture type x customer type: occupied units, reservations,
+people, revenue, cancellations and no-shows, so season-wide insights read a
+few rows per day instead of joining every reservation.
+
+Triggers queue the days touched by reservation, assignment, customer-type,
+furniture and state-definition writes in beach_daily_rollup_dirty;
+models/insights/rollup.py recomputes queued days once they are in the past.
+"""
+
+from database.connection import get_db
+
+
+def _queue_days(select: str) -> str:
+    """Statement queueing the days returned by a SELECT."""
+    return f'INSERT OR IGNORE INTO beach_daily_rollup_dirty (day) {select};'
+
+
+def _queue_reservation(row: str) -> str:
+    """Statements queueing a reservation's start day and assignment days."""
+    return '\n'.join([
+        _queue_days(f'SELECT {row}.start_date WHERE {row}.start_date IS NOT NULL'),
+        _queue_days(f'SELECT assignment_date FROM beach_reservation_furniture '
+                    f'WHERE reservation_id = {row}.id'),
+    ])
+
+
+def _queue_assignment(row: str) -> str:
+    """Statements queueing an assignment day and its reservation's start day."""
+    return '\n'.join([
+        _queue_days(f'SELECT {row}.assignment_date'),
+        _queue_days(f'SELECT start_date FROM beach_reservations '
+                    f'WHERE id = {row}.reservation_id AND start_date IS NOT NULL'),
+    ])
+
+
+def _queue_reservations_where(condition: str) -> str:
+    """Statements queueing every day of the reservations matching a condition."""
+    return '\n'.join([
+        _queue_days(f'SELECT DISTINCT r.start_date FROM beach_reservations r '
+                    f'WHERE {condition} AND r.start_date IS NOT NULL'),
+        _queue_days(f'SELECT DISTINCT rf.assignment_date FROM beach_reservation_furniture rf '
+                    f'JOIN beach_reservations r ON r.id = rf.reservation_id WHERE {condition}'),
+    ])
+
+
+_RESERVATION_COLUMNS = ('start_date', 'customer_id', 'current_state', 'num_people',
+                        'final_price', 'created_at')
+
+_TRIGGERS = {
+    'trg_daily_rollup_res_ins': f'''
+        AFTER INSERT ON beach_reservations BEGIN
+            {_queue_reservation('NEW')}
+        END''',
+    # BEFORE: the assignments are still there (cascade removes them afterwards)
+    'trg_daily_rollup_res_del': f'''
+        BEFORE DELETE ON beach_reservations BEGIN
+            {_queue_reservation('OLD')}
+        END''',
+    'trg_daily_rollup_res_upd': f'''
+        AFTER UPDATE OF {', '.join(_RESERVATION_COLUMNS)} ON beach_reservations
+        WHEN {' OR '.join(f'OLD.{c} IS NOT NEW.{c}' for c in _RESERVATION_COLUMNS)}
+        BEGIN
+            {_queue_days('SELECT OLD.start_date WHERE OLD.start_date IS NOT NULL')}
+            {_queue_reservation('NEW')}
+        END''',
+    'trg_daily_rollup_rf_ins': f'''
+        AFTER INSERT ON beach_reservation_furniture BEGIN
+            {_queue_assignment('NEW')}
+        END''',
+    'trg_daily_rollup_rf_del': f'''
+        AFTER DELETE ON beach_reservation_furniture BEGIN
+            {_queue_assignment('OLD')}
+        END''',
+    'trg_daily_rollup_rf_upd': f'''
+        AFTER UPDATE OF reservation_id, furniture_id, assignment_date
+        ON beach_reservation_furniture BEGIN
+            {_queue_assignment('OLD')}
+            {_queue_assignment('NEW')}
+        END''',
+    'trg_daily_rollup_customer_type': f'''
+        AFTER UPDATE OF customer_type ON beach_customers
+        WHEN OLD.customer_type IS NOT NEW.customer_type
+        BEGIN
+            {_queue_reservations_where('r.customer_id = NEW.id')}
+        END''',
+    'trg_daily_rollup_furniture': f'''
+        AFTER UPDATE OF zone_id, furniture_type ON beach_furniture
+        WHEN OLD.zone_id IS NOT NEW.zone_id OR OLD.furniture_type IS NOT NEW.furniture_type
+        BEGIN
+            {_queue_days('SELECT DISTINCT assignment_date FROM beach_reservation_furniture '
+                         'WHERE furniture_id = NEW.id')}
+            {_queue_days('SELECT DISTINCT r.start_date FROM beach_reservations r '
+                         'JOIN beach_reservation_furniture rf ON rf.reservation_id = r.id '
+                         'WHERE rf.furniture_id = NEW.id AND rf.assignment_date = r.start_date')}
+        END''',
+    'trg_daily_rollup_state': f'''
+        AFTER UPDATE OF name, code, is_availability_releasing ON beach_reservation_states
+        WHEN OLD.name IS NOT NEW.name OR OLD.code IS NOT NEW.code
+          OR OLD.is_availability_releasing IS NOT NEW.is_availability_releasing
+        BEGIN
+            {_queue_reservations_where('r.current_state IN (OLD.name, NEW.name)')}
+        END''',
+}
+
+
+def migrate_daily_rollup() -> bool:
+    """
+    Migration: Create beach_daily_rollup, its change queue and the queueing
+    triggers. Every reservation day is queued, so the first refresh (or the
+    rebuild-daily-rollup command) backfills the history.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name IN ('beach_daily_rollup', 'beach_daily_rollup_dirty')
+    """)
+    existing_tables = {row['name'] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='trigger' AND name LIKE 'trg_daily_rollup_%'
+    """)
+    existing_triggers = {row['name'] for row in cursor.fetchall()}
+    missing_triggers = [name for name in _TRIGGERS if name not in existing_triggers]
+
+    if len(existing_tables) == 2 and not missing_triggers:
+        print("Migration already applied - daily rollup tables and triggers exist.")
+        return False
+
+    print("Applying daily_rollup migration...")
+
+    try:
+        if 'beach_daily_rollup' not in existing_tables:
+            # Occupancy measures are counted on assignment days; reservation
+            # measures on the reservation's start day, under the zone/type of
+            # its first piece of furniture (0 / '' when unknown).
+            db.execute('''
+                CREATE TABLE beach_daily_rollup (
+                    day DATE NOT NULL,
+                    zone_id INTEGER NOT NULL DEFAULT 0,
+                    furniture_type TEXT NOT NULL DEFAULT '',
+                    customer_type TEXT NOT NULL DEFAULT '',
+                    occupied_units INTEGER NOT NULL DEFAULT 0,
+                    reservations INTEGER NOT NULL DEFAULT 0,
+                    all_reservations INTEGER NOT NULL DEFAULT 0,
+                    paid_reservations INTEGER NOT NULL DEFAULT 0,
+                    people INTEGER NOT NULL DEFAULT 0,
+                    revenue REAL NOT NULL DEFAULT 0,
+                    cancellations INTEGER NOT NULL DEFAULT 0,
+                    noshows INTEGER NOT NULL DEFAULT 0,
+                    lead_time_days REAL NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, zone_id, furniture_type, customer_type)
+                ) WITHOUT ROWID
+            ''')
+            print("  Created beach_daily_rollup table")
+
+        if 'beach_daily_rollup_dirty' not in existing_tables:
+            db.execute('''
+                CREATE TABLE beach_daily_rollup_dirty (
+                    day DATE PRIMARY KEY
+                ) WITHOUT ROWID
+            ''')
+            print("  Created beach_daily_rollup_dirty table")
+
+        for name in missing_triggers:
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {_TRIGGERS[name]}')
+        print(f"  Created {len(missing_triggers)} daily rollup triggers")
+
+        # Start over from every reservation day: writes made while triggers
+        # were missing (e.g. after init-db recreated the tables) get rolled up
+        db.execute('DELETE FROM beach_daily_rollup')
+        db.execute('DELETE FROM beach_daily_rollup_dirty')
+        db.execute('''
+            INSERT OR IGNORE INTO beach_daily_rollup_dirty (day)
+            SELECT start_date FROM beach_reservations WHERE start_date IS NOT NULL
+            UNION SELECT assignment_date FROM beach_reservation_furniture
+        ''')
+        print("  Cleared rollup and queued all reservation days")
+
+        db.commit()
+        print("Migration daily_rollup applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
@@ -116,3 +116,71 @@ def migrate_hotel_guests_booking_reference() -> bool:
         db.rollback()
         print(f"Migration failed: {e}")
         raise
+
+
+# SQL twin of models.hotel_guest.booking_base(): strip a trailing '-<digits>'
+# segment suffix ('2026-4142-2' -> '2026-4142'), otherwise keep the reference.
+BOOKING_BASE_SQL = (
+    "CASE WHEN substr(rtrim(booking_reference, '0123456789'), -1) = '-' "
+    "AND rtrim(booking_reference, '0123456789') != booking_reference "
+    "THEN substr(booking_reference, 1, length(rtrim(booking_reference, '0123456789')) - 1) "
+    "ELSE booking_reference END"
+)
+
+
+def migrate_hotel_guests_booking_base() -> bool:
+    """
+    Migration: Add the derived booking_base column (booking reference without
+    its PMS segment suffix) to hotel_guests, and index it together with
+    booking_reference, so the post-import segment passes load whole bookings
+    by index instead of LIKE scans per reservation.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute('PRAGMA table_xinfo(hotel_guests)')
+    columns = {row['name'] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='index' AND name IN ('idx_hotel_guests_booking_base',
+                                        'idx_hotel_guests_booking_ref')
+    """)
+    existing_indexes = {row['name'] for row in cursor.fetchall()}
+
+    if 'booking_base' in columns and len(existing_indexes) == 2:
+        print("Migration already applied - hotel_guests.booking_base exists.")
+        return False
+
+    print("Applying hotel_guests_booking_base migration...")
+
+    try:
+        if 'booking_base' not in columns:
+            # Virtual generated column: always in step with booking_reference
+            db.execute(f'''
+                ALTER TABLE hotel_guests
+                ADD COLUMN booking_base TEXT GENERATED ALWAYS AS ({BOOKING_BASE_SQL}) VIRTUAL
+            ''')
+            print("  Added booking_base column")
+
+        db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_hotel_guests_booking_base
+            ON hotel_guests(booking_base)
+        ''')
+        db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_hotel_guests_booking_ref
+            ON hotel_guests(booking_reference)
+        ''')
+        print("  Created booking_base and booking_reference indexes")
+
+        db.commit()
+        print("Migration hotel_guests_booking_base applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
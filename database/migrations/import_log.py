@@ -58,3 +58,36 @@ def migrate_import_log_table() -> bool:
         db.rollback()
         print(f"Migration failed: {e}")
         raise
+
+
+def migrate_import_log_timings() -> bool:
+    """
+    Migration: Add timings_json column to beach_import_log (per-phase durations).
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute("PRAGMA table_info(beach_import_log)")
+    existing_columns = [row['name'] for row in cursor.fetchall()]
+
+    if 'timings_json' in existing_columns:
+        print("Migration already applied - timings_json column exists.")
+        return False
+
+    print("Applying import_log_timings migration...")
+
+    try:
+        db.execute('ALTER TABLE beach_import_log ADD COLUMN timings_json TEXT')
+        print("  Added timings_json column")
+
+        db.commit()
+        print("Migration import_log_timings applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
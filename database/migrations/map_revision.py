@@ -0,0 +1,280 @@
+"""
+Map revision migration.
+Change log that versions the beach map per date, so polling tablets can skip
+unchanged payloads (ETag) or fetch only the furniture that changed (?since=).
+
+The log is fed by triggers, so every write path (models, raw-SQL routes,
+import scripts) bumps the revision without having to remember to.
+"""
+
+from database.connection import get_db
+
+
+# Sentinel bounds for changes that affect every date (layout/config edits)
+MAP_DATE_MIN = '0000-01-01'
+MAP_DATE_MAX = '9999-12-31'
+
+# Date range covered by a furniture row: temporary furniture only exists on
+# its own dates, permanent furniture appears on every date.
+_FURNITURE_FROM = (
+    "CASE WHEN {row}.is_temporary = 1 "
+    "THEN COALESCE({row}.temp_start_date, {row}.valid_date, '" + MAP_DATE_MIN + "') "
+    "ELSE '" + MAP_DATE_MIN + "' END"
+)
+_FURNITURE_TO = (
+    "CASE WHEN {row}.is_temporary = 1 "
+    "THEN COALESCE({row}.temp_end_date, {row}.valid_date, '" + MAP_DATE_MAX + "') "
+    "ELSE '" + MAP_DATE_MAX + "' END"
+)
+
+
+def _log(furniture_id: str, date_from: str, date_to: str, source: str) -> str:
+    """Build the INSERT statement a trigger uses to record one change."""
+    return (
+        'INSERT INTO beach_map_changes (furniture_id, date_from, date_to, source) '
+        f"VALUES ({furniture_id}, {date_from}, {date_to}, '{source}');"
+    )
+
+
+def _full_map(source: str) -> str:
+    """Change that invalidates the whole map on every date."""
+    return _log('NULL', f"'{MAP_DATE_MIN}'", f"'{MAP_DATE_MAX}'", source)
+
+
+def _reservation_furniture(where: str, source: str) -> str:
+    """Change rows for every furniture/date a reservation (or customer) holds."""
+    return f'''
+        INSERT INTO beach_map_changes (furniture_id, date_from, date_to, source)
+        SELECT rf.furniture_id, rf.assignment_date, rf.assignment_date, '{source}'
+        FROM beach_reservation_furniture rf
+        JOIN beach_reservations r ON rf.reservation_id = r.id
+        WHERE {where};
+    '''
+
+
+def _guest_dates(row: str) -> str:
+    """Arrival/departure days of a hotel guest (check-in/out markers)."""
+    return f'''
+        INSERT INTO beach_map_changes (furniture_id, date_from, date_to, source)
+        SELECT NULL, d, d, 'hotel_guest'
+        FROM (SELECT {row}.arrival_date AS d UNION SELECT {row}.departure_date)
+        WHERE d IS NOT NULL;
+    '''
+
+
+def _build_triggers() -> dict:
+    """Return {trigger_name: CREATE TRIGGER statement}."""
+    triggers = {
+        # Furniture assignments (create, move, date change, delete)
+        'trg_map_rev_res_furniture_ins': f'''
+            AFTER INSERT ON beach_reservation_furniture BEGIN
+                {_log('NEW.furniture_id', 'NEW.assignment_date', 'NEW.assignment_date', 'reservation')}
+            END''',
+        'trg_map_rev_res_furniture_del': f'''
+            AFTER DELETE ON beach_reservation_furniture BEGIN
+                {_log('OLD.furniture_id', 'OLD.assignment_date', 'OLD.assignment_date', 'reservation')}
+            END''',
+        'trg_map_rev_res_furniture_upd': f'''
+            AFTER UPDATE ON beach_reservation_furniture BEGIN
+                {_log('OLD.furniture_id', 'OLD.assignment_date', 'OLD.assignment_date', 'reservation')}
+                {_log('NEW.furniture_id', 'NEW.assignment_date', 'NEW.assignment_date', 'reservation')}
+            END''',
+
+        # Reservation fields rendered on the map (state, party size, notes...)
+        'trg_map_rev_reservation_upd': f'''
+            AFTER UPDATE OF current_state, current_states, num_people, notes,
+                            customer_id, ticket_number, is_furniture_locked,
+                            booking_reference
+            ON beach_reservations BEGIN
+                {_reservation_furniture('r.id = NEW.id', 'state')}
+            END''',
+
+        # Customer fields shown in the furniture label/tooltip
+        'trg_map_rev_customer_upd': f'''
+            AFTER UPDATE OF first_name, last_name, room_number, customer_type,
+                            vip_status, booking_reference
+            ON beach_customers
+            WHEN OLD.first_name IS NOT NEW.first_name
+              OR OLD.last_name IS NOT NEW.last_name
+              OR OLD.room_number IS NOT NEW.room_number
+              OR OLD.customer_type IS NOT NEW.customer_type
+              OR OLD.vip_status IS NOT NEW.vip_status
+              OR OLD.booking_reference IS NOT NEW.booking_reference
+            BEGIN
+                {_reservation_furniture(
+                    "r.customer_id = NEW.id AND rf.assignment_date >= date('now', '-1 day')",
+                    'customer'
+                )}
+            END''',
+
+        # Room-change badge
+        'trg_map_rev_room_change_ins': f'''
+            AFTER INSERT ON beach_room_changes BEGIN
+                {_reservation_furniture(
+                    'r.customer_id = NEW.customer_id '
+                    'AND rf.assignment_date = date(NEW.changed_at)',
+                    'room_change'
+                )}
+            END''',
+
+        # Check-in / check-out markers
+        'trg_map_rev_hotel_guest_ins': f'''
+            AFTER INSERT ON hotel_guests BEGIN
+                {_guest_dates('NEW')}
+            END''',
+        'trg_map_rev_hotel_guest_del': f'''
+            AFTER DELETE ON hotel_guests BEGIN
+                {_guest_dates('OLD')}
+            END''',
+        'trg_map_rev_hotel_guest_upd': f'''
+            AFTER UPDATE OF arrival_date, departure_date, booking_reference, room_number
+            ON hotel_guests
+            WHEN OLD.arrival_date IS NOT NEW.arrival_date
+              OR OLD.departure_date IS NOT NEW.departure_date
+              OR OLD.booking_reference IS NOT NEW.booking_reference
+              OR OLD.room_number IS NOT NEW.room_number
+            BEGIN
+                {_guest_dates('OLD')}
+                {_guest_dates('NEW')}
+            END''',
+
+        # Furniture blocks
+        'trg_map_rev_block_ins': f'''
+            AFTER INSERT ON beach_furniture_blocks BEGIN
+                {_log('NEW.furniture_id', 'NEW.start_date', 'NEW.end_date', 'block')}
+            END''',
+        'trg_map_rev_block_del': f'''
+            AFTER DELETE ON beach_furniture_blocks BEGIN
+                {_log('OLD.furniture_id', 'OLD.start_date', 'OLD.end_date', 'block')}
+            END''',
+        'trg_map_rev_block_upd': f'''
+            AFTER UPDATE ON beach_furniture_blocks BEGIN
+                {_log('OLD.furniture_id', 'OLD.start_date', 'OLD.end_date', 'block')}
+                {_log('NEW.furniture_id', 'NEW.start_date', 'NEW.end_date', 'block')}
+            END''',
+
+        # Daily positions
+        'trg_map_rev_daily_pos_ins': f'''
+            AFTER INSERT ON beach_furniture_daily_positions BEGIN
+                {_log('NEW.furniture_id', 'NEW.date', 'NEW.date', 'daily_position')}
+            END''',
+        'trg_map_rev_daily_pos_del': f'''
+            AFTER DELETE ON beach_furniture_daily_positions BEGIN
+                {_log('OLD.furniture_id', 'OLD.date', 'OLD.date', 'daily_position')}
+            END''',
+        'trg_map_rev_daily_pos_upd': f'''
+            AFTER UPDATE ON beach_furniture_daily_positions BEGIN
+                {_log('NEW.furniture_id', 'NEW.date', 'NEW.date', 'daily_position')}
+            END''',
+
+        # Furniture (map editor, temporary furniture)
+        'trg_map_rev_furniture_ins': f'''
+            AFTER INSERT ON beach_furniture BEGIN
+                {_log('NEW.id', _FURNITURE_FROM.format(row='NEW'),
+                      _FURNITURE_TO.format(row='NEW'), 'furniture')}
+            END''',
+        'trg_map_rev_furniture_del': f'''
+            AFTER DELETE ON beach_furniture BEGIN
+                {_log('OLD.id', _FURNITURE_FROM.format(row='OLD'),
+                      _FURNITURE_TO.format(row='OLD'), 'furniture')}
+            END''',
+        'trg_map_rev_furniture_upd': f'''
+            AFTER UPDATE ON beach_furniture BEGIN
+                {_log('OLD.id', _FURNITURE_FROM.format(row='OLD'),
+                      _FURNITURE_TO.format(row='OLD'), 'furniture')}
+                {_log('NEW.id', _FURNITURE_FROM.format(row='NEW'),
+                      _FURNITURE_TO.format(row='NEW'), 'furniture')}
+            END''',
+
+        # Map configuration values
+        'trg_map_rev_config_ins': f'''
+            AFTER INSERT ON beach_config WHEN NEW.key LIKE 'map_%' BEGIN
+                {_full_map('config')}
+            END''',
+        'trg_map_rev_config_upd': f'''
+            AFTER UPDATE ON beach_config WHEN NEW.key LIKE 'map_%' BEGIN
+                {_full_map('config')}
+            END''',
+    }
+
+    # Reference tables rendered on every date: any change reloads the map
+    for table, source in (
+        ('beach_zones', 'zone'),
+        ('beach_furniture_types', 'furniture_type'),
+        ('beach_reservation_states', 'state'),
+    ):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            triggers[f'trg_map_rev_{source}_{event.lower()[:3]}'] = f'''
+                AFTER {event} ON {table} BEGIN
+                    {_full_map(source)}
+                END'''
+
+    return triggers
+
+
+def migrate_map_revision() -> bool:
+    """
+    Migration: Create beach_map_changes table and its feeding triggers.
+
+    Triggers are dropped together with their table when init_db() recreates
+    the schema, so they are checked (and recreated) independently.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    triggers = _build_triggers()
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name='beach_map_changes'
+    """)
+    table_exists = cursor.fetchone() is not None
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='trigger' AND name LIKE 'trg_map_rev_%'
+    """)
+    existing_triggers = {row['name'] for row in cursor.fetchall()}
+    missing_triggers = [name for name in triggers if name not in existing_triggers]
+
+    if table_exists and not missing_triggers:
+        print("Migration already applied - beach_map_changes table and triggers exist.")
+        return False
+
+    print("Applying map_revision migration...")
+
+    try:
+        if not table_exists:
+            db.execute('''
+                CREATE TABLE beach_map_changes (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    furniture_id INTEGER,
+                    date_from TEXT NOT NULL,
+                    date_to TEXT NOT NULL,
+                    source TEXT,
+                    changed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            ''')
+            print("  Created beach_map_changes table")
+
+            db.execute('''
+                CREATE INDEX idx_map_changes_range
+                ON beach_map_changes(date_to, date_from)
+            ''')
+            print("  Created index on date_to + date_from")
+
+        for name in missing_triggers:
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {triggers[name]}')
+        print(f"  Created {len(missing_triggers)} map revision triggers")
+
+        db.commit()
+        print("Migration map_revision applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
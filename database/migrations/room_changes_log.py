@@ -55,3 +55,58 @@ def migrate_room_changes_table() -> bool:
         db.rollback()
         print(f"Migration failed: {e}")
         raise
+
+
+def migrate_room_change_dates() -> bool:
+    """
+    Migration: Add the derived change_date column (date(changed_at)) to
+    beach_room_changes and index it per customer, so per-day room-change
+    lookups are index range scans instead of date() over every row.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute('PRAGMA table_xinfo(beach_room_changes)')
+    columns = {row['name'] for row in cursor.fetchall()}
+    if not columns:
+        print("Skipping room_change_dates migration - beach_room_changes table missing.")
+        return False
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='index' AND name='idx_room_changes_customer_day'
+    """)
+    index_exists = cursor.fetchone() is not None
+
+    if 'change_date' in columns and index_exists:
+        print("Migration already applied - beach_room_changes.change_date exists.")
+        return False
+
+    print("Applying room_change_dates migration...")
+
+    try:
+        if 'change_date' not in columns:
+            # Virtual generated column: always in step with changed_at, whoever writes it
+            db.execute('''
+                ALTER TABLE beach_room_changes
+                ADD COLUMN change_date DATE GENERATED ALWAYS AS (date(changed_at)) VIRTUAL
+            ''')
+            print("  Added change_date column")
+
+        db.execute('''
+            CREATE INDEX IF NOT EXISTS idx_room_changes_customer_day
+            ON beach_room_changes(customer_id, change_date)
+        ''')
+        print("  Created index on customer_id + change_date")
+
+        db.commit()
+        print("Migration room_change_dates applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
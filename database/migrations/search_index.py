@@ -0,0 +1,126 @@
+"""
+Search index migration.
+Trigram FTS5 indexes over beach_customers and hotel_guests holding
+pre-normalised (accent-folded, lower-case) name, phone, room, email and
+booking-reference text, for search-as-you-type without table scans.
+
+Folding happens in Python (models/search_index.py), so triggers only queue
+changed rows in beach_search_dirty; the customer/guest write paths and guest
+imports apply the queue, and searches pick up leftovers only when the write
+lock is free. Every write path is covered without SQL functions having to
+exist on the writing connection.
+"""
+
+from database.connection import get_db
+
+
+# Indexed source tables: {kind: (table, FTS table, columns that feed the document)}
+SEARCH_SOURCES = {
+    'customer': ('beach_customers', 'beach_customers_fts',
+                 ('first_name', 'last_name', 'email', 'phone', 'room_number', 'booking_reference')),
+    'hotel_guest': ('hotel_guests', 'hotel_guests_fts',
+                    ('guest_name', 'email', 'phone', 'room_number', 'booking_reference')),
+}
+
+
+def _queue(kind: str, row: str) -> str:
+    """Statement queueing one source row for re-indexing."""
+    return (
+        'INSERT OR IGNORE INTO beach_search_dirty (kind, ref_id) '
+        f"VALUES ('{kind}', {row}.id);"
+    )
+
+
+def _build_triggers() -> dict:
+    """Return {trigger_name: CREATE TRIGGER statement}."""
+    triggers = {}
+    for kind, (table, _fts, columns) in SEARCH_SOURCES.items():
+        changed = '\n              OR '.join(f'OLD.{c} IS NOT NEW.{c}' for c in columns)
+        triggers[f'trg_search_{kind}_ins'] = f'''
+            AFTER INSERT ON {table} BEGIN
+                {_queue(kind, 'NEW')}
+            END'''
+        triggers[f'trg_search_{kind}_del'] = f'''
+            AFTER DELETE ON {table} BEGIN
+                {_queue(kind, 'OLD')}
+            END'''
+        triggers[f'trg_search_{kind}_upd'] = f'''
+            AFTER UPDATE OF {', '.join(columns)} ON {table}
+            WHEN {changed}
+            BEGIN
+                {_queue(kind, 'NEW')}
+            END'''
+    return triggers
+
+
+def migrate_search_index() -> bool:
+    """
+    Migration: Create the customer/guest FTS5 search indexes, the change queue
+    and its triggers. Every existing row is queued, so the first search (or
+    models.search_index.refresh_search_index()) builds the index.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    triggers = _build_triggers()
+    tables = ['beach_search_dirty'] + [fts for _t, fts, _c in SEARCH_SOURCES.values()]
+
+    cursor.execute(f"""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name IN ({','.join('?' for _ in tables)})
+    """, tables)
+    existing_tables = {row['name'] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='trigger' AND name LIKE 'trg_search_%'
+    """)
+    existing_triggers = {row['name'] for row in cursor.fetchall()}
+    missing_triggers = [name for name in triggers if name not in existing_triggers]
+
+    if existing_tables == set(tables) and not missing_triggers:
+        print("Migration already applied - search index tables and triggers exist.")
+        return False
+
+    print("Applying search_index migration...")
+
+    try:
+        if 'beach_search_dirty' not in existing_tables:
+            db.execute('''
+                CREATE TABLE beach_search_dirty (
+                    kind TEXT NOT NULL,
+                    ref_id INTEGER NOT NULL,
+                    PRIMARY KEY (kind, ref_id)
+                ) WITHOUT ROWID
+            ''')
+            print("  Created beach_search_dirty table")
+
+        for kind, (table, fts, _columns) in SEARCH_SOURCES.items():
+            if fts not in existing_tables:
+                # rowid = source row id; doc = folded searchable text
+                db.execute(f"CREATE VIRTUAL TABLE {fts} USING fts5(doc, tokenize='trigram')")
+                print(f"  Created {fts} index")
+
+        for name in missing_triggers:
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {triggers[name]}')
+        print(f"  Created {len(missing_triggers)} search index triggers")
+
+        # Queue everything: rows written while triggers were missing get re-indexed
+        for kind, (table, _fts, _columns) in SEARCH_SOURCES.items():
+            db.execute(f'''
+                INSERT OR IGNORE INTO beach_search_dirty (kind, ref_id)
+                SELECT '{kind}', id FROM {table}
+            ''')
+        print("  Queued all customers and hotel guests for indexing")
+
+        db.commit()
+        print("Migration search_index applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
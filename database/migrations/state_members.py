@@ -0,0 +1,126 @@
+"""
+Reservation state membership migration.
+Normalises the current_states CSV into beach_reservation_state_members
+(one row per reservation and state), so "reservations that are/were in state
+X" filters become index seeks instead of LIKE scans over the CSV.
+
+The table is fed by triggers on beach_reservations.current_states, so every
+write path (state functions, multi-day cancellation, raw-SQL routes) keeps it
+in sync.
+"""
+
+from database.connection import get_db
+
+
+def csv_has_state(csv_expr: str, name_expr: str) -> str:
+    """
+    SQL condition: state name_expr is one of the entries in the CSV csv_expr.
+
+    Exact, case-sensitive entry match (CSV entries are joined with ', ').
+    Evaluates to NULL when the CSV is NULL.
+    """
+    return (
+        f"instr(',' || REPLACE(REPLACE({csv_expr}, ', ', ','), ' ,', ',') || ',', "
+        f"',' || {name_expr} || ',') > 0"
+    )
+
+
+def _members_from(row: str) -> str:
+    """INSERT the membership rows of one reservation from its CSV."""
+    return f'''
+        INSERT OR IGNORE INTO beach_reservation_state_members (reservation_id, state_id)
+        SELECT {row}.id, s.id FROM beach_reservation_states s
+        WHERE {csv_has_state(f'{row}.current_states', 's.name')};
+    '''
+
+
+def _build_triggers() -> dict:
+    """Return {trigger_name: CREATE TRIGGER statement}."""
+    return {
+        'trg_state_members_res_ins': f'''
+            AFTER INSERT ON beach_reservations BEGIN
+                {_members_from('NEW')}
+            END''',
+        'trg_state_members_res_upd': f'''
+            AFTER UPDATE OF current_states ON beach_reservations
+            WHEN OLD.current_states IS NOT NEW.current_states
+            BEGIN
+                DELETE FROM beach_reservation_state_members WHERE reservation_id = NEW.id;
+                {_members_from('NEW')}
+            END''',
+    }
+
+
+def migrate_reservation_state_members() -> bool:
+    """
+    Migration: Create beach_reservation_state_members, backfill it and
+    install its feeding triggers.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    triggers = _build_triggers()
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name='beach_reservation_state_members'
+    """)
+    table_exists = cursor.fetchone() is not None
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='trigger' AND name LIKE 'trg_state_members_%'
+    """)
+    existing_triggers = {row['name'] for row in cursor.fetchall()}
+    missing_triggers = [name for name in triggers if name not in existing_triggers]
+
+    if table_exists and not missing_triggers:
+        print("Migration already applied - beach_reservation_state_members table and triggers exist.")
+        return False
+
+    print("Applying reservation_state_members migration...")
+
+    try:
+        if not table_exists:
+            db.execute('''
+                CREATE TABLE beach_reservation_state_members (
+                    reservation_id INTEGER NOT NULL
+                        REFERENCES beach_reservations(id) ON DELETE CASCADE,
+                    state_id INTEGER NOT NULL
+                        REFERENCES beach_reservation_states(id) ON DELETE CASCADE,
+                    PRIMARY KEY (reservation_id, state_id)
+                ) WITHOUT ROWID
+            ''')
+            print("  Created beach_reservation_state_members table")
+
+            db.execute('''
+                CREATE INDEX idx_state_members_state
+                ON beach_reservation_state_members(state_id, reservation_id)
+            ''')
+            print("  Created index on state_id + reservation_id")
+
+        for name in missing_triggers:
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {triggers[name]}')
+        print(f"  Created {len(missing_triggers)} state membership triggers")
+
+        # (Re)build from the CSV: also repairs rows written without the triggers
+        db.execute('DELETE FROM beach_reservation_state_members')
+        db.execute(f'''
+            INSERT OR IGNORE INTO beach_reservation_state_members (reservation_id, state_id)
+            SELECT r.id, s.id
+            FROM beach_reservations r
+            JOIN beach_reservation_states s ON {csv_has_state('r.current_states', 's.name')}
+        ''')
+        print("  Backfilled state membership from current_states")
+
+        db.commit()
+        print("Migration reservation_state_members applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
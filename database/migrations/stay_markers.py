@@ -0,0 +1,120 @@
+"""
+Stay markers migration.
+Per-day hotel check-in / check-out flags (beach_stay_markers), keyed by
+booking reference and by room, so the availability map joins one row per
+occupied sunbed instead of re-reading guest stays on every poll.
+
+Triggers on hotel_guests queue the affected days in beach_stay_markers_dirty;
+models/stay_markers.py rebuilds those days after each PMS import and guest
+edit (and on a map read if anything is still queued and the write lock is
+free). Rebuilding per day once per import keeps bulk guest writes cheap.
+"""
+
+from database.connection import get_db
+
+
+def _queue(row: str) -> str:
+    """Statement queueing a guest row's arrival and departure days."""
+    return (
+        'INSERT OR IGNORE INTO beach_stay_markers_dirty (marker_date) '
+        f'SELECT {row}.arrival_date WHERE {row}.arrival_date IS NOT NULL '
+        f'UNION SELECT {row}.departure_date WHERE {row}.departure_date IS NOT NULL;'
+    )
+
+
+_TRIGGERS = {
+    'trg_stay_markers_guest_ins': f'''
+        AFTER INSERT ON hotel_guests BEGIN
+            {_queue('NEW')}
+        END''',
+    'trg_stay_markers_guest_del': f'''
+        AFTER DELETE ON hotel_guests BEGIN
+            {_queue('OLD')}
+        END''',
+    'trg_stay_markers_guest_upd': f'''
+        AFTER UPDATE OF arrival_date, departure_date, booking_reference, room_number
+        ON hotel_guests
+        WHEN OLD.arrival_date IS NOT NEW.arrival_date
+          OR OLD.departure_date IS NOT NEW.departure_date
+          OR OLD.booking_reference IS NOT NEW.booking_reference
+          OR OLD.room_number IS NOT NEW.room_number
+        BEGIN
+            {_queue('OLD')}
+            {_queue('NEW')}
+        END''',
+}
+
+
+def migrate_stay_markers() -> bool:
+    """
+    Migration: Create beach_stay_markers, its change queue and the queueing
+    triggers. Every guest stay day is queued, so the first refresh builds it.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name IN ('beach_stay_markers', 'beach_stay_markers_dirty')
+    """)
+    existing_tables = {row['name'] for row in cursor.fetchall()}
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='trigger' AND name LIKE 'trg_stay_markers_%'
+    """)
+    existing_triggers = {row['name'] for row in cursor.fetchall()}
+    missing_triggers = [name for name in _TRIGGERS if name not in existing_triggers]
+
+    if len(existing_tables) == 2 and not missing_triggers:
+        print("Migration already applied - stay marker tables and triggers exist.")
+        return False
+
+    print("Applying stay_markers migration...")
+
+    try:
+        if 'beach_stay_markers' not in existing_tables:
+            # key_kind 'ref' = booking_reference, 'room' = room_number;
+            # flags: 1 = check-in that day, 2 = check-out that day
+            db.execute('''
+                CREATE TABLE beach_stay_markers (
+                    marker_date DATE NOT NULL,
+                    key_kind TEXT NOT NULL,
+                    match_key TEXT NOT NULL,
+                    flags INTEGER NOT NULL,
+                    PRIMARY KEY (marker_date, key_kind, match_key)
+                ) WITHOUT ROWID
+            ''')
+            print("  Created beach_stay_markers table")
+
+        if 'beach_stay_markers_dirty' not in existing_tables:
+            db.execute('''
+                CREATE TABLE beach_stay_markers_dirty (
+                    marker_date DATE PRIMARY KEY
+                ) WITHOUT ROWID
+            ''')
+            print("  Created beach_stay_markers_dirty table")
+
+        for name in missing_triggers:
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {_TRIGGERS[name]}')
+        print(f"  Created {len(missing_triggers)} stay marker triggers")
+
+        # Queue every stay day: guests written while triggers were missing get picked up
+        db.execute('''
+            INSERT OR IGNORE INTO beach_stay_markers_dirty (marker_date)
+            SELECT arrival_date FROM hotel_guests WHERE arrival_date IS NOT NULL
+            UNION SELECT departure_date FROM hotel_guests WHERE departure_date IS NOT NULL
+        ''')
+        print("  Queued all guest stay days")
+
+        db.commit()
+        print("Migration stay_markers applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
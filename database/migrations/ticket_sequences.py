@@ -0,0 +1,92 @@
+"""
+Ticket sequence migration.
+Per-day reservation ticket counters (beach_ticket_sequences), so a new
+ticket number is one atomic upsert inside the reservation transaction
+instead of a MAX() scan over the day's tickets plus collision retries.
+
+A trigger keeps the counter ahead of tickets written by other means
+(explicit ticket_number, imports, raw SQL), so allocated numbers never
+collide with them.
+"""
+
+from database.connection import get_db
+
+
+# Parent-level tickets: YYMMDD + sequence (children add '-N')
+_TICKET_GLOB = "'[0-9][0-9][0-9][0-9][0-9][0-9][0-9][0-9]*'"
+
+_TRIGGERS = {
+    'trg_ticket_sequences_res_ins': f'''
+        AFTER INSERT ON beach_reservations
+        WHEN NEW.ticket_number GLOB {_TICKET_GLOB}
+        BEGIN
+            INSERT INTO beach_ticket_sequences (day_prefix, last_seq)
+            VALUES (SUBSTR(NEW.ticket_number, 1, 6), CAST(SUBSTR(NEW.ticket_number, 7) AS INTEGER))
+            ON CONFLICT(day_prefix) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq);
+        END''',
+}
+
+
+def migrate_ticket_sequences() -> bool:
+    """
+    Migration: Create beach_ticket_sequences, seed it from existing tickets
+    and install the trigger that keeps it ahead of externally set tickets.
+
+    Returns:
+        bool: True if migration applied, False if already applied
+    """
+    db = get_db()
+    cursor = db.cursor()
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='table' AND name='beach_ticket_sequences'
+    """)
+    table_exists = cursor.fetchone() is not None
+
+    cursor.execute("""
+        SELECT name FROM sqlite_master
+        WHERE type='trigger' AND name LIKE 'trg_ticket_sequences_%'
+    """)
+    existing_triggers = {row['name'] for row in cursor.fetchall()}
+    missing_triggers = [name for name in _TRIGGERS if name not in existing_triggers]
+
+    if table_exists and not missing_triggers:
+        print("Migration already applied - beach_ticket_sequences table and trigger exist.")
+        return False
+
+    print("Applying ticket_sequences migration...")
+
+    try:
+        if not table_exists:
+            db.execute('''
+                CREATE TABLE beach_ticket_sequences (
+                    day_prefix TEXT PRIMARY KEY,
+                    last_seq INTEGER NOT NULL DEFAULT 0
+                ) WITHOUT ROWID
+            ''')
+            print("  Created beach_ticket_sequences table")
+
+        for name in missing_triggers:
+            db.execute(f'CREATE TRIGGER IF NOT EXISTS {name} {_TRIGGERS[name]}')
+        print(f"  Created {len(missing_triggers)} ticket sequence triggers")
+
+        # Seed from existing tickets (never moves a counter backwards)
+        db.execute(f'''
+            INSERT INTO beach_ticket_sequences (day_prefix, last_seq)
+            SELECT SUBSTR(ticket_number, 1, 6), MAX(CAST(SUBSTR(ticket_number, 7) AS INTEGER))
+            FROM beach_reservations
+            WHERE ticket_number GLOB {_TICKET_GLOB}
+            GROUP BY SUBSTR(ticket_number, 1, 6)
+            ON CONFLICT(day_prefix) DO UPDATE SET last_seq = MAX(last_seq, excluded.last_seq)
+        ''')
+        print("  Seeded daily sequences from existing tickets")
+
+        db.commit()
+        print("Migration ticket_sequences applied successfully!")
+        return True
+
+    except Exception as e:
+        db.rollback()
+        print(f"Migration failed: {e}")
+        raise
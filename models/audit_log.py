@@ -6,8 +6,12 @@ Handles audit log creation, retrieval, filtering, and retention cleanup.
 import json
 from datetime import timedelta
 from database import get_db
+from utils.cache import cached_for
 from utils.datetime_helpers import get_now
 
+# Seconds a filtered audit log count is reused by count_audit_logs_cached
+AUDIT_COUNT_TTL = 60
+
 
 # =============================================================================
 # READ OPERATIONS
@@ -35,6 +39,76 @@ def get_audit_log_by_id(audit_log_id: int) -> dict:
         return dict(row) if row else None
 
 
+def _audit_filters(
+    user_id: int = None,
+    action: str = None,
+    entity_type: str = None,
+    entity_id: int = None,
+    start_date: str = None,
+    end_date: str = None
+) -> tuple:
+    """
+    Build the WHERE conditions for audit log filters.
+
+    Dates are compared against the raw created_at values (range
+    predicates), so the (…, created_at) indexes can be used.
+
+    Returns:
+        tuple: (list of SQL conditions, params)
+    """
+    conditions = []
+    params = []
+
+    if user_id is not None:
+        conditions.append('al.user_id = ?')
+        params.append(user_id)
+
+    if action:
+        conditions.append('al.action = ?')
+        params.append(action)
+
+    if entity_type:
+        conditions.append('al.entity_type = ?')
+        params.append(entity_type)
+
+    if entity_id is not None:
+        conditions.append('al.entity_id = ?')
+        params.append(entity_id)
+
+    if start_date:
+        conditions.append('al.created_at >= date(?)')
+        params.append(start_date)
+
+    if end_date:
+        # Whole end day included
+        conditions.append("al.created_at < date(?, '+1 day')")
+        params.append(end_date)
+
+    return conditions, params
+
+
+def make_audit_cursor(log: dict) -> str:
+    """
+    Build the keyset pagination cursor pointing at an audit log row.
+
+    Args:
+        log: Audit log dict (needs created_at and id)
+
+    Returns:
+        Opaque cursor string
+    """
+    return f"{log['created_at']}~{log['id']}"
+
+
+def _parse_audit_cursor(cursor: str):
+    """Split a cursor into (created_at, id), or None if malformed."""
+    created_at, _, log_id = (cursor or '').rpartition('~')
+    try:
+        return (created_at, int(log_id)) if created_at else None
+    except ValueError:
+        return None
+
+
 def get_audit_logs(
     user_id: int = None,
     action: str = None,
@@ -43,10 +117,15 @@ def get_audit_logs(
     start_date: str = None,
     end_date: str = None,
     limit: int = 100,
-    offset: int = 0
+    offset: int = 0,
+    after: str = None,
+    before: str = None
 ) -> list:
     """
-    Get audit logs with optional filtering.
+    Get audit logs with optional filtering, newest first.
+
+    Deep pages should use keyset pagination (after/before cursors from
+    make_audit_cursor) instead of offset, which has to skip every row.
 
     Args:
         user_id: Filter by user ID
@@ -57,52 +136,90 @@ def get_audit_logs(
         end_date: Filter logs until this date (ISO format YYYY-MM-DD)
         limit: Maximum number of records to return (default 100)
         offset: Number of records to skip for pagination
+        after: Cursor of the last row of the previous page (older rows)
+        before: Cursor of the first row of the next page (newer rows)
 
     Returns:
         List of audit log dicts
     """
+    conditions, params = _audit_filters(
+        user_id, action, entity_type, entity_id, start_date, end_date
+    )
+
+    # Keyset pagination on (created_at, id)
+    order = 'DESC'
+    after_key = _parse_audit_cursor(after)
+    before_key = _parse_audit_cursor(before)
+    if after_key:
+        conditions.append('(al.created_at, al.id) < (?, ?)')
+        params.extend(after_key)
+    elif before_key:
+        conditions.append('(al.created_at, al.id) > (?, ?)')
+        params.extend(before_key)
+        order = 'ASC'
+
     with get_db() as conn:
         cursor = conn.cursor()
 
-        query = '''
+        query = f'''
             SELECT al.*, u.username, u.full_name as user_full_name
             FROM audit_log al
             LEFT JOIN users u ON al.user_id = u.id
-            WHERE 1=1
+            WHERE {' AND '.join(conditions) or '1=1'}
+            ORDER BY al.created_at {order}, al.id {order}
+            LIMIT ? OFFSET ?
         '''
+        params.extend([limit, 0 if (after_key or before_key) else offset])
 
-        params = []
-
-        if user_id is not None:
-            query += ' AND al.user_id = ?'
-            params.append(user_id)
-
-        if action:
-            query += ' AND al.action = ?'
-            params.append(action)
-
-        if entity_type:
-            query += ' AND al.entity_type = ?'
-            params.append(entity_type)
-
-        if entity_id is not None:
-            query += ' AND al.entity_id = ?'
-            params.append(entity_id)
-
-        if start_date:
-            query += ' AND date(al.created_at) >= date(?)'
-            params.append(start_date)
+        cursor.execute(query, params)
+        rows = [dict(row) for row in cursor.fetchall()]
+        if order == 'ASC':
+            rows.reverse()
+        return rows
+
+
+def get_audit_log_page(
+    filters: dict,
+    per_page: int = 50,
+    after: str = None,
+    before: str = None,
+    page: int = 1
+) -> dict:
+    """
+    Get one page of audit logs with keyset navigation cursors.
 
-        if end_date:
-            query += ' AND date(al.created_at) <= date(?)'
-            params.append(end_date)
+    Without a cursor the page number is used (offset), so plain ?page=N
+    links keep working; every link built from the returned cursors is a
+    keyset page.
 
-        query += ' ORDER BY al.created_at DESC LIMIT ? OFFSET ?'
-        params.extend([limit, offset])
+    Args:
+        filters: Keyword filters of get_audit_logs (user_id, action, ...)
+        per_page: Page size
+        after: Cursor of the last row of the previous page
+        before: Cursor of the first row of the following page
+        page: Page number, used when no cursor is given
 
-        cursor.execute(query, params)
-        rows = cursor.fetchall()
-        return [dict(row) for row in rows]
+    Returns:
+        Dict with items, next_cursor and prev_cursor (None when there is
+        no such page)
+    """
+    if before:
+        rows = get_audit_logs(**filters, limit=per_page + 1, before=before)
+        has_prev = len(rows) > per_page
+        items = rows[1:] if has_prev else rows
+        has_next = True
+    else:
+        offset = 0 if after else max(page - 1, 0) * per_page
+        rows = get_audit_logs(**filters, limit=per_page + 1, offset=offset, after=after)
+        has_next = len(rows) > per_page
+        items = rows[:per_page]
+        has_prev = bool(after) or page > 1
+
+    return {
+        'items': items,
+        'next_cursor': make_audit_cursor(items[-1]) if has_next and items else None,
+        'prev_cursor': make_audit_cursor(items[0]) if has_prev and items else None,
+    }
 
 
 def count_audit_logs(
@@ -127,44 +244,36 @@ def count_audit_logs(
     Returns:
         Total count of matching audit logs
     """
+    conditions, params = _audit_filters(
+        user_id, action, entity_type, entity_id, start_date, end_date
+    )
+
     with get_db() as conn:
         cursor = conn.cursor()
-
-        query = '''
+        cursor.execute(f'''
             SELECT COUNT(*) as count
             FROM audit_log al
-            WHERE 1=1
-        '''
-
-        params = []
-
-        if user_id is not None:
-            query += ' AND al.user_id = ?'
-            params.append(user_id)
-
-        if action:
-            query += ' AND al.action = ?'
-            params.append(action)
+            WHERE {' AND '.join(conditions) or '1=1'}
+        ''', params)
+        row = cursor.fetchone()
+        return row['count'] if row else 0
 
-        if entity_type:
-            query += ' AND al.entity_type = ?'
-            params.append(entity_type)
 
-        if entity_id is not None:
-            query += ' AND al.entity_id = ?'
-            params.append(entity_id)
+def count_audit_logs_cached(**filters) -> int:
+    """
+    Count audit logs, reusing a count taken in the last AUDIT_COUNT_TTL seconds.
 
-        if start_date:
-            query += ' AND date(al.created_at) >= date(?)'
-            params.append(start_date)
+    For page headers and pagination, where a slightly stale total is fine
+    and recounting a large table on every page turn is not.
 
-        if end_date:
-            query += ' AND date(al.created_at) <= date(?)'
-            params.append(end_date)
+    Args:
+        **filters: Same keyword filters as count_audit_logs
 
-        cursor.execute(query, params)
-        row = cursor.fetchone()
-        return row['count'] if row else 0
+    Returns:
+        (Possibly slightly stale) count of matching audit logs
+    """
+    key = tuple(sorted(filters.items()))
+    return cached_for(AUDIT_COUNT_TTL, 'audit_log_counts', key, lambda: count_audit_logs(**filters))
 
 
 def get_audit_logs_for_entity(entity_type: str, entity_id: int, limit: int = 50) -> list:
@@ -234,7 +343,8 @@ def create_audit_log(
     old_value: str = None,
     new_value: str = None,
     ip_address: str = None,
-    user_agent: str = None
+    user_agent: str = None,
+    created_at: str = None
 ) -> int:
     """
     Create a new audit log entry.
@@ -249,6 +359,7 @@ def create_audit_log(
         new_value: Legacy field for backward compatibility
         ip_address: Client IP address
         user_agent: Client user agent string
+        created_at: Time of the action (UTC 'YYYY-MM-DD HH:MM:SS'), default now
 
     Returns:
         New audit log ID
@@ -277,14 +388,51 @@ def create_audit_log(
 
         cursor.execute('''
             INSERT INTO audit_log
-            (user_id, action, entity_type, entity_id, changes, old_value, new_value, ip_address, user_agent)
-            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-        ''', (user_id, action, entity_type, entity_id, changes_json, old_value, new_value, ip_address, user_agent))
+            (user_id, action, entity_type, entity_id, changes, old_value, new_value,
+             ip_address, user_agent, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ''', (user_id, action, entity_type, entity_id, changes_json, old_value, new_value,
+              ip_address, user_agent, created_at))
 
         conn.commit()
         return cursor.lastrowid
 
 
+def create_audit_logs_bulk(entries: list) -> int:
+    """
+    Insert several audit log entries in one transaction.
+
+    Args:
+        entries: Dicts with create_audit_log's keyword arguments
+                 (action and entity_type required)
+
+    Returns:
+        Number of entries written
+    """
+    if not entries:
+        return 0
+
+    rows = []
+    for entry in entries:
+        changes = entry.get('changes')
+        rows.append((
+            entry.get('user_id'), entry['action'], entry['entity_type'], entry.get('entity_id'),
+            json.dumps(changes, default=str, ensure_ascii=False) if changes is not None else None,
+            entry.get('old_value'), entry.get('new_value'),
+            entry.get('ip_address'), entry.get('user_agent'), entry.get('created_at')
+        ))
+
+    with get_db() as conn:
+        conn.executemany('''
+            INSERT INTO audit_log
+            (user_id, action, entity_type, entity_id, changes, old_value, new_value,
+             ip_address, user_agent, created_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+        ''', rows)
+        conn.commit()
+        return len(rows)
+
+
 # =============================================================================
 # CLEANUP OPERATIONS
 # =============================================================================
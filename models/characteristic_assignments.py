@@ -262,6 +262,79 @@ def score_characteristic_match(furniture_id: int, requested_ids: list[int]) -> d
     }
 
 
+def _load_furniture_characteristic_masks() -> dict:
+    """Load {furniture_id: bitmask of characteristic IDs} in one query."""
+    with get_db() as conn:
+        cursor = conn.execute('''
+            SELECT furniture_id, characteristic_id
+            FROM beach_furniture_characteristics
+        ''')
+        masks = {}
+        for row in cursor.fetchall():
+            fid = row['furniture_id']
+            masks[fid] = masks.get(fid, 0) | (1 << row['characteristic_id'])
+        return masks
+
+
+def get_furniture_characteristic_masks() -> dict:
+    """
+    Get the furniture-to-characteristic matrix as one bitmask per furniture.
+
+    Bit n is set when the furniture has characteristic ID n. The matrix is
+    cached process-wide and reloaded when characteristics or assignments
+    change. Treat the returned dict as read-only.
+
+    Returns:
+        dict: {furniture_id: int bitmask} (furniture without characteristics omitted)
+    """
+    from utils.cache import cached
+    return cached('characteristics', 'furniture_masks', _load_furniture_characteristic_masks)
+
+
+def _mask_to_ids(mask: int) -> list[int]:
+    """Expand a characteristic bitmask into a sorted list of IDs."""
+    ids = []
+    while mask:
+        low = mask & -mask
+        ids.append(low.bit_length() - 1)
+        mask ^= low
+    return ids
+
+
+def score_characteristic_matches(furniture_ids: list[int], requested_ids: list[int]) -> dict:
+    """
+    Bulk version of score_characteristic_match() for many furniture pieces.
+
+    Scoring is set math on the cached bitmasks: no query per furniture.
+
+    Args:
+        furniture_ids: Furniture IDs to score
+        requested_ids: List of characteristic IDs requested
+
+    Returns:
+        dict: {furniture_id: {'score', 'matched', 'missing'}} with the same
+        values score_characteristic_match() returns
+    """
+    if not requested_ids:
+        return {fid: {'score': 1.0, 'matched': [], 'missing': []} for fid in furniture_ids}
+
+    requested_mask = 0
+    for char_id in requested_ids:
+        requested_mask |= 1 << char_id
+
+    masks = get_furniture_characteristic_masks()
+    total = len(requested_ids)
+    results = {}
+    for fid in furniture_ids:
+        matched_mask = masks.get(fid, 0) & requested_mask
+        results[fid] = {
+            'score': matched_mask.bit_count() / total,
+            'matched': _mask_to_ids(matched_mask),
+            'missing': _mask_to_ids(requested_mask & ~matched_mask)
+        }
+    return results
+
+
 # =============================================================================
 # HELPER FUNCTIONS (CODE-BASED)
 # =============================================================================
@@ -5,6 +5,7 @@ Handles reading and writing beach_config key-value pairs.
 
 from typing import Optional, Dict, Any
 from database import get_db
+from utils.cache import cached, invalidate
 
 
 def get_config(key: str, default: str = None) -> Optional[str]:
@@ -102,6 +103,11 @@ def get_map_config() -> Dict[str, Any]:
     Returns:
         Dict with map configuration (typed values)
     """
+    return dict(cached('config', 'map', _load_map_config))
+
+
+def _load_map_config() -> Dict[str, Any]:
+    """Read map configuration values (cache loader)."""
     return {
         'default_width': get_config_int('map_default_width', 1200),
         'min_height': get_config_int('map_min_height', 800),
@@ -145,6 +151,7 @@ def set_config(key: str, value: str, description: str = None) -> bool:
             ''', (key, value, description))
 
         conn.commit()
+        invalidate('config')
         return cursor.rowcount > 0
 
 
@@ -162,4 +169,5 @@ def delete_config(key: str) -> bool:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM beach_config WHERE key = ?', (key,))
         conn.commit()
+        invalidate('config')
         return cursor.rowcount > 0
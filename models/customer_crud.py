@@ -140,6 +140,8 @@ def create_customer(customer_type: str, first_name: str, last_name: str = None,
               kwargs.get('language'), kwargs.get('country_code', '+34'),
               kwargs.get('booking_reference')))
 
+        from .search_index import refresh_search_index
+        refresh_search_index(conn)
         conn.commit()
         return cursor.lastrowid
 
@@ -182,6 +184,8 @@ def update_customer(customer_id: int, **kwargs) -> bool:
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute(query, values)
+        from .search_index import refresh_search_index
+        refresh_search_index(conn)
         conn.commit()
 
         return cursor.rowcount > 0
@@ -258,6 +262,8 @@ def delete_customer(customer_id: int) -> bool:
 
         # Delete customer (customer_tags, customer_preferences, waitlist cascade automatically)
         cursor.execute('DELETE FROM beach_customers WHERE id = ?', (customer_id,))
+        from .search_index import refresh_search_index
+        refresh_search_index(conn)
         conn.commit()
 
         return cursor.rowcount > 0
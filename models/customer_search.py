@@ -53,6 +53,57 @@ def _matches_search(record: dict, search_words: list, fields: list) -> bool:
     return all(word in searchable_text for word in search_words)
 
 
+def _active_stays_by_room(cursor, rooms: set) -> dict:
+    """
+    Get today's active hotel stays for a set of rooms in one query.
+
+    Returns:
+        Dict {room_number: [guest rows]}, each list ordered by
+        arrival_date DESC, is_main_guest DESC
+    """
+    if not rooms:
+        return {}
+    rooms = list(rooms)
+    cursor.execute(f'''
+        SELECT room_number, guest_name, arrival_date, departure_date,
+               is_main_guest, booking_reference
+        FROM hotel_guests
+        WHERE room_number IN ({','.join('?' * len(rooms))})
+          AND departure_date >= date('now')
+          AND arrival_date <= date('now')
+        ORDER BY room_number, arrival_date DESC, is_main_guest DESC
+    ''', rooms)
+    stays = {}
+    for row in cursor.fetchall():
+        stays.setdefault(row['room_number'], []).append(row)
+    return stays
+
+
+def _active_guest_counts(cursor, rooms: set) -> dict:
+    """
+    Count current and future guests per (room, booking reference) in one query.
+
+    Guests without a booking reference are not counted (same as matching
+    them by booking reference in SQL).
+
+    Returns:
+        Dict {(room_number, booking_reference): count}
+    """
+    if not rooms:
+        return {}
+    rooms = list(rooms)
+    cursor.execute(f'''
+        SELECT room_number, booking_reference, COUNT(*) AS guest_count
+        FROM hotel_guests
+        WHERE room_number IN ({','.join('?' * len(rooms))})
+          AND booking_reference IS NOT NULL
+          AND departure_date >= date('now')
+        GROUP BY room_number, booking_reference
+    ''', rooms)
+    return {(row['room_number'], row['booking_reference']): row['guest_count']
+            for row in cursor.fetchall()}
+
+
 def search_customers_unified(query: str, customer_type: str = None, limit: int = 20) -> list:
     """
     Search customers from both beach_customers and hotel_guests tables.
@@ -79,30 +130,16 @@ def search_customers_unified(query: str, customer_type: str = None, limit: int =
         if not search_words:
             return []
 
-        # Build SQL LIKE patterns for pre-filtering (improves performance)
-        like_patterns = [f'%{word}%' for word in search_words]
-        # Also build normalized phone patterns for phone-like queries
-        normalized_phone_patterns = [f'%{normalize_phone(word)}%' if normalize_phone(word) else f'%{word}%' for word in search_words]
+        # Pre-filter through the accent-folded trigram index (see models/search_index.py)
+        from .search_index import refresh_search_index, build_match_filter
+        refresh_search_index(conn, wait=False)
 
-        # Search beach_customers with SQL pre-filtering
-        customer_query = '''
+        customer_match, params = build_match_filter('beach_customers_fts', search_words)
+        customer_query = f'''
             SELECT c.*, 'customer' as source
             FROM beach_customers c
-            WHERE 1=1
+            WHERE c.id IN ({customer_match})
         '''
-        params = []
-
-        # Add SQL-level filtering for each word
-        for pattern, phone_pattern in zip(like_patterns, normalized_phone_patterns):
-            customer_query += '''
-                AND (LOWER(c.first_name || ' ' || COALESCE(c.last_name, '')) LIKE ?
-                     OR LOWER(c.email) LIKE ?
-                     OR c.phone LIKE ?
-                     OR c.phone LIKE ?
-                     OR c.room_number LIKE ?
-                     OR c.booking_reference LIKE ?)
-            '''
-            params.extend([pattern, pattern, pattern, phone_pattern, pattern, pattern])
 
         if customer_type:
             customer_query += ' AND c.customer_type = ?'
@@ -117,94 +154,77 @@ def search_customers_unified(query: str, customer_type: str = None, limit: int =
         from utils.datetime_helpers import get_today
         today = get_today()
 
-        for row in cursor.fetchall():
-            customer = dict(row)
-            # Python-side filtering for accent-insensitive matching
-            if _matches_search(customer, search_words, customer_fields):
-                customer['display_name'] = f"{customer['first_name']} {customer['last_name'] or ''}".strip()
-
-                # For interno customers, check hotel guest data for check-in/check-out today
-                customer['is_checkin_today'] = False
-                customer['is_checkout_today'] = False
-                if customer.get('customer_type') == 'interno' and customer.get('room_number'):
-                    # Get all active bookings' main guests for this room today
-                    cursor.execute('''
-                        SELECT guest_name, arrival_date, departure_date,
-                               is_main_guest, booking_reference
-                        FROM hotel_guests
-                        WHERE room_number = ?
-                          AND departure_date >= date('now')
-                          AND arrival_date <= date('now')
-                        ORDER BY arrival_date DESC, is_main_guest DESC
-                    ''', (customer['room_number'],))
-                    hotel_rows = cursor.fetchall()
-                    if not hotel_rows:
-                        # No active hotel stay - skip this interno customer
-                        continue
-
-                    # Match customer name against active hotel guests
-                    customer_name = normalize_text(
-                        f"{customer.get('first_name', '')} {customer.get('last_name', '')}".strip()
-                    )
-                    matched_guest = None
-                    for hr in hotel_rows:
-                        guest_name_normalized = normalize_text(hr['guest_name'] or '')
-                        common_words = set(customer_name.split()) & set(guest_name_normalized.split())
-                        min_words = min(len(customer_name.split()), len(guest_name_normalized.split()))
-                        if (customer_name in guest_name_normalized
-                                or guest_name_normalized in customer_name
-                                or len(common_words) >= min(2, min_words)):
-                            matched_guest = hr
-                            break
-
-                    if not matched_guest:
-                        # Customer name doesn't match any active guest - skip
-                        continue
-
-                    # Only show main guest per booking (skip secondary guests)
-                    if not matched_guest['is_main_guest']:
-                        continue
-
-                    arrival = matched_guest['arrival_date']
-                    departure = matched_guest['departure_date']
-                    if isinstance(arrival, str):
-                        customer['is_checkin_today'] = arrival == today.isoformat()
-                    else:
-                        customer['is_checkin_today'] = arrival == today
-                    if isinstance(departure, str):
-                        customer['is_checkout_today'] = departure == today.isoformat()
-                    else:
-                        customer['is_checkout_today'] = departure == today
+        # Python-side filtering for accent-insensitive matching
+        candidates = [dict(row) for row in cursor.fetchall()]
+        candidates = [c for c in candidates if _matches_search(c, search_words, customer_fields)]
+
+        # Active hotel stays of every candidate interno room, in one query
+        stays_by_room = _active_stays_by_room(cursor, {
+            c['room_number'] for c in candidates
+            if c.get('customer_type') == 'interno' and c.get('room_number')
+        })
+
+        for customer in candidates:
+            customer['display_name'] = f"{customer['first_name']} {customer['last_name'] or ''}".strip()
+
+            # For interno customers, check hotel guest data for check-in/check-out today
+            customer['is_checkin_today'] = False
+            customer['is_checkout_today'] = False
+            if customer.get('customer_type') == 'interno' and customer.get('room_number'):
+                # All active bookings' guests for this room today
+                hotel_rows = stays_by_room.get(customer['room_number'], [])
+                if not hotel_rows:
+                    # No active hotel stay - skip this interno customer
+                    continue
+
+                # Match customer name against active hotel guests
+                customer_name = normalize_text(
+                    f"{customer.get('first_name', '')} {customer.get('last_name', '')}".strip()
+                )
+                matched_guest = None
+                for hr in hotel_rows:
+                    guest_name_normalized = normalize_text(hr['guest_name'] or '')
+                    common_words = set(customer_name.split()) & set(guest_name_normalized.split())
+                    min_words = min(len(customer_name.split()), len(guest_name_normalized.split()))
+                    if (customer_name in guest_name_normalized
+                            or guest_name_normalized in customer_name
+                            or len(common_words) >= min(2, min_words)):
+                        matched_guest = hr
+                        break
+
+                if not matched_guest:
+                    # Customer name doesn't match any active guest - skip
+                    continue
+
+                # Only show main guest per booking (skip secondary guests)
+                if not matched_guest['is_main_guest']:
+                    continue
 
-                results.append(customer)
-                if len(results) >= limit:
-                    break
+                arrival = matched_guest['arrival_date']
+                departure = matched_guest['departure_date']
+                if isinstance(arrival, str):
+                    customer['is_checkin_today'] = arrival == today.isoformat()
+                else:
+                    customer['is_checkin_today'] = arrival == today
+                if isinstance(departure, str):
+                    customer['is_checkout_today'] = departure == today.isoformat()
+                else:
+                    customer['is_checkout_today'] = departure == today
+
+            results.append(customer)
+            if len(results) >= limit:
+                break
 
         # Search hotel_guests (only if customer_type is not 'externo')
         if customer_type != 'externo' and len(results) < limit:
-            guest_query = '''
-                SELECT h.*,
-                       'hotel_guest' as source,
-                       (SELECT COUNT(*) FROM hotel_guests h2
-                        WHERE h2.room_number = h.room_number
-                          AND h2.booking_reference = h.booking_reference
-                          AND h2.departure_date >= date('now')) as room_guest_count
+            guest_match, guest_params = build_match_filter('hotel_guests_fts', search_words)
+            guest_query = f'''
+                SELECT h.*, 'hotel_guest' as source
                 FROM hotel_guests h
-                WHERE h.departure_date >= date('now')
+                WHERE h.id IN ({guest_match})
+                  AND h.departure_date >= date('now')
                   AND h.arrival_date <= date('now')
             '''
-            guest_params = []
-
-            # Add SQL-level filtering for each word
-            for pattern in like_patterns:
-                guest_query += '''
-                    AND (LOWER(h.guest_name) LIKE ?
-                         OR h.room_number LIKE ?
-                         OR LOWER(h.email) LIKE ?
-                         OR h.phone LIKE ?
-                         OR h.booking_reference LIKE ?)
-                '''
-                guest_params.extend([pattern, pattern, pattern, pattern, pattern])
 
             guest_query += '''
                 ORDER BY h.room_number,
@@ -217,6 +237,10 @@ def search_customers_unified(query: str, customer_type: str = None, limit: int =
             guest_params.append(limit * 5)
 
             cursor.execute(guest_query, guest_params)
+            guest_rows = cursor.fetchall()
+
+            # Guests per (room, booking) for the "N huéspedes" label, in one query
+            guest_counts = _active_guest_counts(cursor, {row['room_number'] for row in guest_rows})
 
             # Avoid showing the SAME person twice (once as a beach customer, once as a
             # hotel guest). Match on person identity — room+name and booking_reference —
@@ -238,7 +262,7 @@ def search_customers_unified(query: str, customer_type: str = None, limit: int =
             added_rooms = set()
 
             guest_fields = ['guest_name', 'room_number', 'email', 'phone', 'booking_reference']
-            for row in cursor.fetchall():
+            for row in guest_rows:
                 guest = dict(row)
                 room = guest['room_number']
                 # Skip if the SAME person is already in the results as a beach customer
@@ -251,7 +275,7 @@ def search_customers_unified(query: str, customer_type: str = None, limit: int =
                     continue
                 # Python-side filtering for accent-insensitive matching
                 if _matches_search(guest, search_words, guest_fields):
-                    guest_count = guest.get('room_guest_count', 1)
+                    guest_count = guest_counts.get((room, guest.get('booking_reference')), 0)
                     guest['display_name'] = guest['guest_name'] + (f" ({guest_count} huéspedes)" if guest_count > 1 else "")
                     guest['customer_type'] = 'interno'  # Hotel guests are always interno
                     # Check-in/Check-out today flags (compare date objects or strings)
@@ -306,6 +330,8 @@ def create_customer_from_hotel_guest(hotel_guest_id: int, additional_data: dict
     Raises:
         ValueError if hotel guest not found or customer already exists for room
     """
+    from .search_index import refresh_search_index
+
     with get_db() as conn:
         cursor = conn.cursor()
         additional_data = additional_data or {}
@@ -348,6 +374,7 @@ def create_customer_from_hotel_guest(hotel_guest_id: int, additional_data: dict
                     updated_at = CURRENT_TIMESTAMP
                 WHERE id = ?
             ''', (guest['room_number'], guest.get('booking_reference'), existing['id']))
+            refresh_search_index(conn)
             conn.commit()
             # Return existing customer instead of creating duplicate
             return {
@@ -400,6 +427,7 @@ def create_customer_from_hotel_guest(hotel_guest_id: int, additional_data: dict
             guest.get('booking_reference')
         ))
 
+        refresh_search_index(conn)
         conn.commit()
         customer_id = cursor.lastrowid
 
@@ -445,13 +473,15 @@ def merge_customers(source_id: int, target_id: int) -> bool:
     if source_id == target_id:
         raise ValueError('No se puede fusionar un cliente consigo mismo')
 
+    from .search_index import refresh_search_index
+
     with get_db() as conn:
         cursor = conn.cursor()
 
         try:
             conn.execute('BEGIN IMMEDIATE')
 
-            # Transfer reservations
+            # Transfer reservations (statistics move with them via triggers)
             cursor.execute('''
                 UPDATE beach_reservations
                 SET customer_id = ?
@@ -470,15 +500,6 @@ def merge_customers(source_id: int, target_id: int) -> bool:
                 SELECT ?, tag_id FROM beach_customer_tags WHERE customer_id = ?
             ''', (target_id, source_id))
 
-            # Update target stats
-            cursor.execute('''
-                UPDATE beach_customers
-                SET total_visits = total_visits + ?,
-                    total_spent = total_spent + ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (source['total_visits'], source['total_spent'], target_id))
-
             # Delete source customer characteristics and tags
             cursor.execute('DELETE FROM beach_customer_characteristics WHERE customer_id = ?', (source_id,))
             cursor.execute('DELETE FROM beach_customer_tags WHERE customer_id = ?', (source_id,))
@@ -486,6 +507,7 @@ def merge_customers(source_id: int, target_id: int) -> bool:
             # Delete source customer
             cursor.execute('DELETE FROM beach_customers WHERE id = ?', (source_id,))
 
+            refresh_search_index(conn)
             conn.commit()
             return True
 
@@ -9,7 +9,7 @@ from datetime import datetime
 
 
 def get_all_furniture(zone_id: int = None, active_only: bool = True,
-                      for_date: str = None) -> list:
+                      for_date: str = None, furniture_ids: list = None) -> list:
     """
     Get all beach furniture.
 
@@ -19,6 +19,7 @@ def get_all_furniture(zone_id: int = None, active_only: bool = True,
         for_date: Date string YYYY-MM-DD for filtering temporary furniture (optional)
                   If provided, temporary furniture is only included if for_date
                   falls within temp_start_date and temp_end_date
+        furniture_ids: Restrict to these furniture IDs (optional)
 
     Returns:
         List of furniture dicts with zone information
@@ -47,6 +48,12 @@ def get_all_furniture(zone_id: int = None, active_only: bool = True,
         if active_only:
             query += ' AND f.active = 1'
 
+        if furniture_ids is not None:
+            if not furniture_ids:
+                return []
+            query += f" AND f.id IN ({','.join('?' * len(furniture_ids))})"
+            params.extend(furniture_ids)
+
         # Filter temporary furniture by date range
         if for_date:
             query += '''
@@ -91,6 +98,33 @@ def get_furniture_by_id(furniture_id: int) -> dict:
         return dict(row) if row else None
 
 
+def get_furniture_by_ids(furniture_ids: list) -> dict:
+    """
+    Get several furniture pieces in one query.
+
+    Args:
+        furniture_ids: List of furniture IDs
+
+    Returns:
+        dict: {furniture_id: furniture dict} for the IDs that exist
+    """
+    if not furniture_ids:
+        return {}
+
+    placeholders = ','.join('?' * len(furniture_ids))
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute(f'''
+            SELECT f.*, z.name as zone_name, z.color as zone_color,
+                   ft.display_name as furniture_type_name
+            FROM beach_furniture f
+            LEFT JOIN beach_zones z ON f.zone_id = z.id
+            LEFT JOIN beach_furniture_types ft ON f.furniture_type = ft.type_code
+            WHERE f.id IN ({placeholders})
+        ''', list(furniture_ids))
+        return {row['id']: dict(row) for row in cursor.fetchall()}
+
+
 def get_furniture_types() -> list:
     """
     Get all furniture types.
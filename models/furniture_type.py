@@ -7,6 +7,7 @@ auto-numbering, and advanced configuration support.
 import json
 from typing import Tuple, Optional
 from database import get_db
+from utils.cache import cached, invalidate
 
 
 # =============================================================================
@@ -23,6 +24,13 @@ def get_all_furniture_types(active_only: bool = True) -> list:
     Returns:
         List of furniture type dicts sorted by display_order
     """
+    rows = cached('furniture_types', ('all', active_only),
+                  lambda: _load_furniture_types(active_only))
+    return [dict(row) for row in rows]
+
+
+def _load_furniture_types(active_only: bool) -> list:
+    """Query furniture types with active furniture counts (cache loader)."""
     with get_db() as conn:
         cursor = conn.cursor()
 
@@ -145,6 +153,7 @@ def create_furniture_type(type_code: str, display_name: str, **kwargs) -> int:
 
         cursor.execute(query, values)
         conn.commit()
+        invalidate('furniture_types')
         return cursor.lastrowid
 
 
@@ -199,6 +208,7 @@ def update_furniture_type(type_id: int, **kwargs) -> bool:
         cursor = conn.cursor()
         cursor.execute(query, values)
         conn.commit()
+        invalidate('furniture_types')
 
         return cursor.rowcount > 0
 
@@ -245,6 +255,7 @@ def delete_furniture_type(type_id: int) -> bool:
         ''', (type_id,))
 
         conn.commit()
+        invalidate('furniture_types')
         return cursor.rowcount > 0
 
 
@@ -562,6 +573,7 @@ def update_furniture_types_order(type_ids: list) -> bool:
                     WHERE id = ?
                 ''', (order, type_id))
             conn.commit()
+            invalidate('furniture_types')
             return True
         except Exception:
             conn.rollback()
@@ -8,6 +8,9 @@ from datetime import date
 from typing import Optional, List, Dict, Any
 import unicodedata
 
+from .search_index import refresh_search_index
+from .stay_markers import refresh_stay_markers
+
 
 def normalize_guest_name(name: str) -> str:
     """Normalize a guest name for robust matching across PMS exports.
@@ -287,6 +290,8 @@ def create_hotel_guest(
             nationality, email, phone, notes, source_file, is_main_guest, booking_reference
         ))
 
+        refresh_search_index(conn)
+        refresh_stay_markers(conn)
         conn.commit()
         return cursor.lastrowid
 
@@ -386,6 +391,8 @@ def upsert_hotel_guest(
                 WHERE id = ?
             ''', update_values)
 
+            refresh_search_index(conn)
+            refresh_stay_markers(conn)
             conn.commit()
             return {
                 'id': guest_id,
@@ -426,6 +433,219 @@ def upsert_hotel_guest(
             }
 
 
+# Fields bulk_upsert_hotel_guests() copies from each record when not None
+_BULK_OPTIONAL_FIELDS = ('guest_type', 'nationality', 'vip_code', 'source_file')
+
+
+def bulk_upsert_hotel_guests(records: List[Dict[str, Any]], conn) -> List[Dict[str, Any]]:
+    """
+    Insert or update many hotel guests with the same rules as upsert_hotel_guest().
+
+    Existing guests for every booking reference and room in the batch are
+    prefetched in one query and matched in memory (in record order, so
+    repeated rows behave like consecutive upserts). Writes go through
+    executemany on the given connection; nothing is committed, so the
+    caller controls the transaction (start it with BEGIN IMMEDIATE so the
+    pre-allocated ids cannot race another writer).
+
+    Args:
+        records: Dicts with room_number, guest_name, arrival_date,
+                 departure_date, booking_reference and optional guest_type,
+                 nationality, vip_code, source_file
+        conn: Database connection (open transaction)
+
+    Returns:
+        One dict per record, aligned with the input: 'id', 'action'
+        ('created' | 'updated' | 'error'), 'is_main_guest', 'room_changed',
+        'old_room', 'new_room' ('error' also carries 'error')
+    """
+    if not records:
+        return []
+
+    def _text(value):
+        # Cell values may be numbers; the table stores TEXT
+        return value if value is None or isinstance(value, str) else str(value)
+
+    def _iso(value):
+        return value.isoformat() if isinstance(value, date) else value
+
+    records = [
+        dict(r, booking_reference=_text(r.get('booking_reference')) or None)
+        for r in records
+    ]
+    refs = sorted({r['booking_reference'] for r in records if r['booking_reference']})
+    rooms = sorted({r['room_number'] for r in records})
+
+    conditions = []
+    params = []
+    if refs:
+        conditions.append(f"booking_reference IN ({','.join('?' * len(refs))})")
+        params.extend(refs)
+    conditions.append(f"room_number IN ({','.join('?' * len(rooms))})")
+    params.extend(rooms)
+
+    rows = conn.execute(f'''
+        SELECT id, room_number, guest_name, arrival_date, departure_date,
+               booking_reference, is_main_guest, guest_type, nationality,
+               vip_code, source_file
+        FROM hotel_guests
+        WHERE {' OR '.join(conditions)}
+    ''', params).fetchall()
+
+    guests = {}
+    for row in rows:
+        guest = dict(row)
+        # DATE columns come back as date objects (PARSE_DECLTYPES)
+        guest['arrival_date'] = _iso(guest['arrival_date'])
+        guest['departure_date'] = _iso(guest['departure_date'])
+        guests[guest['id']] = guest
+    inserted_ids = set()
+    touched_ids = set()
+
+    by_ref = {}          # booking_reference -> [guest ids]
+    by_key = {}          # (room, arrival, name) -> guest id (UNIQUE in the table)
+    room_date_count = {} # (room, arrival) -> guests
+
+    def index(guest):
+        if guest['booking_reference']:
+            by_ref.setdefault(guest['booking_reference'], []).append(guest['id'])
+        by_key[(guest['room_number'], guest['arrival_date'], guest['guest_name'])] = guest['id']
+        slot = (guest['room_number'], guest['arrival_date'])
+        room_date_count[slot] = room_date_count.get(slot, 0) + 1
+
+    for guest in guests.values():
+        index(guest)
+
+    id_row = conn.execute('''
+        SELECT MAX(COALESCE((SELECT seq FROM sqlite_sequence WHERE name = 'hotel_guests'), 0),
+                   COALESCE((SELECT MAX(id) FROM hotel_guests), 0)) AS last_id
+    ''').fetchone()
+    next_id = id_row['last_id'] + 1
+
+    results = []
+    for record in records:
+        room_number = record['room_number']
+        guest_name = record['guest_name']
+        booking_reference = record['booking_reference']
+        arrival_str = _iso(record['arrival_date'])
+        departure_str = _iso(record['departure_date'])
+
+        existing = None
+        room_changed = False
+        old_room = None
+
+        # Priority 1: booking_reference + normalized name
+        if booking_reference:
+            target_name = normalize_guest_name(guest_name)
+            for guest_id in by_ref.get(booking_reference, []):
+                if normalize_guest_name(guests[guest_id]['guest_name']) == target_name:
+                    existing = guests[guest_id]
+                    break
+
+            if existing and existing['room_number'] != room_number:
+                room_changed = True
+                old_room = existing['room_number']
+
+        # Priority 2: room + date + exact name
+        if not existing:
+            guest_id = by_key.get((room_number, arrival_str, guest_name))
+            existing = guests.get(guest_id) if guest_id else None
+
+        if existing:
+            if room_changed:
+                new_key = (room_number, existing['arrival_date'], existing['guest_name'])
+                if new_key in by_key:
+                    results.append({
+                        'id': existing['id'], 'action': 'error',
+                        'error': 'room change collides with an existing guest'
+                    })
+                    continue
+                old_slot = (old_room, existing['arrival_date'])
+                del by_key[(old_room, existing['arrival_date'], existing['guest_name'])]
+                room_date_count[old_slot] -= 1
+                by_key[new_key] = existing['id']
+                new_slot = (room_number, existing['arrival_date'])
+                room_date_count[new_slot] = room_date_count.get(new_slot, 0) + 1
+                existing['room_number'] = room_number
+
+            existing['departure_date'] = departure_str
+            if booking_reference:
+                if existing['booking_reference'] != booking_reference:
+                    by_ref.setdefault(booking_reference, []).append(existing['id'])
+                existing['booking_reference'] = booking_reference
+            for field in _BULK_OPTIONAL_FIELDS:
+                if record.get(field) is not None:
+                    existing[field] = record[field]
+            touched_ids.add(existing['id'])
+
+            results.append({
+                'id': existing['id'],
+                'action': 'updated',
+                'is_main_guest': existing['is_main_guest'],
+                'room_changed': room_changed,
+                'old_room': old_room,
+                'new_room': room_number if room_changed else None
+            })
+        else:
+            # First guest for this room+date becomes the main guest
+            is_main_guest = 1 if room_date_count.get((room_number, arrival_str), 0) == 0 else 0
+            guest = {
+                'id': next_id,
+                'room_number': room_number,
+                'guest_name': guest_name,
+                'arrival_date': arrival_str,
+                'departure_date': departure_str,
+                'booking_reference': booking_reference,
+                'is_main_guest': is_main_guest,
+            }
+            for field in _BULK_OPTIONAL_FIELDS:
+                guest[field] = record.get(field)
+            next_id += 1
+
+            guests[guest['id']] = guest
+            inserted_ids.add(guest['id'])
+            index(guest)
+
+            results.append({
+                'id': guest['id'],
+                'action': 'created',
+                'is_main_guest': is_main_guest,
+                'room_changed': False,
+                'old_room': None,
+                'new_room': None
+            })
+
+    if inserted_ids:
+        conn.executemany('''
+            INSERT INTO hotel_guests (
+                id, room_number, guest_name, arrival_date, departure_date,
+                vip_code, guest_type, nationality, source_file, is_main_guest,
+                booking_reference
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (g['id'], g['room_number'], g['guest_name'], g['arrival_date'],
+             g['departure_date'], g['vip_code'], g['guest_type'], g['nationality'],
+             g['source_file'], g['is_main_guest'], g['booking_reference'])
+            for g in (guests[gid] for gid in sorted(inserted_ids))
+        ])
+
+    updated_ids = touched_ids - inserted_ids
+    if updated_ids:
+        conn.executemany('''
+            UPDATE hotel_guests
+            SET room_number = ?, departure_date = ?, booking_reference = ?,
+                guest_type = ?, nationality = ?, vip_code = ?, source_file = ?,
+                updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', [
+            (g['room_number'], g['departure_date'], g['booking_reference'],
+             g['guest_type'], g['nationality'], g['vip_code'], g['source_file'], g['id'])
+            for g in (guests[gid] for gid in sorted(updated_ids))
+        ])
+
+    return results
+
+
 def propagate_room_change(
     guest_name: str,
     old_room: str,
@@ -515,6 +735,7 @@ def propagate_room_change(
 
         result['reservations_updated'] = cursor.rowcount
 
+        refresh_search_index(conn)
         conn.commit()
         return result
 
@@ -572,6 +793,7 @@ def sync_customer_room_by_booking(booking_reference: str, room_number: str) -> D
             if r['room_number']:  # skip first-assignment (no previous room)
                 log_room_change(r['id'], booking_reference, r['room_number'], room_number,
                                 source='sync', conn=conn)
+        refresh_search_index(conn)
         conn.commit()
 
         result['updated'] = len(stale)
@@ -582,7 +804,84 @@ def sync_customer_room_by_booking(booking_reference: str, room_number: str) -> D
         return result
 
 
-def reconcile_absent_guests(seen_ids, processed_count: int) -> Dict[str, Any]:
+def sync_customer_rooms_by_booking(pairs: List[tuple], conn) -> Dict[str, Any]:
+    """
+    Bulk version of sync_customer_room_by_booking() for a whole guest import.
+
+    Loads every interno customer anchored (via a current/future reservation)
+    to any of the booking references in one query, applies the pairs in
+    order in memory and writes the stale rooms with executemany. Does not
+    commit: runs inside the caller's transaction.
+
+    Args:
+        pairs: [(booking_reference, room_number), ...] in import order
+        conn: Database connection (open transaction)
+
+    Returns:
+        {'updated': n, 'changes': [{'customer_id', 'booking_reference',
+         'old_room', 'new_room'}, ...]}
+    """
+    result = {'updated': 0, 'changes': []}
+    pairs = [(ref, room) for ref, room in pairs if ref and room]
+    if not pairs:
+        return result
+
+    from utils.datetime_helpers import get_today
+    today = get_today().isoformat()
+
+    refs = sorted({ref for ref, _ in pairs})
+    placeholders = ','.join('?' * len(refs))
+    rows = conn.execute(f'''
+        SELECT DISTINCT r.booking_reference, c.id, c.room_number
+        FROM beach_customers c
+        JOIN beach_reservations r ON r.customer_id = c.id
+        WHERE c.customer_type = 'interno'
+          AND r.booking_reference IN ({placeholders})
+          AND r.end_date >= ?
+    ''', (*refs, today)).fetchall()
+
+    customers_by_ref = {}
+    current_room = {}
+    for row in rows:
+        customers_by_ref.setdefault(row['booking_reference'], []).append(row['id'])
+        current_room[row['id']] = row['room_number']
+
+    final = {}  # customer_id -> (room, booking_reference)
+    for ref, room in pairs:
+        for customer_id in customers_by_ref.get(ref, []):
+            old_room = current_room[customer_id]
+            if old_room and old_room == room:
+                continue
+            current_room[customer_id] = room
+            final[customer_id] = (room, ref)
+            result['changes'].append({
+                'customer_id': customer_id,
+                'booking_reference': ref,
+                'old_room': old_room,
+                'new_room': room
+            })
+
+    if final:
+        conn.executemany('''
+            UPDATE beach_customers
+            SET room_number = ?, booking_reference = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', [(room, ref, customer_id) for customer_id, (room, ref) in final.items()])
+        conn.executemany('''
+            INSERT INTO beach_room_changes
+            (customer_id, booking_reference, old_room, new_room, source)
+            VALUES (?, ?, ?, ?, 'sync')
+        ''', [
+            (ch['customer_id'], ch['booking_reference'], ch['old_room'], ch['new_room'])
+            for ch in result['changes'] if ch['old_room']  # skip first-assignment
+        ])
+
+    result['updated'] = len(final)
+    return result
+
+
+def reconcile_absent_guests(seen_ids, processed_count: int,
+                            candidate_ids=None) -> Dict[str, Any]:
     """
     After a full guest-list import, mark guests who were in-house but are ABSENT from
     the new report as checked out (their departure is set to today).
@@ -596,6 +895,9 @@ def reconcile_absent_guests(seen_ids, processed_count: int) -> Dict[str, Any]:
     reconciliation so it can never mass-check-out everyone. It also self-heals: a guest
     wrongly checked out reappears (and is restored) on the next complete import.
 
+    candidate_ids limits check-outs to those guests (incremental sync: the rows
+    removed since the previous report); None considers every in-house guest.
+
     Returns {'checked_out': n, 'skipped': bool, 'reason': str}.
     """
     from utils.datetime_helpers import get_today
@@ -616,6 +918,8 @@ def reconcile_absent_guests(seen_ids, processed_count: int) -> Dict[str, Any]:
                     'reason': f'import too small to reconcile safely ({processed_count} < {threshold})'}
         if not seen_ids:
             return {'checked_out': 0, 'skipped': True, 'reason': 'no guests seen'}
+        if candidate_ids is not None and not candidate_ids:
+            return {'checked_out': 0, 'skipped': False, 'reason': ''}
 
         # Candidates: guests marked in-house (departure >= today) who arrived BEFORE today
         # (so same-day arrivals not yet in the report are never touched) and were NOT in
@@ -624,11 +928,16 @@ def reconcile_absent_guests(seen_ids, processed_count: int) -> Dict[str, Any]:
         # the upsert restores its real departure date.
         seen = list(seen_ids)
         ph = ','.join('?' for _ in seen)
+        candidate_sql = ''
+        candidates = []
+        if candidate_ids is not None:
+            candidates = list(candidate_ids)
+            candidate_sql = f"AND id IN ({','.join('?' for _ in candidates)})"
         rows = cursor.execute(
             f"""SELECT id FROM hotel_guests
                 WHERE arrival_date < ? AND departure_date >= ?
-                  AND id NOT IN ({ph})""",
-            (today, today, *seen)
+                  AND id NOT IN ({ph}) {candidate_sql}""",
+            (today, today, *seen, *candidates)
         ).fetchall()
         ids = [r['id'] for r in rows]
         if ids:
@@ -654,6 +963,8 @@ def delete_hotel_guest(guest_id: int) -> bool:
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM hotel_guests WHERE id = ?', (guest_id,))
+        refresh_search_index(conn)
+        refresh_stay_markers(conn)
         conn.commit()
         return cursor.rowcount > 0
 
@@ -671,6 +982,8 @@ def delete_guests_by_source(source_file: str) -> int:
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM hotel_guests WHERE source_file = ?', (source_file,))
+        refresh_search_index(conn)
+        refresh_stay_markers(conn)
         conn.commit()
         return cursor.rowcount
 
@@ -895,6 +1208,10 @@ def log_room_change(customer_id: int, booking_reference: Optional[str],
             c.commit()
 
 
+# Booking keys loaded per IN (...) statement by the segment passes
+_SEGMENT_CHUNK = 400
+
+
 def booking_base(ref: Optional[str]) -> Optional[str]:
     """
     Return the stable BASE of a PMS reservation number.
@@ -910,7 +1227,53 @@ def booking_base(ref: Optional[str]) -> Optional[str]:
     return m.group(1) if m else ref
 
 
-def refresh_room_segments(conn=None) -> Dict[str, Any]:
+def _load_booking_segments(c, keys) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    Load the hotel_guests segments of the given booking bases in one pass.
+
+    Rows are grouped under their booking_base and under their own reference,
+    so a base also finds an unsuffixed booking with exactly that reference
+    (the old `ref = base OR ref LIKE base-%` lookup). Dates are ISO strings.
+    """
+    segments: Dict[str, List[Dict[str, Any]]] = {}
+    seen: Dict[str, set] = {}  # key -> identities already in its bucket
+    keys = [k for k in keys if k]
+    for start in range(0, len(keys), _SEGMENT_CHUNK):
+        chunk = keys[start:start + _SEGMENT_CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        rows = c.execute(f'''
+            SELECT booking_reference, booking_base, room_number, guest_name,
+                   arrival_date, departure_date
+            FROM hotel_guests
+            WHERE booking_base IN ({placeholders})
+               OR booking_reference IN ({placeholders})
+            ORDER BY id
+        ''', chunk + chunk).fetchall()
+        for row in rows:
+            seg = {
+                'booking_reference': row['booking_reference'],
+                'room_number': row['room_number'],
+                'guest_name': row['guest_name'],
+                'arrival': str(row['arrival_date']) if row['arrival_date'] else None,
+                'departure': str(row['departure_date']) if row['departure_date'] else None,
+            }
+            identity = (seg['booking_reference'], seg['room_number'], seg['guest_name'],
+                        seg['arrival'], seg['departure'])
+            for key in {row['booking_base'], row['booking_reference']}:
+                bucket_seen = seen.setdefault(key, set())
+                if identity not in bucket_seen:
+                    bucket_seen.add(identity)
+                    segments.setdefault(key, []).append(seg)
+    return segments
+
+
+def _segment_covers(seg: Dict[str, Any], on_date: str) -> bool:
+    """True if a loaded segment's stay covers on_date (YYYY-MM-DD)."""
+    return bool(seg['arrival'] and seg['departure']
+                and seg['arrival'] <= on_date <= seg['departure'])
+
+
+def refresh_room_segments(conn=None, booking_refs=None) -> Dict[str, Any]:
     """
     Post-import pass: follow PMS re-booking segments so rooms stay correct.
 
@@ -926,23 +1289,28 @@ def refresh_room_segments(conn=None) -> Dict[str, Any]:
     2. Updates the customer's room (and ref) to the segment covering TODAY — or,
        if the guest hasn't arrived yet, the next upcoming segment.
 
-    Idempotent and additive; runs after every guest import.
+    Set-based: the segments of every involved booking are loaded in one pass
+    (indexed hotel_guests.booking_base) and resolved in memory; updates are
+    applied with executemany.
+
+    Idempotent and additive; runs after every guest import. booking_refs limits
+    the pass to reservations of those bookings (any segment of the same base).
 
     Returns {'reanchored': n, 'rooms_updated': n, 'changes': [...]}.
     """
     from utils.datetime_helpers import get_today
     today = get_today().isoformat()
     summary = {'reanchored': 0, 'rooms_updated': 0, 'changes': []}
+    bases = None if booking_refs is None else {booking_base(r) for r in booking_refs if r}
 
-    def _own_covers(c, ref: str, on_date: str):
+    def _own_covers(segments, ref: str, on_date: str):
         """The anchored segment itself, if it covers on_date (then nothing to fix)."""
-        return c.execute('''
-            SELECT booking_reference, room_number FROM hotel_guests
-            WHERE booking_reference = ? AND arrival_date <= ? AND departure_date >= ?
-            LIMIT 1
-        ''', (ref, on_date, on_date)).fetchone()
+        for seg in segments.get(booking_base(ref), ()):
+            if seg['booking_reference'] == ref and _segment_covers(seg, on_date):
+                return seg
+        return None
 
-    def _sibling_segment(c, base: str, exclude_ref: str, on_date: str, guest_name: str):
+    def _sibling_segment(segments, base: str, exclude_ref: str, on_date: str, guest_name: str):
         """
         The sibling segment of `base` covering on_date, ONLY if unambiguous.
 
@@ -951,13 +1319,8 @@ def refresh_room_segments(conn=None) -> Dict[str, Any]:
         only follow a change when the anchored segment no longer covers the date AND
         exactly one sibling does — or the guest's name singles one out.
         """
-        rows = c.execute('''
-            SELECT DISTINCT booking_reference, room_number, guest_name
-            FROM hotel_guests
-            WHERE (booking_reference = ? OR booking_reference LIKE ?)
-              AND booking_reference != ?
-              AND arrival_date <= ? AND departure_date >= ?
-        ''', (base, base + '-%', exclude_ref, on_date, on_date)).fetchall()
+        rows = [seg for seg in segments.get(base, ())
+                if seg['booking_reference'] != exclude_ref and _segment_covers(seg, on_date)]
         refs = {r['booking_reference'] for r in rows}
         if len(refs) == 1:
             return rows[0]
@@ -971,7 +1334,8 @@ def refresh_room_segments(conn=None) -> Dict[str, Any]:
     def _run(c):
         rows = c.execute('''
             SELECT r.id AS rid, r.reservation_date, r.booking_reference AS ref,
-                   r.customer_id,
+                   r.customer_id, cu.room_number AS cust_room,
+                   cu.booking_reference AS cust_ref,
                    TRIM(cu.first_name || ' ' || COALESCE(cu.last_name, '')) AS cust_name
             FROM beach_reservations r
             JOIN beach_customers cu ON r.customer_id = cu.id
@@ -979,60 +1343,71 @@ def refresh_room_segments(conn=None) -> Dict[str, Any]:
               AND r.end_date >= ?
               AND r.booking_reference IS NOT NULL AND r.booking_reference != ''
         ''', (today,)).fetchall()
+        if bases is not None:
+            rows = [row for row in rows if booking_base(row['ref']) in bases]
+
+        customers = {}  # cust_id -> row (all scanned, for the room pass)
+        keys = set()
+        for row in rows:
+            customers.setdefault(row['customer_id'], row)
+            keys.add(booking_base(row['ref']))
+            if row['cust_ref']:
+                keys.add(booking_base(row['cust_ref']))
+        segments = _load_booking_segments(c, sorted(keys))
 
-        customers = {}  # cust_id -> cust_name (all scanned, for the room pass)
+        reanchors = []
         for row in rows:
-            customers.setdefault(row['customer_id'], row['cust_name'])
+            on_date = str(row['reservation_date'])
             # Anchor still valid for that date (covers multi-room families too).
-            if _own_covers(c, row['ref'], row['reservation_date']):
+            if _own_covers(segments, row['ref'], on_date):
                 continue
-            base = booking_base(row['ref'])
-            seg = _sibling_segment(c, base, row['ref'], row['reservation_date'], row['cust_name'])
+            seg = _sibling_segment(segments, booking_base(row['ref']), row['ref'],
+                                   on_date, row['cust_name'])
             if seg:
-                c.execute('''
-                    UPDATE beach_reservations
-                    SET booking_reference = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (seg['booking_reference'], row['rid']))
+                reanchors.append((seg['booking_reference'], row['rid']))
                 summary['reanchored'] += 1
                 summary['changes'].append({
                     'reservation_id': row['rid'],
                     'old_ref': row['ref'],
                     'new_ref': seg['booking_reference']
                 })
+        c.executemany('''
+            UPDATE beach_reservations
+            SET booking_reference = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', reanchors)
 
         # Customer pass: make each customer's room follow the segment covering TODAY.
-        for cust_id, cust_name in customers.items():
-            cur = c.execute('''
-                SELECT room_number, booking_reference FROM beach_customers WHERE id = ?
-            ''', (cust_id,)).fetchone()
-            if not cur or not cur['booking_reference']:
+        moves = []
+        for cust_id, cur in customers.items():
+            if not cur['cust_ref']:
                 continue
-            own = _own_covers(c, cur['booking_reference'], today)
+            own = _own_covers(segments, cur['cust_ref'], today)
             if own:
                 # Segment unchanged; per-row sync already handles same-ref room edits.
-                new_ref, new_room = cur['booking_reference'], own['room_number']
+                new_ref, new_room = cur['cust_ref'], own['room_number']
             else:
-                seg = _sibling_segment(c, booking_base(cur['booking_reference']),
-                                       cur['booking_reference'], today, cust_name)
+                seg = _sibling_segment(segments, booking_base(cur['cust_ref']),
+                                       cur['cust_ref'], today, cur['cust_name'])
                 if not seg:
                     continue
                 new_ref, new_room = seg['booking_reference'], seg['room_number']
-            if new_room and new_room != cur['room_number']:
-                c.execute('''
-                    UPDATE beach_customers
-                    SET room_number = ?, booking_reference = ?, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (new_room, new_ref, cust_id))
-                if cur['room_number']:
-                    log_room_change(cust_id, new_ref, cur['room_number'], new_room,
-                                    source='segment', conn=c)
+            if new_room and new_room != cur['cust_room']:
+                moves.append((new_room, new_ref, cust_id, cur['cust_room']))
                 summary['rooms_updated'] += 1
                 summary['changes'].append({
                     'customer_id': cust_id,
-                    'old_room': cur['room_number'],
+                    'old_room': cur['cust_room'],
                     'new_room': new_room
                 })
+        c.executemany('''
+            UPDATE beach_customers
+            SET room_number = ?, booking_reference = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', [move[:3] for move in moves])
+        for new_room, new_ref, cust_id, old_room in moves:
+            if old_room:
+                log_room_change(cust_id, new_ref, old_room, new_room, source='segment', conn=c)
 
     if conn is not None:
         _run(conn)
@@ -1043,7 +1418,7 @@ def refresh_room_segments(conn=None) -> Dict[str, Any]:
     return summary
 
 
-def refresh_guest_identity(conn=None) -> Dict[str, Any]:
+def refresh_guest_identity(conn=None, booking_refs=None) -> Dict[str, Any]:
     """
     Post-import pass: keep guest identity aligned with the ACTIVE occupants.
 
@@ -1059,41 +1434,56 @@ def refresh_guest_identity(conn=None) -> Dict[str, Any]:
        longer matches ANY active occupant of their anchored booking, to the
        active occupant of their room — only when that is unambiguous.
 
-    Idempotent; runs after every guest import.
+    Set-based: one windowed query picks the occupants to promote and one pass
+    loads the active occupants of every involved booking; updates are applied
+    with executemany.
+
+    Idempotent; runs after every guest import. booking_refs limits both steps to
+    those bookings (any segment of the same base).
 
     Returns {'mains_promoted': n, 'customers_renamed': n, 'changes': [...]}.
     """
     from utils.datetime_helpers import get_today
     today = get_today().isoformat()
     summary = {'mains_promoted': 0, 'customers_renamed': 0, 'changes': []}
+    bases = None if booking_refs is None else {booking_base(r) for r in booking_refs if r}
 
     def _run(c):
-        # 1) The main-guest flag must sit on an ACTIVE row of each (ref, room).
+        # 1) The main-guest flag must sit on an ACTIVE row of each (ref, room):
+        #    pick the first active occupant (adults first) of groups without one.
         groups = c.execute('''
-            SELECT booking_reference, room_number
-            FROM hotel_guests
-            WHERE departure_date >= ?
-              AND booking_reference IS NOT NULL AND booking_reference != ''
-            GROUP BY booking_reference, room_number
-            HAVING SUM(CASE WHEN is_main_guest = 1 THEN 1 ELSE 0 END) = 0
+            SELECT id, guest_name, booking_reference, room_number
+            FROM (
+                SELECT id, guest_name, booking_reference, room_number,
+                       ROW_NUMBER() OVER (
+                           PARTITION BY booking_reference, room_number
+                           ORDER BY (guest_type = 'AD') DESC, id ASC
+                       ) AS pick,
+                       MAX(CASE WHEN is_main_guest = 1 THEN 1 ELSE 0 END) OVER (
+                           PARTITION BY booking_reference, room_number
+                       ) AS has_main
+                FROM hotel_guests
+                WHERE departure_date >= ?
+                  AND booking_reference IS NOT NULL AND booking_reference != ''
+            )
+            WHERE pick = 1 AND has_main = 0
+            ORDER BY booking_reference, room_number
         ''', (today,)).fetchall()
+        promoted = []
         for g in groups:
-            row = c.execute('''
-                SELECT id, guest_name FROM hotel_guests
-                WHERE booking_reference = ? AND room_number = ? AND departure_date >= ?
-                ORDER BY (guest_type = 'AD') DESC, id ASC LIMIT 1
-            ''', (g['booking_reference'], g['room_number'], today)).fetchone()
-            if row:
-                c.execute('''
-                    UPDATE hotel_guests SET is_main_guest = 1, updated_at = CURRENT_TIMESTAMP
-                    WHERE id = ?
-                ''', (row['id'],))
-                summary['mains_promoted'] += 1
-                summary['changes'].append({
-                    'promoted_main': row['guest_name'],
-                    'booking_reference': g['booking_reference'],
-                    'room_number': g['room_number']
-                })
+            if bases is not None and booking_base(g['booking_reference']) not in bases:
+                continue
+            promoted.append((g['id'],))
+            summary['mains_promoted'] += 1
+            summary['changes'].append({
+                'promoted_main': g['guest_name'],
+                'booking_reference': g['booking_reference'],
+                'room_number': g['room_number']
+            })
+        c.executemany('''
+            UPDATE hotel_guests SET is_main_guest = 1, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', promoted)
 
         # 2) Rename customers stuck with a holder/stub name.
         custs = c.execute('''
@@ -1105,11 +1495,24 @@ def refresh_guest_identity(conn=None) -> Dict[str, Any]:
               AND r.end_date >= ?
               AND cu.booking_reference IS NOT NULL AND cu.booking_reference != ''
         ''', (today,)).fetchall()
+        if bases is not None:
+            custs = [cu for cu in custs if booking_base(cu['booking_reference']) in bases]
+
+        # Active occupants of every involved booking, loaded in one pass
+        active_by_ref: Dict[str, List[Any]] = {}
+        refs = sorted({cu['booking_reference'] for cu in custs})
+        for start in range(0, len(refs), _SEGMENT_CHUNK):
+            chunk = refs[start:start + _SEGMENT_CHUNK]
+            placeholders = ','.join('?' * len(chunk))
+            for a in c.execute(f'''
+                SELECT booking_reference, guest_name, room_number FROM hotel_guests
+                WHERE booking_reference IN ({placeholders}) AND departure_date >= ?
+            ''', chunk + [today]):
+                active_by_ref.setdefault(a['booking_reference'], []).append(a)
+
+        renames = []
         for cu in custs:
-            active = c.execute('''
-                SELECT guest_name, room_number FROM hotel_guests
-                WHERE booking_reference = ? AND departure_date >= ?
-            ''', (cu['booking_reference'], today)).fetchall()
+            active = active_by_ref.get(cu['booking_reference'])
             if not active:
                 continue
             old_name = f"{cu['first_name'] or ''} {cu['last_name'] or ''}".strip()
@@ -1124,11 +1527,7 @@ def refresh_guest_identity(conn=None) -> Dict[str, Any]:
             new_name = next(iter(in_room)).strip()
             # Same first/last split convention as create_customer_from_hotel_guest.
             parts = new_name.split(' ', 1)
-            c.execute('''
-                UPDATE beach_customers
-                SET first_name = ?, last_name = ?, updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (parts[0], parts[1] if len(parts) > 1 else '', cu['id']))
+            renames.append((parts[0], parts[1] if len(parts) > 1 else '', cu['id']))
             summary['customers_renamed'] += 1
             summary['changes'].append({
                 'customer_id': cu['id'],
@@ -1136,6 +1535,11 @@ def refresh_guest_identity(conn=None) -> Dict[str, Any]:
                 'new_name': new_name,
                 'room_number': cu['room_number']
             })
+        c.executemany('''
+            UPDATE beach_customers
+            SET first_name = ?, last_name = ?, updated_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        ''', renames)
 
     if conn is not None:
         _run(conn)
@@ -1144,3 +1548,33 @@ def refresh_guest_identity(conn=None) -> Dict[str, Any]:
             _run(c)
             c.commit()
     return summary
+
+
+def get_bookings_with_boundaries(since: str, until: str) -> List[str]:
+    """
+    Booking references with a segment arrival or departure in [since, until].
+
+    The segment and identity passes resolve against TODAY, so a booking whose
+    PMS rows did not change still needs them once one of its segments starts
+    or ends: the customer moves to the next room, a departed occupant loses
+    the main-guest flag. Incremental syncs add these bookings to the ones
+    touched by the row diff.
+
+    Args:
+        since: First day of the window (YYYY-MM-DD), usually the last sync date
+        until: Last day of the window (YYYY-MM-DD), usually today
+
+    Returns:
+        Distinct booking references
+    """
+    with get_db() as conn:
+        rows = conn.execute('''
+            SELECT booking_reference FROM hotel_guests
+            WHERE arrival_date BETWEEN ? AND ?
+              AND booking_reference IS NOT NULL AND booking_reference != ''
+            UNION
+            SELECT booking_reference FROM hotel_guests
+            WHERE departure_date BETWEEN ? AND ?
+              AND booking_reference IS NOT NULL AND booking_reference != ''
+        ''', (since, until, since, until)).fetchall()
+    return [row['booking_reference'] for row in rows]
@@ -16,7 +16,8 @@ def save_import_log(
     updated_count: int,
     errors: list,
     room_changes: list,
-    imported_by: Optional[int] = None
+    imported_by: Optional[int] = None,
+    timings: Optional[dict] = None
 ) -> int:
     """
     Save an import result to the log.
@@ -30,6 +31,7 @@ def save_import_log(
         errors: List of error strings
         room_changes: List of room change dicts
         imported_by: User ID who triggered the import
+        timings: Optional per-phase durations in ms ({phase: ms})
 
     Returns:
         int: ID of the created log entry
@@ -38,8 +40,9 @@ def save_import_log(
     cursor = db.execute('''
         INSERT INTO beach_import_log
         (import_type, source_file, total_records, created_count,
-         updated_count, error_count, errors_json, room_changes_json, imported_by)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+         updated_count, error_count, errors_json, room_changes_json, imported_by,
+         timings_json)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
     ''', (
         import_type,
         source_file,
@@ -49,7 +52,8 @@ def save_import_log(
         len(errors),
         json.dumps(errors, ensure_ascii=False) if errors else None,
         json.dumps(room_changes, ensure_ascii=False) if room_changes else None,
-        imported_by
+        imported_by,
+        json.dumps(timings) if timings else None
     ))
     db.commit()
     return cursor.lastrowid
@@ -90,6 +94,8 @@ def get_last_import(import_type: str = 'hotel_guests') -> Optional[Dict[str, Any
     else:
         result['room_changes'] = []
 
+    result['timings'] = json.loads(result['timings_json']) if result.get('timings_json') else {}
+
     return result
 
 
@@ -122,6 +128,7 @@ def get_import_log_list(
         entry = dict(row)
         entry['errors'] = json.loads(entry['errors_json']) if entry.get('errors_json') else []
         entry['room_changes'] = json.loads(entry['room_changes_json']) if entry.get('room_changes_json') else []
+        entry['timings'] = json.loads(entry['timings_json']) if entry.get('timings_json') else {}
         results.append(entry)
 
     return results
@@ -15,6 +15,7 @@ from models.insights.occupancy import (
     get_occupancy_by_zone,
     get_pending_checkins_count,
     get_occupancy_comparison,
+    get_today_snapshot,
     get_occupancy_range,
     get_occupancy_stats,
 )
@@ -49,6 +50,7 @@ __all__ = [
     'get_occupancy_by_zone',
     'get_pending_checkins_count',
     'get_occupancy_comparison',
+    'get_today_snapshot',
     'get_occupancy_range',
     'get_occupancy_stats',
     # Revenue
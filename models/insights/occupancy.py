@@ -3,10 +3,19 @@ Occupancy analytics queries.
 Dashboard metrics and occupancy range analytics.
 """
 
+import copy
 from database import get_db
 from datetime import timedelta
 from typing import Optional
+from utils.cache import cached_for
 from utils.datetime_helpers import get_today
+from models.furniture_type import get_all_furniture_types
+from models.map_revision import get_map_revision
+from models.zone import get_all_zones
+from models.insights.rollup import split_range, rollup_totals, rollup_occupied_by_day
+
+# Seconds a dashboard snapshot is reused while the map revision is unchanged
+TODAY_SNAPSHOT_TTL = 30
 
 
 # =============================================================================
@@ -243,6 +252,132 @@ def _get_occupancy_for_date(target_date: str) -> dict:
         return {'occupied': occupied, 'total': total, 'rate': rate}
 
 
+def get_today_snapshot() -> dict:
+    """
+    Get every "today" dashboard KPI in one pass.
+
+    Same payload as get_occupancy_today, get_occupancy_comparison,
+    get_pending_checkins_count and get_occupancy_by_zone together, built from
+    two queries on one connection. Snapshots are reused for
+    TODAY_SNAPSHOT_TTL seconds and keyed by the map revision of yesterday and
+    today, so any reservation or furniture change is seen on the next call.
+
+    Returns:
+        dict with keys:
+            - occupancy: dict (as get_occupancy_today)
+            - comparison: dict (as get_occupancy_comparison)
+            - pending_checkins: int
+            - zones: list (as get_occupancy_by_zone)
+    """
+    today = get_today()
+    yesterday = (today - timedelta(days=1)).isoformat()
+    today = today.isoformat()
+
+    revision = get_map_revision(yesterday, today)
+    snapshot = cached_for(TODAY_SNAPSHOT_TTL, 'insights_today', (today, revision),
+                          lambda: _build_today_snapshot(today, yesterday))
+    return copy.deepcopy(snapshot)
+
+
+def _build_today_snapshot(today: str, yesterday: str) -> dict:
+    """Compute the dashboard snapshot (cache loader for get_today_snapshot)."""
+    with get_db() as conn:
+        # Furniture per zone/type with its occupancy today and yesterday.
+        # Inactive furniture is grouped apart: it counts as occupied, not in totals
+        cursor = conn.execute('''
+            WITH occupied AS (
+                SELECT rf.furniture_id,
+                       MAX(rf.assignment_date = :today) AS today,
+                       MAX(rf.assignment_date = :yesterday) AS yesterday
+                FROM beach_reservation_furniture rf
+                JOIN beach_reservations r ON rf.reservation_id = r.id
+                LEFT JOIN beach_reservation_states s ON r.current_state = s.name
+                WHERE rf.assignment_date IN (:today, :yesterday)
+                  AND (s.is_availability_releasing = 0 OR s.is_availability_releasing IS NULL)
+                GROUP BY rf.furniture_id
+            )
+            SELECT f.active, f.zone_id, f.furniture_type,
+                   COUNT(*) AS total,
+                   COALESCE(SUM(o.today), 0) AS occupied_today,
+                   COALESCE(SUM(o.yesterday), 0) AS occupied_yesterday
+            FROM beach_furniture f
+            LEFT JOIN occupied o ON o.furniture_id = f.id
+            GROUP BY f.active, f.zone_id, f.furniture_type
+        ''', {'today': today, 'yesterday': yesterday})
+        groups = cursor.fetchall()
+
+        cursor = conn.execute('''
+            SELECT COUNT(DISTINCT r.id)
+            FROM beach_reservations r
+            JOIN beach_reservation_states s ON r.current_state = s.name
+            WHERE r.start_date <= ?
+              AND r.end_date >= ?
+              AND s.code IN ('pendiente', 'confirmada')
+        ''', (today, today))
+        pending = cursor.fetchone()[0]
+
+    total = occupied = occupied_yesterday = 0
+    by_type_counts = {}
+    by_zone_counts = {}
+    for row in groups:
+        occupied += row['occupied_today']
+        occupied_yesterday += row['occupied_yesterday']
+        if not row['active']:
+            continue
+        total += row['total']
+        for counts, key in ((by_type_counts, row['furniture_type']),
+                            (by_zone_counts, row['zone_id'])):
+            entry = counts.setdefault(key, [0, 0])
+            entry[0] += row['total']
+            entry[1] += row['occupied_today']
+
+    if total == 0:
+        occupied = occupied_yesterday = 0
+
+    by_type = {}
+    if total > 0:
+        for ft in get_all_furniture_types():
+            type_total, type_occupied = by_type_counts.get(ft['type_code'], (0, 0))
+            by_type[ft['type_code']] = {
+                'name': ft['display_name'],
+                'total': type_total,
+                'occupied': type_occupied,
+                'free': type_total - type_occupied
+            }
+
+    zones = []
+    for zone in get_all_zones():
+        zone_total, zone_occupied = by_zone_counts.get(zone['id'], (0, 0))
+        zones.append({
+            'zone_id': zone['id'],
+            'zone_name': zone['name'],
+            'total': zone_total,
+            'occupied': zone_occupied,
+            'rate': round((zone_occupied / zone_total) * 100, 1) if zone_total > 0 else 0.0
+        })
+
+    rate = round((occupied / total) * 100, 1) if total > 0 else 0.0
+    yesterday_rate = round((occupied_yesterday / total) * 100, 1) if total > 0 else 0.0
+    difference = round(rate - yesterday_rate, 1)
+
+    return {
+        'occupancy': {
+            'occupied': occupied,
+            'total': total,
+            'rate': rate,
+            'by_type': by_type
+        },
+        'comparison': {
+            'today_rate': rate,
+            'yesterday_rate': yesterday_rate,
+            'difference': difference,
+            'trend': 'up' if difference > 0 else 'down' if difference < 0 else 'same'
+        },
+        'pending_checkins': pending,
+        'zones': zones
+    }
+
+
 # =============================================================================
 # ADVANCED ANALYTICS - OCCUPANCY
 # =============================================================================
@@ -250,6 +385,7 @@ def _get_occupancy_for_date(target_date: str) -> dict:
 def get_occupancy_range(start_date: str, end_date: str) -> list:
     """
     Get daily occupancy for a date range.
+    Days before today come from the daily rollup; today onwards is live.
 
     Args:
         start_date: Start date (YYYY-MM-DD)
@@ -260,6 +396,8 @@ def get_occupancy_range(start_date: str, end_date: str) -> list:
     """
     from datetime import datetime
 
+    rolled, live = split_range(start_date, end_date)
+
     with get_db() as conn:
         # Get total active furniture (constant for all days)
         total_cursor = conn.execute('''
@@ -271,20 +409,26 @@ def get_occupancy_range(start_date: str, end_date: str) -> list:
         start = datetime.strptime(start_date, '%Y-%m-%d').date()
         end = datetime.strptime(end_date, '%Y-%m-%d').date()
 
-        # Get occupied counts for the range
-        occupied_cursor = conn.execute('''
-            SELECT
-                rf.assignment_date,
-                COUNT(DISTINCT rf.furniture_id) as occupied
-            FROM beach_reservation_furniture rf
-            JOIN beach_reservations r ON rf.reservation_id = r.id
-            LEFT JOIN beach_reservation_states s ON r.current_state = s.name
-            WHERE rf.assignment_date BETWEEN ? AND ?
-              AND (s.is_availability_releasing = 0 OR s.is_availability_releasing IS NULL)
-            GROUP BY rf.assignment_date
-        ''', (start_date, end_date))
-
-        occupied_by_date = {row[0]: row[1] for row in occupied_cursor}
+        occupied_by_date = {}
+        if rolled:
+            occupied_by_date.update(rollup_occupied_by_day(conn, *rolled))
+
+        if live:
+            # Get occupied counts for the live part of the range
+            occupied_cursor = conn.execute('''
+                SELECT
+                    rf.assignment_date,
+                    COUNT(DISTINCT rf.furniture_id) as occupied
+                FROM beach_reservation_furniture rf
+                JOIN beach_reservations r ON rf.reservation_id = r.id
+                LEFT JOIN beach_reservation_states s ON r.current_state = s.name
+                WHERE rf.assignment_date BETWEEN ? AND ?
+                  AND (s.is_availability_releasing = 0 OR s.is_availability_releasing IS NULL)
+                GROUP BY rf.assignment_date
+            ''', live)
+
+            # assignment_date comes back as a date object: key by ISO string
+            occupied_by_date.update({str(row[0]): row[1] for row in occupied_cursor})
 
         # Build result for each day
         results = []
@@ -308,6 +452,7 @@ def get_occupancy_range(start_date: str, end_date: str) -> list:
 def get_occupancy_stats(start_date: str, end_date: str) -> dict:
     """
     Get summary occupancy statistics for a date range.
+    Days before today come from the daily rollup; today onwards is live.
 
     Args:
         start_date: Start date (YYYY-MM-DD)
@@ -327,33 +472,41 @@ def get_occupancy_stats(start_date: str, end_date: str) -> dict:
             sum(d['rate'] for d in daily_data) / len(daily_data), 1
         )
 
-    with get_db() as conn:
-        # Total reservations (non-releasing states)
-        res_cursor = conn.execute('''
-            SELECT COUNT(DISTINCT r.id)
-            FROM beach_reservations r
-            LEFT JOIN beach_reservation_states s ON r.current_state = s.name
-            WHERE r.start_date BETWEEN ? AND ?
-              AND (s.is_availability_releasing = 0 OR s.is_availability_releasing IS NULL)
-        ''', (start_date, end_date))
-        total_reservations = res_cursor.fetchone()[0]
+    rolled, live = split_range(start_date, end_date)
 
-        # No-show count
-        noshow_cursor = conn.execute('''
-            SELECT COUNT(DISTINCT r.id)
-            FROM beach_reservations r
-            JOIN beach_reservation_states s ON r.current_state = s.name
-            WHERE r.start_date BETWEEN ? AND ?
-              AND s.code = 'no_show'
-        ''', (start_date, end_date))
-        noshow_count = noshow_cursor.fetchone()[0]
-
-        # Total for rate calculation (including no-shows)
-        total_for_rate = conn.execute('''
-            SELECT COUNT(DISTINCT r.id)
-            FROM beach_reservations r
-            WHERE r.start_date BETWEEN ? AND ?
-        ''', (start_date, end_date)).fetchone()[0]
+    with get_db() as conn:
+        totals = rollup_totals(conn, *rolled) if rolled else {}
+        total_reservations = totals.get('reservations', 0)
+        noshow_count = totals.get('noshows', 0)
+        total_for_rate = totals.get('all_reservations', 0)
+
+        if live:
+            # Total reservations (non-releasing states)
+            res_cursor = conn.execute('''
+                SELECT COUNT(DISTINCT r.id)
+                FROM beach_reservations r
+                LEFT JOIN beach_reservation_states s ON r.current_state = s.name
+                WHERE r.start_date BETWEEN ? AND ?
+                  AND (s.is_availability_releasing = 0 OR s.is_availability_releasing IS NULL)
+            ''', live)
+            total_reservations += res_cursor.fetchone()[0]
+
+            # No-show count
+            noshow_cursor = conn.execute('''
+                SELECT COUNT(DISTINCT r.id)
+                FROM beach_reservations r
+                JOIN beach_reservation_states s ON r.current_state = s.name
+                WHERE r.start_date BETWEEN ? AND ?
+                  AND s.code = 'noshow'
+            ''', live)
+            noshow_count += noshow_cursor.fetchone()[0]
+
+            # Total for rate calculation (including no-shows)
+            total_for_rate += conn.execute('''
+                SELECT COUNT(DISTINCT r.id)
+                FROM beach_reservations r
+                WHERE r.start_date BETWEEN ? AND ?
+            ''', live).fetchone()[0]
 
         noshow_rate = 0.0
         if total_for_rate > 0:
@@ -4,6 +4,7 @@ Lead time, day-of-week, and cancellation pattern analytics.
 """
 
 from database import get_db
+from models.insights.rollup import split_range, rollup_totals
 
 
 # =============================================================================
@@ -13,6 +14,7 @@ from database import get_db
 def get_pattern_stats(start_date: str, end_date: str) -> dict:
     """
     Get booking pattern statistics for a date range.
+    Days before today come from the daily rollup; today onwards is live.
 
     Args:
         start_date: Start date (YYYY-MM-DD)
@@ -27,14 +29,32 @@ def get_pattern_stats(start_date: str, end_date: str) -> dict:
             - cancellation_count: int
             - noshow_count: int
     """
+    rolled, live = split_range(start_date, end_date)
+
     with get_db() as conn:
-        # Total reservations in range
-        total_cursor = conn.execute('''
-            SELECT COUNT(*)
-            FROM beach_reservations r
-            WHERE r.start_date BETWEEN ? AND ?
-        ''', (start_date, end_date))
-        total_count = total_cursor.fetchone()[0]
+        totals = rollup_totals(conn, *rolled) if rolled else {}
+        total_count = totals.get('all_reservations', 0)
+        lead_time_days = totals.get('lead_time_days', 0)
+        cancel_count = totals.get('cancellations', 0)
+        noshow_count = totals.get('noshows', 0)
+
+        if live:
+            # Totals, lead time (days between created_at and start_date),
+            # cancellations and no-shows in one pass
+            row = conn.execute('''
+                SELECT
+                    COUNT(*),
+                    COALESCE(SUM(JULIANDAY(r.start_date) - JULIANDAY(DATE(r.created_at))), 0),
+                    COALESCE(SUM(CASE WHEN s.code = 'cancelada' THEN 1 ELSE 0 END), 0),
+                    COALESCE(SUM(CASE WHEN s.code = 'noshow' THEN 1 ELSE 0 END), 0)
+                FROM beach_reservations r
+                LEFT JOIN beach_reservation_states s ON r.current_state = s.name
+                WHERE r.start_date BETWEEN ? AND ?
+            ''', live).fetchone()
+            total_count += row[0]
+            lead_time_days += row[1]
+            cancel_count += row[2]
+            noshow_count += row[3]
 
         if total_count == 0:
             return {
@@ -46,35 +66,7 @@ def get_pattern_stats(start_date: str, end_date: str) -> dict:
                 'noshow_count': 0
             }
 
-        # Average lead time (days between created_at and start_date)
-        lead_time_cursor = conn.execute('''
-            SELECT AVG(JULIANDAY(r.start_date) - JULIANDAY(DATE(r.created_at)))
-            FROM beach_reservations r
-            WHERE r.start_date BETWEEN ? AND ?
-        ''', (start_date, end_date))
-        avg_lead_time = lead_time_cursor.fetchone()[0]
-        avg_lead_time = round(float(avg_lead_time), 1) if avg_lead_time else 0.0
-
-        # Cancellation count
-        cancel_cursor = conn.execute('''
-            SELECT COUNT(*)
-            FROM beach_reservations r
-            JOIN beach_reservation_states s ON r.current_state = s.name
-            WHERE r.start_date BETWEEN ? AND ?
-              AND s.code = 'cancelada'
-        ''', (start_date, end_date))
-        cancel_count = cancel_cursor.fetchone()[0]
-
-        # No-show count
-        noshow_cursor = conn.execute('''
-            SELECT COUNT(*)
-            FROM beach_reservations r
-            JOIN beach_reservation_states s ON r.current_state = s.name
-            WHERE r.start_date BETWEEN ? AND ?
-              AND s.code = 'noshow'
-        ''', (start_date, end_date))
-        noshow_count = noshow_cursor.fetchone()[0]
-
+        avg_lead_time = round(float(lead_time_days) / total_count, 1)
         cancellation_rate = round((cancel_count / total_count) * 100, 1)
         noshow_rate = round((noshow_count / total_count) * 100, 1)
 
@@ -4,6 +4,7 @@ Revenue statistics and breakdown analytics.
 """
 
 from database import get_db
+from models.insights.rollup import split_range, rollup_totals
 
 
 # =============================================================================
@@ -14,6 +15,7 @@ def get_revenue_stats(start_date: str, end_date: str) -> dict:
     """
     Get revenue statistics for a date range.
     Includes all non-cancelled reservations with a final_price.
+    Days before today come from the daily rollup; today onwards is live.
 
     Args:
         start_date: Start date (YYYY-MM-DD)
@@ -25,21 +27,28 @@ def get_revenue_stats(start_date: str, end_date: str) -> dict:
             - paid_reservations: int
             - avg_per_reservation: float
     """
-    with get_db() as conn:
-        cursor = conn.execute('''
-            SELECT
-                COALESCE(SUM(r.final_price), 0) as total_revenue,
-                COUNT(*) as paid_reservations
-            FROM beach_reservations r
-            LEFT JOIN beach_reservation_states s ON r.current_state = s.name
-            WHERE r.start_date BETWEEN ? AND ?
-              AND r.final_price > 0
-              AND (s.is_availability_releasing = 0 OR s.is_availability_releasing IS NULL)
-        ''', (start_date, end_date))
+    rolled, live = split_range(start_date, end_date)
 
-        row = cursor.fetchone()
-        total_revenue = float(row[0] or 0)
-        paid_reservations = row[1] or 0
+    with get_db() as conn:
+        totals = rollup_totals(conn, *rolled) if rolled else {}
+        total_revenue = float(totals.get('revenue', 0))
+        paid_reservations = totals.get('paid_reservations', 0)
+
+        if live:
+            cursor = conn.execute('''
+                SELECT
+                    COALESCE(SUM(r.final_price), 0) as total_revenue,
+                    COUNT(*) as paid_reservations
+                FROM beach_reservations r
+                LEFT JOIN beach_reservation_states s ON r.current_state = s.name
+                WHERE r.start_date BETWEEN ? AND ?
+                  AND r.final_price > 0
+                  AND (s.is_availability_releasing = 0 OR s.is_availability_releasing IS NULL)
+            ''', live)
+
+            row = cursor.fetchone()
+            total_revenue += float(row[0] or 0)
+            paid_reservations += row[1] or 0
 
         avg_per_reservation = 0.0
         if paid_reservations > 0:
@@ -0,0 +1,229 @@
+"""
+Daily insights rollup.
+Maintains beach_daily_rollup (see database/migrations/daily_rollup.py) and
+splits insights date ranges into a rolled-up past and a live present.
+
+Past days are final enough to materialise: triggers queue every day touched
+by a write, and refresh_daily_rollup() recomputes the queued days that are
+older than today. Today and future days are always computed live.
+"""
+
+from datetime import timedelta
+from typing import Optional, Tuple
+
+from database import get_db
+from database.connection import try_begin_immediate
+from utils.datetime_helpers import get_today
+
+# Non-releasing (occupying) state condition, as in the live insights queries
+_OCCUPYING = '(s.is_availability_releasing = 0 OR s.is_availability_releasing IS NULL)'
+
+_ROLLUP_INSERT = f'''
+    INSERT INTO beach_daily_rollup (
+        day, zone_id, furniture_type, customer_type, occupied_units,
+        reservations, all_reservations, paid_reservations, people, revenue,
+        cancellations, noshows, lead_time_days
+    )
+    SELECT day, zone_id, furniture_type, customer_type, SUM(occupied_units),
+           SUM(reservations), SUM(all_reservations), SUM(paid_reservations),
+           SUM(people), SUM(revenue), SUM(cancellations), SUM(noshows),
+           SUM(lead_time_days)
+    FROM (
+        -- Occupancy: furniture held by occupying reservations, per assignment day
+        SELECT rf.assignment_date AS day,
+               COALESCE(f.zone_id, 0) AS zone_id,
+               COALESCE(f.furniture_type, '') AS furniture_type,
+               COALESCE(c.customer_type, '') AS customer_type,
+               COUNT(DISTINCT rf.furniture_id) AS occupied_units,
+               0 AS reservations, 0 AS all_reservations, 0 AS paid_reservations,
+               0 AS people, 0 AS revenue, 0 AS cancellations, 0 AS noshows,
+               0 AS lead_time_days
+        FROM beach_daily_rollup_dirty d
+        JOIN beach_reservation_furniture rf ON rf.assignment_date = d.day
+        JOIN beach_reservations r ON rf.reservation_id = r.id
+        LEFT JOIN beach_reservation_states s ON r.current_state = s.name
+        LEFT JOIN beach_furniture f ON rf.furniture_id = f.id
+        LEFT JOIN beach_customers c ON r.customer_id = c.id
+        WHERE d.day < :today AND {_OCCUPYING}
+        GROUP BY 1, 2, 3, 4
+
+        UNION ALL
+
+        -- Reservations: counted on their start day, under their first furniture
+        SELECT r.start_date,
+               COALESCE(f.zone_id, 0),
+               COALESCE(f.furniture_type, ''),
+               COALESCE(c.customer_type, ''),
+               0,
+               SUM(CASE WHEN {_OCCUPYING} THEN 1 ELSE 0 END),
+               COUNT(*),
+               SUM(CASE WHEN {_OCCUPYING} AND r.final_price > 0 THEN 1 ELSE 0 END),
+               SUM(CASE WHEN {_OCCUPYING} THEN COALESCE(r.num_people, 0) ELSE 0 END),
+               SUM(CASE WHEN {_OCCUPYING} AND r.final_price > 0 THEN r.final_price ELSE 0 END),
+               SUM(CASE WHEN s.code = 'cancelada' THEN 1 ELSE 0 END),
+               SUM(CASE WHEN s.code = 'noshow' THEN 1 ELSE 0 END),
+               COALESCE(SUM(JULIANDAY(r.start_date) - JULIANDAY(DATE(r.created_at))), 0)
+        FROM beach_daily_rollup_dirty d
+        JOIN beach_reservations r ON r.start_date = d.day
+        LEFT JOIN beach_reservation_states s ON r.current_state = s.name
+        LEFT JOIN beach_customers c ON r.customer_id = c.id
+        LEFT JOIN beach_furniture f ON f.id = (
+            SELECT MIN(rf.furniture_id) FROM beach_reservation_furniture rf
+            WHERE rf.reservation_id = r.id AND rf.assignment_date = r.start_date
+        )
+        WHERE d.day < :today
+        GROUP BY 1, 2, 3, 4
+    )
+    GROUP BY day, zone_id, furniture_type, customer_type
+'''
+
+
+def refresh_daily_rollup(conn=None, wait: bool = True) -> int:
+    """
+    Recompute the queued days that are older than today.
+
+    Cheap when nothing past is queued (one index probe), so insights call it
+    with wait=False before reading the rollup: if the write lock is busy they
+    serve the last rollup and leave the queued days for a later refresh.
+    Today's and future days stay queued until they are in the past.
+
+    Args:
+        conn: Existing connection (joins its transaction); None opens one
+        wait: When opening its own transaction, wait for the write lock
+              (False = skip the refresh if the lock is busy)
+
+    Returns:
+        Number of days recomputed
+    """
+    today = get_today().isoformat()
+
+    def _flush(db) -> int:
+        cursor = db.cursor()
+        cursor.execute('SELECT 1 FROM beach_daily_rollup_dirty WHERE day < ? LIMIT 1', (today,))
+        if cursor.fetchone() is None:
+            return 0
+
+        own_transaction = not db.in_transaction
+        if own_transaction:
+            if wait:
+                cursor.execute('BEGIN IMMEDIATE')
+            elif not try_begin_immediate(db):
+                return 0
+        try:
+            cursor.execute('''
+                DELETE FROM beach_daily_rollup
+                WHERE day IN (SELECT day FROM beach_daily_rollup_dirty WHERE day < ?)
+            ''', (today,))
+            cursor.execute(_ROLLUP_INSERT, {'today': today})
+            cursor.execute('DELETE FROM beach_daily_rollup_dirty WHERE day < ?', (today,))
+            days = cursor.rowcount
+            if own_transaction:
+                db.commit()
+            return days
+        except Exception:
+            if own_transaction:
+                db.rollback()
+            raise
+
+    if conn is not None:
+        return _flush(conn)
+    with get_db() as db:
+        return _flush(db)
+
+
+def rebuild_daily_rollup() -> int:
+    """
+    Rebuild the rollup for every past reservation day (backfill/repair path).
+
+    Returns:
+        Number of days recomputed
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            cursor.execute('DELETE FROM beach_daily_rollup')
+            cursor.execute('''
+                INSERT OR IGNORE INTO beach_daily_rollup_dirty (day)
+                SELECT start_date FROM beach_reservations WHERE start_date IS NOT NULL
+                UNION SELECT assignment_date FROM beach_reservation_furniture
+            ''')
+            days = refresh_daily_rollup(conn)
+            conn.commit()
+            return days
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def split_range(start_date: str, end_date: str) -> Tuple[Optional[Tuple[str, str]],
+                                                          Optional[Tuple[str, str]]]:
+    """
+    Split an insights date range into its rolled-up past and its live part.
+
+    Args:
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD)
+
+    Returns:
+        tuple: ((start, end) served from the rollup or None,
+                (start, end) computed live or None)
+    """
+    today = get_today()
+    yesterday = (today - timedelta(days=1)).isoformat()
+    today = today.isoformat()
+
+    rolled = (start_date, min(end_date, yesterday)) if start_date <= yesterday else None
+    live = (max(start_date, today), end_date) if end_date >= today else None
+    return rolled, live
+
+
+def rollup_totals(conn, start_date: str, end_date: str) -> dict:
+    """
+    Sum the rollup measures over a past date range (refreshing it first if
+    the write lock is free).
+
+    Args:
+        conn: Database connection
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD), before today
+
+    Returns:
+        dict of measure -> total
+    """
+    refresh_daily_rollup(conn, wait=False)
+    row = conn.execute('''
+        SELECT COALESCE(SUM(reservations), 0) AS reservations,
+               COALESCE(SUM(all_reservations), 0) AS all_reservations,
+               COALESCE(SUM(paid_reservations), 0) AS paid_reservations,
+               COALESCE(SUM(people), 0) AS people,
+               COALESCE(SUM(revenue), 0) AS revenue,
+               COALESCE(SUM(cancellations), 0) AS cancellations,
+               COALESCE(SUM(noshows), 0) AS noshows,
+               COALESCE(SUM(lead_time_days), 0) AS lead_time_days
+        FROM beach_daily_rollup
+        WHERE day BETWEEN ? AND ?
+    ''', (start_date, end_date)).fetchone()
+    return dict(row)
+
+
+def rollup_occupied_by_day(conn, start_date: str, end_date: str) -> dict:
+    """
+    Occupied furniture per past day from the rollup (refreshing it first if
+    the write lock is free).
+
+    Args:
+        conn: Database connection
+        start_date: Start date (YYYY-MM-DD)
+        end_date: End date (YYYY-MM-DD), before today
+
+    Returns:
+        dict: {'YYYY-MM-DD': occupied units}
+    """
+    refresh_daily_rollup(conn, wait=False)
+    cursor = conn.execute('''
+        SELECT day, SUM(occupied_units) FROM beach_daily_rollup
+        WHERE day BETWEEN ? AND ?
+        GROUP BY day
+    ''', (start_date, end_date))
+    return {str(row[0]): row[1] for row in cursor}
@@ -0,0 +1,103 @@
+"""
+Map revision data access functions.
+Per-date revision numbers for the beach map, used for conditional (ETag)
+and incremental (?since=) map polling.
+
+Revisions are the ids of beach_map_changes rows, which are written by the
+triggers installed in database/migrations/map_revision.py. A date's revision
+is the newest change whose date range covers it, so it only ever grows.
+"""
+
+from datetime import timedelta
+from typing import Optional, Set, Tuple
+
+from database import get_db
+from utils.datetime_helpers import get_today
+
+
+def get_map_revision(target_date: str, until_date: Optional[str] = None) -> int:
+    """
+    Get the current map revision for a date (or for a span of dates).
+
+    Args:
+        target_date: Date string YYYY-MM-DD
+        until_date: Optional last date YYYY-MM-DD; the revision then covers
+            every date from target_date to until_date
+
+    Returns:
+        Revision number (0 if nothing was ever recorded for the date)
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT COALESCE(MAX(id), 0) AS revision
+            FROM beach_map_changes
+            WHERE date_to >= ? AND date_from <= ?
+        ''', (target_date, until_date or target_date))
+        return cursor.fetchone()['revision']
+
+
+def get_map_changes_since(target_date: str, since: int) -> Tuple[Set[int], bool]:
+    """
+    Get the furniture that changed on a date after a given revision.
+
+    Args:
+        target_date: Date string YYYY-MM-DD
+        since: Revision the client already has
+
+    Returns:
+        tuple: (changed furniture IDs, full_reload) - full_reload is True when
+        a change affects the whole map (zones, types, states, config, hotel
+        stays) and the delta cannot be expressed per furniture piece.
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT DISTINCT furniture_id
+            FROM beach_map_changes
+            WHERE id > ? AND date_to >= ? AND date_from <= ?
+        ''', (since, target_date, target_date))
+
+        changed = set()
+        full_reload = False
+        for row in cursor.fetchall():
+            if row['furniture_id'] is None:
+                full_reload = True
+            else:
+                changed.add(row['furniture_id'])
+        return changed, full_reload
+
+
+def build_map_etag(target_date: str, revision: int) -> str:
+    """
+    Build the ETag value for a map payload.
+
+    Args:
+        target_date: Date string YYYY-MM-DD
+        revision: Map revision for the date
+
+    Returns:
+        Opaque ETag value (without quotes)
+    """
+    return f'map-{target_date}-{revision}'
+
+
+def prune_map_changes(keep_days: int = 7, before_date: Optional[str] = None) -> int:
+    """
+    Delete change rows that only cover dates older than the retention window.
+
+    Args:
+        keep_days: Days of history to keep before today
+        before_date: Explicit cutoff date YYYY-MM-DD (overrides keep_days)
+
+    Returns:
+        Number of rows deleted
+    """
+    if before_date is None:
+        before_date = (get_today() - timedelta(days=keep_days)).strftime('%Y-%m-%d')
+
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('DELETE FROM beach_map_changes WHERE date_to < ?', (before_date,))
+        conn.commit()
+        return cursor.rowcount
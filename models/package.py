@@ -6,6 +6,7 @@ Provides functions for package management and queries.
 """
 
 from database import get_db
+from utils.cache import invalidate
 
 
 def get_all_packages(active_only: bool = True) -> list:
@@ -235,6 +236,7 @@ def create_package(package_name: str, base_price: float, price_type: str, **kwar
         ))
 
         conn.commit()
+        invalidate('pricing')
         return cursor.lastrowid
 
 
@@ -319,7 +321,8 @@ def update_package(package_id: int, **kwargs) -> bool:
         cursor.execute(query, values)
         conn.commit()
 
-        return True
+    invalidate('pricing')
+    return True
 
 
 def delete_package(package_id: int) -> bool:
@@ -349,7 +352,9 @@ def delete_package(package_id: int) -> bool:
         ''', (package_id,))
 
         conn.commit()
-        return True
+
+    invalidate('pricing')
+    return True
 
 
 def reorder_packages(package_ids: list) -> bool:
@@ -373,4 +378,6 @@ def reorder_packages(package_ids: list) -> bool:
             ''', (idx, package_id))
 
         conn.commit()
-        return True
+
+    invalidate('pricing')
+    return True
@@ -3,7 +3,23 @@ Pricing data access functions.
 Handles price catalog and minimum consumption policies.
 """
 
+from typing import Optional
+
 from database import get_db
+from utils.cache import cached, invalidate
+
+# Match keys probed by the compiled resolver, most specific first:
+# (use furniture_type, use customer_type, use zone_id)
+_POLICY_MATCH_ORDER = (
+    (True, True, True),
+    (True, True, False),
+    (True, False, True),
+    (False, True, True),
+    (True, False, False),
+    (False, True, False),
+    (False, False, True),
+    (False, False, False),
+)
 
 
 # =============================================================================
@@ -105,34 +121,10 @@ def get_applicable_minimum_consumption_policy(
     Returns:
         Most specific matching policy dictionary or None
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        # Build query with priority-based ordering
-        query = '''
-            SELECT *,
-                   CASE
-                       WHEN furniture_type IS NOT NULL AND customer_type IS NOT NULL AND zone_id IS NOT NULL THEN 7
-                       WHEN furniture_type IS NOT NULL AND customer_type IS NOT NULL THEN 6
-                       WHEN furniture_type IS NOT NULL AND zone_id IS NOT NULL THEN 5
-                       WHEN customer_type IS NOT NULL AND zone_id IS NOT NULL THEN 4
-                       WHEN furniture_type IS NOT NULL THEN 3
-                       WHEN customer_type IS NOT NULL THEN 2
-                       WHEN zone_id IS NOT NULL THEN 1
-                       ELSE 0
-                   END as match_priority
-            FROM beach_minimum_consumption_policies
-            WHERE is_active = 1
-            AND (furniture_type = ? OR furniture_type IS NULL)
-            AND (customer_type = ? OR customer_type IS NULL)
-            AND (zone_id = ? OR zone_id IS NULL)
-            ORDER BY match_priority DESC, priority_order DESC
-            LIMIT 1
-        '''
-
-        cursor.execute(query, (furniture_type, customer_type, zone_id))
-        row = cursor.fetchone()
-        return dict(row) if row else None
+    policy = resolve_minimum_consumption_policy(
+        get_pricing_rules(), furniture_type, customer_type, zone_id
+    )
+    return dict(policy) if policy else None
 
 
 def create_minimum_consumption_policy(
@@ -197,6 +189,7 @@ def create_minimum_consumption_policy(
         ))
 
         conn.commit()
+        invalidate('pricing')
         return cursor.lastrowid
 
 
@@ -272,7 +265,8 @@ def update_minimum_consumption_policy(policy_id: int, **kwargs) -> bool:
         cursor.execute(query, values)
         conn.commit()
 
-        return True
+    invalidate('pricing')
+    return True
 
 
 def delete_minimum_consumption_policy(policy_id: int) -> bool:
@@ -302,7 +296,9 @@ def delete_minimum_consumption_policy(policy_id: int) -> bool:
         ''', (policy_id,))
 
         conn.commit()
-        return True
+
+    invalidate('pricing')
+    return True
 
 
 def reorder_minimum_consumption_policies(policy_ids: list) -> bool:
@@ -328,7 +324,97 @@ def reorder_minimum_consumption_policies(policy_ids: list) -> bool:
             ''', (priority, policy_id))
 
         conn.commit()
-        return True
+
+    invalidate('pricing')
+    return True
+
+
+# =============================================================================
+# COMPILED PRICING RULES
+# =============================================================================
+
+def get_pricing_rules() -> dict:
+    """
+    Get the compiled pricing decision table.
+
+    Built once per process from beach_minimum_consumption_policies and
+    beach_packages, and rebuilt when either table changes ('pricing' cache
+    scope), so a quote resolves without querying them. Values are shared:
+    callers must copy before modifying.
+
+    Returns:
+        dict with:
+            - policies: {(furniture_type, customer_type, zone_id): policy},
+              the highest priority_order active policy per match key
+            - policies_by_id: {policy_id: policy} (active policies)
+            - packages: {package_id: package} (all packages)
+            - active_packages: list of active packages in display order
+    """
+    return cached('pricing', 'rules', _compile_pricing_rules)
+
+
+def _compile_pricing_rules() -> dict:
+    """Load policies and packages into lookup tables (cache loader)."""
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('''
+            SELECT * FROM beach_minimum_consumption_policies
+            WHERE is_active = 1
+            ORDER BY priority_order DESC, id
+        ''')
+        policies = [dict(row) for row in cursor.fetchall()]
+
+        cursor.execute('''
+            SELECT * FROM beach_packages
+            ORDER BY display_order, package_name
+        ''')
+        packages = [dict(row) for row in cursor.fetchall()]
+
+    by_match = {}
+    for policy in policies:
+        key = (policy['furniture_type'], policy['customer_type'], policy['zone_id'])
+        by_match.setdefault(key, policy)
+
+    return {
+        'policies': by_match,
+        'policies_by_id': {policy['id']: policy for policy in policies},
+        'packages': {package['id']: package for package in packages},
+        'active_packages': [package for package in packages if package['active']],
+    }
+
+
+def resolve_minimum_consumption_policy(
+    rules: dict,
+    furniture_type: str = None,
+    customer_type: str = None,
+    zone_id: int = None
+) -> Optional[dict]:
+    """
+    Find the most specific active policy in a compiled rules table.
+
+    Same precedence as get_applicable_minimum_consumption_policy: the most
+    specific furniture_type/customer_type/zone match wins, then the highest
+    priority_order.
+
+    Args:
+        rules: Compiled rules from get_pricing_rules()
+        furniture_type: Furniture type code (optional)
+        customer_type: Customer type ('interno'/'externo', optional)
+        zone_id: Zone ID (optional)
+
+    Returns:
+        Matching (shared) policy dictionary or None
+    """
+    policies = rules['policies']
+    for use_type, use_customer, use_zone in _POLICY_MATCH_ORDER:
+        policy = policies.get((
+            furniture_type if use_type else None,
+            customer_type if use_customer else None,
+            zone_id if use_zone else None,
+        ))
+        if policy:
+            return policy
+    return None
 
 
 # =============================================================================
@@ -22,6 +22,7 @@ from .reservation_state import (
     # State queries
     get_reservation_states,
     get_active_releasing_states,
+    state_membership_filter,
     # State transition validation
     InvalidStateTransitionError,
     VALID_TRANSITIONS,
@@ -37,6 +38,7 @@ from .reservation_state import (
     calculate_reservation_color,
     # Customer statistics
     update_customer_statistics,
+    recompute_all_customer_statistics,
     # History
     get_status_history,
 )
@@ -106,9 +108,12 @@ from .reservation_multiday import (
 from .reservation_suggestions import (
     SUGGESTION_WEIGHTS,
     build_furniture_occupancy_map,
+    build_multi_date_occupancy_map,
     validate_cluster_contiguity,
     suggest_furniture_for_reservation,
+    find_furniture_clusters,
     score_preference_match,
+    score_preference_matches,
     get_customer_preferred_furniture,
 )
 
@@ -130,12 +135,14 @@ __all__ = [
     # State management
     'get_reservation_states',
     'get_active_releasing_states',
+    'state_membership_filter',
     'add_reservation_state',
     'remove_reservation_state',
     'change_reservation_state',
     'cancel_beach_reservation',
     'calculate_reservation_color',
     'update_customer_statistics',
+    'recompute_all_customer_statistics',
     'get_status_history',
 
     # Ticket generation
@@ -192,8 +199,11 @@ __all__ = [
     # Smart suggestions (Phase 6B)
     'SUGGESTION_WEIGHTS',
     'build_furniture_occupancy_map',
+    'build_multi_date_occupancy_map',
     'validate_cluster_contiguity',
     'suggest_furniture_for_reservation',
+    'find_furniture_clusters',
     'score_preference_match',
+    'score_preference_matches',
     'get_customer_preferred_furniture',
 ]
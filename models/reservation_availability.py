@@ -2,13 +2,85 @@
 Bulk availability checking and duplicate detection.
 Handles efficient multi-furniture/multi-date availability queries.
 
+Availability merges reservation occupancy with furniture blocks
+(beach_furniture_blocks): each furniture x date cell is 'free', 'occupied'
+or 'blocked', answered from one reservation query and one block query
+indexed per furniture piece.
+
 Phase 6B - Module 1
 """
 
 import sqlite3
+from bisect import bisect_right
 
 from database import get_db
 from .reservation_state import get_active_releasing_states
+from .stay_markers import refresh_stay_markers, STAY_CHECKIN, STAY_CHECKOUT
+
+
+# Cell status of the availability engine (a reservation wins over a block)
+STATUS_FREE = 'free'
+STATUS_OCCUPIED = 'occupied'
+STATUS_BLOCKED = 'blocked'
+
+
+# =============================================================================
+# FURNITURE BLOCK INTERVALS
+# =============================================================================
+
+def _date_str(value) -> str:
+    """Normalize a DATE value (date object or string) to YYYY-MM-DD."""
+    return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else str(value)
+
+
+def _load_block_index(
+    conn: sqlite3.Connection,
+    furniture_ids: list,
+    date_from: str,
+    date_to: str
+) -> dict:
+    """
+    Load the blocks overlapping a date range for a set of furniture.
+
+    Returns:
+        dict: {furniture_id: (start_dates, blocks)}, both sorted by start
+              date, so _block_on() can bisect instead of scanning
+    """
+    placeholders = ','.join('?' * len(furniture_ids))
+    rows = conn.execute(f'''
+        SELECT b.id, b.furniture_id, b.start_date, b.end_date,
+               b.block_type, b.reason, f.number as furniture_number
+        FROM beach_furniture_blocks b
+        JOIN beach_furniture f ON b.furniture_id = f.id
+        WHERE b.furniture_id IN ({placeholders})
+          AND b.start_date <= ?
+          AND b.end_date >= ?
+        ORDER BY b.furniture_id, b.start_date, b.id
+    ''', [*furniture_ids, date_to, date_from]).fetchall()
+
+    index = {}
+    for row in rows:
+        block = dict(row)
+        block['start_date'] = _date_str(block['start_date'])
+        block['end_date'] = _date_str(block['end_date'])
+        starts, blocks = index.setdefault(row['furniture_id'], ([], []))
+        starts.append(block['start_date'])
+        blocks.append(block)
+    return index
+
+
+def _block_on(block_index: dict, furniture_id: int, date: str):
+    """Block covering a furniture piece on a date (YYYY-MM-DD), or None."""
+    entry = block_index.get(furniture_id)
+    if not entry:
+        return None
+    starts, blocks = entry
+    # Only blocks starting on or before the date can cover it; walk back
+    # from the latest one in case blocks overlap.
+    for i in range(bisect_right(starts, date) - 1, -1, -1):
+        if blocks[i]['end_date'] >= date:
+            return blocks[i]
+    return None
 
 
 # =============================================================================
@@ -62,13 +134,12 @@ def _check_availability_with_conn(
     conflict_set = set()
 
     for row in conflicts:
-        assignment_date = row['assignment_date']
-        if hasattr(assignment_date, 'strftime'):
-            assignment_date = assignment_date.strftime('%Y-%m-%d')
+        assignment_date = _date_str(row['assignment_date'])
         unavailable.append({
             'furniture_id': row['furniture_id'],
             'furniture_number': row['furniture_number'],
             'date': assignment_date,
+            'status': STATUS_OCCUPIED,
             'reservation_id': row['reservation_id'],
             'ticket_number': row['ticket_number'],
             'customer_name': row['customer_name'],
@@ -76,16 +147,42 @@ def _check_availability_with_conn(
         })
         conflict_set.add((row['furniture_id'], assignment_date))
 
+    day_keys = [_date_str(date) for date in dates]
+    block_index = _load_block_index(conn, furniture_ids, min(day_keys), max(day_keys))
+
     availability_matrix = {}
-    for date in dates:
+    status_matrix = {}
+    for date, day in zip(dates, day_keys):
         availability_matrix[date] = {}
+        status_matrix[date] = {}
         for furn_id in furniture_ids:
-            availability_matrix[date][furn_id] = (furn_id, date) not in conflict_set
+            if (furn_id, day) in conflict_set:
+                status = STATUS_OCCUPIED
+            else:
+                block = _block_on(block_index, furn_id, day)
+                status = STATUS_BLOCKED if block else STATUS_FREE
+                if block:
+                    unavailable.append({
+                        'furniture_id': furn_id,
+                        'furniture_number': block['furniture_number'],
+                        'date': day,
+                        'status': STATUS_BLOCKED,
+                        'reservation_id': None,
+                        'ticket_number': None,
+                        'customer_name': None,
+                        'room_number': None,
+                        'block_id': block['id'],
+                        'block_type': block['block_type'],
+                        'block_reason': block['reason']
+                    })
+            availability_matrix[date][furn_id] = status == STATUS_FREE
+            status_matrix[date][furn_id] = status
 
     return {
         'all_available': len(unavailable) == 0,
         'unavailable': unavailable,
-        'availability_matrix': availability_matrix
+        'availability_matrix': availability_matrix,
+        'status_matrix': status_matrix
     }
 
 
@@ -98,6 +195,8 @@ def check_furniture_availability_bulk(
     """
     Check availability of multiple furniture items for multiple dates.
     More efficient than calling check_furniture_availability() in a loop.
+    Furniture blocked on a date (maintenance, VIP hold...) is unavailable
+    just like reserved furniture.
 
     Args:
         furniture_ids: List of furniture IDs to check
@@ -112,11 +211,19 @@ def check_furniture_availability_bulk(
         dict: {
             'all_available': bool,
             'unavailable': [
-                {'furniture_id': int, 'date': str, 'reservation_id': int,
-                 'ticket_number': str, 'customer_name': str}
+                {'furniture_id': int, 'date': str, 'status': 'occupied',
+                 'reservation_id': int, 'ticket_number': str,
+                 'customer_name': str}
+                or
+                {'furniture_id': int, 'date': str, 'status': 'blocked',
+                 'reservation_id': None, 'block_id': int,
+                 'block_type': str, 'block_reason': str}
             ],
             'availability_matrix': {
                 'YYYY-MM-DD': {furniture_id: bool, ...}
+            },
+            'status_matrix': {
+                'YYYY-MM-DD': {furniture_id: 'free'|'occupied'|'blocked', ...}
             }
         }
     """
@@ -124,7 +231,8 @@ def check_furniture_availability_bulk(
         return {
             'all_available': True,
             'unavailable': [],
-            'availability_matrix': {}
+            'availability_matrix': {},
+            'status_matrix': {}
         }
 
     if conn is not None:
@@ -328,7 +436,9 @@ def get_furniture_availability_map(
     date_from: str,
     date_to: str,
     zone_id: int = None,
-    furniture_type: str = None
+    furniture_type: str = None,
+    furniture_ids: list = None,
+    compact: bool = False
 ) -> dict:
     """
     Get availability map for date range (useful for calendar views).
@@ -338,6 +448,10 @@ def get_furniture_availability_map(
         date_to: End date (YYYY-MM-DD)
         zone_id: Filter by zone (optional)
         furniture_type: Filter by type (optional)
+        furniture_ids: Restrict to these furniture IDs (optional, used by
+                       incremental map polling)
+        compact: Return the columnar layout of _build_compact_availability()
+                 instead of one dict per furniture and date
 
     Returns:
         dict: {
@@ -359,19 +473,26 @@ def get_furniture_availability_map(
                         'num_people': int or None,
                         'state': str or None,
                         'is_checkin_today': bool,   # guest arrives the hotel this day
-                        'is_checkout_today': bool   # guest departs the hotel this day
+                        'is_checkout_today': bool,  # guest departs the hotel this day
+                        'status': 'free'|'occupied'|'blocked',
+                        'block': {'id', 'block_type', 'reason', 'start_date',
+                                  'end_date'}     # only when a block covers the day
                     }
                 }
             },
             'summary': {
                 'YYYY-MM-DD': {
                     'total': int,
-                    'available': int,
+                    'available': int,   # neither reserved nor blocked
                     'occupied': int,
+                    'blocked': int,     # blocked and not reserved
                     'occupancy_rate': float
                 }
             }
         }
+
+        'available' on a cell only reflects reservations; 'status' also
+        accounts for furniture blocks.
     """
     with get_db() as conn:
         cursor = conn.cursor()
@@ -397,6 +518,12 @@ def get_furniture_availability_map(
             furniture_query += ' AND f.furniture_type = ?'
             furniture_params.append(furniture_type)
 
+        if furniture_ids is not None:
+            if not furniture_ids:
+                return _empty_availability(compact)
+            furniture_query += f" AND f.id IN ({','.join('?' * len(furniture_ids))})"
+            furniture_params.extend(furniture_ids)
+
         furniture_query += ' ORDER BY f.zone_id, f.number'
 
         cursor.execute(furniture_query, furniture_params)
@@ -404,12 +531,7 @@ def get_furniture_availability_map(
         furniture_ids = [f['id'] for f in furniture_list]
 
         if not furniture_ids:
-            return {
-                'furniture': [],
-                'dates': [],
-                'availability': {},
-                'summary': {}
-            }
+            return _empty_availability(compact)
 
         # Generate date list
         from datetime import datetime, timedelta
@@ -421,9 +543,16 @@ def get_furniture_availability_map(
             dates.append(current.strftime('%Y-%m-%d'))
             current += timedelta(days=1)
 
+        # Hotel check-in / check-out markers, precomputed per day (see
+        # models/stay_markers.py) by the guest write paths. Days left queued
+        # by raw-SQL writes are rebuilt here only if the write lock is free.
+        refresh_stay_markers(conn, wait=False)
+
         # Get all reservations in date range
         placeholders_furniture = ','.join('?' * len(furniture_ids))
 
+        # Stay markers: the guest's booking reference (stable) when known,
+        # room number otherwise; one primary-key probe per occupied cell.
         reservations_query = f'''
             SELECT rf.furniture_id, rf.assignment_date, r.id as reservation_id,
                    r.customer_id,
@@ -431,10 +560,20 @@ def get_furniture_availability_map(
                    r.notes as reservation_notes,
                    c.first_name || ' ' || COALESCE(c.last_name, '') as customer_name,
                    c.first_name, c.room_number, c.customer_type, c.vip_status,
-                   COALESCE(NULLIF(r.booking_reference, ''), c.booking_reference) AS booking_reference
+                   COALESCE(NULLIF(r.booking_reference, ''), c.booking_reference) AS booking_reference,
+                   COALESCE(sm.flags, 0) AS stay_flags
             FROM beach_reservation_furniture rf
             JOIN beach_reservations r ON rf.reservation_id = r.id
             JOIN beach_customers c ON r.customer_id = c.id
+            LEFT JOIN beach_stay_markers sm
+                   ON sm.marker_date = rf.assignment_date
+                  AND sm.key_kind = CASE
+                          WHEN COALESCE(NULLIF(r.booking_reference, ''),
+                                        NULLIF(c.booking_reference, '')) IS NULL
+                          THEN 'room' ELSE 'ref' END
+                  AND sm.match_key = COALESCE(NULLIF(r.booking_reference, ''),
+                                              NULLIF(c.booking_reference, ''),
+                                              c.room_number)
             WHERE rf.furniture_id IN ({placeholders_furniture})
               AND rf.assignment_date >= ?
               AND rf.assignment_date <= ?
@@ -450,6 +589,21 @@ def get_furniture_availability_map(
         cursor.execute(reservations_query, res_params)
         reservations = cursor.fetchall()
 
+        # Blocks covering each cell, from one interval query for the range
+        block_index = _load_block_index(conn, furniture_ids, date_from, date_to)
+        blocked_cells = {}
+        for furn_id in block_index:
+            for date in dates:
+                block = _block_on(block_index, furn_id, date)
+                if block:
+                    blocked_cells[(furn_id, date)] = {
+                        'id': block['id'],
+                        'block_type': block['block_type'],
+                        'reason': block['reason'],
+                        'start_date': block['start_date'],
+                        'end_date': block['end_date']
+                    }
+
         # Build reservation lookup: {(furniture_id, date): reservation_info}
         # Note: assignment_date may be returned as datetime.date object, convert to string
         reservation_map = {}
@@ -473,7 +627,8 @@ def get_furniture_availability_map(
                 'has_notes': bool(notes_stripped),
                 'notes_preview': notes_stripped[:80],
                 'booking_reference': row['booking_reference'],
-                'customer_id': row['customer_id']
+                'customer_id': row['customer_id'],
+                'stay_flags': row['stay_flags']
             }
 
         # ---------------------------------------------------------------
@@ -487,93 +642,45 @@ def get_furniture_availability_map(
         if customer_ids:
             placeholders_cust = ','.join('?' * len(customer_ids))
             cursor.execute(f'''
-                SELECT customer_id, old_room, new_room, date(changed_at) AS change_date
+                SELECT customer_id, old_room, new_room, change_date
                 FROM beach_room_changes
                 WHERE customer_id IN ({placeholders_cust})
-                  AND date(changed_at) >= ? AND date(changed_at) <= ?
+                  AND change_date >= ? AND change_date <= ?
                 ORDER BY changed_at ASC
             ''', (*customer_ids, date_from, date_to))
             for rc in cursor.fetchall():
+                change_date = rc['change_date']
+                if hasattr(change_date, 'strftime'):
+                    change_date = change_date.strftime('%Y-%m-%d')
                 # Last change of the day wins (chronological order)
-                room_changes_by_customer_date[(rc['customer_id'], rc['change_date'])] = {
+                room_changes_by_customer_date[(rc['customer_id'], change_date)] = {
                     'old_room': rc['old_room'], 'new_room': rc['new_room']
                 }
 
         # ---------------------------------------------------------------
-        # Hotel check-in / check-out markers (hotel stay dates)
-        # Flag, per occupied furniture and date, whether the occupying guest
-        # ARRIVES (check-in) or DEPARTS (check-out) the hotel that day, so the
-        # map can mark those sunbeds. Linked to the PMS hotel_guests by
-        # booking_reference (stable) with room_number as fallback. Purely
-        # additive / read-only; externo or unmatched customers stay unflagged.
+        # Hotel check-in / check-out markers: whether the occupying guest
+        # ARRIVES or DEPARTS the hotel that day, joined from beach_stay_markers
+        # by booking_reference (room_number when the guest has none).
+        # Externo or unmatched customers stay unflagged.
         # ---------------------------------------------------------------
-        def _as_date_str(value):
-            return value.strftime('%Y-%m-%d') if hasattr(value, 'strftime') else value
-
-        booking_refs = [r['booking_reference'] for r in reservation_map.values()
-                        if r.get('booking_reference')]
-        rooms_no_ref = [r['room_number'] for r in reservation_map.values()
-                        if r.get('room_number') and not r.get('booking_reference')]
-
-        stay_by_ref = {}    # booking_reference -> (arrival_str, departure_str)
-        stays_by_room = {}  # room_number -> list[(arrival_str, departure_str)]
-
-        if booking_refs or rooms_no_ref:
-            # Only stays overlapping the requested window, and only the
-            # booking_refs / rooms actually present, to keep the result tight.
-            guest_query = '''
-                SELECT booking_reference, room_number, arrival_date, departure_date
-                FROM hotel_guests
-                WHERE departure_date >= ? AND arrival_date <= ?
-            '''
-            guest_params = [date_from, date_to]
-
-            or_clauses = []
-            if booking_refs:
-                or_clauses.append(
-                    f"booking_reference IN ({','.join('?' * len(booking_refs))})"
-                )
-                guest_params.extend(booking_refs)
-            if rooms_no_ref:
-                or_clauses.append(
-                    f"room_number IN ({','.join('?' * len(rooms_no_ref))})"
-                )
-                guest_params.extend(rooms_no_ref)
-            if or_clauses:
-                guest_query += ' AND (' + ' OR '.join(or_clauses) + ')'
-
-            cursor.execute(guest_query, guest_params)
-            for g in cursor.fetchall():
-                arrival = _as_date_str(g['arrival_date'])
-                departure = _as_date_str(g['departure_date'])
-                ref = g['booking_reference']
-                room = g['room_number']
-                if ref and ref not in stay_by_ref:
-                    stay_by_ref[ref] = (arrival, departure)
-                if room:
-                    stays_by_room.setdefault(room, []).append((arrival, departure))
-
         def _checkin_checkout_flags(res_info, date):
             """Return (is_checkin_today, is_checkout_today) for a reservation on a date."""
-            ref = res_info.get('booking_reference')
-            room = res_info.get('room_number')
-            stay = None
-            if ref and ref in stay_by_ref:
-                stay = stay_by_ref[ref]
-            elif room and room in stays_by_room:
-                # Pick the stay covering this date (room may host several over time).
-                for arr, dep in stays_by_room[room]:
-                    if (arr is None or arr <= date) and (dep is None or dep >= date):
-                        stay = (arr, dep)
-                        break
-            if not stay:
-                return False, False
-            arrival, departure = stay
-            return arrival == date, departure == date
+            flags = res_info.get('stay_flags') or 0
+            return bool(flags & STAY_CHECKIN), bool(flags & STAY_CHECKOUT)
+
+        if compact:
+            return _build_compact_availability(
+                furniture_list, dates, reservation_map,
+                room_changes_by_customer_date, _checkin_checkout_flags,
+                blocked_cells
+            )
 
         # Build availability matrix
         availability = {}
-        summary = {d: {'total': len(furniture_ids), 'available': 0, 'occupied': 0} for d in dates}
+        summary = {
+            d: {'total': len(furniture_ids), 'available': 0, 'occupied': 0, 'blocked': 0}
+            for d in dates
+        }
 
         for furn in furniture_list:
             furn_id = furn['id']
@@ -604,10 +711,12 @@ def get_furniture_availability_map(
                         'is_checkin_today': is_checkin_today,
                         'is_checkout_today': is_checkout_today,
                         'room_changed_today': bool(room_change),
-                        'previous_room': room_change['old_room'] if room_change else None
+                        'previous_room': room_change['old_room'] if room_change else None,
+                        'status': STATUS_OCCUPIED
                     }
                     summary[date]['occupied'] += 1
                 else:
+                    blocked = key in blocked_cells
                     availability[furn_id][date] = {
                         'available': True,
                         'reservation_id': None,
@@ -618,9 +727,12 @@ def get_furniture_availability_map(
                         'customer_type': None,
                         'vip_status': None,
                         'num_people': None,
-                        'state': None
+                        'state': None,
+                        'status': STATUS_BLOCKED if blocked else STATUS_FREE
                     }
-                    summary[date]['available'] += 1
+                    summary[date]['blocked' if blocked else 'available'] += 1
+                if key in blocked_cells:
+                    availability[furn_id][date]['block'] = blocked_cells[key]
 
         # Calculate occupancy rates
         for date in dates:
@@ -636,6 +748,141 @@ def get_furniture_availability_map(
         }
 
 
+# Reservation columns of the compact availability layout (one row per reservation)
+COMPACT_RESERVATION_COLUMNS = (
+    'reservation_id', 'ticket_number', 'customer_name', 'first_name', 'room_number',
+    'customer_type', 'vip_status', 'num_people', 'state', 'is_furniture_locked',
+    'has_notes', 'notes_preview',
+)
+
+# Per-cell marker flags of the compact layout
+CELL_CHECKIN = 1
+CELL_CHECKOUT = 2
+CELL_ROOM_CHANGED = 4
+CELL_BLOCKED = 8
+
+
+def _empty_availability(compact: bool) -> dict:
+    """Availability payload for an empty furniture selection."""
+    if compact:
+        return {
+            'format': 'compact',
+            'furniture': [],
+            'dates': [],
+            'reservation_columns': list(COMPACT_RESERVATION_COLUMNS),
+            'reservations': [],
+            'cells': [],
+            'markers': [],
+            'summary': {}
+        }
+    return {
+        'furniture': [],
+        'dates': [],
+        'availability': {},
+        'summary': {}
+    }
+
+
+def _build_compact_availability(
+    furniture_list: list,
+    dates: list,
+    reservation_map: dict,
+    room_changes_by_customer_date: dict,
+    checkin_checkout_flags,
+    blocked_cells: dict = None
+) -> dict:
+    """
+    Build the columnar availability layout.
+
+    Each reservation is stored once as a row of 'reservations' (values in
+    'reservation_columns' order). 'cells' holds one list of ints per
+    furniture (same order as 'furniture'), one int per date: 0 when free,
+    otherwise the 1-based index of the occupying reservation row. Day-level
+    flags live in the sparse 'markers' list as
+    [furniture_index, date_index, flags, previous_room], with flags a bit
+    mask of CELL_CHECKIN, CELL_CHECKOUT, CELL_ROOM_CHANGED and CELL_BLOCKED.
+
+    Only occupied and blocked cells are visited; free cells are the zeros
+    of the preallocated rows.
+
+    Args:
+        furniture_list: Furniture dicts (row order of 'cells')
+        dates: Date strings (column order of 'cells')
+        reservation_map: {(furniture_id, date): reservation info}
+        room_changes_by_customer_date: {(customer_id, date): room change}
+        checkin_checkout_flags: callable(res_info, date) -> (checkin, checkout)
+        blocked_cells: {(furniture_id, date): block} (optional)
+
+    Returns:
+        dict with format, furniture, dates, reservation_columns,
+        reservations, cells, markers and summary
+    """
+    furniture_index = {f['id']: i for i, f in enumerate(furniture_list)}
+    date_index = {d: i for i, d in enumerate(dates)}
+    width = len(dates)
+
+    cells = [[0] * width for _ in furniture_list]
+    occupied = [0] * width
+    blocked = [0] * width
+    reservations = []
+    row_by_reservation = {}
+    markers = []
+    blocked_cells = blocked_cells or {}
+
+    for (furn_id, date), res_info in reservation_map.items():
+        fi = furniture_index.get(furn_id)
+        di = date_index.get(date)
+        if fi is None or di is None:
+            continue
+
+        row = row_by_reservation.get(res_info['reservation_id'])
+        if row is None:
+            reservations.append([res_info[c] for c in COMPACT_RESERVATION_COLUMNS])
+            row = row_by_reservation[res_info['reservation_id']] = len(reservations)
+        cells[fi][di] = row
+        occupied[di] += 1
+
+        is_checkin, is_checkout = checkin_checkout_flags(res_info, date)
+        room_change = room_changes_by_customer_date.get((res_info.get('customer_id'), date))
+        flags = ((CELL_CHECKIN if is_checkin else 0)
+                 | (CELL_CHECKOUT if is_checkout else 0)
+                 | (CELL_ROOM_CHANGED if room_change else 0)
+                 | (CELL_BLOCKED if (furn_id, date) in blocked_cells else 0))
+        if flags:
+            markers.append([fi, di, flags, room_change['old_room'] if room_change else None])
+
+    for furn_id, date in blocked_cells:
+        fi = furniture_index.get(furn_id)
+        di = date_index.get(date)
+        if fi is None or di is None or cells[fi][di]:
+            continue  # occupied cells carry CELL_BLOCKED in their marker
+        blocked[di] += 1
+        markers.append([fi, di, CELL_BLOCKED, None])
+
+    total = len(furniture_list)
+    summary = {
+        date: {
+            'total': total,
+            'available': total - occupied[i] - blocked[i],
+            'occupied': occupied[i],
+            'blocked': blocked[i],
+            'occupancy_rate': round(occupied[i] / total * 100, 1) if total > 0 else 0
+        }
+        for i, date in enumerate(dates)
+    }
+
+    return {
+        'format': 'compact',
+        'furniture': furniture_list,
+        'dates': dates,
+        'reservation_columns': list(COMPACT_RESERVATION_COLUMNS),
+        'reservations': reservations,
+        'cells': cells,
+        'markers': markers,
+        'summary': summary
+    }
+
+
 # =============================================================================
 # HELPER FUNCTIONS
 # =============================================================================
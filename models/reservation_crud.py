@@ -8,7 +8,7 @@ Phase 6B - Module 4 (Main CRUD with re-exports from specialized modules)
 from database import get_db
 from datetime import datetime
 from utils.datetime_helpers import get_now
-from .reservation_state import calculate_reservation_color, update_customer_statistics
+from .reservation_state import calculate_reservation_color
 from .state import get_default_state
 from .reservation_availability import check_furniture_availability_bulk
 from .characteristic_assignments import sync_preferences_to_reservation
@@ -26,9 +26,9 @@ from .characteristic_assignments import (
 # TICKET NUMBER GENERATION
 # =============================================================================
 
-def generate_reservation_number(reservation_date: str = None, cursor=None, max_retries: int = 5) -> str:
+def generate_reservation_number(reservation_date: str = None, cursor=None) -> str:
     """
-    Generate unique reservation number with race condition protection.
+    Allocate the next reservation number for a day.
 
     Format: YYMMDDRR where:
     - YY = Year (2 digits)
@@ -38,16 +38,20 @@ def generate_reservation_number(reservation_date: str = None, cursor=None, max_r
 
     Example: 25011601 = First reservation on Jan 16, 2025
 
+    The daily counter (beach_ticket_sequences) is incremented with a single
+    upsert, so concurrent creations never pick the same number. Pass the
+    reservation transaction's cursor: a rolled back reservation releases its
+    number.
+
     Args:
         reservation_date: Date for reservation (default: today)
         cursor: Active transaction cursor
-        max_retries: Max attempts on collision
 
     Returns:
         str: Unique reservation number (YYMMDDRR)
 
     Raises:
-        ValueError: If unable to generate unique number
+        ValueError: If the daily limit (999) is reached
     """
     if not reservation_date:
         reservation_date = get_now().strftime('%Y-%m-%d')
@@ -55,37 +59,24 @@ def generate_reservation_number(reservation_date: str = None, cursor=None, max_r
     date_obj = datetime.strptime(reservation_date, '%Y-%m-%d')
     date_prefix = date_obj.strftime('%y%m%d')  # YYMMDD
 
-    with get_db() as conn:
-        cur = cursor or conn.cursor()
-
-        for attempt in range(max_retries):
-            # Find max sequential for the day
-            # Sequence is normally 2 digits (01-99); on very busy days it extends to
-            # 3 digits (100-999). SUBSTR(...,7) reads the WHOLE sequence so 3-digit
-            # numbers are parsed correctly (CAST takes the leading digits, so child
-            # tickets like "...05-1" still resolve to their parent sequence, 5).
-            cur.execute('''
-                SELECT MAX(CAST(SUBSTR(ticket_number, 7) AS INTEGER)) as max_seq
-                FROM beach_reservations
-                WHERE ticket_number LIKE ?
-            ''', (f'{date_prefix}%',))
-
-            result = cur.fetchone()
-            next_seq = (result['max_seq'] or 0) + 1
+    if cursor is None:
+        # Standalone allocation: own (committed) transaction
+        with get_db() as conn:
+            return generate_reservation_number(reservation_date, conn.cursor())
 
-            if next_seq > 999:
-                raise ValueError(f"Daily reservation limit (999) reached for {reservation_date}")
+    cursor.execute('''
+        INSERT INTO beach_ticket_sequences (day_prefix, last_seq) VALUES (?, 1)
+        ON CONFLICT(day_prefix) DO UPDATE SET last_seq = last_seq + 1
+        RETURNING last_seq
+    ''', (date_prefix,))
+    next_seq = cursor.fetchone()['last_seq']
 
-            # Keep the 2-digit format for the first 99 (backward compatible), then 3 digits.
-            seq_str = f"{next_seq:02d}" if next_seq < 100 else str(next_seq)
-            ticket_number = f"{date_prefix}{seq_str}"
+    if next_seq > 999:
+        raise ValueError(f"Daily reservation limit (999) reached for {reservation_date}")
 
-            # Verify uniqueness
-            cur.execute('SELECT id FROM beach_reservations WHERE ticket_number = ?', (ticket_number,))
-            if not cur.fetchone():
-                return ticket_number
-
-        raise ValueError("Could not generate unique ticket number after multiple retries")
+    # Keep the 2-digit format for the first 99 (backward compatible), then 3 digits.
+    seq_str = f"{next_seq:02d}" if next_seq < 100 else str(next_seq)
+    return f"{date_prefix}{seq_str}"
 
 
 def generate_child_reservation_number(parent_number: str, child_index: int) -> str:
@@ -176,20 +167,20 @@ def create_beach_reservation(
     """
     # Payment ticket and method are optional (for auditing purposes)
 
+    # Default state read before the transaction (its own connection use commits)
+    default_state = get_default_state()
+    initial_state = default_state.get('name', 'Confirmada')
+
     with get_db() as conn:
         cursor = conn.cursor()
 
         try:
             cursor.execute('BEGIN IMMEDIATE')
 
-            # Generate ticket number if not provided
+            # Allocate the ticket number inside the transaction (released on rollback)
             if not ticket_number:
                 ticket_number = generate_reservation_number(reservation_date, cursor)
 
-            # Get default state from database
-            default_state = get_default_state()
-            initial_state = default_state.get('name', 'Confirmada')
-
             # Get customer's current room for original_room tracking, plus the stable
             # booking_reference (hotel reservation number) so the reservation is anchored
             # to the booking even if the physical room later changes or isn't assigned yet.
@@ -13,8 +13,7 @@ from .reservation_crud import (
 )
 from .reservation_state import (
     add_reservation_state,
-    get_active_releasing_states,
-    update_customer_statistics
+    get_active_releasing_states
 )
 from .reservation_availability import (
     check_furniture_availability_bulk,
@@ -126,6 +125,10 @@ def create_linked_multiday_reservations(
     # acquired first, then checks run on the same g.db connection, ensuring
     # no other writer can insert conflicting reservations between check and create.
 
+    # Default state read before the transaction (its own connection use commits)
+    default_state = get_default_state()
+    initial_state = default_state.get('name', 'Confirmada')
+
     with get_db() as conn:
         cursor = conn.cursor()
 
@@ -142,18 +145,22 @@ def create_linked_multiday_reservations(
                         avail_result = check_furniture_availability_bulk(date_furniture_ids, [date], conn=conn)
                         if not avail_result['all_available']:
                             unavail = avail_result['unavailable'][0]
+                            conflict = (f"reservation {unavail['ticket_number']}"
+                                        if unavail['reservation_id'] else 'blocked')
                             raise ValueError(
                                 f"Furniture {unavail['furniture_id']} not available on {unavail['date']} "
-                                f"(reservation {unavail['ticket_number']})"
+                                f"({conflict})"
                             )
                 else:
                     # Same furniture for all days - check all against all
                     avail_result = check_furniture_availability_bulk(all_furniture_ids, dates, conn=conn)
                     if not avail_result['all_available']:
                         unavail = avail_result['unavailable'][0]
+                        conflict = (f"reserva {unavail['ticket_number']}"
+                                    if unavail['reservation_id'] else 'bloqueado')
                         raise ValueError(
                             f"Mobiliario {unavail['furniture_id']} no disponible el {unavail['date']} "
-                            f"(reserva {unavail['ticket_number']})"
+                            f"({conflict})"
                         )
 
             # Check for duplicates (inside transaction lock)
@@ -165,10 +172,6 @@ def create_linked_multiday_reservations(
                         f"(ticket {existing['ticket_number']})"
                     )
 
-            # Get default state from database
-            default_state = get_default_state()
-            initial_state = default_state.get('name', 'Confirmada')
-
             # Get customer's current room for original_room tracking + stable booking_reference
             cursor.execute('''
                 SELECT room_number, customer_type, booking_reference,
@@ -205,7 +208,8 @@ def create_linked_multiday_reservations(
                 date_furniture = furniture_by_date.get(date, furniture_ids)
 
                 if i == 0:
-                    # First date: create parent reservation
+                    # First date: create parent reservation. Its ticket is the only
+                    # sequence number allocated; children derive from it (-1, -2...)
                     ticket_number = generate_reservation_number(date, cursor)
 
                     cursor.execute('''
@@ -530,12 +534,6 @@ def cancel_multiday_reservations(
 
             conn.commit()
 
-            # Update customer statistics
-            cursor.execute('SELECT customer_id FROM beach_reservations WHERE id = ?', (parent_id,))
-            row = cursor.fetchone()
-            if row:
-                update_customer_statistics(row['customer_id'])
-
             return {
                 'success': True,
                 'cancelled_count': len(cancelled_ids),
@@ -18,6 +18,8 @@ from models.state import (
     get_default_state,
     get_state_by_name,
     get_incident_states,
+    get_releasing_states,
+    get_state_id_map,
 )
 
 
@@ -145,13 +147,47 @@ def get_active_releasing_states() -> list:
     Returns:
         list: Names of states with is_availability_releasing=1
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT name FROM beach_reservation_states
-            WHERE is_availability_releasing = 1 AND active = 1
-        ''')
-        return [row['name'] for row in cursor.fetchall()]
+    return get_releasing_states()
+
+
+def state_membership_filter(state_names: list, alias: str = 'r', negate: bool = False) -> tuple:
+    """
+    SQL condition matching reservations that hold any of the given states.
+
+    Uses the normalised beach_reservation_state_members table (index seek)
+    instead of LIKE scans over the current_states CSV. Unlike state_id /
+    current_state, it covers every accumulated state, not just the top one.
+
+    Args:
+        state_names: State names (e.g. ['Sentada'])
+        alias: Alias of beach_reservations in the outer query
+        negate: Match reservations holding NONE of the states
+
+    Returns:
+        tuple: (sql_condition, params)
+
+    Example:
+        cond, params = state_membership_filter(['Cancelada', 'No-Show'], negate=True)
+        cursor.execute(f'SELECT COUNT(*) FROM beach_reservations r WHERE {cond}', params)
+    """
+    ids_by_name = get_state_id_map()
+    state_ids = [ids_by_name[name] for name in state_names if name in ids_by_name]
+    if not state_ids:
+        return ('1' if negate else '0'), []
+
+    placeholders = ', '.join('?' for _ in state_ids)
+    if negate:
+        # Per-row primary key probe
+        return f'''NOT EXISTS (
+            SELECT 1 FROM beach_reservation_state_members sm
+            WHERE sm.reservation_id = {alias}.id AND sm.state_id IN ({placeholders})
+        )''', state_ids
+
+    # Driven by the (state_id, reservation_id) index
+    return f'''{alias}.id IN (
+        SELECT sm.reservation_id FROM beach_reservation_state_members sm
+        WHERE sm.state_id IN ({placeholders})
+    )''', state_ids
 
 
 # =============================================================================
@@ -169,7 +205,8 @@ def add_reservation_state(reservation_id: int, state_type: str, changed_by: str,
     3. Updates current_state to new state
     4. Records in history
     5. If No-Show: creates automatic incident
-    6. Updates customer statistics
+
+    Customer statistics follow through the reservation triggers.
 
     Args:
         reservation_id: Reservation ID
@@ -244,10 +281,6 @@ def add_reservation_state(reservation_id: int, state_type: str, changed_by: str,
                 _create_state_incident(cursor, customer_id, reservation_id, changed_by, state_type)
 
             conn.commit()
-
-            # Update customer statistics
-            update_customer_statistics(customer_id)
-
             return True
 
         except Exception as e:
@@ -263,7 +296,8 @@ def remove_reservation_state(reservation_id: int, state_type: str, changed_by: s
     1. Removes from current_states CSV
     2. Recalculates current_state by priority
     3. Records in history
-    4. Updates customer statistics
+
+    Customer statistics follow through the reservation triggers.
 
     Args:
         reservation_id: Reservation ID
@@ -282,14 +316,13 @@ def remove_reservation_state(reservation_id: int, state_type: str, changed_by: s
             cursor.execute('BEGIN IMMEDIATE')
 
             # Get current reservation data
-            cursor.execute('SELECT customer_id, current_states FROM beach_reservations WHERE id = ?',
+            cursor.execute('SELECT current_states FROM beach_reservations WHERE id = ?',
                           (reservation_id,))
             row = cursor.fetchone()
             if not row:
                 conn.rollback()
                 return False
 
-            customer_id = row['customer_id']
             current_states = row['current_states'] or ''
 
             # Remove from CSV
@@ -329,10 +362,6 @@ def remove_reservation_state(reservation_id: int, state_type: str, changed_by: s
                 ''', (reservation_id, removed_state_id, new_state_id, changed_by, notes or 'Estado eliminado'))
 
             conn.commit()
-
-            # Update customer statistics
-            update_customer_statistics(customer_id)
-
             return True
 
         except Exception as e:
@@ -367,7 +396,7 @@ def change_reservation_state(reservation_id: int, new_state: str, changed_by: st
             cursor.execute('BEGIN IMMEDIATE')
 
             # Get current state
-            cursor.execute('SELECT current_state, customer_id FROM beach_reservations WHERE id = ?',
+            cursor.execute('SELECT current_state FROM beach_reservations WHERE id = ?',
                           (reservation_id,))
             row = cursor.fetchone()
             if not row:
@@ -375,7 +404,6 @@ def change_reservation_state(reservation_id: int, new_state: str, changed_by: st
                 return False
 
             old_state = row['current_state']
-            customer_id = row['customer_id']
 
             # Validate state transition
             validate_state_transition(old_state, new_state, bypass_validation)
@@ -407,10 +435,6 @@ def change_reservation_state(reservation_id: int, new_state: str, changed_by: st
                 ''', (reservation_id, old_state_id, new_state_id, changed_by, reason_text))
 
             conn.commit()
-
-            # Update customer stats
-            update_customer_statistics(customer_id)
-
             return True
 
         except Exception:
@@ -492,9 +516,95 @@ def _create_state_incident(cursor, customer_id: int, reservation_id: int, report
 # CUSTOMER STATISTICS
 # =============================================================================
 
+# Statistics are maintained incrementally by triggers on beach_reservations
+# (database/migrations/customer_stats.py), which apply the same rules as a delta
+# per inserted, deleted or updated reservation. The functions below rebuild them
+# from scratch (repair, bulk imports).
+
+def _customer_stats_select(where: str) -> tuple:
+    """
+    Aggregated statistics per customer, one row per customer_id.
+
+    State filters go through state_membership_filter() (membership-table
+    seeks). Returns (sql, params); where is applied before grouping and its
+    own params are appended by the caller.
+    """
+    visit, visit_params = state_membership_filter(['Sentada'])
+    no_show, no_show_params = state_membership_filter(['No-Show'])
+    cancelled, cancelled_params = state_membership_filter(['Cancelada'])
+    counted, counted_params = state_membership_filter(['No-Show', 'Cancelada'], negate=True)
+
+    sql = f'''
+        SELECT r.customer_id,
+               COALESCE(SUM({visit}), 0) AS visits,
+               MAX(CASE WHEN {visit} THEN r.reservation_date END) AS last_visit,
+               COALESCE(SUM({no_show}), 0) AS no_shows,
+               COALESCE(SUM({cancelled}), 0) AS cancellations,
+               COALESCE(SUM({counted}), 0) AS total,
+               ROUND(COALESCE(SUM(CASE WHEN {counted}
+                                   THEN r.final_price END), 0), 2) AS total_spent
+        FROM beach_reservations r
+        {where}
+        GROUP BY r.customer_id
+    '''
+    params = (visit_params + visit_params + no_show_params + cancelled_params
+              + counted_params + counted_params)
+    return sql, params
+
+
+def _recompute_customer_statistics(cursor, customer_id: int = None) -> int:
+    """
+    Rebuild statistics for one customer (or all) in a single grouped pass.
+
+    Customers without reservations are reset to zero. Only rows whose values
+    actually change are written.
+
+    Returns:
+        int: Number of customers updated
+    """
+    where = 'WHERE r.customer_id = ?' if customer_id is not None else ''
+    customer_filter = 'AND c.id = ?' if customer_id is not None else ''
+    params = (customer_id,) if customer_id is not None else ()
+    stats_select, stats_params = _customer_stats_select(where)
+
+    cursor.execute(f'''
+        UPDATE beach_customers AS c
+        SET total_visits = s.visits,
+            last_visit = s.last_visit,
+            no_shows = s.no_shows,
+            cancellations = s.cancellations,
+            total_reservations = s.total,
+            total_spent = s.total_spent
+        FROM ({stats_select}) AS s
+        WHERE c.id = s.customer_id
+          AND (c.total_visits IS NOT s.visits
+               OR c.last_visit IS NOT s.last_visit
+               OR c.no_shows IS NOT s.no_shows
+               OR c.cancellations IS NOT s.cancellations
+               OR c.total_reservations IS NOT s.total
+               OR c.total_spent IS NOT s.total_spent)
+    ''', tuple(stats_params) + params)
+    updated = cursor.rowcount
+
+    cursor.execute(f'''
+        UPDATE beach_customers AS c
+        SET total_visits = 0, last_visit = NULL, no_shows = 0,
+            cancellations = 0, total_reservations = 0, total_spent = 0
+        WHERE NOT EXISTS (SELECT 1 FROM beach_reservations r WHERE r.customer_id = c.id)
+          AND (COALESCE(c.total_visits, 0) != 0 OR c.last_visit IS NOT NULL
+               OR COALESCE(c.no_shows, 0) != 0 OR COALESCE(c.cancellations, 0) != 0
+               OR COALESCE(c.total_reservations, 0) != 0 OR COALESCE(c.total_spent, 0) != 0)
+          {customer_filter}
+    ''', params)
+    return updated + cursor.rowcount
+
+
 def update_customer_statistics(customer_id: int) -> bool:
     """
-    Update customer statistics based on reservations.
+    Recompute customer statistics based on reservations.
+
+    Statistics are kept up to date incrementally on every reservation write;
+    this rebuilds them for one customer (repair).
 
     Calculates:
     - total_visits: Reservations with 'Sentada' state
@@ -514,75 +624,7 @@ def update_customer_statistics(customer_id: int) -> bool:
         cursor = conn.cursor()
 
         try:
-            # Count visits (reservations with Sentada state)
-            cursor.execute('''
-                SELECT COUNT(*) as visits
-                FROM beach_reservations
-                WHERE customer_id = ?
-                  AND current_states LIKE '%Sentada%'
-            ''', (customer_id,))
-            visits = cursor.fetchone()['visits']
-
-            # Get last visit date
-            cursor.execute('''
-                SELECT MAX(reservation_date) as last_visit
-                FROM beach_reservations
-                WHERE customer_id = ?
-                  AND current_states LIKE '%Sentada%'
-            ''', (customer_id,))
-            last_visit = cursor.fetchone()['last_visit']
-
-            # Count no-shows
-            cursor.execute('''
-                SELECT COUNT(*) as no_shows
-                FROM beach_reservations
-                WHERE customer_id = ?
-                  AND current_states LIKE '%No-Show%'
-            ''', (customer_id,))
-            no_shows = cursor.fetchone()['no_shows']
-
-            # Count cancellations
-            cursor.execute('''
-                SELECT COUNT(*) as cancellations
-                FROM beach_reservations
-                WHERE customer_id = ?
-                  AND current_states LIKE '%Cancelada%'
-            ''', (customer_id,))
-            cancellations = cursor.fetchone()['cancellations']
-
-            # Count total reservations (excluding cancelled and no-show)
-            cursor.execute('''
-                SELECT COUNT(*) as total
-                FROM beach_reservations
-                WHERE customer_id = ?
-                  AND current_states NOT LIKE '%Cancelada%'
-                  AND current_states NOT LIKE '%No-Show%'
-            ''', (customer_id,))
-            total_reservations = cursor.fetchone()['total']
-
-            # Calculate total spent (sum of final_price, excluding cancelled/no-show)
-            cursor.execute('''
-                SELECT COALESCE(SUM(final_price), 0) as total_spent
-                FROM beach_reservations
-                WHERE customer_id = ?
-                  AND current_states NOT LIKE '%Cancelada%'
-                  AND current_states NOT LIKE '%No-Show%'
-            ''', (customer_id,))
-            total_spent = cursor.fetchone()['total_spent']
-
-            # Update customer
-            cursor.execute('''
-                UPDATE beach_customers
-                SET total_visits = ?,
-                    last_visit = ?,
-                    no_shows = ?,
-                    cancellations = ?,
-                    total_reservations = ?,
-                    total_spent = ?,
-                    updated_at = CURRENT_TIMESTAMP
-                WHERE id = ?
-            ''', (visits, last_visit, no_shows, cancellations, total_reservations, total_spent, customer_id))
-
+            _recompute_customer_statistics(cursor, customer_id)
             conn.commit()
             return True
 
@@ -591,6 +633,32 @@ def update_customer_statistics(customer_id: int) -> bool:
             return False
 
 
+def recompute_all_customer_statistics(conn=None) -> int:
+    """
+    Rebuild the statistics of every customer in one grouped pass.
+
+    For repair and after bulk data loads that bypass the usual write paths.
+
+    Args:
+        conn: Optional connection (caller commits); own transaction if None
+
+    Returns:
+        int: Number of customers whose statistics changed
+    """
+    if conn is not None:
+        return _recompute_customer_statistics(conn.cursor())
+
+    with get_db() as c:
+        cursor = c.cursor()
+        try:
+            updated = _recompute_customer_statistics(cursor)
+            c.commit()
+            return updated
+        except Exception:
+            c.rollback()
+            raise
+
+
 def get_status_history(reservation_id: int) -> list:
     """
     Get state change history for reservation.
@@ -10,6 +10,8 @@ Phase 6B - Module 3 (Main API with re-exports from specialized modules)
 # Re-export functions from specialized modules for backward compatibility
 from .reservation_suggestions_map import (
     build_furniture_occupancy_map,
+    build_multi_date_occupancy_map,
+    get_furniture_layout,
     get_customer_preferred_furniture,
     ROW_TOLERANCE_PX
 )
@@ -17,9 +19,15 @@ from .reservation_suggestions_map import (
 from .reservation_suggestions_scoring import (
     validate_cluster_contiguity,
     score_preference_match,
+    score_preference_matches,
     score_capacity_match
 )
 
+from .reservation_suggestions_cluster import (
+    find_furniture_clusters,
+    get_furniture_adjacency
+)
+
 
 # =============================================================================
 # CONSTANTS
@@ -90,45 +98,32 @@ def suggest_furniture_for_reservation(
 
     preferences = [p.strip() for p in preferences_csv.split(',') if p.strip()]
 
-    # Build occupancy map for first date (primary)
-    primary_date = dates[0]
-    occupancy_map = build_furniture_occupancy_map(primary_date, zone_id)
+    # Occupancy across all dates at once (free on every date = available)
+    occupancy_map = build_multi_date_occupancy_map(dates, zone_id)
 
     available_ids = occupancy_map.get('available_ids', [])
     furniture_dict = occupancy_map.get('furniture', {})
 
     if not available_ids:
+        if len(dates) > 1:
+            message = 'No hay mobiliario disponible para todas las fechas'
+        else:
+            message = 'No hay mobiliario disponible para esta fecha'
         return {
             'success': False,
             'strategy': 'no_availability',
             'suggestions': [],
             'total_available': 0,
-            'message': 'No hay mobiliario disponible para esta fecha'
+            'message': message
         }
 
-    # Check availability across all dates
-    if len(dates) > 1:
-        for date in dates[1:]:
-            other_map = build_furniture_occupancy_map(date, zone_id)
-            other_available = set(other_map.get('available_ids', []))
-            available_ids = [fid for fid in available_ids if fid in other_available]
-
-    if not available_ids:
-        return {
-            'success': False,
-            'strategy': 'no_availability',
-            'suggestions': [],
-            'total_available': 0,
-            'message': 'No hay mobiliario disponible para todas las fechas'
-        }
+    # Score individual furniture (one cached matrix lookup for all pieces)
+    pref_results = score_preference_matches(available_ids, preferences)
 
-    # Score individual furniture
     scored_furniture = []
     for fid in available_ids:
         furn = furniture_dict.get(fid, {})
-
-        # Preference score
-        pref_result = score_preference_match(fid, preferences)
+        pref_result = pref_results[fid]
 
         scored_furniture.append({
             'id': fid,
@@ -141,6 +136,9 @@ def suggest_furniture_for_reservation(
             'matched_prefs': pref_result['matched']
         })
 
+    scored_by_id = {f['id']: f for f in scored_furniture}
+    available_set = set(available_ids)
+
     # Sort by preference score, then by row/x for grouping
     scored_furniture.sort(key=lambda f: (-f['preference_score'], f['row'], f['x']))
 
@@ -174,7 +172,7 @@ def suggest_furniture_for_reservation(
     rows = occupancy_map.get('rows', {})
 
     for row_idx, row_furniture in rows.items():
-        available_in_row = [fid for fid in row_furniture if fid in available_ids]
+        available_in_row = [fid for fid in row_furniture if fid in available_set]
 
         if len(available_in_row) < 2:
             continue
@@ -192,8 +190,7 @@ def suggest_furniture_for_reservation(
                 if total_cap >= num_people:
                     # Average preference score
                     avg_pref = sum(
-                        next((f['preference_score'] for f in scored_furniture if f['id'] == fid), 0)
-                        for fid in pair
+                        scored_by_id[fid]['preference_score'] for fid in pair
                     ) / len(pair)
 
                     cap_score = score_capacity_match(total_cap, num_people)
@@ -206,10 +203,7 @@ def suggest_furniture_for_reservation(
 
                     matched_prefs = []
                     for fid in pair:
-                        for f in scored_furniture:
-                            if f['id'] == fid:
-                                matched_prefs.extend(f['matched_prefs'])
-                                break
+                        matched_prefs.extend(scored_by_id[fid]['matched_prefs'])
 
                     suggestions.append({
                         'furniture_ids': pair,
@@ -235,8 +229,7 @@ def suggest_furniture_for_reservation(
 
                     if total_cap >= num_people:
                         avg_pref = sum(
-                            next((f['preference_score'] for f in scored_furniture if f['id'] == fid), 0)
-                            for fid in triplet
+                            scored_by_id[fid]['preference_score'] for fid in triplet
                         ) / len(triplet)
 
                         cap_score = score_capacity_match(total_cap, num_people)
@@ -260,6 +253,50 @@ def suggest_furniture_for_reservation(
                             'zone_id': furniture_dict[triplet[0]]['zone_id']
                         })
 
+    # Strategy 3: Multi-row clusters for large parties (bounded beam search)
+    if num_people > 4 or not suggestions:
+        seen = {frozenset(s['furniture_ids']) for s in suggestions}
+        clusters = find_furniture_clusters(
+            occupancy_map,
+            num_people,
+            {fid: f['preference_score'] for fid, f in scored_by_id.items()},
+            limit=limit
+        )
+
+        for cluster in clusters:
+            if frozenset(cluster) in seen:
+                continue
+
+            contiguity = validate_cluster_contiguity(cluster, occupancy_map)
+            total_cap = sum(furniture_dict[fid]['capacity'] for fid in cluster)
+            avg_pref = sum(
+                scored_by_id[fid]['preference_score'] for fid in cluster
+            ) / len(cluster)
+            cap_score = score_capacity_match(total_cap, num_people)
+
+            total_score = (
+                SUGGESTION_WEIGHTS['contiguity'] * contiguity['contiguity_score'] +
+                SUGGESTION_WEIGHTS['preferences'] * avg_pref +
+                SUGGESTION_WEIGHTS['capacity'] * cap_score
+            )
+
+            matched_prefs = set()
+            for fid in cluster:
+                matched_prefs.update(scored_by_id[fid]['matched_prefs'])
+
+            suggestions.append({
+                'furniture_ids': cluster,
+                'furniture_numbers': [furniture_dict[fid]['number'] for fid in cluster],
+                'total_capacity': total_cap,
+                'total_score': round(total_score, 3),
+                'contiguity_score': round(contiguity['contiguity_score'], 3),
+                'preference_score': round(avg_pref, 3),
+                'capacity_score': round(cap_score, 3),
+                'preference_matches': list(matched_prefs),
+                'available_all_dates': True,
+                'zone_id': furniture_dict[cluster[0]]['zone_id']
+            })
+
     # Sort by total score and limit
     suggestions.sort(key=lambda s: -s['total_score'])
     suggestions = suggestions[:limit]
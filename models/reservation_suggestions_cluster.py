@@ -0,0 +1,174 @@
+"""
+Cluster search for large parties in the furniture suggestion system.
+
+Builds a spatial adjacency graph from furniture positions (cached per zone
+layout) and runs a bounded beam search over available furniture to find
+contiguous groups of any size, across adjacent rows.
+
+Phase 6B - Module 3C (Large party clusters)
+"""
+
+import time
+
+from .reservation_suggestions_map import get_furniture_layout
+
+
+# =============================================================================
+# CONSTANTS
+# =============================================================================
+
+# Furniture in adjacent rows is a neighbour when horizontally within this distance
+ADJACENT_ROW_X_TOLERANCE_PX = 60
+
+# Search bounds
+CLUSTER_BEAM_WIDTH = 20
+CLUSTER_MAX_PIECES = 12
+CLUSTER_TIME_BUDGET_S = 0.2
+
+
+# =============================================================================
+# ADJACENCY GRAPH
+# =============================================================================
+
+def _build_adjacency(layout: dict) -> dict:
+    """
+    Build {furniture_id: set of neighbour ids} from a row-clustered layout.
+
+    Neighbours are consecutive pieces in the same row, and pieces in the
+    previous/next row within ADJACENT_ROW_X_TOLERANCE_PX horizontally.
+    """
+    furniture = layout['furniture']
+    rows = layout['rows']
+    adjacency = {fid: set() for fid in furniture}
+
+    for row_idx, row_ids in rows.items():
+        for left, right in zip(row_ids, row_ids[1:]):
+            adjacency[left].add(right)
+            adjacency[right].add(left)
+
+        next_row = rows.get(row_idx + 1, [])
+        for fid in row_ids:
+            x = furniture[fid]['x']
+            for other in next_row:
+                if abs(furniture[other]['x'] - x) <= ADJACENT_ROW_X_TOLERANCE_PX:
+                    adjacency[fid].add(other)
+                    adjacency[other].add(fid)
+
+    return adjacency
+
+
+def get_furniture_adjacency(zone_id: int = None) -> dict:
+    """
+    Get the furniture adjacency graph, cached per layout version.
+
+    Args:
+        zone_id: Filter by zone (optional)
+
+    Returns:
+        dict: {furniture_id: set of adjacent furniture ids} (read-only)
+    """
+    from utils.cache import cached
+    return cached('furniture_layout', ('adjacency', zone_id or None),
+                  lambda: _build_adjacency(get_furniture_layout(zone_id)))
+
+
+# =============================================================================
+# BEAM SEARCH
+# =============================================================================
+
+def _spread(furniture_ids, furniture_dict: dict) -> float:
+    """Bounding-box half perimeter of a cluster (smaller = more compact)."""
+    xs = [furniture_dict[fid]['x'] for fid in furniture_ids]
+    ys = [furniture_dict[fid]['y'] for fid in furniture_ids]
+    return (max(xs) - min(xs)) + (max(ys) - min(ys))
+
+
+def find_furniture_clusters(
+    occupancy_map: dict,
+    num_people: int,
+    preference_scores: dict = None,
+    limit: int = 5,
+    beam_width: int = CLUSTER_BEAM_WIDTH,
+    max_pieces: int = CLUSTER_MAX_PIECES,
+    time_budget: float = CLUSTER_TIME_BUDGET_S
+) -> list:
+    """
+    Find contiguous clusters of available furniture seating num_people.
+
+    Grows clusters one adjacent available piece at a time, keeping the
+    beam_width most promising partial clusters per step (best preference
+    average, then most compact). Stops when the beam is exhausted, clusters
+    reach max_pieces, or the time budget runs out; clusters found so far are
+    returned.
+
+    Args:
+        occupancy_map: Result from build_multi_date_occupancy_map()
+        num_people: Number of people to seat
+        preference_scores: {furniture_id: score 0.0-1.0} (default 1.0 each)
+        limit: Maximum clusters to return
+        beam_width: Partial clusters kept per step
+        max_pieces: Maximum furniture pieces per cluster
+        time_budget: Seconds allowed for the search
+
+    Returns:
+        list: Furniture id lists (sorted by row/x), best first
+    """
+    furniture_dict = occupancy_map.get('furniture', {})
+    available = set(occupancy_map.get('available_ids', []))
+    if not available or num_people < 1:
+        return []
+
+    adjacency = get_furniture_adjacency(occupancy_map.get('zone_id'))
+    scores = preference_scores or {}
+    deadline = time.monotonic() + time_budget
+
+    def rank(state):
+        ids, _, pref_sum = state
+        return (-pref_sum / len(ids), _spread(ids, furniture_dict))
+
+    seeds = sorted(
+        ((frozenset([fid]), furniture_dict[fid]['capacity'] or 0, scores.get(fid, 1.0))
+         for fid in available),
+        key=rank
+    )
+
+    completed = {state[0]: state for state in seeds if state[1] >= num_people}
+    beam = [state for state in seeds if state[1] < num_people][:beam_width]
+
+    for _ in range(max_pieces - 1):
+        if not beam or time.monotonic() > deadline:
+            break
+
+        candidates = {}
+        for ids, capacity, pref_sum in beam:
+            frontier = set()
+            for fid in ids:
+                frontier |= adjacency.get(fid, set())
+            frontier &= available
+            frontier -= ids
+
+            for fid in frontier:
+                grown = ids | {fid}
+                if grown in candidates or grown in completed:
+                    continue
+                candidates[grown] = (
+                    grown,
+                    capacity + (furniture_dict[fid]['capacity'] or 0),
+                    pref_sum + scores.get(fid, 1.0)
+                )
+
+        beam = []
+        for state in sorted(candidates.values(), key=rank):
+            if state[1] >= num_people:
+                completed[state[0]] = state
+            elif len(beam) < beam_width:
+                beam.append(state)
+
+        if len(completed) >= limit * beam_width:
+            break
+
+    best = sorted(completed.values(), key=lambda s: (len(s[0]), s[1]) + rank(s))[:limit]
+    return [
+        sorted(ids, key=lambda fid: (furniture_dict[fid].get('row', 0), furniture_dict[fid]['x']))
+        for ids, _, _ in best
+    ]
@@ -23,6 +23,195 @@ ROW_TOLERANCE_PX = 30
 # OCCUPANCY MAP BUILDER
 # =============================================================================
 
+def _load_furniture_layout(zone_id: int = None) -> dict:
+    """
+    Load active furniture and cluster it into rows by Y position.
+
+    Returns:
+        dict: {'furniture': {id: static fields + 'row'}, 'rows': {row: [ids by x]}}
+    """
+    with get_db() as conn:
+        query = '''
+            SELECT f.id, f.number, f.furniture_type, f.capacity,
+                   f.position_x, f.position_y, f.zone_id
+            FROM beach_furniture f
+            WHERE f.active = 1
+        '''
+        params = []
+
+        if zone_id:
+            query += ' AND f.zone_id = ?'
+            params.append(zone_id)
+
+        query += ' ORDER BY f.position_y, f.position_x'
+        all_furniture = conn.execute(query, params).fetchall()
+
+    furniture_dict = {}
+    y_positions = []
+
+    for f in all_furniture:
+        furn_id = f['id']
+        y = f['position_y'] or 0
+
+        furniture_dict[furn_id] = {
+            'id': furn_id,
+            'number': f['number'],
+            'type': f['furniture_type'],
+            'capacity': f['capacity'],
+            'x': f['position_x'] or 0,
+            'y': y,
+            'zone_id': f['zone_id']
+        }
+        y_positions.append((furn_id, y))
+
+    # Assign rows based on Y clustering
+    rows = {}
+
+    if y_positions:
+        # Sort by Y position
+        y_positions.sort(key=lambda x: x[1])
+
+        current_row = 0
+        current_y = y_positions[0][1]
+        rows[current_row] = []
+
+        for furn_id, y in y_positions:
+            if abs(y - current_y) > ROW_TOLERANCE_PX:
+                # New row
+                current_row += 1
+                current_y = y
+                rows[current_row] = []
+
+            rows[current_row].append(furn_id)
+            furniture_dict[furn_id]['row'] = current_row
+
+        # Sort each row by X position
+        for row_idx in rows:
+            rows[row_idx].sort(key=lambda fid: furniture_dict[fid]['x'])
+
+    return {'furniture': furniture_dict, 'rows': rows}
+
+
+def get_furniture_layout(zone_id: int = None) -> dict:
+    """
+    Get the row-clustered furniture layout, cached per layout version.
+
+    The clustering only depends on furniture positions, so it is reused
+    until furniture is added, removed, moved or edited (the
+    'furniture_layout' cache generation). Treat the result as read-only.
+
+    Args:
+        zone_id: Filter by zone (optional)
+
+    Returns:
+        dict: {'furniture': {id: {...}}, 'rows': {row_index: [ids sorted by x]}}
+    """
+    from utils.cache import cached
+    return cached('furniture_layout', zone_id or None,
+                  lambda: _load_furniture_layout(zone_id))
+
+
+def get_occupied_furniture_for_dates(dates: list, zone_id: int = None) -> dict:
+    """
+    Get furniture occupied on any of the given dates, in one grouped query.
+
+    Args:
+        dates: Dates to check (YYYY-MM-DD); the first one is the primary date
+        zone_id: Filter by zone (optional)
+
+    Returns:
+        dict: {furniture_id: reservation_id on the primary date, or None if the
+        furniture is only occupied on other dates}
+    """
+    if not dates:
+        return {}
+
+    releasing_states = get_active_releasing_states()
+    date_placeholders = ','.join('?' * len(dates))
+
+    query = f'''
+        SELECT rf.furniture_id,
+               MAX(CASE WHEN rf.assignment_date = ? THEN r.id END) as reservation_id
+        FROM beach_reservation_furniture rf
+        JOIN beach_reservations r ON rf.reservation_id = r.id
+        WHERE rf.assignment_date IN ({date_placeholders})
+    '''
+    params = [dates[0]] + list(dates)
+
+    if releasing_states:
+        placeholders = ','.join('?' * len(releasing_states))
+        query += f' AND r.current_state NOT IN ({placeholders})'
+        params.extend(releasing_states)
+
+    if zone_id:
+        query += '''
+            AND rf.furniture_id IN (SELECT id FROM beach_furniture WHERE zone_id = ?)
+        '''
+        params.append(zone_id)
+
+    query += ' GROUP BY rf.furniture_id'
+
+    with get_db() as conn:
+        rows = conn.execute(query, params).fetchall()
+        return {row['furniture_id']: row['reservation_id'] for row in rows}
+
+
+def build_multi_date_occupancy_map(dates: list, zone_id: int = None) -> dict:
+    """
+    Build the occupancy map for a stay spanning several dates.
+
+    Furniture is 'available' only when it is free on every date. Row
+    clustering comes from the cached layout and occupancy from a single
+    grouped query, so a week-long stay costs about the same as one day.
+
+    Args:
+        dates: Dates to check (YYYY-MM-DD); the first one is the primary date
+        zone_id: Filter by zone (optional)
+
+    Returns:
+        dict: Same structure as build_furniture_occupancy_map() plus 'dates';
+        'reservation_id' refers to the primary date
+    """
+    primary_date = dates[0] if dates else None
+    layout = get_furniture_layout(zone_id)
+
+    if not layout['furniture']:
+        return {
+            'date': primary_date,
+            'dates': list(dates),
+            'zone_id': zone_id,
+            'occupied_ids': [],
+            'available_ids': [],
+            'furniture': {},
+            'rows': {},
+            'row_count': 0
+        }
+
+    occupied_map = get_occupied_furniture_for_dates(dates, zone_id)
+
+    # Copy the shared layout entries before adding per-date state
+    furniture_dict = {}
+    for furn_id, furn in layout['furniture'].items():
+        entry = dict(furn)
+        entry['available'] = furn_id not in occupied_map
+        entry['reservation_id'] = occupied_map.get(furn_id)
+        furniture_dict[furn_id] = entry
+
+    occupied_ids = [fid for fid in occupied_map if fid in furniture_dict]
+    available_ids = [fid for fid in furniture_dict if fid not in occupied_map]
+
+    return {
+        'date': primary_date,
+        'dates': list(dates),
+        'zone_id': zone_id,
+        'occupied_ids': occupied_ids,
+        'available_ids': available_ids,
+        'furniture': furniture_dict,
+        'rows': {row_idx: list(ids) for row_idx, ids in layout['rows'].items()},
+        'row_count': len(layout['rows'])
+    }
+
+
 def build_furniture_occupancy_map(date: str, zone_id: int = None) -> dict:
     """
     Build spatial occupancy map grouping furniture by rows.
@@ -58,119 +247,9 @@ def build_furniture_occupancy_map(date: str, zone_id: int = None) -> dict:
             'row_count': int
         }
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
-
-        releasing_states = get_active_releasing_states()
-
-        # Get all furniture
-        furniture_query = '''
-            SELECT f.id, f.number, f.furniture_type, f.capacity,
-                   f.position_x, f.position_y, f.zone_id,
-                   z.name as zone_name
-            FROM beach_furniture f
-            LEFT JOIN beach_zones z ON f.zone_id = z.id
-            WHERE f.active = 1
-        '''
-        params = []
-
-        if zone_id:
-            furniture_query += ' AND f.zone_id = ?'
-            params.append(zone_id)
-
-        furniture_query += ' ORDER BY f.position_y, f.position_x'
-
-        cursor.execute(furniture_query, params)
-        all_furniture = cursor.fetchall()
-
-        if not all_furniture:
-            return {
-                'date': date,
-                'zone_id': zone_id,
-                'occupied_ids': [],
-                'available_ids': [],
-                'furniture': {},
-                'rows': {},
-                'row_count': 0
-            }
-
-        # Get occupied furniture for the date
-        occupied_query = '''
-            SELECT rf.furniture_id, r.id as reservation_id
-            FROM beach_reservation_furniture rf
-            JOIN beach_reservations r ON rf.reservation_id = r.id
-            WHERE rf.assignment_date = ?
-        '''
-        occ_params = [date]
-
-        if releasing_states:
-            placeholders = ','.join('?' * len(releasing_states))
-            occupied_query += f' AND r.current_state NOT IN ({placeholders})'
-            occ_params.extend(releasing_states)
-
-        cursor.execute(occupied_query, occ_params)
-        occupied_map = {row['furniture_id']: row['reservation_id'] for row in cursor.fetchall()}
-
-        # Group furniture by rows (based on Y position)
-        furniture_dict = {}
-        y_positions = []
-
-        for f in all_furniture:
-            furn_id = f['id']
-            y = f['position_y'] or 0
-
-            furniture_dict[furn_id] = {
-                'id': furn_id,
-                'number': f['number'],
-                'type': f['furniture_type'],
-                'capacity': f['capacity'],
-                'x': f['position_x'] or 0,
-                'y': y,
-                'zone_id': f['zone_id'],
-                'available': furn_id not in occupied_map,
-                'reservation_id': occupied_map.get(furn_id)
-            }
-            y_positions.append((furn_id, y))
-
-        # Assign rows based on Y clustering
-        rows = {}
-        row_assignments = {}
-
-        if y_positions:
-            # Sort by Y position
-            y_positions.sort(key=lambda x: x[1])
-
-            current_row = 0
-            current_y = y_positions[0][1]
-            rows[current_row] = []
-
-            for furn_id, y in y_positions:
-                if abs(y - current_y) > ROW_TOLERANCE_PX:
-                    # New row
-                    current_row += 1
-                    current_y = y
-                    rows[current_row] = []
-
-                rows[current_row].append(furn_id)
-                row_assignments[furn_id] = current_row
-                furniture_dict[furn_id]['row'] = current_row
-
-            # Sort each row by X position
-            for row_idx in rows:
-                rows[row_idx].sort(key=lambda fid: furniture_dict[fid]['x'])
-
-        occupied_ids = list(occupied_map.keys())
-        available_ids = [fid for fid in furniture_dict if fid not in occupied_map]
-
-        return {
-            'date': date,
-            'zone_id': zone_id,
-            'occupied_ids': occupied_ids,
-            'available_ids': available_ids,
-            'furniture': furniture_dict,
-            'rows': rows,
-            'row_count': len(rows)
-        }
+    occupancy_map = build_multi_date_occupancy_map([date], zone_id)
+    del occupancy_map['dates']
+    return occupancy_map
 
 
 # =============================================================================
@@ -129,15 +129,92 @@ def validate_cluster_contiguity(furniture_ids: list, occupancy_map: dict) -> dic
 # PREFERENCE MATCHING (CARACTERÍSTICAS SYSTEM)
 # =============================================================================
 
+def _load_characteristic_lookup() -> dict:
+    """Load {'names': {id: name}, 'codes': {code: id}} for all characteristics."""
+    with get_db() as conn:
+        cursor = conn.execute('SELECT id, code, name FROM beach_characteristics')
+        rows = cursor.fetchall()
+        return {
+            'names': {row['id']: row['name'] for row in rows},
+            'codes': {row['code']: row['id'] for row in rows}
+        }
+
+
+def _get_characteristic_lookup() -> dict:
+    """Cached characteristic id/name/code lookup (read-only)."""
+    from utils.cache import cached
+    return cached('characteristics', 'lookup', _load_characteristic_lookup)
+
+
+def _resolve_preference_ids(preferences: list, lookup: dict) -> list:
+    """
+    Normalize requested preferences to characteristic IDs.
+
+    Accepts IDs (int or numeric string) and, for callers passing the CSV of
+    codes, characteristic codes. Unknown codes are kept out of the match but
+    still count as requested.
+    """
+    resolved = []
+    for pref in preferences:
+        if isinstance(pref, int):
+            resolved.append(pref)
+        elif isinstance(pref, str) and pref.isdigit():
+            resolved.append(int(pref))
+        else:
+            resolved.append(lookup['codes'].get(pref, -1))
+    return resolved
+
+
+def score_preference_matches(furniture_ids: list, preferences: list) -> dict:
+    """
+    Score many furniture pieces against requested characteristics at once.
+
+    Loads the furniture-to-characteristic matrix once (cached) instead of
+    querying per furniture and per matched characteristic.
+
+    Args:
+        furniture_ids: Furniture IDs to score
+        preferences: List of characteristic IDs requested (codes also accepted)
+
+    Returns:
+        dict: {furniture_id: {'score', 'matched', 'total_requested'}}
+    """
+    from models.characteristic_assignments import score_characteristic_matches
+
+    if not preferences:
+        return {
+            fid: {'score': 1.0, 'matched': [], 'total_requested': 0}
+            for fid in furniture_ids
+        }
+
+    lookup = _get_characteristic_lookup()
+    requested = _resolve_preference_ids(preferences, lookup)
+    known = [char_id for char_id in requested if char_id >= 0]
+    names = lookup['names']
+
+    results = score_characteristic_matches(furniture_ids, known)
+    scored = {}
+    for fid in furniture_ids:
+        result = results[fid]
+        matched = result['matched'] if known else []
+        scored[fid] = {
+            'score': len(matched) / len(requested),
+            'matched': [names[char_id] for char_id in matched if char_id in names],
+            'total_requested': len(preferences)
+        }
+    return scored
+
+
 def score_preference_match(furniture_id: int, preferences: list) -> dict:
     """
     Score how well furniture matches requested characteristics.
 
     Uses the unified características system - direct ID comparison.
+    Single-furniture wrapper around score_preference_matches().
 
     Args:
         furniture_id: Furniture ID to score
-        preferences: List of characteristic IDs requested (NOT codes)
+        preferences: List of characteristic IDs requested (codes also accepted)
 
     Returns:
         dict: {
@@ -146,33 +223,7 @@ def score_preference_match(furniture_id: int, preferences: list) -> dict:
             'total_requested': int
         }
     """
-    from models.characteristic_assignments import score_characteristic_match
-
-    # Handle empty preferences
-    if not preferences:
-        return {
-            'score': 1.0,
-            'matched': [],
-            'total_requested': 0
-        }
-
-    # Use the new characteristic matching system
-    result = score_characteristic_match(furniture_id, preferences)
-
-    # Get matched characteristic names for display
-    matched_names = []
-    if result['matched']:
-        from models.characteristic import get_characteristic_by_id
-        for char_id in result['matched']:
-            char = get_characteristic_by_id(char_id)
-            if char:
-                matched_names.append(char['name'])
-
-    return {
-        'score': result['score'],
-        'matched': matched_names,
-        'total_requested': len(preferences)
-    }
+    return score_preference_matches([furniture_id], preferences)[furniture_id]
 
 
 # =============================================================================
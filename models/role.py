@@ -4,6 +4,7 @@ Handles role CRUD operations and role-permission assignments.
 """
 
 from database import get_db
+from utils.cache import invalidate
 
 
 def get_all_roles(active_only: bool = True) -> list:
@@ -148,6 +149,7 @@ def update_role(role_id: int, **kwargs) -> bool:
         cursor = conn.cursor()
         cursor.execute(query, values)
         conn.commit()
+        invalidate('users')
 
         return cursor.rowcount > 0
 
@@ -172,6 +174,7 @@ def assign_permission(role_id: int, permission_id: int) -> bool:
                 VALUES (?, ?)
             ''', (role_id, permission_id))
             conn.commit()
+            invalidate('permissions')
             return True
         except Exception:
             # Already exists
@@ -197,6 +200,7 @@ def revoke_permission(role_id: int, permission_id: int) -> bool:
         ''', (role_id, permission_id))
 
         conn.commit()
+        invalidate('permissions')
         return cursor.rowcount > 0
 
 
@@ -278,6 +282,7 @@ def bulk_set_permissions(role_id: int, permission_ids: list) -> dict:
         removed_details = [current[pid] for pid in to_remove]
 
         conn.commit()
+        invalidate('permissions')
 
         return {'added': added_details, 'removed': removed_details}
 
@@ -296,4 +301,6 @@ def delete_role(role_id: int) -> bool:
         cursor = conn.cursor()
         cursor.execute('DELETE FROM roles WHERE id = ? AND is_system = 0', (role_id,))
         conn.commit()
+        invalidate('users')
+        invalidate('permissions')
         return cursor.rowcount > 0
@@ -0,0 +1,156 @@
+"""
+Customer/guest search index functions.
+Maintains the trigram FTS5 indexes (beach_customers_fts, hotel_guests_fts)
+used by the unified customer search, and builds their MATCH expressions.
+
+Each index row has the source row's id as rowid and a single 'doc' column
+holding the accent-folded, lower-case searchable fields. Triggers installed
+in database/migrations/search_index.py queue changed rows in
+beach_search_dirty; the customer and guest write paths apply the queue with
+refresh_search_index() inside their own transaction, so searches read the
+index as-is.
+"""
+
+from typing import List, Tuple
+
+from database import get_db
+from database.connection import try_begin_immediate
+from database.migrations.search_index import SEARCH_SOURCES
+from .customer_search import normalize_text
+
+# Ids handled per IN (...) statement
+_CHUNK = 500
+
+# Shortest substring the trigram tokenizer can look up through the index
+_MIN_TRIGRAM = 3
+
+
+def _build_doc(row) -> str:
+    """Folded searchable text for one source row (fields joined by spaces)."""
+    return ' '.join(normalize_text(str(value)) for value in row if value)
+
+
+def _reindex(cursor, kind: str, ids: List[int]) -> None:
+    """Replace the index rows of the given source ids (deleted rows drop out)."""
+    table, fts, columns = SEARCH_SOURCES[kind]
+    for start in range(0, len(ids), _CHUNK):
+        chunk = ids[start:start + _CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        cursor.execute(f'DELETE FROM {fts} WHERE rowid IN ({placeholders})', chunk)
+        cursor.execute(f'''
+            SELECT id, {', '.join(columns)} FROM {table}
+            WHERE id IN ({placeholders})
+        ''', chunk)
+        cursor.executemany(
+            f'INSERT INTO {fts} (rowid, doc) VALUES (?, ?)',
+            [(row['id'], _build_doc(tuple(row)[1:])) for row in cursor.fetchall()]
+        )
+        cursor.execute(f'''
+            DELETE FROM beach_search_dirty
+            WHERE kind = ? AND ref_id IN ({placeholders})
+        ''', [kind] + chunk)
+
+
+def refresh_search_index(conn=None, wait: bool = True) -> int:
+    """
+    Apply queued customer/guest changes to the search indexes.
+
+    Cheap when nothing is queued (one index probe). Write paths call it
+    before committing; searches call it with wait=False to pick up rows
+    queued by raw-SQL writes without ever queueing behind a writer.
+
+    Args:
+        conn: Existing connection (joins its transaction); None opens one
+        wait: When opening its own transaction, wait for the write lock
+              (False = skip the refresh if the lock is busy)
+
+    Returns:
+        Number of source rows re-indexed
+    """
+    def _flush(db) -> int:
+        cursor = db.cursor()
+        cursor.execute('SELECT 1 FROM beach_search_dirty LIMIT 1')
+        if cursor.fetchone() is None:
+            return 0
+
+        own_transaction = not db.in_transaction
+        if own_transaction:
+            if wait:
+                cursor.execute('BEGIN IMMEDIATE')
+            elif not try_begin_immediate(db):
+                return 0
+        try:
+            refreshed = 0
+            for kind in SEARCH_SOURCES:
+                cursor.execute('SELECT ref_id FROM beach_search_dirty WHERE kind = ?', (kind,))
+                ids = [row['ref_id'] for row in cursor.fetchall()]
+                _reindex(cursor, kind, ids)
+                refreshed += len(ids)
+            if own_transaction:
+                db.commit()
+            return refreshed
+        except Exception:
+            if own_transaction:
+                db.rollback()
+            raise
+
+    if conn is not None:
+        return _flush(conn)
+    with get_db() as db:
+        return _flush(db)
+
+
+def rebuild_search_index() -> int:
+    """
+    Rebuild both search indexes from scratch (repair path).
+
+    Returns:
+        Number of source rows indexed
+    """
+    with get_db() as conn:
+        cursor = conn.cursor()
+        cursor.execute('BEGIN IMMEDIATE')
+        try:
+            for kind, (table, fts, _columns) in SEARCH_SOURCES.items():
+                cursor.execute(f'DELETE FROM {fts}')
+                cursor.execute(f'''
+                    INSERT OR IGNORE INTO beach_search_dirty (kind, ref_id)
+                    SELECT ?, id FROM {table}
+                ''', (kind,))
+            refreshed = refresh_search_index(conn)
+            conn.commit()
+            return refreshed
+        except Exception:
+            conn.rollback()
+            raise
+
+
+def build_match_filter(fts: str, search_words: List[str]) -> Tuple[str, list]:
+    """
+    Build the condition selecting index rows that contain every search word.
+
+    Words of three or more characters go through the trigram index (MATCH);
+    shorter ones fall back to LIKE on the (small) index table.
+
+    Args:
+        fts: FTS table name ('beach_customers_fts' / 'hotel_guests_fts')
+        search_words: Normalized (accent-folded, lower-case) query words
+
+    Returns:
+        tuple: (SQL 'rowid IN (...)'-ready subquery, params)
+    """
+    phrases = []
+    conditions = []
+    params = []
+    for word in search_words:
+        if len(word) >= _MIN_TRIGRAM:
+            phrases.append('"' + word.replace('"', '""') + '"')
+        else:
+            conditions.append('doc LIKE ?')
+            params.append(f'%{word}%')
+
+    if phrases:
+        conditions.insert(0, f'{fts} MATCH ?')
+        params.insert(0, ' AND '.join(phrases))
+
+    return f"SELECT rowid FROM {fts} WHERE {' AND '.join(conditions)}", params
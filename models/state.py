@@ -6,32 +6,56 @@ Provides dynamic lookup functions for state properties.
 """
 
 from database import get_db
+from utils.cache import cached, invalidate
 
 
-def get_all_states(active_only: bool = True) -> list:
+def get_all_states(active_only: bool = True, include_usage: bool = True) -> list:
     """
     Get all reservation states.
 
+    State rows come from the reference-data cache; usage counts change with
+    every reservation, so they are queried fresh when requested.
+
     Args:
         active_only: If True, return only active states
+        include_usage: If True, add usage_count (reservations per state)
 
     Returns:
         List of state dictionaries ordered by display_order
     """
+    states = [dict(row) for row in _get_cached_states(active_only)]
+
+    if include_usage:
+        with get_db() as conn:
+            cursor = conn.cursor()
+            cursor.execute('''
+                SELECT current_state, COUNT(*) as usage_count
+                FROM beach_reservations
+                GROUP BY current_state
+            ''')
+            usage = {row['current_state']: row['usage_count'] for row in cursor.fetchall()}
+        for state in states:
+            state['usage_count'] = usage.get(state['name'], 0)
+
+    return states
+
+
+def _get_cached_states(active_only: bool = True) -> list:
+    """Cached state rows (shared between requests: do not mutate)."""
+    return cached('states', ('all', active_only), lambda: _load_states(active_only))
+
+
+def _load_states(active_only: bool) -> list:
+    """Query reservation states (cache loader)."""
     with get_db() as conn:
         cursor = conn.cursor()
 
-        query = '''
-            SELECT s.*,
-                   (SELECT COUNT(*) FROM beach_reservations
-                    WHERE current_state = s.name) as usage_count
-            FROM beach_reservation_states s
-        '''
+        query = 'SELECT * FROM beach_reservation_states'
 
         if active_only:
-            query += ' WHERE s.active = 1'
+            query += ' WHERE active = 1'
 
-        query += ' ORDER BY s.display_order'
+        query += ' ORDER BY display_order'
 
         cursor.execute(query)
         return [dict(row) for row in cursor.fetchall()]
@@ -125,14 +149,17 @@ def get_state_priority_map() -> dict:
     Returns:
         dict: {state_name: priority} mapping
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT name, display_priority
-            FROM beach_reservation_states
-            WHERE active = 1
-        ''')
-        return {row['name']: row['display_priority'] for row in cursor.fetchall()}
+    return {s['name']: s['display_priority'] for s in _get_cached_states()}
+
+
+def get_state_id_map() -> dict:
+    """
+    Get name to ID mapping for all states (including inactive ones).
+
+    Returns:
+        dict: {state_name: state_id} mapping
+    """
+    return {s['name']: s['id'] for s in _get_cached_states(active_only=False)}
 
 
 def get_incident_states() -> list:
@@ -142,13 +169,7 @@ def get_incident_states() -> list:
     Returns:
         List of state names with creates_incident=1
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT name FROM beach_reservation_states
-            WHERE creates_incident = 1 AND active = 1
-        ''')
-        return [row['name'] for row in cursor.fetchall()]
+    return [s['name'] for s in _get_cached_states() if s['creates_incident'] == 1]
 
 
 def get_releasing_states() -> list:
@@ -158,13 +179,7 @@ def get_releasing_states() -> list:
     Returns:
         List of state names with is_availability_releasing=1
     """
-    with get_db() as conn:
-        cursor = conn.cursor()
-        cursor.execute('''
-            SELECT name FROM beach_reservation_states
-            WHERE is_availability_releasing = 1 AND active = 1
-        ''')
-        return [row['name'] for row in cursor.fetchall()]
+    return [s['name'] for s in _get_cached_states() if s['is_availability_releasing'] == 1]
 
 
 def create_state(
@@ -216,6 +231,7 @@ def create_state(
               display_priority, creates_incident))
 
         conn.commit()
+        invalidate('states')
         return cursor.lastrowid
 
 
@@ -271,6 +287,7 @@ def update_state(state_id: int, **kwargs) -> bool:
 
         cursor.execute(query, values)
         conn.commit()
+        invalidate('states')
 
         return cursor.rowcount > 0
 
@@ -302,6 +319,7 @@ def delete_state(state_id: int) -> bool:
         cursor = conn.cursor()
         cursor.execute('UPDATE beach_reservation_states SET active = 0 WHERE id = ?', (state_id,))
         conn.commit()
+        invalidate('states')
 
         return cursor.rowcount > 0
 
@@ -328,6 +346,7 @@ def reorder_states(state_ids: list) -> bool:
                 ''', (order, state_id))
 
             conn.commit()
+            invalidate('states')
             return True
 
         except Exception:
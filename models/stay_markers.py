@@ -0,0 +1,119 @@
+"""
+Hotel stay marker functions.
+Maintains beach_stay_markers: per day, the booking references and rooms with
+a hotel check-in (flag 1) and/or check-out (flag 2) that day. Triggers
+installed in database/migrations/stay_markers.py queue the days touched by
+hotel_guests writes; the guest write paths and imports rebuild those days
+with refresh_stay_markers(), so map reads use the markers as-is.
+"""
+
+from database import get_db
+from database.connection import try_begin_immediate
+
+# Marker flag bits
+STAY_CHECKIN = 1
+STAY_CHECKOUT = 2
+
+
+def _rebuild_dirty_days(cursor) -> int:
+    """Recompute the markers of every queued day and clear the queue."""
+    cursor.execute('''
+        DELETE FROM beach_stay_markers
+        WHERE marker_date IN (SELECT marker_date FROM beach_stay_markers_dirty)
+    ''')
+    # Booking references: one booking is one stay, so the flags of its
+    # guests combine. Two joins (arrival / departure) so each side uses its
+    # date index.
+    cursor.execute('''
+        INSERT INTO beach_stay_markers (marker_date, key_kind, match_key, flags)
+        SELECT marker_date, 'ref', match_key, MAX(flag = 1) + 2 * MAX(flag = 2)
+        FROM (
+            SELECT d.marker_date, g.booking_reference AS match_key, 1 AS flag
+            FROM beach_stay_markers_dirty d
+            JOIN hotel_guests g ON g.arrival_date = d.marker_date
+            UNION ALL
+            SELECT d.marker_date, g.booking_reference, 2
+            FROM beach_stay_markers_dirty d
+            JOIN hotel_guests g ON g.departure_date = d.marker_date
+        )
+        WHERE match_key IS NOT NULL AND match_key != ''
+        GROUP BY marker_date, match_key
+    ''')
+    # Rooms host several stays over time: on a turnover day only the stay
+    # already in the room (earliest arrival) sets the flags, as a room-only
+    # customer can't be told apart from the incoming guest.
+    cursor.execute('''
+        INSERT INTO beach_stay_markers (marker_date, key_kind, match_key, flags)
+        SELECT marker_date, 'room', match_key, flags
+        FROM (
+            SELECT marker_date, match_key, flags,
+                   ROW_NUMBER() OVER (
+                       PARTITION BY marker_date, match_key
+                       ORDER BY arrival_date, id
+                   ) AS stay_rank
+            FROM (
+                SELECT d.marker_date, g.room_number AS match_key, g.id,
+                       g.arrival_date,
+                       (g.arrival_date = d.marker_date)
+                           + 2 * (g.departure_date = d.marker_date) AS flags
+                FROM beach_stay_markers_dirty d
+                JOIN hotel_guests g ON g.arrival_date = d.marker_date
+                UNION
+                SELECT d.marker_date, g.room_number, g.id, g.arrival_date,
+                       (g.arrival_date = d.marker_date)
+                           + 2 * (g.departure_date = d.marker_date)
+                FROM beach_stay_markers_dirty d
+                JOIN hotel_guests g ON g.departure_date = d.marker_date
+            )
+            WHERE match_key IS NOT NULL AND match_key != ''
+        )
+        WHERE stay_rank = 1
+    ''')
+    cursor.execute('SELECT COUNT(*) FROM beach_stay_markers_dirty')
+    days = cursor.fetchone()[0]
+    cursor.execute('DELETE FROM beach_stay_markers_dirty')
+    return days
+
+
+def refresh_stay_markers(conn=None, wait: bool = True) -> int:
+    """
+    Rebuild the stay markers of the days queued by hotel_guests changes.
+
+    Cheap when nothing is queued (one index probe). Guest write paths call it
+    before committing; map reads call it with wait=False to pick up days
+    queued by raw-SQL writes without ever queueing behind a writer.
+
+    Args:
+        conn: Existing connection (joins its transaction); None opens one
+        wait: When opening its own transaction, wait for the write lock
+              (False = skip the rebuild if the lock is busy)
+
+    Returns:
+        Number of days rebuilt
+    """
+    def _flush(db) -> int:
+        cursor = db.cursor()
+        cursor.execute('SELECT 1 FROM beach_stay_markers_dirty LIMIT 1')
+        if cursor.fetchone() is None:
+            return 0
+
+        own_transaction = not db.in_transaction
+        if own_transaction:
+            if wait:
+                cursor.execute('BEGIN IMMEDIATE')
+            elif not try_begin_immediate(db):
+                return 0
+        try:
+            days = _rebuild_dirty_days(cursor)
+            if own_transaction:
+                db.commit()
+            return days
+        except Exception:
+            if own_transaction:
+                db.rollback()
+            raise
+
+    if conn is not None:
+        return _flush(conn)
+    with get_db() as db:
+        return _flush(db)
@@ -15,14 +15,25 @@ Two layers:
 - find_out_of_stay_reservations(): post-import audit that lists current or
   future interno reservations whose hotel booking no longer covers the
   reservation date, so they surface in the import summary instead of being
-  discovered on the map.
+  discovered on the map. It validates the whole batch through
+  check_dates_within_stay_bulk(), which loads every stay segment in a few
+  chunked queries instead of one lookup per reservation.
 """
 
-from typing import Any, Dict, List, Optional
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 from database import get_db
 from models.hotel_guest import booking_base, normalize_guest_name
 
+# Keys per IN (...) query when loading stay segments in bulk
+_STAY_CHUNK = 400
+
+_SEGMENT_COLUMNS = '''
+    id, booking_reference, room_number, guest_name,
+    arrival_date, departure_date, nationality, vip_code
+'''
+
 
 def _stay_segments_for_customer(conn, customer: Dict[str, Any]) -> List[Dict[str, Any]]:
     """
@@ -32,31 +43,22 @@ def _stay_segments_for_customer(conn, customer: Dict[str, Any]) -> List[Dict[str
     re-books on room changes: base-1, base-2... are the same stay).
     Fallback (customer without anchor): rows for the customer's room whose
     normalized guest name matches the customer name.
+
+    Same indexed lookup as the bulk audit, so a live reservation check and
+    the post-import audit always classify a customer the same way.
     """
-    ref = (customer.get('booking_reference') or '').strip()
-    if ref:
-        base = booking_base(ref)
-        return conn.execute('''
-            SELECT booking_reference, room_number, guest_name,
-                   arrival_date, departure_date, nationality, vip_code
-            FROM hotel_guests
-            WHERE booking_reference = ? OR booking_reference LIKE ?
-        ''', (base, base + '-%')).fetchall()
+    return _stay_segments_for_customers(conn, [customer])[0]
 
-    room = (customer.get('room_number') or '').strip()
-    if not room:
-        return []
-    name = normalize_guest_name(
+
+def _customer_guest_name(customer: Dict[str, Any]) -> str:
+    """Normalized 'first last' name of a customer, for the room fallback."""
+    return normalize_guest_name(
         f"{customer.get('first_name') or ''} {customer.get('last_name') or ''}".strip()
     )
-    if not name:
-        return []
-    rows = conn.execute('''
-        SELECT booking_reference, room_number, guest_name,
-               arrival_date, departure_date, nationality, vip_code
-        FROM hotel_guests
-        WHERE room_number = ?
-    ''', (room,)).fetchall()
+
+
+def _match_guest_name(rows, name: str) -> list:
+    """Rows whose normalized guest name contains / is contained in name."""
     matched = []
     for r in rows:
         gname = normalize_guest_name(r['guest_name'] or '')
@@ -67,6 +69,58 @@ def _stay_segments_for_customer(conn, customer: Dict[str, Any]) -> List[Dict[str
     return matched
 
 
+def _stay_segments_for_customers(conn, customers: Sequence[Dict[str, Any]]) -> List[list]:
+    """
+    The segments of every customer, in input order, loaded with one chunked
+    query per key kind (booking bases, fallback rooms) instead of one query
+    per customer.
+    """
+    refs = [(c.get('booking_reference') or '').strip() for c in customers]
+    bases = sorted({booking_base(ref) for ref in refs if ref})
+    rooms = sorted({(c.get('room_number') or '').strip()
+                    for c, ref in zip(customers, refs) if not ref} - {''})
+
+    by_base: Dict[str, list] = {}
+    for start in range(0, len(bases), _STAY_CHUNK):
+        chunk = bases[start:start + _STAY_CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        rows = conn.execute(f'''
+            SELECT {_SEGMENT_COLUMNS}, booking_base
+            FROM hotel_guests
+            WHERE booking_base IN ({placeholders})
+               OR booking_reference IN ({placeholders})
+            ORDER BY id
+        ''', chunk + chunk).fetchall()
+        # A base matches its own suffixed segments and an unsuffixed booking
+        # with exactly that reference (ref = base OR ref LIKE base-%).
+        for row in rows:
+            for key in {row['booking_base'], row['booking_reference']}:
+                by_base.setdefault(key, []).append(row)
+
+    by_room: Dict[str, list] = {}
+    for start in range(0, len(rooms), _STAY_CHUNK):
+        chunk = rooms[start:start + _STAY_CHUNK]
+        placeholders = ','.join('?' * len(chunk))
+        rows = conn.execute(f'''
+            SELECT {_SEGMENT_COLUMNS}
+            FROM hotel_guests
+            WHERE room_number IN ({placeholders})
+            ORDER BY id
+        ''', chunk).fetchall()
+        for row in rows:
+            by_room.setdefault(row['room_number'], []).append(row)
+
+    result = []
+    for customer, ref in zip(customers, refs):
+        if ref:
+            result.append(by_base.get(booking_base(ref), []))
+            continue
+        room = (customer.get('room_number') or '').strip()
+        name = _customer_guest_name(customer) if room else ''
+        result.append(_match_guest_name(by_room.get(room, []), name) if name else [])
+    return result
+
+
 def _iso(value) -> str:
     """Normalize DATE column values (date objects or strings) to YYYY-MM-DD."""
     if value is None:
@@ -74,6 +128,62 @@ def _iso(value) -> str:
     return value.isoformat() if hasattr(value, 'isoformat') else str(value)
 
 
+def _stay_intervals(segments) -> List[Tuple[str, str]]:
+    """Merge segment windows into sorted, non-overlapping (arrival, departure)."""
+    windows = sorted(
+        (arr, dep)
+        for arr, dep in ((_iso(s['arrival_date']), _iso(s['departure_date']))
+                         for s in segments)
+        if arr and dep
+    )
+    merged: List[Tuple[str, str]] = []
+    for arr, dep in windows:
+        if merged and arr <= merged[-1][1]:
+            if dep > merged[-1][1]:
+                merged[-1] = (merged[-1][0], dep)
+        else:
+            merged.append((arr, dep))
+    return merged
+
+
+def _not_applicable() -> Dict[str, Any]:
+    """check_dates_within_stay result for externos / missing customer."""
+    return {
+        'applicable': False, 'known': False, 'ok': True,
+        'uncovered': [], 'arrival': None, 'departure': None,
+        'guest_name': None,
+    }
+
+
+def _evaluate_stay(segments, dates: List[str]) -> Dict[str, Any]:
+    """
+    check_dates_within_stay result for an interno customer whose segments
+    are already loaded. Each date is located by bisection in the merged
+    interval list.
+    """
+    result = _not_applicable()
+    result['applicable'] = True
+    if not segments:
+        return result  # pre-arrival: PMS doesn't know this guest yet, allow
+    result['known'] = True
+    result['guest_name'] = next(
+        (s['guest_name'] for s in segments if s['guest_name']), None)
+    intervals = _stay_intervals(segments)
+    if not intervals:
+        return result
+    result['arrival'] = intervals[0][0]
+    result['departure'] = max(dep for _, dep in intervals)
+    starts = [arr for arr, _ in intervals]
+    uncovered = []
+    for d in dates:
+        i = bisect_right(starts, d) - 1
+        if i < 0 or d > intervals[i][1]:
+            uncovered.append(d)
+    result['uncovered'] = sorted(uncovered)
+    result['ok'] = not uncovered
+    return result
+
+
 def check_dates_within_stay(customer: Optional[Dict[str, Any]],
                             dates: List[str],
                             conn=None) -> Dict[str, Any]:
@@ -91,42 +201,44 @@ def check_dates_within_stay(customer: Optional[Dict[str, Any]],
         arrival / departure: overall stay window (min arrival, max departure).
         guest_name: display name from the PMS rows (best effort).
     """
-    result = {
-        'applicable': False, 'known': False, 'ok': True,
-        'uncovered': [], 'arrival': None, 'departure': None,
-        'guest_name': None,
-    }
     if not customer or customer.get('customer_type') != 'interno' or not dates:
-        return result
-    result['applicable'] = True
+        return _not_applicable()
+
+    if conn is not None:
+        return _evaluate_stay(_stay_segments_for_customer(conn, customer), dates)
+    with get_db() as c:
+        return _evaluate_stay(_stay_segments_for_customer(c, customer), dates)
+
+
+def check_dates_within_stay_bulk(checks: Sequence[Tuple[Optional[Dict[str, Any]], List[str]]],
+                                 conn=None) -> List[Dict[str, Any]]:
+    """
+    check_dates_within_stay for many (customer, dates) pairs at once.
+
+    The stay segments of all interno customers are loaded together (see
+    _stay_segments_for_customers) and every date is checked in memory, so
+    the cost no longer grows with one query per pair.
+
+    Returns:
+        One check_dates_within_stay result per pair, in input order.
+    """
+    pending = [i for i, (customer, dates) in enumerate(checks)
+               if customer and customer.get('customer_type') == 'interno' and dates]
+    results = [_not_applicable() for _ in checks]
+    if not pending:
+        return results
 
     def _run(c):
-        segments = _stay_segments_for_customer(c, customer)
-        if not segments:
-            return  # pre-arrival: PMS doesn't know this guest yet, allow
-        result['known'] = True
-        windows = []
-        for s in segments:
-            arr, dep = _iso(s['arrival_date']), _iso(s['departure_date'])
-            if arr and dep:
-                windows.append((arr, dep))
-            if not result['guest_name'] and s['guest_name']:
-                result['guest_name'] = s['guest_name']
-        if not windows:
-            return
-        result['arrival'] = min(w[0] for w in windows)
-        result['departure'] = max(w[1] for w in windows)
-        uncovered = [d for d in dates
-                     if not any(w[0] <= d <= w[1] for w in windows)]
-        result['uncovered'] = sorted(uncovered)
-        result['ok'] = not uncovered
+        segments = _stay_segments_for_customers(c, [checks[i][0] for i in pending])
+        for i, customer_segments in zip(pending, segments):
+            results[i] = _evaluate_stay(customer_segments, checks[i][1])
 
     if conn is not None:
         _run(conn)
     else:
         with get_db() as c:
             _run(c)
-    return result
+    return results
 
 
 def outside_stay_message(stay: Dict[str, Any]) -> str:
@@ -252,16 +364,19 @@ def find_out_of_stay_reservations(conn=None) -> List[Dict[str, Any]]:
             ORDER BY r.reservation_date, r.id
         ''', (today,)).fetchall()
 
-        for row in rows:
-            customer = {
-                'customer_type': 'interno',
-                'booking_reference': row['res_ref'] or row['cust_ref'],
-                'room_number': row['room_number'],
-                'first_name': row['first_name'],
-                'last_name': row['last_name'],
-            }
-            stay = check_dates_within_stay(
-                customer, [_iso(row['reservation_date'])], conn=c)
+        customers = [{
+            'customer_type': 'interno',
+            'booking_reference': row['res_ref'] or row['cust_ref'],
+            'room_number': row['room_number'],
+            'first_name': row['first_name'],
+            'last_name': row['last_name'],
+        } for row in rows]
+        stays = check_dates_within_stay_bulk(
+            [(customer, [_iso(row['reservation_date'])])
+             for customer, row in zip(customers, rows)],
+            conn=c)
+
+        for row, customer, stay in zip(rows, customers, stays):
             if stay['applicable'] and stay['known'] and not stay['ok']:
                 departed = bool(stay['departure']) and stay['departure'] < today
                 flagged.append({
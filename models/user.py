@@ -6,6 +6,7 @@ Handles user authentication, CRUD operations, and Flask-Login integration.
 from werkzeug.security import generate_password_hash, check_password_hash
 from database import get_db
 from datetime import datetime
+from utils.cache import cached, invalidate
 
 
 class User:
@@ -56,12 +57,22 @@ def get_user_by_id(user_id: int) -> dict:
     """
     Get user by ID.
 
+    Runs on every request (Flask-Login user_loader), so rows are cached per
+    process under the 'users' generation; any write to users/roles is seen
+    on the next lookup.
+
     Args:
         user_id: User ID
 
     Returns:
         User dict or None if not found
     """
+    row = cached('users', user_id, lambda: _load_user(user_id))
+    return dict(row) if row else None
+
+
+def _load_user(user_id: int) -> dict:
+    """Query a user row with its role name (cache loader)."""
     with get_db() as conn:
         cursor = conn.cursor()
         cursor.execute('''
@@ -174,6 +185,7 @@ def create_user(username: str, email: str, password: str, full_name: str = None,
         ''', (username, email, password_hash, full_name, role_id))
 
         conn.commit()
+        invalidate('users')
         return cursor.lastrowid
 
 
@@ -211,6 +223,7 @@ def update_user(user_id: int, **kwargs) -> bool:
         cursor = conn.cursor()
         cursor.execute(query, values)
         conn.commit()
+        invalidate('users')
 
         return cursor.rowcount > 0
 
@@ -237,6 +250,7 @@ def update_password(user_id: int, new_password: str) -> bool:
         ''', (password_hash, user_id))
 
         conn.commit()
+        invalidate('users')
         return cursor.rowcount > 0
 
 
@@ -258,6 +272,7 @@ def delete_user(user_id: int) -> bool:
         ''', (user_id,))
 
         conn.commit()
+        invalidate('users')
         return cursor.rowcount > 0
 
 
@@ -275,6 +290,7 @@ def update_last_login(user_id: int) -> None:
             WHERE id = ?
         ''', (user_id,))
         conn.commit()
+        invalidate('users')
 
 
 def check_password(user_dict: dict, password: str) -> bool:
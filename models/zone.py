@@ -4,6 +4,7 @@ Handles zone CRUD operations.
 """
 
 from database import get_db
+from utils.cache import cached, invalidate
 
 
 def get_all_zones(active_only: bool = True) -> list:
@@ -16,6 +17,12 @@ def get_all_zones(active_only: bool = True) -> list:
     Returns:
         List of zone dicts ordered by display_order
     """
+    rows = cached('zones', ('all', active_only), lambda: _load_zones(active_only))
+    return [dict(row) for row in rows]
+
+
+def _load_zones(active_only: bool) -> list:
+    """Query zones with furniture/child counts (cache loader)."""
     with get_db() as conn:
         cursor = conn.cursor()
 
@@ -94,6 +101,7 @@ def create_zone(
               canvas_width, canvas_height, background_color, number_start))
 
         conn.commit()
+        invalidate('zones')
         return cursor.lastrowid
 
 
@@ -129,6 +137,7 @@ def update_zone(zone_id: int, **kwargs) -> bool:
         cursor = conn.cursor()
         cursor.execute(query, values)
         conn.commit()
+        invalidate('zones')
 
         return cursor.rowcount > 0
 
@@ -174,6 +183,7 @@ def delete_zone(zone_id: int) -> bool:
         cursor.execute('DELETE FROM beach_zones WHERE id = ?', (zone_id,))
 
         conn.commit()
+        invalidate('zones')
         return cursor.rowcount > 0
 
 
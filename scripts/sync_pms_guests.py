@@ -8,7 +8,12 @@ into the beach club system automatically.
 Usage:
     python scripts/sync_pms_guests.py              # Run once
     python scripts/sync_pms_guests.py --force       # Force import even if file unchanged
-    python scripts/sync_pms_guests.py --dry-run     # Check without importing
+    python scripts/sync_pms_guests.py --dry-run     # Print the change set without importing
+    python scripts/sync_pms_guests.py --full        # Apply every row (ignore the snapshot)
+
+Imports are incremental: the report is diffed against the snapshot of the
+previous sync (instance/pms_guest_snapshot.json) and only added, changed and
+removed guests are applied. Without a snapshot the whole file is applied.
 
 Designed to run as a cron job every 2-4 hours.
 """
@@ -48,6 +53,8 @@ NEXTCLOUD_FILE_PATH = os.environ.get(
 # Lives under instance/ so it persists across container redeploys (db-data volume).
 STATE_DIR = PROJECT_ROOT / 'instance'
 STATE_FILE = STATE_DIR / '.pms_sync_state'
+# Row snapshot of the last applied report (for the incremental diff)
+SNAPSHOT_FILE = STATE_DIR / 'pms_guest_snapshot.json'
 
 # Logging
 LOG_DIR = PROJECT_ROOT / 'logs'
@@ -158,15 +165,21 @@ def save_sync_hash(file_hash: str) -> None:
 # IMPORT
 # =============================================================================
 
-def run_import(file_content: bytes) -> dict:
+def run_import(file_content: bytes, dry_run: bool = False, full: bool = False) -> dict:
     """
-    Save content to temp file and run the hotel guest import.
+    Save content to temp file and run the incremental hotel guest sync.
+
+    Args:
+        file_content: Downloaded Excel file
+        dry_run: Only compute the change set
+        full: Apply every row instead of the diff
 
     Returns:
-        Import result dictionary with created/updated/errors counts.
+        Import result dictionary with created/updated/errors counts,
+        the change set ('changes') and per-phase 'timings'.
     """
     from app import create_app
-    from blueprints.admin.services.user_service import import_hotel_guests_from_excel
+    from blueprints.admin.services.user_service import sync_hotel_guests_incremental
 
     # Save to temp file
     with tempfile.NamedTemporaryFile(
@@ -183,9 +196,12 @@ def run_import(file_content: bytes) -> dict:
             timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
             source_name = f"pms_auto_sync_{timestamp}"
 
-            result = import_hotel_guests_from_excel(
+            result = sync_hotel_guests_incremental(
                 file_path=tmp_path,
-                source_name=source_name
+                snapshot_path=str(SNAPSHOT_FILE),
+                source_name=source_name,
+                dry_run=dry_run,
+                full=full
             )
 
             return result
@@ -196,6 +212,23 @@ def run_import(file_content: bytes) -> dict:
         except OSError:
             pass
 
+
+def log_change_set(result: dict) -> None:
+    """Log the diff against the previous snapshot and what it costs to apply."""
+    changes = result.get('changes', {})
+    timings = result.get('timings', {})
+    to_write = changes.get('added', 0) + changes.get('changed', 0)
+
+    log.info(f"Change set ({result.get('mode', 'full')}): "
+             f"{changes.get('added', 0)} added, {changes.get('changed', 0)} changed, "
+             f"{changes.get('removed', 0)} removed, {changes.get('unchanged', 0)} unchanged")
+    log.info(f"  Cost: {to_write} of {result.get('total', 0)} rows written, "
+             f"{changes.get('booking_refs', 0)} booking(s) re-segmented "
+             f"(read {timings.get('read', 0)} ms, diff {timings.get('diff', 0)} ms)")
+    for kind in ('added', 'changed', 'removed'):
+        for key in changes.get('sample', {}).get(kind, []):
+            log.info(f"  {kind}: {key}")
+
 # =============================================================================
 # MAIN
 # =============================================================================
@@ -206,7 +239,9 @@ def main():
     parser.add_argument('--force', action='store_true',
                         help='Force import even if file unchanged')
     parser.add_argument('--dry-run', action='store_true',
-                        help='Download and check but do not import')
+                        help='Download and print the change set but do not import')
+    parser.add_argument('--full', action='store_true',
+                        help='Apply every row instead of the diff against the last sync')
     args = parser.parse_args()
 
     log.info("=" * 60)
@@ -236,12 +271,18 @@ def main():
 
     # Step 3: Dry run check
     if args.dry_run:
-        log.info("[DRY RUN] Would import file. Exiting.")
+        try:
+            result = run_import(content, dry_run=True, full=args.full)
+        except Exception as e:
+            log.error(f"Dry run failed: {e}", exc_info=True)
+            sys.exit(1)
+        log.info("[DRY RUN] Nothing imported.")
+        log_change_set(result)
         sys.exit(0)
 
     # Step 4: Run import
     try:
-        result = run_import(content)
+        result = run_import(content, full=args.full)
 
         created = result.get('created', 0)
         updated = result.get('updated', 0)
@@ -250,7 +291,10 @@ def main():
         room_changes = result.get('room_changes', [])
 
         log.info(f"Import complete: {total} processed, "
-                 f"{created} created, {updated} updated")
+                 f"{created} created, {updated} updated, "
+                 f"{result.get('checked_out', 0)} checked out "
+                 f"({result.get('timings', {}).get('total', 0)} ms)")
+        log_change_set(result)
 
         if room_changes:
             for change in room_changes:
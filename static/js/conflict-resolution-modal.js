@@ -244,7 +244,9 @@ class ConflictResolutionModal {
                                     ${c.furniture_number || 'Mobiliario #' + c.furniture_id}
                                 </span>
                                 <span class="conflict-blocker">
-                                    Ocupado por: ${c.customer_name} (${c.ticket_number})
+                                    ${c.status === 'blocked'
+                                        ? `Bloqueado${c.block_reason ? `: ${escapeHtml(c.block_reason)}` : ''}`
+                                        : `Ocupado por: ${c.customer_name} (${c.ticket_number})`}
                                 </span>
                             </div>
                         `).join('')}
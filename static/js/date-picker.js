@@ -149,7 +149,7 @@ class DatePicker {
 
         try {
             const response = await fetch(
-                `${this.occupancyApiUrl}?date_from=${dateFrom}&date_to=${dateTo}`
+                `${this.occupancyApiUrl}?date_from=${dateFrom}&date_to=${dateTo}&format=compact`
             );
             const data = await response.json();
 
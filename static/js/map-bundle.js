@@ -553,7 +553,7 @@ class DatePicker {
 
         try {
             const response = await fetch(
-                `${this.occupancyApiUrl}?date_from=${dateFrom}&date_to=${dateTo}`
+                `${this.occupancyApiUrl}?date_from=${dateFrom}&date_to=${dateTo}&format=compact`
             );
             const data = await response.json();
 
@@ -1497,8 +1497,13 @@ class SafeguardModal {
                 <span class="conflict-furniture">${_sgEscape(c.furniture_number || 'Mobiliario #' + c.furniture_id)}</span>
                 <span class="conflict-date">${formatDate(c.date)}</span>
                 <span class="conflict-reservation">
-                    Reserva #${_sgEscape(c.ticket_number || c.reservation_id)}
-                    ${c.customer_name ? ` - ${_sgEscape(c.customer_name)}` : ''}
+                    ${c.status === 'blocked' ? `
+                        Bloqueado
+                        ${c.block_reason ? ` - ${_sgEscape(c.block_reason)}` : ''}
+                    ` : `
+                        Reserva #${_sgEscape(c.ticket_number || c.reservation_id)}
+                        ${c.customer_name ? ` - ${_sgEscape(c.customer_name)}` : ''}
+                    `}
                 </span>
             </div>
         `).join('');
@@ -1834,7 +1839,9 @@ class ConflictResolutionModal {
                                     ${c.furniture_number || 'Mobiliario #' + c.furniture_id}
                                 </span>
                                 <span class="conflict-blocker">
-                                    Ocupado por: ${c.customer_name} (${c.ticket_number})
+                                    ${c.status === 'blocked'
+                                        ? `Bloqueado${c.block_reason ? `: ${escapeHtml(c.block_reason)}` : ''}`
+                                        : `Ocupado por: ${c.customer_name} (${c.ticket_number})`}
                                 </span>
                             </div>
                         `).join('')}
@@ -3862,14 +3862,29 @@ class BeachMap {
         return null;
     }
 
-    async loadData() {
+    /**
+     * Load map data for the current date.
+     * @param {Object} [opts]
+     * @param {boolean} [opts.incremental=false] - Ask only for the furniture that
+     *     changed since the loaded map revision (auto-refresh polling)
+     */
+    async loadData({ incremental = false } = {}) {
         try {
-            const response = await fetch(`${this.options.apiUrl}?date=${this.currentDate}`);
+            let url = `${this.options.apiUrl}?date=${this.currentDate}`;
+            const canPatch = incremental && this.data && !this.isShowingCachedData &&
+                this.data.date === this.currentDate && this.data.map_revision != null;
+            if (canPatch) {
+                url += `&since=${this.data.map_revision}`;
+            }
+
+            const response = await fetch(url);
             if (!response.ok) throw new Error('Error loading map data');
 
             const result = await response.json();
 
-            if (result.success) {
+            if (result.success && result.delta) {
+                this.applyMapDelta(result);
+            } else if (result.success) {
                 this.data = result;
                 this.isShowingCachedData = false;
 
@@ -3912,6 +3927,35 @@ class BeachMap {
         }
     }
 
+    /**
+     * Merge an incremental map payload (?since=) into the loaded data.
+     * Changed furniture missing from availability/blocks is free/unblocked.
+     * @param {Object} delta - Delta response from the map data API
+     */
+    applyMapDelta(delta) {
+        const data = this.data;
+        const changed = new Set(delta.changed_furniture || []);
+        const removed = new Set(delta.removed_furniture || []);
+        const updates = new Map((delta.furniture || []).map(f => [f.id, f]));
+
+        data.furniture = data.furniture
+            .filter(f => !removed.has(f.id))
+            .map(f => updates.get(f.id) || f);
+        const known = new Set(data.furniture.map(f => f.id));
+        updates.forEach((f, id) => {
+            if (!known.has(id)) data.furniture.push(f);
+        });
+
+        changed.forEach(id => {
+            delete data.availability[id];
+            delete data.blocks[id];
+        });
+        Object.assign(data.availability, delta.availability || {});
+        Object.assign(data.blocks, delta.blocks || {});
+
+        data.map_revision = delta.map_revision;
+    }
+
     render() {
         if (!this.data) return;
 
@@ -4225,7 +4269,7 @@ class BeachMap {
         }
 
         try {
-            const success = await this.loadData();
+            const success = await this.loadData({ incremental: true });
             this.render();
             return success && !this.isShowingCachedData;
         } catch (error) {
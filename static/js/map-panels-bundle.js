@@ -5209,7 +5209,18 @@ class DateAvailabilityHandler {
         if (conflictDates.length === 1) {
             const date = conflictDates[0];
             const items = conflictsByDate[date];
-            warningHtml += `<strong>${items.map(i => escapeHtml(i.furniture_number)).join(', ')}</strong> ocupado el ${formatDate(date)}`;
+            const occupied = items.filter(i => i.status !== 'blocked');
+            const blocked = items.filter(i => i.status === 'blocked');
+            const parts = [];
+            if (occupied.length > 0) {
+                parts.push(`<strong>${occupied.map(i => escapeHtml(i.furniture_number)).join(', ')}</strong> ocupado`);
+            }
+            if (blocked.length > 0) {
+                const reasons = [...new Set(blocked.map(i => i.block_reason).filter(Boolean))];
+                parts.push(`<strong>${blocked.map(i => escapeHtml(i.furniture_number)).join(', ')}</strong> bloqueado`
+                    + (reasons.length > 0 ? ` (${reasons.map(r => escapeHtml(r)).join(', ')})` : ''));
+            }
+            warningHtml += `${parts.join(', ')} el ${formatDate(date)}`;
         } else {
             warningHtml += `Mobiliario no disponible para ${conflictDates.length} fechas`;
         }
@@ -740,9 +740,16 @@ document.addEventListener('DOMContentLoaded', function () {
             // Build detailed conflict info
             let conflictDetails = '';
             conflicts.forEach(c => {
-                const blockerInfo = c.room_number
-                    ? `Hab. ${c.room_number} (${c.customer_name})`
-                    : c.customer_name;
+                let blockerInfo;
+                if (c.status === 'blocked') {
+                    blockerInfo = c.block_reason
+                        ? `Bloqueado (${escapeHtml(c.block_reason)})`
+                        : 'Bloqueado';
+                } else {
+                    blockerInfo = c.room_number
+                        ? `Hab. ${c.room_number} (${c.customer_name})`
+                        : c.customer_name;
+                }
 
                 conflictDetails += `<div class="mb-1">
                     <strong>${c.furniture_number || '#' + c.furniture_id}</strong>: 
@@ -378,8 +378,13 @@ class SafeguardModal {
                 <span class="conflict-furniture">${_sgEscape(c.furniture_number || 'Mobiliario #' + c.furniture_id)}</span>
                 <span class="conflict-date">${formatDate(c.date)}</span>
                 <span class="conflict-reservation">
-                    Reserva #${_sgEscape(c.ticket_number || c.reservation_id)}
-                    ${c.customer_name ? ` - ${_sgEscape(c.customer_name)}` : ''}
+                    ${c.status === 'blocked' ? `
+                        Bloqueado
+                        ${c.block_reason ? ` - ${_sgEscape(c.block_reason)}` : ''}
+                    ` : `
+                        Reserva #${_sgEscape(c.ticket_number || c.reservation_id)}
+                        ${c.customer_name ? ` - ${_sgEscape(c.customer_name)}` : ''}
+                    `}
                 </span>
             </div>
         `).join('');
@@ -0,0 +1,217 @@
+"""
+Tests for audit logging (utils/audit.py, models/audit_log.py).
+"""
+
+import json
+
+import pytest
+
+from database import get_db
+
+
+def _audit_rows(entity_type):
+    return get_db().execute(
+        'SELECT entity_id, action, changes, created_at FROM audit_log WHERE entity_type = ? ORDER BY id',
+        (entity_type,)
+    ).fetchall()
+
+
+@pytest.fixture
+def async_audit(app):
+    """Background audit writer enabled; stopped (and flushed) afterwards."""
+    from utils.audit import shutdown_audit_writer
+
+    app.config['AUDIT_ASYNC_ENABLED'] = True
+    yield app
+    shutdown_audit_writer()
+    app.config['AUDIT_ASYNC_ENABLED'] = False
+
+
+class TestAuditSnapshots:
+    """Snapshots read only the audited columns."""
+
+    def test_snapshot_reads_audited_columns(self, app):
+        with app.app_context():
+            from models.customer import create_customer
+            from utils.audit import AUDIT_COLUMNS, audit_snapshot, get_audit_snapshot
+
+            customer_id = create_customer(
+                customer_type='externo', first_name='Audit', last_name='Snapshot',
+                phone='600000041'
+            )
+
+            snapshot = get_audit_snapshot('customer', customer_id)
+            assert tuple(snapshot) == AUDIT_COLUMNS['customer'][1]
+            assert snapshot['first_name'] == 'Audit'
+            assert get_audit_snapshot('customer', 999999) is None
+
+            record = dict(snapshot, total_visits=3)
+            assert audit_snapshot('customer', record) == snapshot
+
+
+    def test_reservation_preference_edit_is_audited(self, app, authenticated_client):
+        with app.app_context():
+            from models.customer import create_customer
+            from models.reservation import create_beach_reservation
+            from utils.datetime_helpers import get_today
+
+            customer_id = create_customer(
+                customer_type='externo', first_name='Audit', last_name='Prefs',
+                phone='600000042'
+            )
+            furniture_id = get_db().execute(
+                'SELECT id FROM beach_furniture WHERE active = 1 LIMIT 1'
+            ).fetchone()['id']
+            reservation_id, _ = create_beach_reservation(
+                customer_id=customer_id, reservation_date=get_today().isoformat(),
+                num_people=2, furniture_ids=[furniture_id], created_by='test'
+            )
+
+        response = authenticated_client.patch(
+            f'/beach/api/map/reservations/{reservation_id}/update',
+            json={'preferences': 'pref_sombra'}
+        )
+        assert response.status_code == 200
+
+        with app.app_context():
+            row = get_db().execute('''
+                SELECT changes FROM audit_log
+                WHERE entity_type = 'reservation' AND entity_id = ? AND action = 'UPDATE'
+                ORDER BY id DESC LIMIT 1
+            ''', (reservation_id,)).fetchone()
+            changes = json.loads(row['changes'])
+            assert changes['before']['preferences'] in (None, '')
+            assert changes['after']['preferences'] == 'pref_sombra'
+
+
+class TestAuditWriter:
+    """Entries are written inline in tests and in batches when async."""
+
+    def test_synchronous_write(self, app):
+        with app.app_context():
+            from utils.audit import log_update
+
+            audit_id = log_update('sync_test', 1, before={'a': 1}, after={'a': 2})
+
+            assert audit_id is not None
+            rows = _audit_rows('sync_test')
+            assert len(rows) == 1
+            assert rows[0]['created_at'] is not None
+
+    def test_async_entries_written_in_batches(self, async_audit):
+        with async_audit.app_context():
+            from utils.audit import log_create, flush_audit_log
+
+            ids = [log_create('async_test', i, data={'n': i}) for i in range(25)]
+            assert ids == [None] * 25  # queued, not written inline
+
+            flush_audit_log()
+            rows = _audit_rows('async_test')
+            assert [r['entity_id'] for r in rows] == list(range(25))
+            assert '"n": 0' in rows[0]['changes']
+
+    def test_full_buffer_falls_back_to_direct_write(self, async_audit):
+        with async_audit.app_context():
+            from utils import audit
+
+            writer = audit._get_writer()
+            writer.submit = lambda entry: False  # buffer always full
+
+            assert audit.log_create('overflow_test', 7) is not None
+            assert [r['entity_id'] for r in _audit_rows('overflow_test')] == [7]
+
+    def test_bulk_insert(self, app):
+        with app.app_context():
+            from models.audit_log import create_audit_logs_bulk
+
+            written = create_audit_logs_bulk([
+                {'action': 'CREATE', 'entity_type': 'bulk_test', 'entity_id': 1,
+                 'created_at': '2099-01-01 10:00:00'},
+                {'action': 'DELETE', 'entity_type': 'bulk_test', 'entity_id': 1,
+                 'changes': {'before': {'x': 1}, 'after': None}},
+            ])
+
+            assert written == 2
+            rows = _audit_rows('bulk_test')
+            assert [r['action'] for r in rows] == ['CREATE', 'DELETE']
+            assert str(rows[0]['created_at']) == '2099-01-01 10:00:00'
+
+
+@pytest.fixture
+def audit_rows(app):
+    """Seven 'page_test' entries over three days (two share a timestamp)."""
+    with app.app_context():
+        from models.audit_log import create_audit_logs_bulk
+
+        stamps = ['2099-03-01 09:00:00', '2099-03-01 12:00:00', '2099-03-02 08:00:00',
+                  '2099-03-02 08:00:00', '2099-03-02 23:59:59', '2099-03-03 00:00:00',
+                  '2099-03-03 10:00:00']
+        create_audit_logs_bulk([
+            {'action': 'UPDATE', 'entity_type': 'page_test', 'entity_id': i, 'created_at': stamp}
+            for i, stamp in enumerate(stamps)
+        ])
+    return app
+
+
+class TestAuditLogPagination:
+    """Sargable date filters and keyset pages."""
+
+    def test_keyset_pages_forward_and_back(self, audit_rows):
+        with audit_rows.app_context():
+            from models.audit_log import get_audit_log_page
+
+            filters = {'entity_type': 'page_test'}
+            first = get_audit_log_page(filters, per_page=3)
+            assert [r['entity_id'] for r in first['items']] == [6, 5, 4]
+            assert first['prev_cursor'] is None
+
+            second = get_audit_log_page(filters, per_page=3, after=first['next_cursor'], page=2)
+            assert [r['entity_id'] for r in second['items']] == [3, 2, 1]
+
+            third = get_audit_log_page(filters, per_page=3, after=second['next_cursor'], page=3)
+            assert [r['entity_id'] for r in third['items']] == [0]
+            assert third['next_cursor'] is None
+
+            back = get_audit_log_page(filters, per_page=3, before=third['prev_cursor'], page=2)
+            assert [r['entity_id'] for r in back['items']] == [3, 2, 1]
+            back = get_audit_log_page(filters, per_page=3, before=back['prev_cursor'], page=1)
+            assert [r['entity_id'] for r in back['items']] == [6, 5, 4]
+            assert back['prev_cursor'] is None
+
+    def test_date_range_includes_whole_end_day(self, audit_rows):
+        with audit_rows.app_context():
+            from models.audit_log import get_audit_logs, count_audit_logs
+
+            logs = get_audit_logs(entity_type='page_test', start_date='2099-03-02', end_date='2099-03-02')
+            assert [r['entity_id'] for r in logs] == [4, 3, 2]
+            assert count_audit_logs(entity_type='page_test', end_date='2099-03-02') == 5
+
+    def test_filtered_page_uses_index(self, audit_rows):
+        with audit_rows.app_context():
+            plan = ' '.join(row['detail'] for row in get_db().execute('''
+                EXPLAIN QUERY PLAN
+                SELECT * FROM audit_log al
+                WHERE al.entity_type = ? AND (al.created_at, al.id) < (?, ?)
+                ORDER BY al.created_at DESC, al.id DESC LIMIT 50
+            ''', ('page_test', '2099-03-03 00:00:00', 10)).fetchall())
+            assert 'idx_audit_log_entity_type' in plan
+            assert 'TEMP B-TREE' not in plan
+
+    def test_api_returns_cursors(self, audit_rows, authenticated_client):
+        response = authenticated_client.get('/beach/admin/audit-logs/api?entity_type=page_test&per_page=4')
+        pagination = response.get_json()['pagination']
+        assert pagination['has_next'] is True
+
+        response = authenticated_client.get(
+            '/beach/admin/audit-logs/api',
+            query_string={'entity_type': 'page_test', 'per_page': 4, 'after': pagination['next_cursor']}
+        )
+        data = response.get_json()
+        assert [r['entity_id'] for r in data['data']] == [2, 1, 0]
+        assert data['pagination']['has_next'] is False
+
+        page = authenticated_client.get(
+            '/beach/admin/audit-logs',
+            query_string={'entity_type': 'page_test', 'per_page': 25, 'after': pagination['next_cursor'], 'page': 2}
+        )
+        assert page.status_code == 200
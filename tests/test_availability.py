@@ -2,6 +2,9 @@
 Tests for reservation availability functions.
 """
 
+import sqlite3
+import time
+
 import pytest
 from datetime import date, timedelta
 from app import create_app
@@ -227,6 +230,182 @@ class TestGetFurnitureAvailabilityMap:
             assert isinstance(result['furniture'], list)
             assert isinstance(result['availability'], dict)
 
+    def test_compact_layout_matches_nested(self, app, setup_test_data):
+        """Compact layout stores each reservation once and agrees cell by cell."""
+        with app.app_context():
+            from models.reservation_availability import (
+                get_furniture_availability_map, COMPACT_RESERVATION_COLUMNS
+            )
+
+            furniture_ids = setup_test_data['furniture_ids']
+            db = get_db()
+            db.execute('''
+                INSERT INTO beach_reservation_furniture (reservation_id, furniture_id, assignment_date)
+                VALUES (?, ?, '2099-06-15')
+            ''', (setup_test_data['reservation_id_1'], furniture_ids[1]))
+            db.commit()
+
+            nested = get_furniture_availability_map('2099-06-14', '2099-06-16', furniture_ids=furniture_ids)
+            compact = get_furniture_availability_map('2099-06-14', '2099-06-16',
+                                                     furniture_ids=furniture_ids, compact=True)
+
+            assert compact['format'] == 'compact'
+            assert compact['dates'] == nested['dates']
+            assert compact['summary'] == nested['summary']
+            assert len(compact['reservations']) == 1
+            assert compact['cells'] == [[0, 1, 0], [0, 1, 0]]
+            assert compact['markers'] == []
+
+            for fi, furn in enumerate(compact['furniture']):
+                for di, day in enumerate(compact['dates']):
+                    cell = nested['availability'][furn['id']][day]
+                    index = compact['cells'][fi][di]
+                    assert cell['available'] is (index == 0)
+                    if index:
+                        row = dict(zip(COMPACT_RESERVATION_COLUMNS, compact['reservations'][index - 1]))
+                        assert row == {c: cell[c] for c in COMPACT_RESERVATION_COLUMNS}
+
+    def test_compact_layout_via_api(self, app, setup_test_data):
+        """The map availability endpoint serves the compact layout on request."""
+        client = app.test_client()
+        client.post('/login', data={'username': 'admin', 'password': 'PuroAdmin2026!'})
+
+        response = client.get('/beach/api/map/availability', query_string={
+            'date_from': '2099-06-15', 'date_to': '2099-06-15', 'format': 'compact'
+        })
+        data = response.get_json()
+
+        assert data['success'] is True
+        assert 'availability' not in data
+        assert data['summary']['2099-06-15']['occupied'] == 1
+        assert sum(row[0] for row in data['cells']) == 1
+
+
+class TestAvailabilityMapMarkers:
+    """Check-in/check-out and room-change flags come from indexed lookups."""
+
+    def test_stay_markers_follow_guest_changes(self, app, setup_test_data):
+        with app.app_context():
+            from models.reservation_availability import get_furniture_availability_map
+
+            db = get_db()
+            db.execute("UPDATE beach_customers SET booking_reference = 'BK-MARK-1' WHERE id = ?",
+                       (setup_test_data['customer_id'],))
+            db.execute('''
+                INSERT INTO hotel_guests (guest_name, room_number, arrival_date, departure_date,
+                                          booking_reference, is_main_guest)
+                VALUES ('Marker Guest', '210', '2099-06-15', '2099-06-20', 'BK-MARK-1', 1)
+            ''')
+            db.commit()
+
+            fid = setup_test_data['furniture_id_1']
+            cell = get_furniture_availability_map('2099-06-15', '2099-06-15')['availability'][fid]['2099-06-15']
+            assert (cell['is_checkin_today'], cell['is_checkout_today']) == (True, False)
+
+            # Guest edits re-queue the affected days
+            db.execute("UPDATE hotel_guests SET arrival_date = '2099-06-10', departure_date = '2099-06-15' "
+                       "WHERE booking_reference = 'BK-MARK-1'")
+            db.commit()
+            cell = get_furniture_availability_map('2099-06-15', '2099-06-15')['availability'][fid]['2099-06-15']
+            assert (cell['is_checkin_today'], cell['is_checkout_today']) == (False, True)
+            assert db.execute('SELECT COUNT(*) FROM beach_stay_markers_dirty').fetchone()[0] == 0
+
+    def test_guest_writes_rebuild_markers_and_map_never_waits(self, app, setup_test_data):
+        with app.app_context():
+            from models.hotel_guest import upsert_hotel_guest
+            from models.reservation_availability import get_furniture_availability_map
+
+            db = get_db()
+            db.execute("UPDATE beach_customers SET booking_reference = 'BK-MARK-2' WHERE id = ?",
+                       (setup_test_data['customer_id'],))
+            db.commit()
+            upsert_hotel_guest('212', 'Edit Guest', '2099-06-15', '2099-06-18',
+                               booking_reference='BK-MARK-2')
+            assert db.execute('SELECT COUNT(*) FROM beach_stay_markers_dirty').fetchone()[0] == 0
+
+            # A raw-SQL write leaves its days queued; with the write lock held
+            # elsewhere the map read skips the rebuild instead of waiting
+            db.execute("UPDATE hotel_guests SET departure_date = '2099-06-15' "
+                       "WHERE booking_reference = 'BK-MARK-2'")
+            db.commit()
+            writer = sqlite3.connect(app.config['DATABASE_PATH'])
+            writer.execute('BEGIN IMMEDIATE')
+            try:
+                started = time.monotonic()
+                get_furniture_availability_map('2099-06-15', '2099-06-15')
+                assert time.monotonic() - started < 1
+            finally:
+                writer.rollback()
+                writer.close()
+            assert db.execute('SELECT COUNT(*) FROM beach_stay_markers_dirty').fetchone()[0] > 0
+
+            fid = setup_test_data['furniture_id_1']
+            cell = get_furniture_availability_map('2099-06-15', '2099-06-15')['availability'][fid]['2099-06-15']
+            assert (cell['is_checkin_today'], cell['is_checkout_today']) == (True, True)
+
+    def test_room_marker_used_without_booking_reference(self, app, setup_test_data):
+        with app.app_context():
+            from models.reservation_availability import get_furniture_availability_map
+            from models.stay_markers import refresh_stay_markers
+
+            db = get_db()
+            db.execute("UPDATE beach_customers SET room_number = '211' WHERE id = ?",
+                       (setup_test_data['customer_id'],))
+            db.execute('''
+                INSERT INTO hotel_guests (guest_name, room_number, arrival_date, departure_date,
+                                          booking_reference, is_main_guest)
+                VALUES ('Room Guest', '211', '2099-06-12', '2099-06-15', 'BK-OTHER', 1)
+            ''')
+            db.commit()
+            assert refresh_stay_markers() >= 2
+
+            fid = setup_test_data['furniture_id_1']
+            cell = get_furniture_availability_map('2099-06-15', '2099-06-15')['availability'][fid]['2099-06-15']
+            assert cell['is_checkout_today'] is True
+
+    def test_room_marker_on_turnover_day_uses_one_stay(self, app, setup_test_data):
+        with app.app_context():
+            from models.reservation_availability import get_furniture_availability_map
+
+            db = get_db()
+            db.execute("UPDATE beach_customers SET room_number = '213' WHERE id = ?",
+                       (setup_test_data['customer_id'],))
+            db.execute('''
+                INSERT INTO hotel_guests (guest_name, room_number, arrival_date, departure_date,
+                                          booking_reference, is_main_guest)
+                VALUES ('Outgoing Guest', '213', '2099-06-10', '2099-06-15', 'BK-OUT', 1),
+                       ('Incoming Guest', '213', '2099-06-15', '2099-06-20', 'BK-IN', 1)
+            ''')
+            db.commit()
+
+            # Check-out and check-in of two different stays never combine
+            fid = setup_test_data['furniture_id_1']
+            cell = get_furniture_availability_map('2099-06-15', '2099-06-15')['availability'][fid]['2099-06-15']
+            assert (cell['is_checkin_today'], cell['is_checkout_today']) == (False, True)
+
+    def test_room_change_day_lookup_uses_index(self, app, setup_test_data):
+        with app.app_context():
+            from models.reservation_availability import get_furniture_availability_map
+
+            db = get_db()
+            db.execute('''
+                INSERT INTO beach_room_changes (customer_id, old_room, new_room, changed_at)
+                VALUES (?, '101', '102', '2099-06-15 09:30:00')
+            ''', (setup_test_data['customer_id'],))
+            db.commit()
+
+            fid = setup_test_data['furniture_id_1']
+            cell = get_furniture_availability_map('2099-06-15', '2099-06-15')['availability'][fid]['2099-06-15']
+            assert cell['room_changed_today'] is True
+            assert cell['previous_room'] == '101'
+
+            plan = ' '.join(row['detail'] for row in db.execute('''
+                EXPLAIN QUERY PLAN
+                SELECT customer_id FROM beach_room_changes
+                WHERE customer_id IN (?, ?) AND change_date >= ? AND change_date <= ?
+            ''', (1, 2, '2099-06-01', '2099-06-30')).fetchall())
+            assert 'idx_room_changes_customer_day' in plan
+
 
 class TestGetConflictingReservations:
     """Tests for conflicting reservations lookup."""
@@ -298,3 +477,66 @@ class TestCheckFurnitureAvailabilityBulkWithConn:
             assert result['all_available'] is False
             assert len(result['unavailable']) == 1
             assert result['unavailable'][0]['furniture_id'] == furniture_id
+
+
+class TestBlockAwareAvailability:
+    """Furniture blocks are merged into the availability engine."""
+
+    def _block(self, furniture_id, start, end):
+        from models.furniture_block import create_furniture_block
+        return create_furniture_block(furniture_id, start, end, block_type='maintenance',
+                                      reason='Reparación')
+
+    def test_bulk_check_reports_blocked_cells(self, app, setup_test_data):
+        with app.app_context():
+            from models.reservation_availability import check_furniture_availability_bulk
+
+            f1, f2 = setup_test_data['furniture_ids']
+            block_id = self._block(f2, '2099-06-15', '2099-06-16')
+            dates = ['2099-06-15', '2099-06-16', '2099-06-17']
+
+            result = check_furniture_availability_bulk([f1, f2], dates)
+
+            assert result['status_matrix'] == {
+                '2099-06-15': {f1: 'occupied', f2: 'blocked'},
+                '2099-06-16': {f1: 'free', f2: 'blocked'},
+                '2099-06-17': {f1: 'free', f2: 'free'},
+            }
+            assert result['availability_matrix']['2099-06-16'] == {f1: True, f2: False}
+            blocked = [u for u in result['unavailable'] if u['status'] == 'blocked']
+            assert [(u['furniture_id'], u['date'], u['block_id']) for u in blocked] == [
+                (f2, '2099-06-15', block_id), (f2, '2099-06-16', block_id)
+            ]
+            assert check_furniture_availability_bulk([f1], ['2099-06-16'])['all_available'] is True
+
+    def test_availability_map_carries_blocks(self, app, setup_test_data):
+        with app.app_context():
+            from models.reservation_availability import (
+                get_furniture_availability_map, CELL_BLOCKED
+            )
+
+            f1, f2 = setup_test_data['furniture_ids']
+            block_id = self._block(f2, '2099-06-15', '2099-06-16')
+
+            nested = get_furniture_availability_map('2099-06-15', '2099-06-17', furniture_ids=[f1, f2])
+            compact = get_furniture_availability_map('2099-06-15', '2099-06-17',
+                                                     furniture_ids=[f1, f2], compact=True)
+
+            cells = nested['availability'][f2]
+            assert [cells[d]['status'] for d in nested['dates']] == ['blocked', 'blocked', 'free']
+            assert cells['2099-06-16']['block']['id'] == block_id
+            assert 'block' not in cells['2099-06-17']
+            assert nested['availability'][f1]['2099-06-15']['status'] == 'occupied'
+            assert nested['summary']['2099-06-16'] == {
+                'total': 2, 'available': 1, 'occupied': 0, 'blocked': 1, 'occupancy_rate': 0.0
+            }
+            assert compact['summary'] == nested['summary']
+            fi = [f['id'] for f in compact['furniture']].index(f2)
+            blocked_markers = [m[:3] for m in compact['markers'] if m[2] & CELL_BLOCKED]
+            assert sorted(blocked_markers) == [[fi, 0, CELL_BLOCKED], [fi, 1, CELL_BLOCKED]]
+
+        client = app.test_client()
+        client.post('/login', data={'username': 'admin', 'password': 'PuroAdmin2026!'})
+        data = client.get('/beach/api/map/data', query_string={'date': '2099-06-16'}).get_json()
+        assert data['blocks'][str(f2)]['id'] == block_id
+        assert data['blocks'][str(f2)]['reason'] == 'Reparación'
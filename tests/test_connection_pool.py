@@ -0,0 +1,93 @@
+"""
+Tests for the per-thread SQLite connection pool (database/connection.py).
+"""
+
+import threading
+
+from database import get_db
+
+
+def _run_in_thread(fn):
+    """Run fn on a fresh thread (its own, empty pool) and return its result."""
+    result = {}
+
+    def target():
+        result['value'] = fn()
+
+    thread = threading.Thread(target=target)
+    thread.start()
+    thread.join()
+    return result['value']
+
+
+class TestConnectionPool:
+    """Pooled connections are reused, configured once and never shared."""
+
+    def test_connection_reused_across_app_contexts(self, app):
+        def contexts():
+            with app.app_context():
+                first = get_db()
+            with app.app_context():
+                second = get_db()
+            return first is second
+
+        assert _run_in_thread(contexts)
+
+    def test_pragmas_applied(self, app):
+        with app.app_context():
+            db = get_db()
+            assert db.execute('PRAGMA foreign_keys').fetchone()[0] == 1
+            assert db.execute('PRAGMA journal_mode').fetchone()[0] == 'wal'
+            # NORMAL
+            assert db.execute('PRAGMA synchronous').fetchone()[0] == 1
+
+    def test_nested_context_gets_its_own_connection(self, app):
+        with app.app_context():
+            outer = get_db()
+            with app.app_context():
+                inner = get_db()
+            assert inner is not outer
+            # Outer connection still usable after the inner one is closed
+            outer.execute('SELECT 1').fetchone()
+
+    def test_threads_do_not_share_connections(self, app):
+        with app.app_context():
+            main_conn = get_db()
+
+            def worker():
+                with app.app_context():
+                    return get_db()
+
+            assert _run_in_thread(worker) is not main_conn
+
+    def test_open_transaction_rolled_back_on_release(self, app):
+        def contexts():
+            with app.app_context():
+                first = get_db()
+                first.execute(
+                    "INSERT INTO beach_config (key, value) VALUES ('pool_probe', '1')"
+                )
+            with app.app_context():
+                second = get_db()
+                row = second.execute(
+                    "SELECT 1 FROM beach_config WHERE key = 'pool_probe'"
+                ).fetchone()
+                return first is second, second.in_transaction, row
+
+        reused, in_transaction, row = _run_in_thread(contexts)
+        assert reused
+        assert not in_transaction
+        assert row is None
+
+    def test_connection_without_foreign_keys_not_reused(self, app):
+        def contexts():
+            with app.app_context():
+                first = get_db()
+                first.execute('PRAGMA foreign_keys = OFF')
+            with app.app_context():
+                second = get_db()
+                return first is second, second.execute('PRAGMA foreign_keys').fetchone()[0]
+
+        reused, foreign_keys = _run_in_thread(contexts)
+        assert not reused
+        assert foreign_keys == 1
@@ -0,0 +1,128 @@
+"""
+Tests for the unified customer search and its trigram index
+(models/customer_search.py, models/search_index.py).
+"""
+
+import sqlite3
+import time
+from datetime import date, timedelta
+
+from database import get_db
+
+
+def _add_guest(name, room, booking_reference):
+    today = date.today()
+    db = get_db()
+    db.execute('''
+        INSERT INTO hotel_guests (guest_name, room_number, arrival_date, departure_date,
+                                  booking_reference, is_main_guest)
+        VALUES (?, ?, ?, ?, ?, 1)
+    ''', (name, room, today - timedelta(days=1), today + timedelta(days=3), booking_reference))
+    db.commit()
+
+
+class TestUnifiedSearchIndex:
+    """Search goes through the accent-folded index and follows every write."""
+
+    def test_accent_insensitive_match(self, app):
+        with app.app_context():
+            from models.customer import create_customer, search_customers_unified
+
+            customer_id = create_customer(
+                customer_type='externo', first_name='José María', last_name='García',
+                phone='600000031'
+            )
+
+            for query in ('garcia', 'GARCÍA jose', 'jo', '600000031'):
+                ids = [r['id'] for r in search_customers_unified(query) if r['source'] == 'customer']
+                assert customer_id in ids, query
+
+            assert search_customers_unified('garcias') == []
+
+    def test_updates_and_deletes_reach_the_index(self, app):
+        with app.app_context():
+            from models.customer import (create_customer, update_customer, delete_customer,
+                                         search_customers_unified)
+
+            customer_id = create_customer(
+                customer_type='externo', first_name='Núria', last_name='Pons',
+                phone='600000032'
+            )
+            assert search_customers_unified('nuria')
+
+            update_customer(customer_id, last_name='Ferrer')
+            assert search_customers_unified('pons') == []
+            assert [r['id'] for r in search_customers_unified('ferrer')] == [customer_id]
+
+            # Write paths apply the queue themselves: searches only read the index
+            assert get_db().execute('SELECT COUNT(*) FROM beach_search_dirty').fetchone()[0] == 0
+
+            delete_customer(customer_id)
+            assert search_customers_unified('ferrer') == []
+            assert get_db().execute(
+                'SELECT COUNT(*) FROM beach_customers_fts WHERE rowid = ?', (customer_id,)
+            ).fetchone()[0] == 0
+
+    def test_in_house_guest_search(self, app):
+        with app.app_context():
+            from models.customer import search_customers_unified
+            from models.search_index import rebuild_search_index
+
+            _add_guest('Ångström Müller', '412', 'BK-SEARCH-1')
+
+            results = search_customers_unified('mull', customer_type='interno')
+            assert [(r['source'], r['room_number']) for r in results] == [('hotel_guest', '412')]
+            assert search_customers_unified('bk-search')[0]['guest_name'] == 'Ångström Müller'
+
+            assert rebuild_search_index() >= 1
+            assert search_customers_unified('angstrom')[0]['room_number'] == '412'
+
+    def test_interno_stays_and_guest_counts_batched(self, app):
+        with app.app_context():
+            from models.customer import create_customer, search_customers_unified
+
+            _add_guest('Carla Batch', '501', 'BK-BATCH-1')
+            _add_guest('Pere Batch', '501', 'BK-BATCH-1')
+            _add_guest('Laia Batch', '502', 'BK-BATCH-2')
+            staying = create_customer(customer_type='interno', first_name='Laia', last_name='Batch',
+                                      room_number='502', phone='600000033')
+            # Interno customer without an active stay is hidden
+            create_customer(customer_type='interno', first_name='Old', last_name='Batch',
+                            room_number='503', phone='600000034')
+
+            statements = []
+            get_db().set_trace_callback(statements.append)
+            try:
+                results = search_customers_unified('batch')
+            finally:
+                get_db().set_trace_callback(None)
+
+            assert [(r['source'], r['room_number']) for r in results] == [
+                ('customer', '502'), ('hotel_guest', '501')
+            ]
+            assert results[0]['id'] == staying
+            assert results[1]['display_name'] == 'Carla Batch (2 huéspedes)'
+            # One stay lookup + one count query, however many matched; no writes
+            assert sum('FROM hotel_guests\n' in s for s in statements) == 2
+            assert not any('BEGIN IMMEDIATE' in s for s in statements)
+
+    def test_search_skips_refresh_while_write_lock_is_busy(self, app):
+        with app.app_context():
+            from models.customer import search_customers_unified
+
+            # Raw-SQL write: only queued, not applied
+            _add_guest('Bruno Lockhart', '610', 'BK-LOCK-1')
+
+            writer = sqlite3.connect(app.config['DATABASE_PATH'])
+            writer.execute('BEGIN IMMEDIATE')
+            try:
+                started = time.monotonic()
+                assert search_customers_unified('lockhart') == []
+                assert time.monotonic() - started < 1
+            finally:
+                writer.rollback()
+                writer.close()
+
+            # Lock free again: the leftover queue is applied on the next search
+            results = search_customers_unified('lockhart')
+            assert [r['room_number'] for r in results] == ['610']
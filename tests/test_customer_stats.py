@@ -0,0 +1,116 @@
+"""
+Tests for incrementally maintained customer statistics (beach_customers
+stats kept by reservation triggers, models/reservation_state.py recompute).
+"""
+
+import pytest
+
+from database import get_db
+
+
+STATS = ('total_visits', 'last_visit', 'no_shows', 'cancellations',
+         'total_reservations', 'total_spent')
+
+
+@pytest.fixture
+def stats_customer(app):
+    """Customer with three reservations on different dates."""
+    with app.app_context():
+        from models.reservation import create_beach_reservation
+
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute('''
+            INSERT INTO beach_customers (customer_type, first_name, last_name, phone)
+            VALUES ('externo', 'Stats', 'Customer', '600000020')
+        ''')
+        customer_id = cursor.lastrowid
+        db.commit()
+
+        reservation_ids = []
+        for day, price in (('2099-07-01', 20.0), ('2099-07-02', 30.0), ('2099-07-03', 15.5)):
+            reservation_id, _ = create_beach_reservation(
+                customer_id=customer_id, reservation_date=day, num_people=2,
+                final_price=price, created_by='test'
+            )
+            reservation_ids.append(reservation_id)
+
+        return {'customer_id': customer_id, 'reservation_ids': reservation_ids}
+
+
+def _stats(customer_id):
+    row = get_db().execute(
+        f"SELECT {', '.join(STATS)} FROM beach_customers WHERE id = ?", (customer_id,)
+    ).fetchone()
+    return {key: (str(row[key]) if key == 'last_visit' and row[key] else row[key]) for key in STATS}
+
+
+class TestIncrementalCustomerStats:
+    """Deltas applied on every reservation write match a full recompute."""
+
+    def test_state_changes_apply_deltas(self, app, stats_customer):
+        with app.app_context():
+            from models.reservation import (
+                add_reservation_state, remove_reservation_state, update_customer_statistics
+            )
+
+            customer_id = stats_customer['customer_id']
+            first, second, third = stats_customer['reservation_ids']
+            assert _stats(customer_id)['total_reservations'] == 3
+            assert _stats(customer_id)['total_spent'] == 65.5
+
+            add_reservation_state(first, 'Sentada', 'test')
+            add_reservation_state(second, 'Sentada', 'test')
+            add_reservation_state(third, 'Cancelada', 'test')
+
+            stats = _stats(customer_id)
+            assert stats['total_visits'] == 2
+            assert stats['last_visit'] == '2099-07-02'
+            assert stats['cancellations'] == 1
+            assert stats['total_reservations'] == 2
+            assert stats['total_spent'] == 50.0
+
+            # Losing the latest visit falls back to the previous one
+            remove_reservation_state(second, 'Sentada', 'test')
+            stats = _stats(customer_id)
+            assert stats['total_visits'] == 1
+            assert stats['last_visit'] == '2099-07-01'
+
+            incremental = _stats(customer_id)
+            update_customer_statistics(customer_id)
+            assert _stats(customer_id) == incremental
+
+    def test_price_change_and_delete(self, app, stats_customer):
+        with app.app_context():
+            from models.reservation import update_beach_reservation, delete_reservation
+
+            customer_id = stats_customer['customer_id']
+            first, second, _ = stats_customer['reservation_ids']
+
+            update_beach_reservation(first, final_price=45.0)
+            assert _stats(customer_id)['total_spent'] == 90.5
+
+            delete_reservation(second)
+            stats = _stats(customer_id)
+            assert stats['total_reservations'] == 2
+            assert stats['total_spent'] == 60.5
+
+    def test_recompute_all_repairs_drift(self, app, stats_customer):
+        with app.app_context():
+            from models.reservation import add_reservation_state, recompute_all_customer_statistics
+
+            customer_id = stats_customer['customer_id']
+            add_reservation_state(stats_customer['reservation_ids'][0], 'Sentada', 'test')
+            expected = _stats(customer_id)
+
+            db = get_db()
+            db.execute('''
+                UPDATE beach_customers
+                SET total_visits = 99, last_visit = NULL, total_spent = 0
+                WHERE id = ?
+            ''', (customer_id,))
+            db.commit()
+
+            assert recompute_all_customer_statistics() >= 1
+            assert _stats(customer_id) == expected
+            assert recompute_all_customer_statistics() == 0
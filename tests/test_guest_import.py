@@ -0,0 +1,454 @@
+"""
+Tests for the bulk hotel guest import (blueprints/admin/services/user_service.py).
+"""
+
+import pytest
+import openpyxl
+from datetime import timedelta
+
+from database import get_db
+
+
+HEADERS = ['Nombre', 'Apellidos', 'Reserva', 'Pensión', 'Tipo', 'Háb.',
+           'Llegada', 'Salida']
+
+
+def _write_report(path, rows):
+    """Write a GuestInHouse-style report (title rows, header on row 3)."""
+    wb = openpyxl.Workbook()
+    sheet = wb.active
+    sheet.append(['Guest In House Report'])
+    sheet.append([])
+    sheet.append(HEADERS)
+    for row in rows:
+        sheet.append(row)
+    wb.save(path)
+    return str(path)
+
+
+@pytest.fixture
+def stay(app):
+    from utils.datetime_helpers import get_today
+
+    today = get_today()
+    return today - timedelta(days=1), today + timedelta(days=4)
+
+
+class TestBulkGuestImport:
+    """Bulk pipeline keeps upsert semantics and reports timings."""
+
+    def test_creates_guests_and_marks_main_guest(self, app, tmp_path, stay):
+        arrival, departure = stay
+        path = _write_report(tmp_path / 'guests.xlsx', [
+            ['Ana', 'López', 'BK-1', 'AD', 'AD', '101', arrival, departure],
+            ['Luis', 'López', 'BK-1', 'AD', 'AD', '101', arrival, departure],
+            ['Marta', 'Ruiz', 'BK-2', 'AD', 'AD', '102', arrival, departure],
+            ['', '', 'Preferencias: vista mar', '', '', '', None, None],
+            ['Sin', 'Fecha', 'BK-3', 'AD', 'AD', '103', None, departure],
+        ])
+
+        with app.app_context():
+            from blueprints.admin.services.user_service import import_hotel_guests_from_excel
+
+            result = import_hotel_guests_from_excel(path, source_name='guests.xlsx')
+
+            assert result['created'] == 3
+            assert result['updated'] == 0
+            assert result['total'] == 4
+            assert len(result['errors']) == 1
+            assert {'read', 'guests', 'room_sync', 'total'} <= set(result['timings'])
+
+            rows = get_db().execute('''
+                SELECT guest_name, is_main_guest, source_file FROM hotel_guests
+                WHERE room_number = '101' ORDER BY id
+            ''').fetchall()
+            assert [(r['guest_name'], r['is_main_guest']) for r in rows] == [
+                ('Ana López', 1), ('Luis López', 0)
+            ]
+            assert rows[0]['source_file'] == 'guests.xlsx'
+
+    def test_reimport_updates_and_syncs_room_change(self, app, tmp_path, stay):
+        arrival, departure = stay
+        with app.app_context():
+            from blueprints.admin.services.user_service import import_hotel_guests_from_excel
+            from models.customer import create_customer, get_customer_by_id
+            from models.reservation import create_beach_reservation
+            from utils.datetime_helpers import get_today
+
+            import_hotel_guests_from_excel(_write_report(tmp_path / 'first.xlsx', [
+                ['Ana', 'López', 'BK-1', 'AD', 'AD', '101', arrival, departure],
+            ]))
+
+            customer_id = create_customer(
+                customer_type='interno', first_name='Ana', last_name='López',
+                room_number='101', phone='600000010'
+            )
+            furniture_id = get_db().execute(
+                'SELECT id FROM beach_furniture WHERE active = 1 LIMIT 1'
+            ).fetchone()['id']
+            reservation_id, _ = create_beach_reservation(
+                customer_id=customer_id,
+                reservation_date=get_today().isoformat(),
+                num_people=2,
+                furniture_ids=[furniture_id],
+                created_by='test'
+            )
+            db = get_db()
+            db.execute("UPDATE beach_reservations SET booking_reference = 'BK-1' WHERE id = ?",
+                       (reservation_id,))
+            db.commit()
+            # beach_room_changes outlives init_db: only look at rows logged below
+            last_change_id = db.execute(
+                'SELECT COALESCE(MAX(id), 0) FROM beach_room_changes').fetchone()[0]
+
+            # Same booking, new room and a later departure; name spelled differently
+            later = departure + timedelta(days=2)
+            result = import_hotel_guests_from_excel(_write_report(tmp_path / 'second.xlsx', [
+                ['ANA', 'LOPEZ', 'BK-1', 'AD', 'AD', '205', arrival, later],
+            ]))
+
+            assert result['created'] == 0
+            assert result['updated'] == 1
+
+            guest = get_db().execute(
+                "SELECT room_number, departure_date FROM hotel_guests WHERE booking_reference = 'BK-1'"
+            ).fetchone()
+            assert guest['room_number'] == '205'
+            assert str(guest['departure_date']) == later.isoformat()
+
+            assert get_customer_by_id(customer_id)['room_number'] == '205'
+            assert [(c['old_room'], c['new_room']) for c in result['room_changes']] == [('101', '205')]
+
+            logged = get_db().execute(
+                'SELECT old_room, new_room FROM beach_room_changes WHERE customer_id = ? AND id > ?',
+                (customer_id, last_change_id)
+            ).fetchall()
+            assert [(r['old_room'], r['new_room']) for r in logged] == [('101', '205')]
+
+    def test_repeated_rows_match_sequential_upserts(self, app, tmp_path, stay):
+        arrival, departure = stay
+        path = _write_report(tmp_path / 'dupes.xlsx', [
+            ['Ana', 'López', 'BK-1', 'AD', 'AD', '101', arrival, departure],
+            ['Ana', 'López', 'BK-1', 'AD', 'AD', '101', arrival, departure + timedelta(days=1)],
+        ])
+
+        with app.app_context():
+            from blueprints.admin.services.user_service import import_hotel_guests_from_excel
+
+            result = import_hotel_guests_from_excel(path)
+
+            assert result['created'] == 1
+            assert result['updated'] == 1
+            rows = get_db().execute(
+                "SELECT departure_date FROM hotel_guests WHERE booking_reference = 'BK-1'"
+            ).fetchall()
+            assert len(rows) == 1
+            assert str(rows[0]['departure_date']) == (departure + timedelta(days=1)).isoformat()
+
+    def test_timings_saved_to_import_log(self, app):
+        with app.app_context():
+            from models.import_log import save_import_log, get_last_import
+
+            save_import_log(
+                import_type='hotel_guests', source_file='x.xlsx', total_records=1,
+                created_count=1, updated_count=0, errors=[], room_changes=[],
+                timings={'read': 1.5, 'guests': 2.0}
+            )
+
+            assert get_last_import()['timings'] == {'read': 1.5, 'guests': 2.0}
+
+
+class TestIncrementalGuestSync:
+    """Diff-based sync applies only what changed since the last snapshot."""
+
+    def _sync(self, tmp_path, name, rows, **kwargs):
+        from blueprints.admin.services.user_service import sync_hotel_guests_incremental
+        return sync_hotel_guests_incremental(
+            _write_report(tmp_path / name, rows),
+            snapshot_path=str(tmp_path / 'snapshot.json'),
+            **kwargs
+        )
+
+    def test_second_sync_applies_only_changes(self, app, tmp_path, stay):
+        arrival, departure = stay
+        rows = [
+            ['Ana', 'López', 'BK-1', 'AD', 'AD', '101', arrival, departure],
+            ['Marta', 'Ruiz', 'BK-2', 'AD', 'AD', '102', arrival, departure],
+            ['Pau', 'Vidal', '', 'AD', 'AD', '103', arrival, departure],
+        ]
+        with app.app_context():
+            first = self._sync(tmp_path, 'first.xlsx', rows)
+            assert first['mode'] == 'full'
+            assert first['created'] == 3
+
+            later = departure + timedelta(days=3)
+            result = self._sync(tmp_path, 'second.xlsx', [
+                rows[0],
+                ['Marta', 'Ruiz', 'BK-2', 'AD', 'AD', '102', arrival, later],
+                rows[2],
+                ['Joan', 'Serra', 'BK-4', 'AD', 'AD', '104', arrival, departure],
+            ])
+
+            assert result['mode'] == 'incremental'
+            assert {k: result['changes'][k] for k in ('added', 'changed', 'removed', 'unchanged')} == {
+                'added': 1, 'changed': 1, 'removed': 0, 'unchanged': 2
+            }
+            assert result['changes']['booking_refs'] == 2
+            assert (result['created'], result['updated']) == (1, 1)
+
+            guest = get_db().execute(
+                "SELECT departure_date FROM hotel_guests WHERE booking_reference = 'BK-2'"
+            ).fetchone()
+            assert str(guest['departure_date']) == later.isoformat()
+
+            # Same file again: nothing to write
+            again = self._sync(tmp_path, 'third.xlsx', [
+                rows[0],
+                ['Marta', 'Ruiz', 'BK-2', 'AD', 'AD', '102', arrival, later],
+                rows[2],
+                ['Joan', 'Serra', 'BK-4', 'AD', 'AD', '104', arrival, departure],
+            ])
+            assert again['changes']['unchanged'] == 4
+            assert (again['created'], again['updated']) == (0, 0)
+
+    def test_dry_run_writes_nothing(self, app, tmp_path, stay):
+        arrival, departure = stay
+        with app.app_context():
+            result = self._sync(tmp_path, 'dry.xlsx', [
+                ['Ana', 'López', 'BK-1', 'AD', 'AD', '101', arrival, departure],
+            ], dry_run=True)
+
+            assert result['dry_run'] is True
+            assert result['changes']['added'] == 1
+            assert get_db().execute('SELECT COUNT(*) FROM hotel_guests').fetchone()[0] == 0
+            assert not (tmp_path / 'snapshot.json').exists()
+
+    def test_removed_guest_checked_out(self, app, tmp_path, stay):
+        arrival, departure = stay
+        # Enough guests for the reconciliation safety guard
+        rows = [[f'Guest{i}', 'Test', f'BK-{i}', 'AD', 'AD', str(100 + i), arrival, departure]
+                for i in range(60)]
+        with app.app_context():
+            from utils.datetime_helpers import get_today
+
+            self._sync(tmp_path, 'first.xlsx', rows)
+
+            result = self._sync(tmp_path, 'second.xlsx', rows[1:])
+
+            assert result['changes']['removed'] == 1
+            assert result['changes']['unchanged'] == 59
+            assert result['checked_out'] == 1
+            gone = get_db().execute(
+                "SELECT departure_date FROM hotel_guests WHERE booking_reference = 'BK-0'"
+            ).fetchone()
+            assert str(gone['departure_date']) == (get_today() - timedelta(days=1)).isoformat()
+
+    def test_unchanged_report_follows_segment_boundary(self, app, tmp_path, monkeypatch):
+        import utils.datetime_helpers as datetime_helpers
+
+        with app.app_context():
+            today = datetime_helpers.get_today()
+            moved = today + timedelta(days=2)
+            reserved = (today + timedelta(days=3)).isoformat()
+            # Room change: first segment ends tomorrow, second starts the day after
+            rows = [
+                ['Eva', 'Soler', 'BK-7-1', 'AD', 'AD', '301',
+                 today - timedelta(days=2), today + timedelta(days=1)],
+                ['Eva', 'Soler', 'BK-7-2', 'AD', 'AD', '302', moved, today + timedelta(days=5)],
+            ]
+            db = get_db()
+            customer_id = db.execute('''
+                INSERT INTO beach_customers (customer_type, first_name, last_name, room_number,
+                                             booking_reference)
+                VALUES ('interno', 'Eva', 'Soler', '301', 'BK-7-1')
+            ''').lastrowid
+            db.execute('''
+                INSERT INTO beach_reservations (customer_id, reservation_date, start_date,
+                                                end_date, num_people, current_state,
+                                                booking_reference)
+                VALUES (?, ?, ?, ?, 2, 'Confirmada', 'BK-7-1')
+            ''', (customer_id, reserved, reserved, reserved))
+            db.commit()
+
+            self._sync(tmp_path, 'first.xlsx', rows)
+            customer = db.execute('SELECT room_number FROM beach_customers WHERE id = ?',
+                                  (customer_id,)).fetchone()
+            assert customer['room_number'] == '301'
+
+            # Same report two days later: the stay has moved to the second segment
+            monkeypatch.setattr(datetime_helpers, 'get_today', lambda: moved)
+            result = self._sync(tmp_path, 'second.xlsx', rows)
+
+            assert result['changes']['unchanged'] == 2
+            assert result['segment_room_updates'] == 1
+            customer = db.execute(
+                'SELECT room_number, booking_reference FROM beach_customers WHERE id = ?',
+                (customer_id,)
+            ).fetchone()
+            assert (customer['room_number'], customer['booking_reference']) == ('302', 'BK-7-2')
+
+
+class TestPostImportPasses:
+    """Set-based segment and identity passes run after every import."""
+
+    def _guest(self, db, ref, room, name, arrival, departure, guest_type='AD', main=0):
+        db.execute('''
+            INSERT INTO hotel_guests (room_number, guest_name, arrival_date, departure_date,
+                                      guest_type, is_main_guest, booking_reference)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', (room, name, arrival, departure, guest_type, main, ref))
+
+    def _customer_with_reservation(self, db, name, room, ref, day):
+        first, last = name.split(' ', 1)
+        customer_id = db.execute('''
+            INSERT INTO beach_customers (customer_type, first_name, last_name, room_number,
+                                         booking_reference)
+            VALUES ('interno', ?, ?, ?, ?)
+        ''', (first, last, room, ref)).lastrowid
+        reservation_id = db.execute('''
+            INSERT INTO beach_reservations (customer_id, reservation_date, start_date, end_date,
+                                            num_people, current_state, booking_reference)
+            VALUES (?, ?, ?, ?, 2, 'Confirmada', ?)
+        ''', (customer_id, day, day, day, ref)).lastrowid
+        return customer_id, reservation_id
+
+    def test_segments_follow_room_change(self, app):
+        from models.hotel_guest import refresh_room_segments
+        from utils.datetime_helpers import get_today
+
+        today = get_today()
+        db = get_db()
+        self._guest(db, 'BK-9-1', '101', 'Dean Smith', today - timedelta(days=3), today - timedelta(days=1))
+        self._guest(db, 'BK-9-2', '202', 'Dean Smith', today, today + timedelta(days=4))
+        # A family holding two rooms at once: ambiguous, never followed
+        self._guest(db, 'FM-5-1', '301', 'Ana Ruiz', today - timedelta(days=2), today + timedelta(days=3))
+        self._guest(db, 'FM-5-2', '302', 'Luis Ruiz', today, today + timedelta(days=3))
+        self._guest(db, 'FM-5-3', '303', 'Eva Ruiz', today, today + timedelta(days=3))
+        dean_id, dean_res = self._customer_with_reservation(
+            db, 'Dean Smith', '101', 'BK-9-1', (today + timedelta(days=1)).isoformat())
+        ana_id, ana_res = self._customer_with_reservation(
+            db, 'Ana Ruiz', '301', 'FM-5-1', today.isoformat())
+        db.commit()
+
+        assert refresh_room_segments(booking_refs=['OTHER-1'])['reanchored'] == 0
+
+        summary = refresh_room_segments()
+
+        assert summary['reanchored'] == 1
+        assert summary['rooms_updated'] == 1
+        reservations = dict(db.execute(
+            'SELECT id, booking_reference FROM beach_reservations WHERE id IN (?, ?)',
+            (dean_res, ana_res)).fetchall())
+        assert reservations == {dean_res: 'BK-9-2', ana_res: 'FM-5-1'}
+        dean = db.execute('SELECT room_number, booking_reference FROM beach_customers WHERE id = ?',
+                          (dean_id,)).fetchone()
+        assert (dean['room_number'], dean['booking_reference']) == ('202', 'BK-9-2')
+        assert db.execute('''
+            SELECT old_room, new_room FROM beach_room_changes
+            WHERE customer_id = ? AND booking_reference = 'BK-9-2'
+        ''', (dean_id,)).fetchone()[:] == ('101', '202')
+
+        # Idempotent
+        assert refresh_room_segments()['reanchored'] == 0
+
+    def test_identity_follows_active_occupants(self, app):
+        from models.hotel_guest import refresh_guest_identity
+        from utils.datetime_helpers import get_today
+
+        today = get_today()
+        db = get_db()
+        # Holder row checked out yesterday; the real occupants replaced it
+        self._guest(db, 'GG-7', '4009', 'DL GOUGH', today - timedelta(days=3), today - timedelta(days=1), main=1)
+        self._guest(db, 'GG-7', '4009', 'Tom Gough', today - timedelta(days=3), today + timedelta(days=2), 'NI')
+        self._guest(db, 'GG-7', '4009', 'Dana Lee Gough', today - timedelta(days=3), today + timedelta(days=2))
+        customer_id, _ = self._customer_with_reservation(db, 'DL GOUGH', '4009', 'GG-7', today.isoformat())
+        db.commit()
+
+        summary = refresh_guest_identity()
+
+        assert summary['mains_promoted'] == 1
+        assert db.execute('''
+            SELECT guest_name FROM hotel_guests
+            WHERE booking_reference = 'GG-7' AND is_main_guest = 1 AND departure_date >= ?
+        ''', (today,)).fetchone()['guest_name'] == 'Dana Lee Gough'
+        # Two active occupants in the room: renaming would be a guess
+        assert summary['customers_renamed'] == 0
+
+        db.execute("DELETE FROM hotel_guests WHERE guest_name = 'Tom Gough'")
+        db.commit()
+        assert refresh_guest_identity()['customers_renamed'] == 1
+        customer = db.execute('SELECT first_name, last_name FROM beach_customers WHERE id = ?',
+                              (customer_id,)).fetchone()
+        assert (customer['first_name'], customer['last_name']) == ('Dana', 'Lee Gough')
+
+    def test_out_of_stay_audit_loads_segments_in_bulk(self, app):
+        from models.stay_validation import check_dates_within_stay, find_out_of_stay_reservations
+        from utils.datetime_helpers import get_today
+
+        today = get_today()
+        db = get_db()
+        self._guest(db, 'OS-1-1', '501', 'Ida Holm', today - timedelta(days=4), today - timedelta(days=1))
+        # Room change: the second segment extends the stay in another room
+        self._guest(db, 'OS-2-1', '502', 'Leo Park', today - timedelta(days=1), today + timedelta(days=1))
+        self._guest(db, 'OS-2-2', '602', 'Leo Park', today + timedelta(days=1), today + timedelta(days=3))
+        self._guest(db, 'ZZ-3', '777', 'Nora Diaz', today - timedelta(days=5), today - timedelta(days=1))
+
+        day = [(today + timedelta(days=n)).isoformat() for n in range(6)]
+        reservations = {
+            'departed': self._customer_with_reservation(db, 'Ida Holm', '501', 'OS-1-1', day[1]),
+            'covered': self._customer_with_reservation(db, 'Leo Park', '502', 'OS-2-1', day[2]),
+            'beyond': self._customer_with_reservation(db, 'Leo Park', '502', 'OS-2-1', day[5]),
+            'unknown': self._customer_with_reservation(db, 'Pre Arrival', '901', 'NEW-1', day[1]),
+            'room_fallback': self._customer_with_reservation(db, 'Nora Diaz', '777', None, day[0]),
+        }
+        db.execute('''
+            UPDATE beach_reservations
+            SET state_id = (SELECT id FROM beach_reservation_states WHERE name = 'Confirmada')
+        ''')
+        db.commit()
+
+        statements = []
+        db.set_trace_callback(statements.append)
+        try:
+            flagged = find_out_of_stay_reservations()
+        finally:
+            db.set_trace_callback(None)
+
+        ids = {res_id: key for key, (_, res_id) in reservations.items()}
+        ours = {ids[r['reservation_id']]: r for r in flagged if r['reservation_id'] in ids}
+        assert {key: r['severity'] for key, r in ours.items()} == {
+            'departed': 'departed',
+            'beyond': 'beyond_departure',
+            'room_fallback': 'departed',
+        }
+        assert ours['beyond']['stay_departure'] == day[3]
+        assert len([s for s in statements if 'hotel_guests' in s]) == 2
+
+        # Same verdicts as the per-reservation check
+        single = check_dates_within_stay(
+            {'customer_type': 'interno', 'booking_reference': 'OS-2-1'}, [day[2], day[5]])
+        assert (single['uncovered'], single['departure']) == ([day[5]], day[3])
+
+    def test_single_check_matches_audit_lookup(self, app):
+        from models.stay_validation import check_dates_within_stay, find_out_of_stay_reservations
+        from utils.datetime_helpers import get_today
+
+        today = get_today()
+        day = [(today + timedelta(days=n)).isoformat() for n in range(5)]
+        db = get_db()
+        self._guest(db, 'DS-5', '520', 'Ona Vives', today - timedelta(days=2), today + timedelta(days=1))
+        # Another booking: deeper suffix and different case, same 'DS-' prefix
+        self._guest(db, 'DS-9-2', '521', 'Pol Mas', today + timedelta(days=1), today + timedelta(days=6))
+        self._guest(db, 'ds-7', '522', 'Rita Gil', today + timedelta(days=1), today + timedelta(days=6))
+        _, reservation_id = self._customer_with_reservation(db, 'Ona Vives', '520', 'DS-5', day[4])
+        db.execute('''
+            UPDATE beach_reservations
+            SET state_id = (SELECT id FROM beach_reservation_states WHERE name = 'Confirmada')
+        ''')
+        db.commit()
+
+        single = check_dates_within_stay(
+            {'customer_type': 'interno', 'booking_reference': 'DS-5'}, [day[4]])
+        assert (single['uncovered'], single['departure']) == ([day[4]], day[1])
+        flagged = {r['reservation_id']: r for r in find_out_of_stay_reservations()}
+        assert flagged[reservation_id]['stay_departure'] == day[1]
@@ -2,6 +2,9 @@
 Tests for insights model functions.
 """
 
+import sqlite3
+import time
+
 import pytest
 from datetime import date, timedelta
 
@@ -917,5 +920,170 @@ class TestInsightsPatternsAPI:
             assert len(data['lead_time']) == 5
 
 
+def _add_reservation(day, state='Confirmada', price=0.0, people=2):
+    """Insert a one-day reservation on the first active furniture."""
+    from database import get_db
+
+    db = get_db()
+    furniture_id = db.execute('SELECT id FROM beach_furniture WHERE active = 1 LIMIT 1').fetchone()[0]
+    customer_id = db.execute('''
+        INSERT INTO beach_customers (customer_type, first_name, last_name, phone)
+        VALUES ('externo', 'Rollup', 'Test', '611000000')
+    ''').lastrowid
+    reservation_id = db.execute('''
+        INSERT INTO beach_reservations (customer_id, reservation_date, start_date, end_date,
+                                        num_people, current_state, final_price, created_at)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+    ''', (customer_id, day, day, day, people, state, price, f'{day} 08:00:00')).lastrowid
+    db.execute('''
+        INSERT INTO beach_reservation_furniture (reservation_id, furniture_id, assignment_date)
+        VALUES (?, ?, ?)
+    ''', (reservation_id, furniture_id, day))
+    db.commit()
+    return reservation_id
+
+
+class TestDailyRollup:
+    """Past days are served from beach_daily_rollup, kept current by triggers."""
+
+    def test_past_days_read_from_rollup(self, app):
+        from database import get_db
+        from models.insights import get_occupancy_range, get_revenue_stats, get_pattern_stats
+        from utils.datetime_helpers import get_today
+
+        with app.app_context():
+            past = (get_today() - timedelta(days=3)).isoformat()
+            today = get_today().isoformat()
+            _add_reservation(past, price=40.0)
+            _add_reservation(past, state='Cancelada', price=25.0)
+            _add_reservation(today, price=10.0)
+
+            daily = {d['date']: d['occupied'] for d in get_occupancy_range(past, today)}
+            assert daily[past] == 1
+            assert daily[today] == 1
+
+            revenue = get_revenue_stats(past, today)
+            assert revenue['total_revenue'] == 50.0
+            assert revenue['paid_reservations'] == 2
+
+            patterns = get_pattern_stats(past, today)
+            assert patterns['total_reservations'] == 3
+            assert patterns['cancellation_count'] == 1
+
+            db = get_db()
+            rolled_days = {str(r[0]) for r in db.execute('SELECT DISTINCT day FROM beach_daily_rollup')}
+            assert rolled_days == {past}
+            # Today's day stays queued until it is in the past
+            assert [str(r[0]) for r in db.execute('SELECT day FROM beach_daily_rollup_dirty')] == [today]
+
+    def test_state_change_requeues_past_day(self, app):
+        from database import get_db
+        from models.insights import get_revenue_stats, get_occupancy_stats
+        from utils.datetime_helpers import get_today
+
+        with app.app_context():
+            past = (get_today() - timedelta(days=5)).isoformat()
+            reservation_id = _add_reservation(past, price=30.0)
+            assert get_revenue_stats(past, past)['total_revenue'] == 30.0
+
+            db = get_db()
+            db.execute("UPDATE beach_reservations SET current_state = 'No-Show' WHERE id = ?",
+                       (reservation_id,))
+            db.commit()
+
+            assert get_revenue_stats(past, past)['total_revenue'] == 0.0
+            stats = get_occupancy_stats(past, past)
+            assert stats['total_reservations'] == 0
+            assert stats['noshow_rate'] == 100.0
+
+    def test_read_serves_last_rollup_while_write_lock_is_busy(self, app):
+        from database import get_db
+        from models.insights import get_revenue_stats
+        from utils.datetime_helpers import get_today
+
+        with app.app_context():
+            past = (get_today() - timedelta(days=4)).isoformat()
+            _add_reservation(past, price=20.0)
+            assert get_revenue_stats(past, past)['total_revenue'] == 20.0
+
+            _add_reservation(past, price=5.0)
+            writer = sqlite3.connect(app.config['DATABASE_PATH'])
+            writer.execute('BEGIN IMMEDIATE')
+            try:
+                started = time.monotonic()
+                assert get_revenue_stats(past, past)['total_revenue'] == 20.0
+                assert time.monotonic() - started < 1
+            finally:
+                writer.rollback()
+                writer.close()
+
+            # The queued day is picked up once the lock is free
+            assert [str(r[0]) for r in get_db().execute('SELECT day FROM beach_daily_rollup_dirty')] == [past]
+            assert get_revenue_stats(past, past)['total_revenue'] == 25.0
+
+    def test_rebuild_matches_incremental(self, app):
+        from database import get_db
+        from models.insights.rollup import rebuild_daily_rollup
+        from utils.datetime_helpers import get_today
+
+        with app.app_context():
+            for offset, state in ((2, 'Confirmada'), (2, 'Cancelada'), (9, 'Confirmada')):
+                _add_reservation((get_today() - timedelta(days=offset)).isoformat(), state=state, price=15.0)
+
+            def snapshot():
+                return [tuple(r) for r in get_db().execute(
+                    'SELECT * FROM beach_daily_rollup ORDER BY day, zone_id, furniture_type, customer_type'
+                )]
+
+            from models.insights.rollup import refresh_daily_rollup
+            assert refresh_daily_rollup() == 2
+            incremental = snapshot()
+
+            assert rebuild_daily_rollup() == 2
+            assert snapshot() == incremental
+
+
+class TestTodaySnapshot:
+    """get_today_snapshot bundles the "today" KPIs behind a revision-keyed cache."""
+
+    def test_matches_individual_queries(self, app):
+        from models.insights import (
+            get_today_snapshot, get_occupancy_today, get_occupancy_comparison,
+            get_pending_checkins_count, get_occupancy_by_zone
+        )
+        from utils.datetime_helpers import get_today
+
+        with app.app_context():
+            _add_reservation((get_today() - timedelta(days=1)).isoformat())
+            _add_reservation(get_today().isoformat(), state='Pendiente')
+
+            snapshot = get_today_snapshot()
+
+            assert snapshot['occupancy'] == get_occupancy_today()
+            assert snapshot['comparison'] == get_occupancy_comparison()
+            assert snapshot['pending_checkins'] == get_pending_checkins_count()
+            assert snapshot['zones'] == get_occupancy_by_zone()
+            assert snapshot['occupancy']['occupied'] == 1
+
+    def test_reused_until_map_revision_changes(self, app, monkeypatch):
+        from models.insights import occupancy
+        from utils.datetime_helpers import get_today
+
+        with app.app_context():
+            builds = []
+            build = occupancy._build_today_snapshot
+            monkeypatch.setattr(occupancy, '_build_today_snapshot',
+                                lambda *args: builds.append(args) or build(*args))
+
+            first = occupancy.get_today_snapshot()
+            assert occupancy.get_today_snapshot() == first
+            assert len(builds) == 1
+
+            _add_reservation(get_today().isoformat())
+            assert occupancy.get_today_snapshot()['occupancy']['occupied'] == \
+                first['occupancy']['occupied'] + 1
+            assert len(builds) == 2
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
@@ -0,0 +1,175 @@
+"""
+Tests for map revisions (ETag and incremental ?since= polling of /map/data).
+"""
+
+import pytest
+from database import get_db
+
+
+MAP_DATE = '2099-07-01'
+
+
+@pytest.fixture
+def map_setup(app):
+    """Two furniture pieces and a customer for revision tests."""
+    with app.app_context():
+        db = get_db()
+        cursor = db.cursor()
+        cursor.execute('''
+            SELECT id FROM beach_furniture
+            WHERE active = 1 AND is_temporary = 0
+            ORDER BY id LIMIT 2
+        ''')
+        furniture_ids = [row['id'] for row in cursor.fetchall()]
+
+        cursor.execute('''
+            INSERT INTO beach_customers (customer_type, first_name, last_name, phone)
+            VALUES ('externo', 'Rev', 'Tester', '600000001')
+        ''')
+        customer_id = cursor.lastrowid
+        db.commit()
+
+        return {'furniture_ids': furniture_ids, 'customer_id': customer_id}
+
+
+def _create_reservation(customer_id, furniture_id):
+    from models.reservation import create_beach_reservation
+    reservation_id, _ = create_beach_reservation(
+        customer_id=customer_id,
+        reservation_date=MAP_DATE,
+        num_people=2,
+        furniture_ids=[furniture_id],
+        created_by='test'
+    )
+    return reservation_id
+
+
+class TestMapRevisionModel:
+    """Tests for revision bookkeeping fed by the triggers."""
+
+    def test_reservation_bumps_revision_for_its_date_only(self, app, map_setup):
+        with app.app_context():
+            from models.map_revision import get_map_revision, get_map_changes_since
+
+            before = get_map_revision(MAP_DATE)
+            other_before = get_map_revision('2099-07-05')
+
+            _create_reservation(map_setup['customer_id'], map_setup['furniture_ids'][0])
+
+            assert get_map_revision(MAP_DATE) > before
+            assert get_map_revision('2099-07-05') == other_before
+
+            changed, full_reload = get_map_changes_since(MAP_DATE, before)
+            assert changed == {map_setup['furniture_ids'][0]}
+            assert full_reload is False
+
+    def test_state_change_bumps_revision(self, app, map_setup):
+        with app.app_context():
+            from models.map_revision import get_map_revision
+            from models.reservation_state import add_reservation_state
+
+            reservation_id = _create_reservation(
+                map_setup['customer_id'], map_setup['furniture_ids'][0]
+            )
+            before = get_map_revision(MAP_DATE)
+
+            add_reservation_state(reservation_id, 'Sentada', 'test')
+
+            assert get_map_revision(MAP_DATE) > before
+
+    def test_block_range_bumps_every_covered_date(self, app, map_setup):
+        with app.app_context():
+            from models.map_revision import get_map_revision
+            from models.furniture_block import create_furniture_block
+
+            before = get_map_revision('2099-07-03')
+            create_furniture_block(
+                furniture_id=map_setup['furniture_ids'][1],
+                start_date='2099-07-02',
+                end_date='2099-07-04',
+                block_type='maintenance',
+                created_by='test'
+            )
+            assert get_map_revision('2099-07-03') > before
+
+    def test_config_change_requires_full_reload(self, app, map_setup):
+        with app.app_context():
+            from models.map_revision import get_map_revision, get_map_changes_since
+            from models.config import set_config
+
+            before = get_map_revision(MAP_DATE)
+            set_config('map_zone_height', '250')
+
+            _, full_reload = get_map_changes_since(MAP_DATE, before)
+            assert full_reload is True
+
+    def test_prune_keeps_current_dates(self, app, map_setup):
+        with app.app_context():
+            from models.map_revision import get_map_revision, prune_map_changes
+
+            _create_reservation(map_setup['customer_id'], map_setup['furniture_ids'][0])
+            revision = get_map_revision(MAP_DATE)
+
+            prune_map_changes(before_date='2099-01-01')
+
+            assert get_map_revision(MAP_DATE) == revision
+
+
+class TestMapDataConditionalPolling:
+    """Tests for ETag / delta responses of /beach/api/map/data."""
+
+    def test_unchanged_poll_returns_304(self, authenticated_client, map_setup):
+        first = authenticated_client.get(f'/beach/api/map/data?date={MAP_DATE}')
+        assert first.status_code == 200
+        etag = first.headers.get('ETag')
+        assert etag
+
+        second = authenticated_client.get(
+            f'/beach/api/map/data?date={MAP_DATE}',
+            headers={'If-None-Match': etag}
+        )
+        assert second.status_code == 304
+
+    def test_change_invalidates_etag(self, app, authenticated_client, map_setup):
+        first = authenticated_client.get(f'/beach/api/map/data?date={MAP_DATE}')
+        etag = first.headers.get('ETag')
+
+        with app.app_context():
+            _create_reservation(map_setup['customer_id'], map_setup['furniture_ids'][0])
+
+        second = authenticated_client.get(
+            f'/beach/api/map/data?date={MAP_DATE}',
+            headers={'If-None-Match': etag}
+        )
+        assert second.status_code == 200
+        assert second.headers.get('ETag') != etag
+
+    def test_since_returns_only_changed_furniture(self, app, authenticated_client, map_setup):
+        first = authenticated_client.get(f'/beach/api/map/data?date={MAP_DATE}').get_json()
+        revision = first['map_revision']
+        furniture_id = map_setup['furniture_ids'][0]
+
+        with app.app_context():
+            reservation_id = _create_reservation(map_setup['customer_id'], furniture_id)
+
+        delta = authenticated_client.get(
+            f'/beach/api/map/data?date={MAP_DATE}&since={revision}'
+        ).get_json()
+
+        assert delta['delta'] is True
+        assert delta['changed_furniture'] == [furniture_id]
+        assert [f['id'] for f in delta['furniture']] == [furniture_id]
+        assert delta['availability'][str(furniture_id)]['reservation_id'] == reservation_id
+        assert delta['map_revision'] > revision
+        assert 'zones' not in delta
+
+    def test_since_current_revision_is_empty_delta(self, authenticated_client, map_setup):
+        first = authenticated_client.get(f'/beach/api/map/data?date={MAP_DATE}').get_json()
+
+        delta = authenticated_client.get(
+            f"/beach/api/map/data?date={MAP_DATE}&since={first['map_revision']}"
+        ).get_json()
+
+        assert delta['delta'] is True
+        assert delta['changed_furniture'] == []
+        assert delta['availability'] == {}
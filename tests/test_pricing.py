@@ -0,0 +1,176 @@
+"""
+Tests for the compiled pricing resolver (models/pricing.py) and the pricing
+service built on it.
+"""
+
+from datetime import date
+
+from database import get_db
+
+
+def _first_furniture():
+    """First active furniture piece (id, zone_id, furniture_type)."""
+    row = get_db().execute('''
+        SELECT id, zone_id, furniture_type FROM beach_furniture
+        WHERE active = 1 ORDER BY id LIMIT 1
+    ''').fetchone()
+    return row['id'], row['zone_id'], row['furniture_type']
+
+
+class TestPricingResolver:
+    """Policies and packages resolve from the compiled rules table."""
+
+    def test_most_specific_policy_wins(self, app):
+        with app.app_context():
+            from models.pricing import (
+                create_minimum_consumption_policy, get_applicable_minimum_consumption_policy
+            )
+
+            _, zone_id, furniture_type = _first_furniture()
+            create_minimum_consumption_policy('Default', 5.0)
+            create_minimum_consumption_policy('Externos', 10.0, customer_type='externo')
+            create_minimum_consumption_policy('Tipo', 15.0, furniture_type=furniture_type)
+            create_minimum_consumption_policy('Tipo zona baja', 20.0, furniture_type=furniture_type,
+                                              zone_id=zone_id, priority_order=1)
+            create_minimum_consumption_policy('Tipo zona alta', 25.0, furniture_type=furniture_type,
+                                              zone_id=zone_id, priority_order=9)
+
+            def resolved(**kwargs):
+                return get_applicable_minimum_consumption_policy(**kwargs)['policy_name']
+
+            assert resolved(furniture_type=furniture_type, customer_type='externo',
+                            zone_id=zone_id) == 'Tipo zona alta'
+            assert resolved(furniture_type=furniture_type, customer_type='externo') == 'Tipo'
+            assert resolved(furniture_type='otro', customer_type='externo') == 'Externos'
+            assert resolved(furniture_type='otro', customer_type='interno') == 'Default'
+
+    def test_writes_rebuild_the_rules(self, app):
+        with app.app_context():
+            from models.pricing import (
+                create_minimum_consumption_policy, delete_minimum_consumption_policy,
+                get_applicable_minimum_consumption_policy
+            )
+
+            assert get_applicable_minimum_consumption_policy(customer_type='externo') is None
+
+            policy_id = create_minimum_consumption_policy('Externos', 10.0, customer_type='externo')
+            assert get_applicable_minimum_consumption_policy(customer_type='externo')['id'] == policy_id
+
+            delete_minimum_consumption_policy(policy_id)
+            assert get_applicable_minimum_consumption_policy(customer_type='externo') is None
+
+            # Raw SQL writes are picked up through the generation triggers
+            db = get_db()
+            db.execute('UPDATE beach_minimum_consumption_policies SET is_active = 1 WHERE id = ?',
+                       (policy_id,))
+            db.commit()
+            assert get_applicable_minimum_consumption_policy(customer_type='externo')['id'] == policy_id
+
+    def test_eligible_packages_filtered_in_memory(self, app):
+        with app.app_context():
+            from models.package import create_package
+            from blueprints.beach.services.pricing_service import get_eligible_packages
+
+            furniture_id, _, furniture_type = _first_furniture()
+            create_package('Persona', 30.0, 'per_person', customer_type='externo',
+                           furniture_types_included=furniture_type)
+            create_package('Fijo', 50.0, 'per_package')
+            create_package('Internos', 20.0, 'per_package', customer_type='interno')
+            create_package('Caducado', 10.0, 'per_package', valid_until='2020-12-31')
+            create_package('Otro tipo', 5.0, 'per_package', furniture_types_included='zzz')
+
+            packages = get_eligible_packages('externo', [furniture_id], date(2030, 7, 1), 2)
+
+            assert [(p['package_name'], p['calculated_price']) for p in packages] == [
+                ('Fijo', 50.0), ('Persona', 60.0)
+            ]
+
+    def test_quote_queries_only_furniture(self, app):
+        with app.app_context():
+            from models.package import create_package
+            from models.pricing import create_minimum_consumption_policy
+            from blueprints.beach.services.pricing_service import (
+                get_eligible_packages, get_applicable_minimum_consumption
+            )
+
+            furniture_id, _, _ = _first_furniture()
+            create_package('Fijo', 50.0, 'per_package')
+            create_minimum_consumption_policy('Default', 5.0, calculation_type='per_person')
+            get_eligible_packages('externo', [furniture_id], date(2030, 7, 1), 2)  # warm the rules
+
+            statements = []
+            get_db().set_trace_callback(statements.append)
+            try:
+                packages = get_eligible_packages('externo', [furniture_id], date(2030, 7, 1), 2)
+                minimum = get_applicable_minimum_consumption([furniture_id], 'externo', 3)
+            finally:
+                get_db().set_trace_callback(None)
+
+            assert [p['package_name'] for p in packages] == ['Fijo']
+            assert minimum['amount'] == 15.0
+            assert not [s for s in statements
+                        if 'beach_packages' in s or 'beach_minimum_consumption_policies' in s]
+
+
+class TestPricingBatch:
+    """calculate_pricing_batch prices many combinations in one call."""
+
+    def _customer(self, customer_type='externo'):
+        db = get_db()
+        customer_id = db.execute('''
+            INSERT INTO beach_customers (customer_type, first_name, last_name, phone)
+            VALUES (?, 'Batch', 'Quote', '611000000')
+        ''', (customer_type,)).lastrowid
+        db.commit()
+        return customer_id
+
+    def test_batch_matches_single_quotes(self, app):
+        with app.app_context():
+            from models.pricing import create_minimum_consumption_policy
+            from blueprints.beach.services.pricing_service import (
+                calculate_pricing_batch, calculate_reservation_pricing
+            )
+
+            furniture_id, _, furniture_type = _first_furniture()
+            other_id = get_db().execute(
+                'SELECT id FROM beach_furniture WHERE active = 1 AND id != ? LIMIT 1', (furniture_id,)
+            ).fetchone()[0]
+            create_minimum_consumption_policy('Tipo', 12.0, calculation_type='per_person',
+                                              furniture_type=furniture_type)
+            customer_id = self._customer()
+            sets = [[furniture_id], [other_id, furniture_id]]
+            dates = [date(2030, 7, 1), date(2030, 7, 2)]
+
+            quotes = calculate_pricing_batch(customer_id, sets, dates, [2, 4])
+
+            assert len(quotes) == 8
+            for quote in quotes:
+                assert quote['pricing'] == calculate_reservation_pricing(
+                    customer_id, quote['furniture_ids'], quote['reservation_date'],
+                    quote['num_people']
+                )
+            assert [q['pricing']['calculated_price'] for q in quotes[:2]] == [24.0, 48.0]
+
+    def test_batch_endpoint(self, authenticated_client, app):
+        with app.app_context():
+            furniture_id, _, _ = _first_furniture()
+            customer_id = self._customer()
+
+        response = authenticated_client.post('/beach/api/pricing/calculate-batch', json={
+            'customer_id': customer_id,
+            'furniture_sets': [[furniture_id]],
+            'dates': ['2030-07-01', '2030-07-02'],
+            'party_sizes': [2],
+        })
+        assert response.status_code == 200
+        data = response.get_json()
+        assert data['success'] is True
+        assert [q['reservation_date'] for q in data['quotes']] == ['2030-07-01', '2030-07-02']
+
+        response = authenticated_client.post('/beach/api/pricing/calculate-batch', json={
+            'customer_id': customer_id,
+            'furniture_sets': [[furniture_id]],
+            'dates': ['01/07/2030'],
+            'party_sizes': [2],
+        })
+        assert response.get_json()['success'] is False
@@ -0,0 +1,105 @@
+"""
+Tests for the process-wide reference-data cache (utils/cache.py).
+"""
+
+from database import get_db
+
+
+class TestReferenceCache:
+    """Cached zones/types/states/config stay coherent with writes."""
+
+    def test_cached_value_reused_until_generation_changes(self, app):
+        with app.app_context():
+            from utils.cache import cached
+
+            calls = []
+
+            def loader():
+                calls.append(1)
+                return len(calls)
+
+            assert cached('states', 'probe', loader) == 1
+            assert cached('states', 'probe', loader) == 1
+
+            # A write from any connection bumps the generation via triggers
+            db = get_db()
+            db.execute("UPDATE beach_reservation_states SET color = color WHERE code = 'confirmada'")
+            db.commit()
+
+            assert cached('states', 'probe', loader) == 2
+
+    def test_update_state_is_visible_immediately(self, app):
+        with app.app_context():
+            from models.state import get_state_by_code, update_state, get_state_priority_map
+
+            state = get_state_by_code('confirmada')
+            get_state_priority_map()  # warm the cache
+
+            update_state(state['id'], display_priority=77)
+
+            assert get_state_priority_map()[state['name']] == 77
+
+    def test_releasing_states_follow_raw_sql_writes(self, app):
+        with app.app_context():
+            from models.reservation_state import get_active_releasing_states
+
+            assert 'Confirmada' not in get_active_releasing_states()
+
+            db = get_db()
+            db.execute('''
+                UPDATE beach_reservation_states SET is_availability_releasing = 1
+                WHERE name = 'Confirmada'
+            ''')
+            db.commit()
+
+            assert 'Confirmada' in get_active_releasing_states()
+
+    def test_map_config_invalidated_by_set_config(self, app):
+        with app.app_context():
+            from models.config import get_map_config, set_config
+
+            assert get_map_config()['zone_height'] != 321
+            set_config('map_zone_height', '321')
+            assert get_map_config()['zone_height'] == 321
+
+    def test_callers_get_copies(self, app):
+        with app.app_context():
+            from models.zone import get_all_zones
+
+            zones = get_all_zones()
+            zones[0]['name'] = 'Mutated'
+
+            assert get_all_zones()[0]['name'] != 'Mutated'
+
+    def test_zone_furniture_count_tracks_new_furniture(self, app):
+        with app.app_context():
+            from models.zone import get_all_zones
+            from models.furniture import create_furniture
+
+            zone = get_all_zones()[0]
+            create_furniture('CACHE1', zone['id'], 'hamaca', 2)
+
+            refreshed = next(z for z in get_all_zones() if z['id'] == zone['id'])
+            assert refreshed['furniture_count'] == zone['furniture_count'] + 1
+
+    def test_state_usage_count_is_not_cached(self, app):
+        with app.app_context():
+            from models.state import get_all_states
+
+            before = {s['name']: s['usage_count'] for s in get_all_states()}
+
+            db = get_db()
+            cursor = db.cursor()
+            cursor.execute('''
+                INSERT INTO beach_customers (customer_type, first_name, phone)
+                VALUES ('externo', 'Usage', '600000002')
+            ''')
+            cursor.execute('''
+                INSERT INTO beach_reservations
+                (customer_id, start_date, end_date, reservation_date, current_state)
+                VALUES (?, '2099-08-01', '2099-08-01', '2099-08-01', 'Confirmada')
+            ''', (cursor.lastrowid,))
+            db.commit()
+
+            after = {s['name']: s['usage_count'] for s in get_all_states()}
+            assert after['Confirmada'] == before['Confirmada'] + 1
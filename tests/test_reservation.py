@@ -418,6 +418,40 @@ class TestTicketNumberGeneration:
             # Different date prefixes
             assert ticket1[:6] != ticket2[:6]
 
+    def test_explicit_ticket_keeps_sequence_ahead(self, app):
+        """A ticket written outside the allocator is never handed out again."""
+        with app.app_context():
+            from models.reservation import generate_reservation_number
+            from models.customer import create_customer
+
+            customer_id = create_customer(
+                customer_type='externo', first_name='Seq', last_name='Explicit',
+                phone='555-SEQ-002'
+            )
+            db = get_db()
+            db.execute('''
+                INSERT INTO beach_reservations (customer_id, ticket_number, reservation_date,
+                                                start_date, end_date, num_people)
+                VALUES (?, '99010742', '2099-01-07', '2099-01-07', '2099-01-07', 2)
+            ''', (customer_id,))
+            db.commit()
+
+            assert generate_reservation_number('2099-01-07') == '99010743'
+
+    def test_rolled_back_allocation_is_released(self, app):
+        """A number allocated in a rolled back transaction is reused."""
+        with app.app_context():
+            from models.reservation import generate_reservation_number
+
+            db = get_db()
+            cursor = db.cursor()
+            cursor.execute('BEGIN IMMEDIATE')
+            assert generate_reservation_number('2099-01-08', cursor) == '99010801'
+            db.rollback()
+
+            assert generate_reservation_number('2099-01-08') == '99010801'
+            assert generate_reservation_number('2099-01-08') == '99010802'
+
 
 class TestReservationUnifiedUpdate:
     """Test the unified reservation update endpoint PATCH /beach/api/map/reservations/<id>/update."""
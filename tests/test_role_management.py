@@ -342,3 +342,69 @@ class TestRoleRoutes:
         assert 'entries' in data
         assert 'total' in data
         assert data['total'] >= 1
+
+
+# =============================================================================
+# TestPermissionCache — Cross-request user and permission cache
+# =============================================================================
+
+class TestPermissionCache:
+    """Process-level user/permission cache follows writes immediately."""
+
+    def test_revoked_permission_applies_on_next_request(self, app, staff_role_id):
+        from flask import g
+        from models.role import get_role_permissions, revoke_permission
+        from models.user import create_user
+        from utils.permissions import load_user_permissions
+
+        with app.app_context():
+            user_id = create_user('cache-staff', 'cache-staff@example.com',
+                                  'CacheStaff2026!', role_id=staff_role_id)
+            permission = get_role_permissions(staff_role_id)[0]
+            assert permission['code'] in load_user_permissions(user_id)
+
+            revoke_permission(staff_role_id, permission['id'])
+
+            # Next request: fresh flask.g, only the process cache carries over
+            g.pop('user_permissions', None)
+            assert permission['code'] not in load_user_permissions(user_id)
+
+    def test_role_permission_set_shared_across_users(self, app, staff_role_id):
+        from database import get_db
+        from models.user import create_user, update_user, get_user_by_id
+        from utils.permissions import get_role_permission_codes
+
+        with app.app_context():
+            first = create_user('cache-a', 'cache-a@example.com', 'CacheA2026!', role_id=staff_role_id)
+            second = create_user('cache-b', 'cache-b@example.com', 'CacheB2026!', role_id=staff_role_id)
+            assert get_user_by_id(first)['role_id'] == get_user_by_id(second)['role_id']
+
+            codes = get_role_permission_codes(staff_role_id)
+            assert get_role_permission_codes(staff_role_id) is codes
+
+            statements = []
+            get_db().set_trace_callback(statements.append)
+            try:
+                get_user_by_id(first)
+                get_role_permission_codes(staff_role_id)
+            finally:
+                get_db().set_trace_callback(None)
+            assert all('beach_cache_generations' in s for s in statements)
+
+            update_user(first, full_name='Cache Renamed')
+            assert get_user_by_id(first)['full_name'] == 'Cache Renamed'
+
+    def test_raw_sql_role_change_reaches_cached_user(self, app, staff_role_id, admin_role_id):
+        from database import get_db
+        from models.user import create_user, get_user_by_id
+
+        with app.app_context():
+            user_id = create_user('cache-raw', 'cache-raw@example.com', 'CacheRaw2026!',
+                                  role_id=staff_role_id)
+            assert get_user_by_id(user_id)['role_name'] == 'staff'
+
+            db = get_db()
+            db.execute('UPDATE users SET role_id = ? WHERE id = ?', (admin_role_id, user_id))
+            db.commit()
+
+            assert get_user_by_id(user_id)['role_name'] == 'admin'
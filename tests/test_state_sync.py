@@ -283,3 +283,90 @@ class TestDataCleanup:
             assert inconsistent is not None, "Should detect inconsistent record"
             assert inconsistent['current_state'] == 'Cancelada'
             assert inconsistent['state_name'] == 'Confirmada'
+
+
+class TestStateMembership:
+    """beach_reservation_state_members mirrors the current_states CSV."""
+
+    def _members(self, cursor, reservation_id):
+        cursor.execute('''
+            SELECT s.name FROM beach_reservation_state_members m
+            JOIN beach_reservation_states s ON m.state_id = s.id
+            WHERE m.reservation_id = ?
+        ''', (reservation_id,))
+        return {row['name'] for row in cursor.fetchall()}
+
+    def test_membership_follows_state_changes(self, app, setup_state_test_data):
+        from database import get_db
+        from models.reservation_state import (
+            add_reservation_state, remove_reservation_state, change_reservation_state
+        )
+
+        with app.app_context():
+            db = get_db()
+            cursor = db.cursor()
+            data = setup_state_test_data
+            test_date = (date.today() + timedelta(days=105)).isoformat()
+
+            cursor.execute('''
+                INSERT INTO beach_reservations (
+                    customer_id, ticket_number, reservation_date, start_date, end_date,
+                    num_people, current_states, current_state, state_id
+                ) VALUES (?, 'MEMBER-001', ?, ?, ?, 2, 'Confirmada', 'Confirmada', ?)
+            ''', (data['customer_id'], test_date, test_date, test_date, data['confirmada_id']))
+            reservation_id = cursor.lastrowid
+            db.commit()
+            assert self._members(cursor, reservation_id) == {'Confirmada'}
+
+            add_reservation_state(reservation_id, 'Sentada', changed_by='test')
+            assert self._members(cursor, reservation_id) == {'Confirmada', 'Sentada'}
+
+            remove_reservation_state(reservation_id, 'Confirmada', changed_by='test')
+            assert self._members(cursor, reservation_id) == {'Sentada'}
+
+            change_reservation_state(reservation_id, 'Cancelada', changed_by='test')
+            assert self._members(cursor, reservation_id) == {'Cancelada'}
+
+    def test_membership_filter(self, app, setup_state_test_data):
+        from database import get_db
+        from models.reservation_state import add_reservation_state, state_membership_filter
+
+        with app.app_context():
+            db = get_db()
+            cursor = db.cursor()
+            data = setup_state_test_data
+            test_date = (date.today() + timedelta(days=106)).isoformat()
+
+            ids = []
+            for ticket in ('MEMBER-002', 'MEMBER-003'):
+                cursor.execute('''
+                    INSERT INTO beach_reservations (
+                        customer_id, ticket_number, reservation_date, start_date, end_date,
+                        num_people, current_states, current_state, state_id
+                    ) VALUES (?, ?, ?, ?, ?, 2, 'Confirmada', 'Confirmada', ?)
+                ''', (data['customer_id'], ticket, test_date, test_date, test_date,
+                      data['confirmada_id']))
+                ids.append(cursor.lastrowid)
+            db.commit()
+            add_reservation_state(ids[0], 'Sentada', changed_by='test')
+
+            condition, params = state_membership_filter(['Sentada'])
+            cursor.execute(
+                f'SELECT r.id FROM beach_reservations r WHERE r.reservation_date = ? AND {condition}',
+                (test_date, *params)
+            )
+            assert [row['id'] for row in cursor.fetchall()] == [ids[0]]
+
+            condition, params = state_membership_filter(['Sentada'], negate=True)
+            cursor.execute(
+                f'SELECT r.id FROM beach_reservations r WHERE r.reservation_date = ? AND {condition}',
+                (test_date, *params)
+            )
+            assert [row['id'] for row in cursor.fetchall()] == [ids[1]]
+
+            condition, params = state_membership_filter(['Sentada'])
+            cursor.execute(
+                f"EXPLAIN QUERY PLAN SELECT 1 FROM beach_reservations r WHERE {condition}", params
+            )
+            plan = ' '.join(row['detail'] for row in cursor.fetchall())
+            assert 'idx_state_members_state' in plan
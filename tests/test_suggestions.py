@@ -0,0 +1,228 @@
+"""
+Tests for the furniture suggestion engine (models/reservation_suggestions*.py).
+"""
+
+import pytest
+from database import get_db
+
+
+SUGGEST_DATE = '2099-08-10'
+
+
+@pytest.fixture
+def characteristic_setup(app):
+    """Two characteristics; the first furniture piece has both, the second one."""
+    with app.app_context():
+        db = get_db()
+        rows = db.execute(
+            'SELECT id, code, name FROM beach_characteristics ORDER BY id LIMIT 2'
+        ).fetchall()
+        chars = [dict(row) for row in rows]
+        furniture_ids = [
+            row['id'] for row in db.execute('''
+                SELECT id FROM beach_furniture WHERE active = 1 ORDER BY id LIMIT 3
+            ''').fetchall()
+        ]
+
+        from models.characteristic_assignments import set_furniture_characteristics
+        set_furniture_characteristics(furniture_ids[0], [chars[0]['id'], chars[1]['id']])
+        set_furniture_characteristics(furniture_ids[1], [chars[1]['id']])
+        set_furniture_characteristics(furniture_ids[2], [])
+
+        return {'chars': chars, 'furniture_ids': furniture_ids}
+
+
+class TestBulkPreferenceScoring:
+    """Bulk scoring matches the per-furniture scorer and tracks writes."""
+
+    def test_bulk_matches_single_scorer(self, app, characteristic_setup):
+        with app.app_context():
+            from models.characteristic_assignments import (
+                score_characteristic_match, score_characteristic_matches
+            )
+
+            requested = [c['id'] for c in characteristic_setup['chars']]
+            bulk = score_characteristic_matches(characteristic_setup['furniture_ids'], requested)
+
+            for fid in characteristic_setup['furniture_ids']:
+                single = score_characteristic_match(fid, requested)
+                assert bulk[fid]['score'] == single['score']
+                assert sorted(bulk[fid]['matched']) == sorted(single['matched'])
+                assert sorted(bulk[fid]['missing']) == sorted(single['missing'])
+
+    def test_preference_scores_and_names(self, app, characteristic_setup):
+        with app.app_context():
+            from models.reservation_suggestions import score_preference_matches
+
+            chars = characteristic_setup['chars']
+            first, second, third = characteristic_setup['furniture_ids']
+            scores = score_preference_matches(
+                [first, second, third], [chars[0]['id'], chars[1]['id']]
+            )
+
+            assert scores[first]['score'] == 1.0
+            assert sorted(scores[first]['matched']) == sorted(c['name'] for c in chars)
+            assert scores[second]['score'] == 0.5
+            assert scores[third]['score'] == 0.0
+
+    def test_codes_accepted(self, app, characteristic_setup):
+        with app.app_context():
+            from models.reservation_suggestions import score_preference_match
+
+            chars = characteristic_setup['chars']
+            result = score_preference_match(
+                characteristic_setup['furniture_ids'][1], [chars[1]['code'], 'no_such_code']
+            )
+
+            assert result['score'] == 0.5
+            assert result['matched'] == [chars[1]['name']]
+
+    def test_matrix_follows_assignment_changes(self, app, characteristic_setup):
+        with app.app_context():
+            from models.reservation_suggestions import score_preference_match
+            from models.characteristic_assignments import set_furniture_characteristics
+
+            char_id = characteristic_setup['chars'][0]['id']
+            fid = characteristic_setup['furniture_ids'][2]
+            assert score_preference_match(fid, [char_id])['score'] == 0.0
+
+            set_furniture_characteristics(fid, [char_id])
+
+            assert score_preference_match(fid, [char_id])['score'] == 1.0
+
+
+class TestSuggestFurniture:
+    """End-to-end suggestion results with preferences."""
+
+    def test_preferred_furniture_ranked_first(self, app, characteristic_setup):
+        with app.app_context():
+            from models.reservation_suggestions import suggest_furniture_for_reservation
+
+            chars = characteristic_setup['chars']
+            result = suggest_furniture_for_reservation(
+                dates=[SUGGEST_DATE],
+                num_people=1,
+                preferences_csv=f"{chars[0]['id']},{chars[1]['id']}",
+                limit=3
+            )
+
+            assert result['success'] is True
+            assert result['strategy'] == 'preference_based'
+            top = result['suggestions'][0]
+            assert top['furniture_ids'] == [characteristic_setup['furniture_ids'][0]]
+            assert top['preference_score'] == 1.0
+
+
+class TestMultiDateOccupancy:
+    """Range-aware occupancy map and cached row layout."""
+
+    def test_occupied_on_later_date_is_unavailable(self, app, characteristic_setup):
+        with app.app_context():
+            from models.reservation import create_beach_reservation
+            from models.reservation_suggestions import (
+                build_furniture_occupancy_map, build_multi_date_occupancy_map
+            )
+
+            db = get_db()
+            cursor = db.cursor()
+            cursor.execute('''
+                INSERT INTO beach_customers (customer_type, first_name, phone)
+                VALUES ('externo', 'Range', '600000003')
+            ''')
+            customer_id = cursor.lastrowid
+            db.commit()
+
+            fid = characteristic_setup['furniture_ids'][0]
+            reservation_id, _ = create_beach_reservation(
+                customer_id=customer_id,
+                reservation_date='2099-08-12',
+                num_people=2,
+                furniture_ids=[fid],
+                created_by='test'
+            )
+
+            single = build_furniture_occupancy_map(SUGGEST_DATE)
+            assert fid in single['available_ids']
+
+            multi = build_multi_date_occupancy_map([SUGGEST_DATE, '2099-08-11', '2099-08-12'])
+            assert fid not in multi['available_ids']
+            assert fid in multi['occupied_ids']
+            # Occupied only on a later date: no reservation on the primary date
+            assert multi['furniture'][fid]['reservation_id'] is None
+
+            later = build_multi_date_occupancy_map(['2099-08-12', SUGGEST_DATE])
+            assert later['furniture'][fid]['reservation_id'] == reservation_id
+
+    def test_layout_refreshed_when_furniture_moves(self, app, characteristic_setup):
+        with app.app_context():
+            from models.reservation_suggestions import build_furniture_occupancy_map
+
+            fid = characteristic_setup['furniture_ids'][0]
+            before = build_furniture_occupancy_map(SUGGEST_DATE)
+            max_row = max(before['rows'])
+
+            db = get_db()
+            db.execute('UPDATE beach_furniture SET position_y = 99999 WHERE id = ?', (fid,))
+            db.commit()
+
+            after = build_furniture_occupancy_map(SUGGEST_DATE)
+            assert after['furniture'][fid]['y'] == 99999
+            assert after['rows'][max(after['rows'])] == [fid]
+            assert max(after['rows']) >= max_row
+
+
+class TestLargePartyClusters:
+    """Cluster search across adjacent rows for groups beyond triplets."""
+
+    def _assert_connected(self, cluster, adjacency):
+        reached = {cluster[0]}
+        stack = [cluster[0]]
+        while stack:
+            for other in adjacency[stack.pop()] & set(cluster):
+                if other not in reached:
+                    reached.add(other)
+                    stack.append(other)
+        assert reached == set(cluster)
+
+    def test_party_of_ten_gets_contiguous_cluster(self, app):
+        with app.app_context():
+            from models.reservation_suggestions import (
+                suggest_furniture_for_reservation, get_furniture_adjacency
+            )
+
+            result = suggest_furniture_for_reservation(
+                dates=[SUGGEST_DATE], num_people=10, limit=3
+            )
+
+            assert result['success'] is True
+            adjacency = get_furniture_adjacency()
+            for suggestion in result['suggestions']:
+                assert suggestion['total_capacity'] >= 10
+                assert suggestion['contiguity_score'] == 1.0
+                self._assert_connected(suggestion['furniture_ids'], adjacency)
+
+    def test_clusters_avoid_occupied_furniture(self, app):
+        with app.app_context():
+            from models.reservation_suggestions import (
+                build_multi_date_occupancy_map, find_furniture_clusters
+            )
+
+            occupancy_map = build_multi_date_occupancy_map([SUGGEST_DATE])
+            blocked = occupancy_map['available_ids'][0]
+            occupancy_map['available_ids'].remove(blocked)
+            occupancy_map['furniture'][blocked]['available'] = False
+
+            clusters = find_furniture_clusters(occupancy_map, 8, limit=5)
+
+            assert clusters
+            assert all(blocked not in cluster for cluster in clusters)
+
+    def test_time_budget_bounds_search(self, app):
+        with app.app_context():
+            from models.reservation_suggestions import (
+                build_multi_date_occupancy_map, find_furniture_clusters
+            )
+
+            occupancy_map = build_multi_date_occupancy_map([SUGGEST_DATE])
+
+            assert find_furniture_clusters(occupancy_map, 12, time_budget=-1) == []
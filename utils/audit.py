@@ -3,7 +3,12 @@ Audit logging utility functions and decorators.
 Provides automatic and manual audit logging for tracking user actions.
 """
 
+import atexit
 import logging
+import os
+import queue
+import threading
+from datetime import datetime, timezone
 from functools import wraps
 from flask import request, g, current_app
 from flask_login import current_user
@@ -12,6 +17,185 @@ from flask_login import current_user
 logger = logging.getLogger(__name__)
 
 
+# =============================================================================
+# AUDITED COLUMNS
+# =============================================================================
+
+# Columns captured in before/after snapshots, per entity type (one table each)
+AUDIT_COLUMNS = {
+    'reservation': ('beach_reservations', (
+        'id', 'customer_id', 'reservation_date', 'num_people', 'time_slot',
+        'current_state', 'current_states', 'notes', 'preferences', 'paid', 'price',
+        'final_price',
+        'payment_method', 'payment_ticket_number', 'package_id',
+        'minimum_consumption_amount', 'minimum_consumption_policy_id'
+    )),
+    'customer': ('beach_customers', (
+        'id', 'customer_type', 'first_name', 'last_name', 'email', 'phone',
+        'country_code', 'room_number', 'language', 'notes', 'vip_status'
+    )),
+    'hotel_guest': ('hotel_guests', (
+        'id', 'guest_name', 'room_number', 'arrival_date', 'departure_date',
+        'booking_reference'
+    )),
+}
+
+
+def audit_snapshot(entity_type: str, record: dict) -> dict:
+    """
+    Reduce an already loaded record to its audited columns.
+
+    Args:
+        entity_type: Entity type (reservation, customer, hotel_guest)
+        record: Entity dict (any superset of the audited columns)
+
+    Returns:
+        Dict with the audited columns (the record itself for unknown types)
+    """
+    if not record:
+        return {}
+    if entity_type not in AUDIT_COLUMNS:
+        return dict(record)
+    return {column: record.get(column) for column in AUDIT_COLUMNS[entity_type][1]}
+
+
+def get_audit_snapshot(entity_type: str, entity_id: int) -> dict:
+    """
+    Read the audited columns of one entity (single-row primary key lookup).
+
+    Args:
+        entity_type: Entity type (reservation, customer, hotel_guest)
+        entity_id: Entity ID
+
+    Returns:
+        Dict with the audited columns, or None if not found / not audited
+    """
+    if entity_type not in AUDIT_COLUMNS:
+        return None
+    from database import get_db
+
+    table, columns = AUDIT_COLUMNS[entity_type]
+    try:
+        with get_db() as conn:
+            row = conn.execute(
+                f"SELECT {', '.join(columns)} FROM {table} WHERE id = ?", (entity_id,)
+            ).fetchone()
+            return dict(row) if row else None
+    except Exception as e:
+        logger.warning(f"Failed to get entity state for {entity_type}/{entity_id}: {e}")
+        return None
+
+
+# =============================================================================
+# BACKGROUND WRITER
+# =============================================================================
+
+class _AuditWriter:
+    """
+    Background thread writing queued audit entries in batches.
+
+    Whatever accumulated while the previous batch was being written goes
+    into the next one (up to batch_size), so batches grow with load without
+    delaying entries when traffic is low. The queue is bounded: when it is
+    full, submit() refuses the entry and the caller writes it directly, so
+    entries are never dropped.
+    """
+
+    def __init__(self, app, max_pending: int, batch_size: int):
+        self._app = app
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._batch_size = batch_size
+        self.pid = os.getpid()
+        self._thread = threading.Thread(target=self._run, name='audit-writer', daemon=True)
+        self._thread.start()
+
+    def submit(self, entry: dict) -> bool:
+        """Queue an entry. Returns False if the buffer is full."""
+        try:
+            self._queue.put_nowait(entry)
+            return True
+        except queue.Full:
+            return False
+
+    def flush(self) -> None:
+        """Block until every queued entry has been written."""
+        self._queue.join()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        """Write what is pending and stop the thread."""
+        self._queue.put(None)
+        self._thread.join(timeout)
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            entries = [entry for entry in batch if entry is not None]
+            try:
+                if entries:
+                    self._write(entries)
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+            if len(entries) < len(batch):
+                return  # stop() sentinel
+
+    def _write(self, entries: list) -> None:
+        from models.audit_log import create_audit_logs_bulk
+        try:
+            with self._app.app_context():
+                create_audit_logs_bulk(entries)
+        except Exception as e:
+            logger.error(f"Failed to write {len(entries)} audit entries: {e}", exc_info=True)
+
+
+_writer = None
+_writer_lock = threading.Lock()
+
+
+def _get_writer():
+    """Background writer for this process (started lazily), or None if disabled."""
+    global _writer
+    if not current_app.config.get('AUDIT_ASYNC_ENABLED', False):
+        return None
+    if _writer is not None and _writer.pid == os.getpid():
+        return _writer
+
+    with _writer_lock:
+        # Threads do not survive fork (gunicorn workers): start one per process
+        if _writer is None or _writer.pid != os.getpid():
+            config = current_app.config
+            _writer = _AuditWriter(
+                current_app._get_current_object(),
+                max_pending=config.get('AUDIT_QUEUE_SIZE', 1000),
+                batch_size=config.get('AUDIT_BATCH_SIZE', 100)
+            )
+        return _writer
+
+
+def flush_audit_log() -> None:
+    """Block until every queued audit entry of this process is written."""
+    writer = _writer
+    if writer is not None and writer.pid == os.getpid():
+        writer.flush()
+
+
+@atexit.register
+def shutdown_audit_writer() -> None:
+    """Write pending audit entries and stop the writer (runs at interpreter exit)."""
+    global _writer
+    writer = _writer
+    if writer is not None and writer.pid == os.getpid():
+        writer.stop()
+        _writer = None
+
+
 def log_audit(
     action: str,
     entity_type: str,
@@ -36,7 +220,8 @@ def log_audit(
         user_id: Override user ID (defaults to current_user.id)
 
     Returns:
-        New audit log ID, or None if logging failed
+        New audit log ID, or None if the entry was queued for the background
+        writer (AUDIT_ASYNC_ENABLED) or logging failed
 
     Example:
         # Log a manual action
@@ -81,18 +266,24 @@ def log_audit(
                 'after': after
             }
 
-        # Create audit log entry
-        audit_log_id = create_audit_log(
-            action=action,
-            entity_type=entity_type,
-            entity_id=entity_id,
-            user_id=user_id,
-            changes=changes,
-            ip_address=ip_address,
-            user_agent=user_agent
-        )
-
-        return audit_log_id
+        entry = {
+            'action': action,
+            'entity_type': entity_type,
+            'entity_id': entity_id,
+            'user_id': user_id,
+            'changes': changes,
+            'ip_address': ip_address,
+            'user_agent': user_agent,
+            # Time of the action, not of the (possibly deferred) write
+            'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+        }
+
+        writer = _get_writer()
+        if writer is not None and writer.submit(entry):
+            return None
+
+        # Create audit log entry (async disabled or buffer full)
+        return create_audit_log(**entry)
 
     except Exception as e:
         # Audit logging should never fail the main operation
@@ -187,61 +378,9 @@ def _get_entity_state(entity_type: str, entity_id: int) -> dict:
         entity_id: Entity ID
 
     Returns:
-        Dictionary with entity state, or None if not found
+        Dictionary with the audited columns, or None if not found
     """
-    try:
-        if entity_type == 'reservation':
-            from models.reservation import get_reservation_with_details
-            reservation = get_reservation_with_details(entity_id)
-            if reservation:
-                # Return relevant fields for audit comparison
-                return {
-                    'id': reservation.get('id'),
-                    'customer_id': reservation.get('customer_id'),
-                    'customer_name': reservation.get('customer_name'),
-                    'reservation_date': reservation.get('reservation_date'),
-                    'num_people': reservation.get('num_people'),
-                    'current_state': reservation.get('current_state'),
-                    'current_states': reservation.get('current_states'),
-                    'notes': reservation.get('notes'),
-                    'paid': reservation.get('paid'),
-                    'final_price': reservation.get('final_price'),
-                    'payment_method': reservation.get('payment_method')
-                }
-
-        elif entity_type == 'customer':
-            from models.customer_crud import get_customer_by_id
-            customer = get_customer_by_id(entity_id)
-            if customer:
-                # Return relevant fields, excluding sensitive data
-                return {
-                    'id': customer.get('id'),
-                    'name': customer.get('name'),
-                    'email': customer.get('email'),
-                    'phone': customer.get('phone'),
-                    'customer_type': customer.get('customer_type'),
-                    'preferences': customer.get('preferences'),
-                    'observations': customer.get('observations')
-                }
-
-        elif entity_type == 'hotel_guest':
-            from models.hotel_guest import get_hotel_guest_by_id
-            guest = get_hotel_guest_by_id(entity_id)
-            if guest:
-                return {
-                    'id': guest.get('id'),
-                    'name': guest.get('name'),
-                    'room_number': guest.get('room_number'),
-                    'check_in_date': guest.get('check_in_date'),
-                    'check_out_date': guest.get('check_out_date')
-                }
-
-        # Add more entity types as needed
-
-    except Exception as e:
-        logger.warning(f"Failed to get entity state for {entity_type}/{entity_id}: {e}")
-
-    return None
+    return get_audit_snapshot(entity_type, entity_id)
 
 
 def _is_error_response(result) -> bool:
@@ -396,7 +535,12 @@ def log_view(entity_type: str, entity_id: int) -> int:
 
 # Export public API
 __all__ = [
+    'AUDIT_COLUMNS',
     'audit_action',
+    'audit_snapshot',
+    'get_audit_snapshot',
+    'flush_audit_log',
+    'shutdown_audit_writer',
     'log_audit',
     'log_create',
     'log_update',
@@ -0,0 +1,159 @@
+"""
+Process-wide cache for slow-changing reference data.
+
+Entries are grouped in scopes ('zones', 'furniture_types',
+'furniture_layout', 'states', 'characteristics', 'config', 'users',
+'permissions', 'pricing'). Each scope has a generation counter in
+beach_cache_generations, bumped by triggers whenever the underlying tables
+change (see database/migrations/cache_generations.py). A lookup reads the
+counter (one primary-key query) and reuses the cached value while it is
+unchanged, so writes from any gunicorn worker are seen by all of them on the
+next lookup.
+
+Usage:
+    from utils.cache import cached, invalidate
+
+    def get_all_zones(active_only=True):
+        return cached('zones', ('all', active_only), lambda: _load(active_only))
+
+    invalidate('zones')  # after a write, drops this worker's entries at once
+
+For data that changes too often for a generation counter (e.g. audit log
+counts), cached_for() keeps a value for a fixed number of seconds instead.
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+from database import get_db
+
+
+_lock = threading.Lock()
+_entries: dict = {}  # (scope, key) -> (generation, value)
+_timed_entries: dict = {}  # (scope, key) -> (expires_at, value)
+_MAX_TIMED_ENTRIES = 512
+
+
+def get_generation(scope: str) -> Optional[int]:
+    """
+    Read the current generation of a cache scope.
+
+    Uses the request connection without a context manager so it never
+    commits a transaction the caller has open.
+
+    Args:
+        scope: Cache scope name
+
+    Returns:
+        Generation number, or None if the counter table is not migrated yet
+        (caching is then bypassed)
+    """
+    try:
+        row = get_db().execute(
+            'SELECT generation FROM beach_cache_generations WHERE scope = ?', (scope,)
+        ).fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return row['generation'] if row else 0
+
+
+def cached(scope: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+    """
+    Return the cached value for (scope, key), loading it if stale or missing.
+
+    Cached values are shared between threads: callers must treat them as
+    read-only (the model functions using this return copies).
+
+    Args:
+        scope: Cache scope name
+        key: Hashable key within the scope (e.g. function arguments)
+        loader: Zero-argument callable producing the fresh value
+
+    Returns:
+        Cached or freshly loaded value
+    """
+    generation = get_generation(scope)
+    if generation is None:
+        return loader()
+
+    with _lock:
+        entry = _entries.get((scope, key))
+    if entry is not None and entry[0] == generation:
+        return entry[1]
+
+    value = loader()
+    with _lock:
+        _entries[(scope, key)] = (generation, value)
+    return value
+
+
+def cached_for(seconds: float, scope: str, key: Hashable, loader: Callable[[], Any]) -> Any:
+    """
+    Return the value for (scope, key), reloading it once it is older than
+    the given number of seconds (per process; no cross-worker invalidation).
+
+    Args:
+        seconds: Time to live
+        scope: Cache scope name
+        key: Hashable key within the scope
+        loader: Zero-argument callable producing the fresh value
+
+    Returns:
+        Cached or freshly loaded value
+    """
+    now = time.monotonic()
+    with _lock:
+        entry = _timed_entries.get((scope, key))
+    if entry is not None and entry[0] > now:
+        return entry[1]
+
+    value = loader()
+    with _lock:
+        if len(_timed_entries) >= _MAX_TIMED_ENTRIES:
+            # Keys can be open-ended (filter combinations): drop expired ones
+            for cache_key in [k for k, (expires_at, _) in _timed_entries.items() if expires_at <= now]:
+                del _timed_entries[cache_key]
+        _timed_entries[(scope, key)] = (now + seconds, value)
+    return value
+
+
+def invalidate(scope: str = None) -> None:
+    """
+    Drop this process's cached entries for a scope (or for every scope).
+
+    Other workers pick the change up through the generation counter; this
+    only makes the writing worker drop its entries immediately.
+
+    Args:
+        scope: Scope to clear, or None to clear everything
+    """
+    with _lock:
+        if scope is None:
+            _entries.clear()
+            _timed_entries.clear()
+            return
+        for entries in (_entries, _timed_entries):
+            for cache_key in [k for k in entries if k[0] == scope]:
+                del entries[cache_key]
+
+
+def bump_generation(scope: str, conn: sqlite3.Connection = None) -> None:
+    """
+    Bump a scope's generation explicitly (for scopes without triggers).
+    Does not commit: the bump lands with the caller's transaction.
+
+    Args:
+        scope: Cache scope name
+        conn: Optional connection to write on (joins the caller's transaction)
+    """
+    db = conn if conn is not None else get_db()
+    try:
+        db.execute('''
+            INSERT INTO beach_cache_generations (scope, generation) VALUES (?, 1)
+            ON CONFLICT(scope) DO UPDATE SET generation = generation + 1
+        ''', (scope,))
+    except sqlite3.OperationalError:
+        pass
+    invalidate(scope)
@@ -6,12 +6,15 @@ Provides functions to load and check user permissions.
 from flask import g
 from database import get_db
 from models.role import get_role_permissions
+from models.user import get_user_by_id
+from utils.cache import cached
 
 
 def load_user_permissions(user_id: int) -> set:
     """
     Load all permissions for a user based on their role.
-    Caches result in flask.g for per-request reuse.
+    Caches result in flask.g for per-request reuse; the role's permission
+    set itself is cached per process and shared by every user of the role.
 
     Args:
         user_id: User ID
@@ -23,24 +26,37 @@ def load_user_permissions(user_id: int) -> set:
     if hasattr(g, 'user_permissions') and g.user_permissions is not None:
         return g.user_permissions
 
-    db = get_db()
-    cursor = db.cursor()
-
-    # Get user's role
-    cursor.execute('SELECT role_id FROM users WHERE id = ?', (user_id,))
-    row = cursor.fetchone()
+    # Get user's role (cached user row, see get_user_by_id)
+    user = get_user_by_id(user_id)
 
-    if not row or not row['role_id']:
+    if not user or not user['role_id']:
         g.user_permissions = set()
         return g.user_permissions
 
-    # Get all permissions for the role
-    permissions = get_role_permissions(row['role_id'])
-    g.user_permissions = {perm['code'] for perm in permissions}
+    g.user_permissions = set(get_role_permission_codes(user['role_id']))
 
     return g.user_permissions
 
 
+def get_role_permission_codes(role_id: int) -> frozenset:
+    """
+    Get the permission codes of a role.
+
+    Cached per process under the 'permissions' generation, which triggers
+    bump on any permissions/role_permissions write, so revocations apply
+    on the next request in every worker.
+
+    Args:
+        role_id: Role ID
+
+    Returns:
+        Frozenset of permission codes
+    """
+    return cached('permissions', ('role', role_id), lambda: frozenset(
+        perm['code'] for perm in get_role_permissions(role_id)
+    ))
+
+
 def has_permission(user, permission_code: str) -> bool:
     """
     Check if user has a specific permission.
@@ -60,7 +76,8 @@ def get_menu_items(user) -> list:
     """
     Generate hierarchical navigation menu based on user permissions.
     Uses a single query instead of N+1 queries.
-    Caches result in flask.g for per-request reuse.
+    Caches result in flask.g for per-request reuse and per role across
+    requests. Treat the result as read-only.
 
     Args:
         user: User object (Flask-Login)
@@ -73,7 +90,27 @@ def get_menu_items(user) -> list:
         return g.menu_items
 
     user_permissions = load_user_permissions(user.id)
+    role_id = getattr(user, 'role_id', None)
+
+    if role_id is None:
+        g.menu_items = _build_menu(user_permissions)
+    else:
+        # Same role, same permissions: the menu is shared by the role's users
+        g.menu_items = cached('permissions', ('menu', role_id),
+                              lambda: _build_menu(user_permissions))
+    return g.menu_items
+
 
+def _build_menu(user_permissions: set) -> list:
+    """
+    Build the menu structure for a set of permission codes (cache loader).
+
+    Args:
+        user_permissions: Permission codes the menu is filtered by
+
+    Returns:
+        List of parent menu dicts with children lists
+    """
     db = get_db()
     cursor = db.cursor()
 
@@ -126,8 +163,7 @@ def get_menu_items(user) -> list:
                 'children': children
             })
 
-    g.menu_items = menu_structure
-    return g.menu_items
+    return menu_structure
 
 
 def cache_user_permissions(user_id: int):